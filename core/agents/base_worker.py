@@ -11,7 +11,7 @@ class BaseWorker:
         self.name = name
         self.mission = mission
         self.chat_name = chat_name
-        self._status = 'pending'  # pending | running | done | failed | cancelled
+        self._status = 'pending'  # pending | queued | running | done | failed | cancelled
         self._status_lock = threading.Lock()
         self.result = None
         self.error = None
@@ -25,8 +25,10 @@ class BaseWorker:
         self._start_time = None
         self._end_time = None
         self._cancelled = threading.Event()
+        self._finished = threading.Event()
         self._thread = None
         self._on_complete = on_complete
+        self._queued_at = None  # set by AgentManager when the spawn had to wait
 
     @property
     def status(self):
@@ -40,6 +42,13 @@ class BaseWorker:
                 return
             self._status = value
 
+    @property
+    def cancelled(self):
+        """True once cancel() was called. Long-running run() loops should
+        check this between steps and return early; an ExecutionContext run
+        inside run() checks it on its own."""
+        return self._cancelled.is_set()
+
     @property
     def elapsed(self):
         if self._start_time is None:
@@ -48,18 +57,26 @@ class BaseWorker:
         return round(end - self._start_time, 1)
 
     def start(self):
-        self.status = 'running'
-        self._start_time = time.time()
+        """Run on a dedicated thread. AgentManager doesn't use this — it runs
+        workers on its pool via _mark_started() + _run_wrapper()."""
+        self._mark_started()
         self._thread = threading.Thread(
             target=self._run_wrapper, daemon=True, name=f'agent-{self.name}'
         )
         self._thread.start()
 
+    def _mark_started(self):
+        self.status = 'running'
+        self._start_time = time.time()
+
     def cancel(self):
         self._cancelled.set()
-        if self.status == 'running':
+        was_queued = self.status == 'queued'
+        if self.status in ('running', 'queued'):
             self.status = 'cancelled'
             self._end_time = time.time()
+        if was_queued:
+            self._finished.set()  # never ran, nothing to wait for
         # Clear result so recall() doesn't return partial output for a
         # dismissed agent. User said "I don't want this" — honor that.
         self.result = None
@@ -67,7 +84,16 @@ class BaseWorker:
     def _run_wrapper(self):
         from core.event_bus import publish, Events
         try:
-            self.run()
+            # Cancelled while waiting for a pool slot — don't start the work
+            if not self._cancelled.is_set():
+                from core.continuity.execution_context import current_cancel_event
+                # Lets an ExecutionContext inside run() stop between its LLM
+                # and tool steps once cancel() fires
+                token = current_cancel_event.set(self._cancelled)
+                try:
+                    self.run()
+                finally:
+                    current_cancel_event.reset(token)
             if self._cancelled.is_set():
                 self.status = 'cancelled'
                 # Cancellation voids the result — run() may have finished
@@ -115,6 +141,7 @@ class BaseWorker:
                         f"Agent {self.name}: on_complete raised: {e}",
                         exc_info=True,
                     )
+            self._finished.set()
 
     def run(self):
         """Override this in subclasses. Set self.result on success, self.error on failure."""
@@ -1,7 +1,11 @@
 # core/agents/manager.py — Agent lifecycle manager with type registry
+import bisect
+import itertools
 import logging
+import time
 import uuid
 import threading
+from collections import deque
 
 from core.event_bus import publish, Events
 
@@ -11,16 +15,74 @@ logger = logging.getLogger(__name__)
 DEFAULT_NAMES = ['Alpha', 'Bravo', 'Charlie', 'Delta', 'Echo']
 
 
-class AgentManager:
-    """Manages a pool of background agent workers with a pluggable type registry."""
+class AgentStats:
+    """Throughput / latency counters for the agent pool. Caller holds the manager lock."""
+
+    WINDOW = 300  # seconds of completions used for the per-minute rate
+
+    def __init__(self):
+        self.counts = {'done': 0, 'failed': 0, 'cancelled': 0}
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+        self.run_max = 0.0
+        self.finished = 0
+        self._recent = deque(maxlen=1000)  # monotonic finish times
+
+    def record(self, status, wait, run):
+        self.counts[status] = self.counts.get(status, 0) + 1
+        self.finished += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.run_total += run
+        self.run_max = max(self.run_max, run)
+        self._recent.append(time.monotonic())
+
+    def snapshot(self):
+        cutoff = time.monotonic() - self.WINDOW
+        recent = sum(1 for t in self._recent if t >= cutoff)
+        n = self.finished or 1
+        return {
+            **self.counts,
+            'finished': self.finished,
+            'per_minute': round(recent / (self.WINDOW / 60), 2),
+            'avg_wait_s': round(self.wait_total / n, 2),
+            'max_wait_s': round(self.wait_max, 2),
+            'avg_run_s': round(self.run_total / n, 2),
+            'max_run_s': round(self.run_max, 2),
+        }
+
 
-    def __init__(self, max_concurrent=3):
-        self.max_concurrent = max_concurrent
+class AgentManager:
+    """Runs background agent workers on a bounded pool, with a pluggable type registry.
+
+    Up to max_concurrent workers run at once on pool threads. Further spawns
+    wait in a queue of at most max_queued (0 = no queue: reject at the cap).
+    Dispatch order: higher priority first; within a priority, chats take
+    turns (the chat served longest ago goes next); FIFO within a chat — so
+    one chat firing off dozens of missions can't starve another.
+    """
+
+    def __init__(self, max_concurrent=3, max_queued=0):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_queued = max(0, int(max_queued))
         self._agents = {}  # id -> BaseWorker
         self._types = {}   # type_key -> {display_name, spawn_args, factory, names}
         self._lock = threading.Lock()
         self._name_counters = {}  # type_key -> int
 
+        # Scheduling — all guarded by _lock
+        self._queued = {}             # chat_name -> sorted [(-priority, seq, worker)]
+        self._seq = itertools.count()
+        self._chat_turn = {}          # chat_name -> dispatch tick when last served
+        self._tick = itertools.count(1)
+        self._ready = deque()         # dispatched, waiting for a pool thread to pick up
+        self._in_flight = 0           # dispatched and not yet returned from run()
+        self._work = threading.Condition(self._lock)
+        self._pool = []
+        self._stopping = False
+        self._stats = AgentStats()
+
     # --- Type registry ---
 
     def register_type(self, type_key, display_name, factory, spawn_args=None, names=None):
@@ -65,7 +127,7 @@ class AgentManager:
         names = self._types.get(type_key, {}).get('names', DEFAULT_NAMES)
         # Reset counter when no agents of this type are active
         active_of_type = any(
-            a.status == 'running' for a in self._agents.values()
+            a.status in ('running', 'queued') for a in self._agents.values()
             if hasattr(a, '_agent_type') and a._agent_type == type_key
         )
         if not active_of_type:
@@ -78,15 +140,28 @@ class AgentManager:
     def _active_count(self):
         return sum(1 for a in self._agents.values() if a.status == 'running')
 
-    def spawn(self, agent_type, mission, chat_name='', **kwargs) -> dict:
-        """Spawn a new agent. Returns {id, name} or {error}."""
+    def _queued_count(self):
+        return sum(len(jobs) for jobs in self._queued.values())
+
+    def spawn(self, agent_type, mission, chat_name='', priority=0, **kwargs) -> dict:
+        """Spawn a new agent. Returns {id, name, status} or {error}.
+
+        status is 'running', or 'queued' (with queue_position) when every
+        pool slot is busy. Higher priority jobs are dispatched first.
+        """
         type_info = self._types.get(agent_type)
         if not type_info:
             available = ', '.join(self._types.keys()) or 'none'
             return {'error': f"Unknown agent type '{agent_type}'. Available: {available}"}
 
         with self._lock:
-            if self._active_count() >= self.max_concurrent:
+            if self._stopping:
+                return {'error': 'Agent system is shutting down.'}
+            full = self._in_flight >= self.max_concurrent
+            if full and self._queued_count() >= self.max_queued:
+                if self.max_queued:
+                    return {'error': f'Agent limit reached ({self.max_concurrent} running, '
+                                     f'{self.max_queued} queued). Dismiss or wait for an agent to finish.'}
                 return {'error': f'Agent limit reached ({self.max_concurrent}). Dismiss or wait for an agent to finish.'}
 
             agent_id = uuid.uuid4().hex[:8]
@@ -101,10 +176,13 @@ class AgentManager:
                 **kwargs
             )
             worker._agent_type = agent_type
-            worker.status = 'running'
+            worker._queued_at = time.monotonic()
+            worker.status = 'queued'
             self._agents[agent_id] = worker
-
-        worker.start()
+            bisect.insort(self._queued.setdefault(chat_name, []), (-priority, next(self._seq), worker))
+            self._dispatch_locked()
+            status = worker.status
+            position = self._queue_order_locked().index(agent_id) + 1 if status == 'queued' else None
 
         publish(Events.AGENT_SPAWNED, {
             'id': agent_id,
@@ -112,18 +190,113 @@ class AgentManager:
             'mission': mission,
             'chat_name': chat_name,
             'agent_type': agent_type,
+            'status': status,
         })
 
+        if position:
+            logger.info(f"Agent {name} ({agent_id}) queued at position {position}: type={agent_type}, mission={mission[:80]}")
+            return {'id': agent_id, 'name': name, 'status': status, 'queue_position': position}
         logger.info(f"Agent {name} ({agent_id}) spawned: type={agent_type}, mission={mission[:80]}")
-        return {'id': agent_id, 'name': name}
+        return {'id': agent_id, 'name': name, 'status': status}
+
+    # --- Pool ---
+
+    def _pick_locked(self):
+        """Pop the next queued worker: best priority, then the chat served longest ago."""
+        best_key, best_chat = None, None
+        for chat, jobs in self._queued.items():
+            neg_priority, seq, _ = jobs[0]
+            key = (neg_priority, self._chat_turn.get(chat, 0), seq)
+            if best_key is None or key < best_key:
+                best_key, best_chat = key, chat
+        jobs = self._queued[best_chat]
+        worker = jobs.pop(0)[2]
+        if not jobs:
+            del self._queued[best_chat]
+        self._chat_turn[best_chat] = next(self._tick)
+        return worker
+
+    def _queue_order_locked(self):
+        """Agent ids in the order they'd be dispatched (for queue_position)."""
+        queued = {chat: list(jobs) for chat, jobs in self._queued.items()}
+        turns = dict(self._chat_turn)
+        tick = max(turns.values(), default=0)
+        order = []
+        while queued:
+            chat = min(queued, key=lambda c: (queued[c][0][0], turns.get(c, 0), queued[c][0][1]))
+            order.append(queued[chat].pop(0)[2].id)
+            if not queued[chat]:
+                del queued[chat]
+            tick += 1
+            turns[chat] = tick
+        return order
+
+    def _dispatch_locked(self):
+        """Move queued workers onto free pool slots."""
+        while self._queued and self._in_flight < self.max_concurrent and not self._stopping:
+            worker = self._pick_locked()
+            self._in_flight += 1
+            worker._mark_started()
+            self._ready.append(worker)
+            if len(self._pool) < self.max_concurrent:
+                t = threading.Thread(target=self._pool_loop, daemon=True,
+                                     name=f'agent-pool-{len(self._pool) + 1}')
+                self._pool.append(t)
+                t.start()
+            self._work.notify()
+
+    def _pool_loop(self):
+        while True:
+            with self._work:
+                while not self._ready and not self._stopping:
+                    self._work.wait()
+                if not self._ready:
+                    return
+                worker = self._ready.popleft()
+            self._execute(worker)
+
+    def _execute(self, worker):
+        started = time.monotonic()
+        try:
+            worker._run_wrapper()
+        except Exception as e:
+            # _run_wrapper guards run() and its callbacks; this is belt and braces
+            logger.error(f"Agent {worker.name}: pool execution raised: {e}", exc_info=True)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._stats.record(
+                    worker.status if worker.status in ('done', 'failed', 'cancelled') else 'done',
+                    started - (worker._queued_at or started),
+                    time.monotonic() - started,
+                )
+                self._dispatch_locked()
+
+    def stats(self) -> dict:
+        """Pool occupancy plus throughput / latency since startup."""
+        with self._lock:
+            return {
+                'workers': self.max_concurrent,
+                'running': self._in_flight,
+                'queued': self._queued_count(),
+                'max_queued': self.max_queued,
+                **self._stats.snapshot(),
+            }
 
     def check_all(self, chat_name='') -> list:
-        """Return status of agents, optionally filtered by chat."""
+        """Return status of agents, optionally filtered by chat. Queued agents
+        carry queue_position (1 = next to start)."""
         with self._lock:
             agents = self._agents.values()
             if chat_name:
                 agents = [a for a in agents if a.chat_name == chat_name]
-            return [a.to_dict() for a in agents]
+            out = [a.to_dict() for a in agents]
+            if self._queued:
+                order = {aid: i + 1 for i, aid in enumerate(self._queue_order_locked())}
+                for d in out:
+                    if d['id'] in order:
+                        d['queue_position'] = order[d['id']]
+            return out
 
     def recall(self, agent_id) -> dict:
         """Get an agent's report."""
@@ -133,6 +306,8 @@ class AgentManager:
             return {'error': f'Agent {agent_id} not found.'}
         if agent.status == 'running':
             return {'name': agent.name, 'status': 'running', 'result': 'Agent is still running.'}
+        if agent.status == 'queued':
+            return {'name': agent.name, 'status': 'queued', 'result': 'Agent is queued and has not started yet.'}
         return {
             'name': agent.name,
             'status': agent.status,
@@ -147,7 +322,9 @@ class AgentManager:
             agent = self._agents.get(agent_id)
             if not agent:
                 return {'error': f'Agent {agent_id} not found.'}
-            if agent.status == 'running':
+            if agent.status == 'queued':
+                self._unqueue_locked(agent)
+            if agent.status in ('running', 'queued'):
                 agent.cancel()
             self._agents.pop(agent_id, None)
 
@@ -155,6 +332,12 @@ class AgentManager:
         logger.info(f"Agent {agent.name} ({agent_id}) dismissed")
         return {'name': agent.name, 'status': 'dismissed', 'last_result': agent.result}
 
+    def _unqueue_locked(self, worker):
+        jobs = self._queued.get(worker.chat_name, [])
+        self._queued[worker.chat_name] = [j for j in jobs if j[2] is not worker]
+        if not self._queued[worker.chat_name]:
+            del self._queued[worker.chat_name]
+
     def _check_batch_complete(self, agent_id, chat_name):
         """Called when an agent finishes. If all agents for this chat are done, publish batch report."""
         logger.info(f"[batch-gate] ENTER _check_batch_complete agent_id={agent_id} chat={chat_name!r}")
@@ -164,7 +347,7 @@ class AgentManager:
                 logger.info(f"[batch-gate] chat={chat_name!r} no agents in registry (agent_id={agent_id} already popped?) — skipping batch fire")
                 return
             statuses = [(a.name, a.status) for a in chat_agents]
-            still_running = [a.name for a in chat_agents if a.status == 'running']
+            still_running = [a.name for a in chat_agents if a.status in ('running', 'queued')]
             if still_running:
                 logger.info(f"[batch-gate] chat={chat_name!r} batch NOT ready — "
                             f"all agents: {statuses}, still running: {still_running}")
@@ -197,14 +380,22 @@ class AgentManager:
         logger.info(f"Agent batch complete for chat '{chat_name}': {len(dismissed_ids)} agents reported")
 
     def shutdown(self, timeout=10):
-        """Cancel all running agents and wait for threads to finish. Called on app shutdown."""
+        """Cancel queued and running agents, wait for them to finish. Called on app shutdown."""
         with self._lock:
-            running = [(aid, a) for aid, a in self._agents.items() if a.status == 'running']
+            self._stopping = True
+            self._queued.clear()
+            running = [(aid, a) for aid, a in self._agents.items() if a.status in ('running', 'queued')]
         for aid, agent in running:
             logger.info(f"Shutting down agent {agent.name} ({aid})")
             agent.cancel()
+        deadline = time.monotonic() + timeout
         for aid, agent in running:
+            remaining = max(0, deadline - time.monotonic())
             if agent._thread and agent._thread.is_alive():
-                agent._thread.join(timeout=timeout)
+                agent._thread.join(timeout=remaining)
+            elif agent._start_time is not None:
+                agent._finished.wait(remaining)
+        with self._work:
+            self._work.notify_all()
         with self._lock:
             self._agents.clear()
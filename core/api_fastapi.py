@@ -21,6 +21,8 @@ from core.auth import (
 from core.setup import get_password_hash, save_password_hash, verify_password, is_setup_complete
 from core.event_bus import publish, Events
 from core import prompts
+from core.static_assets import AssetManifest, AssetStaticFiles
+from core.http_middleware import SapphireHTTPMiddleware
 
 logger = logging.getLogger(__name__)
 
@@ -46,17 +48,15 @@ def _is_managed():
     return settings.is_managed()
 
 
-def _build_import_map():
-    """Build ES module import map — versions every JS file so browsers cache-bust on restart."""
-    imports = {}
-    for js_file in STATIC_DIR.rglob('*.js'):
-        rel = js_file.relative_to(STATIC_DIR).as_posix()
-        url = f"/static/{rel}"
-        imports[url] = f"{url}?v={BOOT_VERSION}"
-    return json.dumps({"imports": imports})
+# Content-hash manifest for /static — see core/static_assets.py.
+# Built in set_system() at startup (or on first request), not at import.
+STATIC_ASSETS = AssetManifest(STATIC_DIR)
 
 
-IMPORT_MAP = _build_import_map()
+def _build_import_map():
+    """Build ES module import map — every JS file maps to its content-hashed URL,
+    so browsers keep modules across restarts until the file itself changes."""
+    return STATIC_ASSETS.import_map()
 
 # =============================================================================
 # APP SETUP
@@ -81,7 +81,7 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
 # Session middleware added after HTTP middleware decorators below (outermost = LIFO)
 
 # Static files
-app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+app.mount("/static", AssetStaticFiles(directory=str(STATIC_DIR), manifest=STATIC_ASSETS), name="static")
 
 # User assets (avatars, etc)
 if USER_PUBLIC_DIR.exists():
@@ -170,6 +170,7 @@ def set_system(system, restart_callback=None, shutdown_callback=None):
     _system = system
     _restart_callback = restart_callback
     _shutdown_callback = shutdown_callback
+    STATIC_ASSETS.ensure_built()
     logger.info("System instance registered with FastAPI")
 
 
@@ -191,62 +192,13 @@ def get_shutdown_callback():
 
 
 # =============================================================================
-# REQUEST LOGGING
-# =============================================================================
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log incoming requests."""
-    if request.url.path.startswith('/static/'):
-        logger.debug(f"REQ: {request.method} {request.url.path}")
-    else:
-        logger.info(f"REQ: {request.method} {request.url.path}")
-    response = await call_next(request)
-    if response.status_code >= 400 and not request.url.path.startswith('/static/'):
-        logger.warning(f"RSP: {response.status_code} {request.method} {request.url.path}")
-    return response
-
-
-# =============================================================================
-# SECURITY HEADERS
+# REQUEST LOGGING / CSRF / SECURITY HEADERS
 # =============================================================================
 
-@app.middleware("http")
-async def csrf_protection(request: Request, call_next):
-    """Validate CSRF token on state-changing requests from browser sessions."""
-    if request.method not in ("GET", "HEAD", "OPTIONS"):
-        # API key auth (internal/tool calls) — skip CSRF
-        if not request.headers.get('X-API-Key'):
-            # Form-based endpoints handle their own CSRF
-            if request.url.path not in ("/login", "/setup"):
-                if request.session.get('logged_in'):
-                    csrf_header = request.headers.get('X-CSRF-Token')
-                    session_token = request.session.get('csrf_token')
-                    if not csrf_header or not session_token or csrf_header != session_token:
-                        from starlette.responses import JSONResponse
-                        return JSONResponse(status_code=403, content={"detail": "CSRF validation failed"})
-    return await call_next(request)
-
-
-@app.middleware("http")
-async def security_headers(request: Request, call_next):
-    """Add security headers to all responses."""
-    response = await call_next(request)
-    response.headers['X-Content-Type-Options'] = 'nosniff'
-    response.headers['X-Frame-Options'] = 'DENY'
-    response.headers['X-XSS-Protection'] = '1; mode=block'
-
-    # Static assets: cached 1hr, busted by ?v=BOOT_VERSION (changes every restart)
-    # Import map in index.html ensures ALL JS modules get versioned URLs
-    if request.url.path.startswith('/static/'):
-        response.headers['Cache-Control'] = 'public, max-age=3600'
-    elif 'cache-control' not in response.headers:
-        # API responses must never be cached — prevents stale fetch() after hard refresh
-        # (Ctrl+Shift+R only bypasses cache for HTML, not JS fetch() calls)
-        response.headers['Cache-Control'] = 'no-store'
-
-    response.headers['Connection'] = 'keep-alive'
-    return response
+# One pure-ASGI middleware (core/http_middleware.py) instead of three
+# @app.middleware("http") layers, so streamed bodies (SSE) aren't re-sent
+# through a memory stream per layer. Also records per-route latency.
+app.add_middleware(SapphireHTTPMiddleware)
 
 
 # Session middleware - added AFTER HTTP middleware so it's outermost (Starlette LIFO)
@@ -320,7 +272,8 @@ async def index(request: Request, _=Depends(require_login)):
         "v": BOOT_VERSION,
         "app_version": APP_VERSION,
         "managed": _is_managed(),
-        "import_map": IMPORT_MAP
+        "import_map": _build_import_map(),
+        "asset": STATIC_ASSETS.url
     })
 
 
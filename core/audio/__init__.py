@@ -1,11 +1,13 @@
 # core/audio - Unified audio subsystem for Sapphire
 #
 # Provides shared device detection, configuration, and utilities
-# used by both STT recorder and wakeword detection.
+# used by both STT recorder and wakeword detection, plus the float32 DSP
+# (conversions, levels, polyphase resampling) shared with TTS.
 
 from .device_manager import DeviceManager, get_device_manager
 from .errors import AudioError, classify_audio_error
 from .utils import convert_to_mono, resample_audio, get_temp_dir
+from .dsp import StreamResampler, resample
 
 __all__ = [
     'DeviceManager',
@@ -15,4 +17,6 @@ __all__ = [
     'convert_to_mono',
     'resample_audio',
     'get_temp_dir',
+    'StreamResampler',
+    'resample',
 ]
\ No newline at end of file
@@ -0,0 +1,220 @@
+# core/audio/dsp.py - Shared float32 DSP: conversions, levels, polyphase resampling
+"""
+Audio DSP shared by TTS playback, the STT recorder and wake word capture.
+
+Resampling used to be np.interp (linear interpolation) reimplemented in
+three places, partly on float64 copies. Linear interpolation has no
+anti-aliasing filter, so downsampling 48kHz mics to 16kHz for wake word
+folded everything above 8kHz back into the speech band.
+
+Resampling here is polyphase: the rate change is reduced to a rational
+up/down pair, and one Kaiser-windowed sinc low-pass is designed per pair,
+split into `up` phases and cached. Each output sample is then a K-tap dot
+product (K ~ 32) on float32 — no upsampled intermediate is ever built.
+StreamResampler keeps the filter history between chunks, so device audio
+can be converted block by block with no seams; resample() is the one-shot
+form of the same thing.
+
+Micro-benchmarks against np.interp: `python tools/dsp_bench.py`.
+"""
+
+import logging
+from fractions import Fraction
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+INT16_SCALE = 32768.0
+
+ZERO_CROSSINGS = 16     # sinc half-width in output/input samples; sets taps per phase
+KAISER_BETA = 8.6       # ~80 dB stopband
+ROLLOFF = 0.94          # cutoff as a fraction of the lower Nyquist
+MAX_RATIO_TERM = 1024   # larger up/down terms are approximated (odd device rates)
+
+
+# ─── Conversions ──────────────────────────────────────────────────────────────
+
+def to_float32(audio: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """int16 PCM (or any float) to float32 in [-1, 1). float32 input is
+    returned as-is; pass `out` to convert into an existing buffer."""
+    if audio.dtype == np.float32 and out is None:
+        return audio
+    if out is None:
+        out = np.empty(audio.shape, dtype=np.float32)
+    if audio.dtype == np.int16:
+        np.multiply(audio, np.float32(1.0 / INT16_SCALE), out=out, casting='unsafe')
+    else:
+        out[...] = audio
+    return out
+
+
+def to_int16(audio: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """float audio in [-1, 1] to int16 PCM, clipped. int16 input is returned as-is."""
+    if audio.dtype == np.int16:
+        return audio
+    if out is None:
+        out = np.empty(audio.shape, dtype=np.int16)
+    scaled = np.multiply(audio, np.float32(INT16_SCALE), dtype=np.float32)
+    np.clip(scaled, -INT16_SCALE, INT16_SCALE - 1, out=scaled)
+    np.rint(scaled, out=scaled)
+    out[...] = scaled
+    return out
+
+
+def to_mono(audio: np.ndarray) -> np.ndarray:
+    """Average channels of (frames, channels) audio into 1-D float32."""
+    if audio.ndim == 1:
+        return to_float32(audio)
+    if audio.shape[1] == 1:
+        return to_float32(audio.reshape(-1))
+    mono = np.mean(audio, axis=1, dtype=np.float32)
+    if audio.dtype == np.int16:
+        mono *= np.float32(1.0 / INT16_SCALE)
+    return mono
+
+
+def peak(audio: np.ndarray) -> float:
+    """Peak level normalized to 0.0-1.0 (int16 or float input)."""
+    if audio.size == 0:
+        return 0.0
+    level = max(float(audio.max()), -float(audio.min()))  # no abs() temporary
+    return level / INT16_SCALE if audio.dtype == np.int16 else level
+
+
+def rms(audio: np.ndarray) -> float:
+    """RMS level normalized to 0.0-1.0 (int16 or float input)."""
+    if audio.size == 0:
+        return 0.0
+    samples = to_float32(audio)
+    return float(np.sqrt(np.dot(samples.ravel(), samples.ravel()) / samples.size))
+
+
+# ─── Polyphase resampling ─────────────────────────────────────────────────────
+
+def rate_ratio(from_rate: float, to_rate: float) -> Tuple[int, int]:
+    """Reduced (up, down) for a rate change. Terms past MAX_RATIO_TERM are
+    approximated — the output rate is then off by a fraction of a percent."""
+    ratio = Fraction(int(round(to_rate)), int(round(from_rate)))
+    if max(ratio.numerator, ratio.denominator) > MAX_RATIO_TERM:
+        ratio = Fraction(to_rate / from_rate).limit_denominator(MAX_RATIO_TERM)
+    return ratio.numerator, ratio.denominator
+
+
+@lru_cache(maxsize=32)
+def filter_bank(up: int, down: int) -> Tuple[np.ndarray, int]:
+    """Polyphase low-pass for an up/down pair: (bank, delay).
+
+    bank[p, K-1-k] is tap p + k*up of the prototype filter, shape (up, K) —
+    reversed so it dots straight into a forward window of K inputs; delay
+    is the prototype's centre in upsampled samples. Cached — designing
+    a filter costs far more than applying it to a short chunk.
+    """
+    span = max(up, down)
+    half = ZERO_CROSSINGS * span
+    n = np.arange(2 * half + 1, dtype=np.float64) - half
+    cutoff = ROLLOFF / (2.0 * span)
+    proto = 2.0 * cutoff * np.sinc(2.0 * cutoff * n) * np.kaiser(n.size, KAISER_BETA)
+    proto *= up / proto.sum()  # unity DC gain after zero-stuffing by `up`
+    taps = -(-proto.size // up)
+    padded = np.zeros(taps * up, dtype=np.float64)
+    padded[:proto.size] = proto
+    bank = np.ascontiguousarray(padded.reshape(taps, up).T[:, ::-1], dtype=np.float32)
+    bank.setflags(write=False)
+    return bank, half
+
+
+class StreamResampler:
+    """Chunk-by-chunk polyphase resampler for 1-D float32 audio.
+
+    process() returns every output sample whose filter window is covered by
+    the input so far; flush() zero-pads the tail and returns the rest, after
+    which the resampler is reset. Concatenated outputs match resample() on
+    the whole signal (to float32 rounding).
+    """
+
+    def __init__(self, from_rate: float, to_rate: float):
+        self.from_rate = from_rate
+        self.to_rate = to_rate
+        self.up, self.down = rate_ratio(from_rate, to_rate)
+        self.passthrough = self.up == self.down
+        if not self.passthrough:
+            self._bank, self._delay = filter_bank(self.up, self.down)
+            self._taps = self._bank.shape[1]
+        self.reset()
+
+    def reset(self):
+        self._consumed = 0   # input samples seen
+        self._produced = 0   # output samples returned
+        if not self.passthrough:
+            self._history = np.zeros(self._taps - 1, dtype=np.float32)
+
+    def _available(self, last_input: int) -> int:
+        """Outputs whose newest needed input index is <= last_input."""
+        return max(0, ((last_input + 1) * self.up - self._delay - 1) // self.down + 1)
+
+    def _run(self, chunk: np.ndarray, n_end: int) -> np.ndarray:
+        buf = np.concatenate((self._history, chunk))
+        origin = self._consumed - (self._taps - 1)   # global index of buf[0]
+        n_start = self._produced
+        count = max(0, n_end - n_start)
+        out = np.empty(count, dtype=np.float32)
+        if count:
+            # Outputs r, r+up, r+2*up, ... share a phase and their windows
+            # advance by `down` inputs: one strided matrix-vector product each.
+            windows = sliding_window_view(buf, self._taps)
+            for r in range(min(self.up, count)):
+                base, phase = divmod((n_start + r) * self.down + self._delay, self.up)
+                start = base - origin - (self._taps - 1)
+                rows = -(-(count - r) // self.up)
+                out[r::self.up] = windows[start:start + (rows - 1) * self.down + 1:self.down] @ self._bank[phase]
+        self._consumed += chunk.size
+        self._produced = max(self._produced, n_end)
+        keep = self._taps - 1
+        self._history = buf[-keep:].copy() if keep else buf[:0].copy()
+        return out
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        chunk = to_float32(np.asarray(chunk).reshape(-1))
+        if self.passthrough:
+            self._consumed += chunk.size
+            self._produced += chunk.size
+            return chunk
+        n_end = self._available(self._consumed + chunk.size - 1)
+        return self._run(chunk, n_end)
+
+    def flush(self) -> np.ndarray:
+        """Remaining output for the input so far (ceil(N * up / down) total)."""
+        if self.passthrough:
+            self.reset()
+            return np.empty(0, dtype=np.float32)
+        total = -(-self._consumed * self.up // self.down)
+        pad = np.zeros(max(0, (self._delay // self.up) + 2), dtype=np.float32)
+        out = self._run(pad, total) if total > self._produced else np.empty(0, dtype=np.float32)
+        self.reset()
+        return out
+
+
+def resample(audio: np.ndarray, from_rate: float, to_rate: float) -> np.ndarray:
+    """Resample 1-D audio with the cached polyphase filter. Returns float32
+    (int16 input is scaled to [-1, 1)); length is ceil(N * to / from)."""
+    audio = np.asarray(audio).reshape(-1)
+    if int(round(from_rate)) == int(round(to_rate)) or audio.size == 0:
+        if audio.size == 0:
+            return np.empty(0, dtype=np.float32)
+        return to_float32(audio)
+    rs = StreamResampler(from_rate, to_rate)
+    head = rs.process(audio)
+    return np.concatenate((head, rs.flush()))
+
+
+def change_speed(audio: np.ndarray, factor: float) -> np.ndarray:
+    """Play-faster/slower by `factor` at the same sample rate (pitch moves
+    with it). factor is approximated to a ratio with terms <= 64."""
+    if factor == 1.0:
+        return to_float32(audio)
+    ratio = Fraction(1.0 / factor).limit_denominator(64)
+    return resample(audio, ratio.denominator, ratio.numerator)
@@ -10,6 +10,8 @@ import tempfile
 import os
 import logging
 
+from . import dsp
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,8 +54,9 @@ def resample_audio(audio_data: np.ndarray, from_rate: int, to_rate: int) -> np.n
     """
     Resample audio from one sample rate to another.
     
-    Uses linear interpolation - simple and fast enough for 
-    speech processing (STT and wake word detection).
+    One-shot polyphase resampling (see core.audio.dsp). For audio that
+    arrives in chunks, keep a dsp.StreamResampler instead so the filter
+    state carries across chunk boundaries.
     
     Args:
         audio_data: Input audio samples
@@ -65,19 +68,7 @@ def resample_audio(audio_data: np.ndarray, from_rate: int, to_rate: int) -> np.n
     """
     if from_rate == to_rate:
         return audio_data
-    
-    ratio = to_rate / from_rate
-    new_length = int(len(audio_data) * ratio)
-    
-    if new_length == 0:
-        return np.array([], dtype=np.int16)
-    
-    # Linear interpolation
-    old_indices = np.arange(len(audio_data))
-    new_indices = np.linspace(0, len(audio_data) - 1, new_length)
-    resampled = np.interp(new_indices, old_indices, audio_data.astype(np.float32))
-    
-    return resampled.astype(np.int16)
+    return dsp.to_int16(dsp.resample(audio_data, from_rate, to_rate))
 
 
 def calculate_rms(audio_data: np.ndarray) -> float:
@@ -90,16 +81,7 @@ def calculate_rms(audio_data: np.ndarray) -> float:
     Returns:
         RMS level normalized to 0.0-1.0 range
     """
-    if len(audio_data) == 0:
-        return 0.0
-    
-    # Normalize to float range
-    if audio_data.dtype == np.int16:
-        samples = audio_data.astype(np.float32) / 32768.0
-    else:
-        samples = audio_data.astype(np.float32)
-    
-    return float(np.sqrt(np.mean(samples ** 2)))
+    return dsp.rms(audio_data)
 
 
 def calculate_peak(audio_data: np.ndarray) -> float:
@@ -112,13 +94,4 @@ def calculate_peak(audio_data: np.ndarray) -> float:
     Returns:
         Peak level normalized to 0.0-1.0 range
     """
-    if len(audio_data) == 0:
-        return 0.0
-    
-    # Normalize to float range
-    if audio_data.dtype == np.int16:
-        samples = audio_data.astype(np.float32) / 32768.0
-    else:
-        samples = audio_data.astype(np.float32)
-    
-    return float(np.max(np.abs(samples)))
\ No newline at end of file
+    return dsp.peak(audio_data)
@@ -1,3 +1,4 @@
+import json
 import tarfile
 import sqlite3
 import logging
@@ -5,6 +6,7 @@ import threading
 from datetime import datetime
 from pathlib import Path
 import config
+from core.backup_store import SnapshotStore
 
 logger = logging.getLogger(__name__)
 
@@ -16,21 +18,24 @@ logger = logging.getLogger(__name__)
 #  - in-flight tmp files from atomic-rename writes. They may be truncated
 #    JSON and pollute the backup with partial state.
 _BACKUP_EXCLUDE_SUFFIXES = ('.tmp',)
-def _backup_filter(tarinfo):
-    name = tarinfo.name
+def _excluded(name):
     # `.bad-<timestamp>` suffix from corrupted-state quarantine
     if '.bad-' in name:
-        return None
+        return True
     # .tmp rename files + .tmp.<pid>.<id> from PluginState._save
     if name.endswith('.tmp') or '.tmp.' in name:
-        return None
+        return True
     # MCP bearer key files (any plugin) — plaintext live credentials. Backups
     # land on RAID + offsite sync; including these spreads the key everywhere.
     # Krem keeps them recoverable via re-generation in the plugin UI; backup
     # exclusion is the right tradeoff. Witch-hunt 2026-04-21 finding C5.
     if name.endswith('_mcp_key.json'):
-        return None
-    return tarinfo
+        return True
+    return False
+
+
+def _backup_filter(tarinfo):
+    return None if _excluded(tarinfo.name) else tarinfo
 
 
 class Backup:
@@ -49,6 +54,9 @@ class Backup:
         # older backup deleted to make room for a still-writing new one.
         # Witch-hunt 2026-04-21 finding R5.
         self._backup_op_lock = threading.Lock()
+        # Incremental snapshots under user_backups/incremental/
+        self._snapshot_store = SnapshotStore(
+            self.user_dir, self.backup_dir / "incremental", exclude=_excluded)
         logger.info(f"Backup initialized - base_dir: {self.base_dir}, backup_dir: {self.backup_dir}")
 
     def run_scheduled(self):
@@ -108,7 +116,10 @@ class Backup:
             logger.error(f"User directory not found: {self.user_dir}")
             return None
 
+        self._flush_chat_sessions()
         timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+        if getattr(config, 'BACKUPS_MODE', 'full') == 'incremental':
+            return self._create_incremental(f"sapphire_{timestamp}_{backup_type}", backup_type)
         filename = f"sapphire_{timestamp}_{backup_type}.tar.gz"
         filepath = self.backup_dir / filename
         partial = filepath.with_suffix('.gz.partial')
@@ -136,6 +147,78 @@ class Backup:
                 logger.warning(f"Backup partial cleanup failed: {cleanup_err}")
             return None
 
+    def _create_incremental(self, name, backup_type):
+        """Snapshot user/ into the chunk store. Only new or changed files are
+        read and compressed; databases go through sqlite's online backup."""
+        level = getattr(config, 'BACKUPS_COMPRESSION_LEVEL', 3)
+        try:
+            manifest = self._snapshot_store.create(name, backup_type, level=level)
+        except Exception as e:
+            logger.error(f"Incremental backup failed: {e}", exc_info=True)
+            return None
+        st = manifest["stats"]
+        logger.info(
+            f"Created incremental backup: {name} ({st['files']} files, {st['unchanged']} unchanged, "
+            f"{st['new_chunks']} new chunks, {st['new_bytes'] / (1024 * 1024):.2f} MB stored, "
+            f"{st['seconds']}s)"
+        )
+        return f"{name}.json"
+
+    def verify_backup(self, filename):
+        """Check an incremental backup's chunks are present and intact."""
+        name = self._manifest_name(filename)
+        if not name:
+            return None
+        return self._snapshot_store.verify(name)
+
+    def restore_backup(self, filename, target_dir):
+        """Rebuild an incremental backup's user/ tree under target_dir."""
+        name = self._manifest_name(filename)
+        if not name:
+            return None
+        return self._snapshot_store.restore(name, Path(target_dir))
+
+    def export_backup(self, filename):
+        """Write an incremental backup out as a tar.gz (same layout as a full
+        backup) for download. Caller deletes the returned temp file."""
+        name = self._manifest_name(filename)
+        if not name:
+            return None
+        import tempfile
+        fd, tmp = tempfile.mkstemp(dir=self.backup_dir, prefix=".export-", suffix=".tar.gz")
+        try:
+            with open(fd, 'wb') as f:
+                self._snapshot_store.export_tar(name, f)
+        except Exception as e:
+            logger.error(f"Export of {filename} failed: {e}")
+            Path(tmp).unlink(missing_ok=True)
+            return None
+        return Path(tmp)
+
+    def _manifest_name(self, filename):
+        """Manifest name for an incremental backup filename, or None if it isn't one."""
+        if "/" in filename or "\\" in filename:
+            return None
+        if not filename.startswith("sapphire_") or not filename.endswith(".json"):
+            return None
+        name = filename[:-len(".json")]
+        if not (self.backup_dir / "incremental" / "manifests" / filename).exists():
+            return None
+        return name
+
+    def _flush_chat_sessions(self):
+        """Write side chats still dirty in memory to SQLite so the backup has them."""
+        try:
+            from core.api_fastapi import get_system
+            system = get_system()
+        except Exception:
+            return  # No running app (CLI, tests) — nothing held in memory
+        try:
+            if not system.llm_chat.session_manager.flush_sessions():
+                logger.warning("Some cached chats could not be saved before backup")
+        except Exception as e:
+            logger.warning(f"Chat flush before backup failed: {e}")
+
     def _checkpoint_databases(self):
         """Flush WAL journals on all SQLite databases so tar captures consistent state."""
         for db_path in self.user_dir.rglob("*.db"):
@@ -293,16 +376,44 @@ class Backup:
             except Exception as e:
                 logger.warning(f"Could not parse backup filename {f.name}: {e}")
 
+        manifest_dir = self.backup_dir / "incremental" / "manifests"
+        for f in (manifest_dir.glob("sapphire_*.json") if manifest_dir.exists() else []):
+            try:
+                parts = f.stem.split("_")
+                if len(parts) >= 4 and parts[-1] in backups:
+                    with open(f, 'r', encoding='utf-8') as fh:
+                        stats = json.load(fh).get("stats", {})
+                    backups[parts[-1]].append({
+                        "filename": f.name,
+                        "date": parts[1],
+                        "time": parts[2],
+                        "size": stats.get("new_bytes", 0),
+                        "logical_size": stats.get("logical_bytes", 0),
+                        "incremental": True,
+                        "path": str(f)
+                    })
+            except Exception as e:
+                logger.warning(f"Could not read backup manifest {f.name}: {e}")
+
         for backup_type in backups:
-            backups[backup_type].sort(key=lambda x: x["filename"], reverse=True)
+            backups[backup_type].sort(key=lambda x: x["filename"].split(".")[0], reverse=True)
 
         return backups
 
-    def delete_backup(self, filename):
-        """Delete a specific backup file."""
+    def delete_backup(self, filename, gc=True):
+        """Delete a specific backup file. Deleting an incremental backup also
+        drops chunks nothing else references (unless gc=False)."""
         if "/" in filename or "\\" in filename:
             return False
 
+        if self._manifest_name(filename):
+            store = self._snapshot_store
+            store.delete(filename[:-len(".json")])
+            if gc:
+                store.gc()
+            logger.info(f"Deleted backup: {filename}")
+            return True
+
         filepath = self.backup_dir / filename
         if not filepath.exists():
             return False
@@ -328,12 +439,17 @@ class Backup:
         }
 
         deleted = 0
+        dropped_snapshots = False
         for backup_type, backup_list in backups.items():
             limit = limits.get(backup_type, 5)
             if len(backup_list) > limit:
                 for backup in backup_list[limit:]:
-                    if self.delete_backup(backup["filename"]):
+                    # One chunk gc after the loop, not one per snapshot
+                    if self.delete_backup(backup["filename"], gc=False):
                         deleted += 1
+                        dropped_snapshots |= bool(backup.get("incremental"))
+        if dropped_snapshots:
+            self._snapshot_store.gc()
 
         if deleted:
             logger.info(f"Rotation complete: deleted {deleted} old backups")
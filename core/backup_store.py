@@ -0,0 +1,440 @@
+"""
+Incremental backups: a content-addressed chunk store plus one manifest per snapshot.
+
+The full backup tars and gzips all of user/ every run. Memory, knowledge,
+history and gallery data rarely change between runs, yet every night the
+whole tree is read, compressed and stored again.
+
+Layout under user_backups/incremental/:
+    chunks/ab/abcdef...   one file per unique 4 MiB chunk, named by sha256
+    manifests/sapphire_<date>_<time>_<type>.json
+
+Each manifest lists every file in the snapshot with its chunk digests. A
+manifest is complete by itself, so deleting an older one never breaks a
+newer one. The `parent` link lets the next run skip a file that still
+matches its size and mtime, without reading it again. Chunks no manifest
+references are removed by gc(). create() and gc() take the same lock:
+a snapshot's chunks are written before its manifest, so a gc in between
+would see them as unreferenced and delete them.
+
+SQLite databases are copied with the online backup API a few pages at a
+time, so writers are never blocked for the whole copy. A database whose
+file and -wal are unchanged since the parent snapshot is skipped.
+
+Chunks are compressed with zstd when `zstandard` is installed and with zlib
+otherwise. It's optional for taking backups, but chunks written with zstd
+can only be read back (verify, restore, export) while it's installed. A
+chunk that doesn't shrink (images, archives) is stored raw.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import tarfile
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 4 * 1024 * 1024
+DB_BACKUP_PAGES = 1024      # pages per online-backup step; lock released between steps
+DEFAULT_LEVEL = 3
+SQLITE_MAGIC = b"SQLite format 3\x00"
+_DB_SIDECARS = ("-wal", "-shm", "-journal")
+
+# One-byte tag at the start of each chunk file
+_RAW, _ZLIB, _ZSTD = b"r", b"d", b"z"
+
+
+def default_codec() -> str:
+    return "zstd" if zstd is not None else "zlib"
+
+
+class ChunkStore:
+    """sha256-addressed blobs, compressed individually, written atomically."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def put(self, data: bytes, level: int = DEFAULT_LEVEL, digest: Optional[str] = None) -> tuple:
+        """Store a chunk unless it's already there. Returns (digest, bytes written)."""
+        digest = digest or hashlib.sha256(data).hexdigest()
+        dest = self.path(digest)
+        if dest.exists():
+            return digest, 0
+        blob = _compress(data, level)
+        dest.parent.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=dest.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp, dest)
+        except Exception:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return digest, len(blob)
+
+    def get(self, digest: str) -> bytes:
+        """Read and decompress a chunk. Raises ValueError if it doesn't hash back."""
+        data = _decompress(self.path(digest).read_bytes())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"chunk {digest[:12]} is corrupt")
+        return data
+
+    def digests(self) -> Iterable[str]:
+        for sub in self.root.iterdir():
+            if sub.is_dir():
+                for f in sub.iterdir():
+                    if not f.name.endswith('.tmp'):
+                        yield f.name
+
+    def remove(self, digest: str) -> int:
+        p = self.path(digest)
+        try:
+            size = p.stat().st_size
+            p.unlink()
+            return size
+        except FileNotFoundError:
+            return 0
+
+
+def _compress(data: bytes, level: int) -> bytes:
+    if zstd is not None:
+        packed, tag = zstd.ZstdCompressor(level=max(1, min(level, 19))).compress(data), _ZSTD
+    else:
+        packed, tag = zlib.compress(data, max(1, min(level, 9))), _ZLIB
+    if len(packed) >= len(data):
+        return _RAW + data
+    return tag + packed
+
+
+def _decompress(blob: bytes) -> bytes:
+    tag, body = blob[:1], blob[1:]
+    if tag == _RAW:
+        return body
+    if tag == _ZLIB:
+        return zlib.decompress(body)
+    if tag == _ZSTD:
+        if zstd is None:
+            raise RuntimeError("chunk is zstd-compressed but the zstandard package is not installed")
+        return zstd.ZstdDecompressor().decompress(body)
+    raise ValueError(f"unknown chunk codec {tag!r}")
+
+
+def _is_sqlite(path: Path) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            return f.read(16) == SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+def _safe_rel(rel: str) -> bool:
+    p = PurePosixPath(rel)
+    return bool(rel) and not p.is_absolute() and '..' not in p.parts
+
+
+class _ChunkReader(io.RawIOBase):
+    """Sequential file-like view over a manifest entry's chunks (for tar export)."""
+
+    def __init__(self, store: ChunkStore, digests: List[str]):
+        self._store = store
+        self._digests = list(digests)
+        self._buf = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buf and self._digests:
+            self._buf = self._store.get(self._digests.pop(0))
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+
+class SnapshotStore:
+    """Incremental snapshots of one directory tree."""
+
+    def __init__(self, source_dir: Path, root: Path, exclude: Optional[Callable[[str], bool]] = None):
+        self.source_dir = Path(source_dir)
+        self.root = Path(root)
+        self.manifest_dir = self.root / "manifests"
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        self.chunks = ChunkStore(self.root / "chunks")
+        self._exclude = exclude or (lambda rel: False)
+        self._staging = self.root / "staging"
+        # Held by create() and gc(); see the module docstring
+        self._lock = threading.Lock()
+
+    # ── Manifests ──
+
+    def names(self) -> List[str]:
+        """Manifest names, oldest first."""
+        return sorted(p.stem for p in self.manifest_dir.glob("sapphire_*.json"))
+
+    def load(self, name: str) -> Dict:
+        with open(self.manifest_dir / f"{name}.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def latest(self) -> Optional[Dict]:
+        for name in reversed(self.names()):
+            try:
+                return self.load(name)
+            except Exception as e:
+                logger.warning(f"Incremental backup: unreadable manifest {name}: {e}")
+        return None
+
+    def chain(self, name: str) -> List[str]:
+        """The manifest and its still-present ancestors, newest first."""
+        out, seen = [], set()
+        while name and name not in seen and (self.manifest_dir / f"{name}.json").exists():
+            seen.add(name)
+            out.append(name)
+            name = self.load(name).get("parent")
+        return out
+
+    def _write_manifest(self, manifest: Dict):
+        dest = self.manifest_dir / f"{manifest['name']}.json"
+        partial = dest.with_suffix('.json.partial')
+        with open(partial, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        partial.replace(dest)
+
+    # ── Create ──
+
+    def create(self, name: str, backup_type: str, level: int = DEFAULT_LEVEL) -> Dict:
+        """Snapshot source_dir. Returns the manifest (with a `stats` block)."""
+        with self._lock:
+            return self._create(name, backup_type, level)
+
+    def _create(self, name: str, backup_type: str, level: int) -> Dict:
+        started = time.monotonic()
+        parent = self.latest()
+        parent_files = parent.get("files", {}) if parent else {}
+        files: Dict[str, Dict] = {}
+        stats = {"files": 0, "unchanged": 0, "databases": 0, "new_chunks": 0,
+                 "new_bytes": 0, "logical_bytes": 0}
+
+        for path, rel in self._walk():
+            try:
+                if path.suffix == '.db' and _is_sqlite(path):
+                    entry = self._snapshot_db(path, rel, parent_files.get(rel), level, stats)
+                    stats["databases"] += 1
+                else:
+                    entry = self._snapshot_file(path, parent_files.get(rel), level, stats)
+            except FileNotFoundError:
+                continue  # deleted mid-walk
+            files[rel] = entry
+            stats["files"] += 1
+            stats["logical_bytes"] += entry["size"]
+
+        stats["seconds"] = round(time.monotonic() - started, 2)
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "name": name,
+            "type": backup_type,
+            "created": datetime.now().isoformat(),
+            "parent": parent["name"] if parent else None,
+            "codec": default_codec(),
+            "level": level,
+            "files": files,
+            "stats": stats,
+        }
+        self._write_manifest(manifest)
+        return manifest
+
+    def _walk(self):
+        for dirpath, dirnames, filenames in os.walk(self.source_dir):
+            dirnames.sort()
+            for fn in sorted(filenames):
+                path = Path(dirpath) / fn
+                rel = path.relative_to(self.source_dir).as_posix()
+                if self._exclude(rel) or path.is_symlink():
+                    continue
+                if fn.endswith(_DB_SIDECARS):
+                    base = fn.rsplit('-', 1)[0]
+                    if (Path(dirpath) / base).exists():
+                        continue  # folded into the database's online backup
+                yield path, rel
+
+    def _snapshot_file(self, path: Path, prev: Optional[Dict], level: int, stats: Dict) -> Dict:
+        st = path.stat()
+        if (prev and prev.get("size") == st.st_size and prev.get("mtime_ns") == st.st_mtime_ns
+                and "sqlite" not in prev and all(self.chunks.has(d) for d in prev["chunks"])):
+            stats["unchanged"] += 1
+            return prev
+        digests, whole = [], hashlib.sha256()
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(CHUNK_SIZE)
+                if not block:
+                    break
+                whole.update(block)
+                digest, written = self.chunks.put(block, level)
+                digests.append(digest)
+                if written:
+                    stats["new_chunks"] += 1
+                    stats["new_bytes"] += written
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "mode": st.st_mode & 0o777,
+                "sha256": whole.hexdigest(), "chunks": digests}
+
+    @staticmethod
+    def _db_signature(path: Path) -> List[int]:
+        sig = []
+        for p in (path, path.with_name(path.name + "-wal")):
+            try:
+                st = p.stat()
+                sig += [st.st_size, st.st_mtime_ns]
+            except FileNotFoundError:
+                sig += [0, 0]
+        return sig
+
+    def _snapshot_db(self, path: Path, rel: str, prev: Optional[Dict], level: int, stats: Dict) -> Dict:
+        sig = self._db_signature(path)
+        if prev and prev.get("sqlite") == sig and all(self.chunks.has(d) for d in prev["chunks"]):
+            stats["unchanged"] += 1
+            return prev
+        self._staging.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self._staging, suffix='.db')
+        os.close(fd)
+        try:
+            src = sqlite3.connect(str(path), timeout=15)
+            dst = sqlite3.connect(tmp)
+            try:
+                src.backup(dst, pages=DB_BACKUP_PAGES)
+            finally:
+                dst.close()
+                src.close()
+            entry = self._snapshot_file(Path(tmp), None, level, stats)
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+        st = path.stat()
+        entry.update({"mtime_ns": st.st_mtime_ns, "mode": st.st_mode & 0o777, "sqlite": sig})
+        return entry
+
+    # ── Verify / restore / export ──
+
+    def verify(self, name: str, deep: bool = True) -> Dict:
+        """Check every chunk the manifest needs is present (deep: and that
+        each file reassembles to its recorded sha256)."""
+        manifest = self.load(name)
+        missing, corrupt = [], []
+        for rel, entry in manifest["files"].items():
+            if not all(self.chunks.has(d) for d in entry["chunks"]):
+                missing.append(rel)
+                continue
+            if deep:
+                whole = hashlib.sha256()
+                try:
+                    for d in entry["chunks"]:
+                        whole.update(self.chunks.get(d))
+                except Exception:
+                    corrupt.append(rel)
+                    continue
+                if whole.hexdigest() != entry["sha256"]:
+                    corrupt.append(rel)
+        return {"name": name, "ok": not missing and not corrupt, "files": len(manifest["files"]),
+                "missing": missing, "corrupt": corrupt, "chain": self.chain(name)}
+
+    def restore(self, name: str, target_dir: Path, only: Optional[Iterable[str]] = None) -> int:
+        """Rebuild the snapshot's files under target_dir. Returns files written."""
+        manifest = self.load(name)
+        target_dir = Path(target_dir)
+        wanted = set(only) if only is not None else None
+        count = 0
+        for rel, entry in manifest["files"].items():
+            if wanted is not None and rel not in wanted:
+                continue
+            if not _safe_rel(rel):
+                logger.warning(f"Incremental restore: skipping unsafe path {rel!r}")
+                continue
+            dest = target_dir / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            partial = dest.with_name(dest.name + '.restore.tmp')
+            whole = hashlib.sha256()
+            with open(partial, 'wb') as f:
+                for d in entry["chunks"]:
+                    data = self.chunks.get(d)
+                    whole.update(data)
+                    f.write(data)
+            if whole.hexdigest() != entry["sha256"]:
+                partial.unlink(missing_ok=True)
+                raise ValueError(f"{rel} does not match its manifest checksum")
+            os.chmod(partial, entry.get("mode", 0o644))
+            partial.replace(dest)
+            os.utime(dest, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+            count += 1
+        return count
+
+    def export_tar(self, name: str, fileobj, arcroot: str = "user"):
+        """Write the snapshot as a tar.gz, same layout as a full backup."""
+        manifest = self.load(name)
+        with tarfile.open(fileobj=fileobj, mode="w:gz") as tar:
+            for rel, entry in manifest["files"].items():
+                if not _safe_rel(rel):
+                    continue
+                info = tarfile.TarInfo(f"{arcroot}/{rel}")
+                info.size = entry["size"]
+                info.mtime = entry["mtime_ns"] / 1e9
+                info.mode = entry.get("mode", 0o644)
+                tar.addfile(info, io.BufferedReader(_ChunkReader(self.chunks, entry["chunks"])))
+
+    # ── Delete / gc ──
+
+    def delete(self, name: str) -> bool:
+        try:
+            (self.manifest_dir / f"{name}.json").unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def referenced(self) -> Set[str]:
+        keep: Set[str] = set()
+        for name in self.names():
+            for entry in self.load(name)["files"].values():
+                keep.update(entry["chunks"])
+        return keep
+
+    def gc(self) -> Dict[str, int]:
+        """Remove chunks no remaining manifest references."""
+        with self._lock:
+            return self._gc()
+
+    def _gc(self) -> Dict[str, int]:
+        try:
+            keep = self.referenced()
+        except Exception as e:
+            # A manifest we can't read might still need its chunks
+            logger.error(f"Incremental backup gc skipped, unreadable manifest: {e}")
+            return {"removed": 0, "freed": 0}
+        removed = freed = 0
+        for digest in list(self.chunks.digests()):
+            if digest not in keep:
+                freed += self.chunks.remove(digest)
+                removed += 1
+        if removed:
+            logger.info(f"Incremental backup gc: removed {removed} chunks ({freed / (1024 * 1024):.1f} MB)")
+        return {"removed": removed, "freed": freed}
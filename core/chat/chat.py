@@ -13,6 +13,7 @@ from core.hooks import hook_runner, HookEvent
 from core.metrics import metrics as token_metrics
 from .chat_streaming import StreamingChat
 from .chat_tool_calling import ToolCallingEngine, filter_to_thinking_only
+from . import prompt_layout
 from .llm_providers import get_provider, get_provider_for_url, get_provider_by_key, get_first_available_provider, get_generation_params
 
 logger = logging.getLogger(__name__)
@@ -293,6 +294,12 @@ class LLMChat:
 
 
     def _get_system_prompt(self):
+        """Build the system prompt as (static, username, dynamic).
+
+        static is byte-stable between turns so providers can reuse the cached
+        prefix; everything that changes per turn (datetime, spice rotation,
+        prompt_inject hooks) goes in dynamic. See core/chat/prompt_layout.py.
+        """
         username = getattr(config, 'DEFAULT_USERNAME', 'Human Scum')
         ai_name = 'Sapphire'
         # Sanitize curly brackets to prevent template injection
@@ -300,9 +307,22 @@ class LLMChat:
         prompt_template = self.current_system_prompt or "System prompt not loaded."
         prompt = prompt_template.replace("{user_name}", username).replace("{ai_name}", ai_name)
 
-        # Build context parts from chat settings
-        context_parts = []
         chat_settings = self.session_manager.get_chat_settings()
+        dynamic_parts = []
+
+        # Spice rotates every few turns — pull it out of the assembled prompt
+        try:
+            from core import prompts
+            prompt, spice = prompts.split_spice(prompt)
+            if spice:
+                dynamic_parts.append(spice)
+        except Exception as e:
+            logger.debug(f"[CACHE] Spice split skipped: {e}")
+
+        # Custom context is per-chat but fixed across turns — stays in the prefix
+        custom_ctx = chat_settings.get('custom_context', '').strip()
+        if custom_ctx:
+            prompt = f"{prompt}\n\n{custom_ctx}"
 
         # Inject datetime if enabled (user's timezone)
         if chat_settings.get('inject_datetime', False):
@@ -315,23 +335,15 @@ class LLMChat:
             except Exception:
                 now = datetime.now()
                 tz_label = ""
-            context_parts.append(f"Current date/time: {now.strftime('%A, %B %d, %Y at %I:%M %p')}{tz_label}")
-
-        # Inject custom context if present
-        custom_ctx = chat_settings.get('custom_context', '').strip()
-        if custom_ctx:
-            context_parts.append(custom_ctx)
+            dynamic_parts.append(f"Current date/time: {now.strftime('%A, %B %d, %Y at %I:%M %p')}{tz_label}")
 
-        # Plugin prompt_inject hook — append to context_parts
+        # Plugin prompt_inject hook — output may vary per turn, so it's dynamic
         if hook_runner.has_handlers("prompt_inject"):
-            inject_event = HookEvent(context_parts=context_parts, config=config)
+            inject_event = HookEvent(context_parts=dynamic_parts, config=config)
             hook_runner.fire("prompt_inject", inject_event)
 
-        # Combine all static context into main prompt
-        if context_parts:
-            prompt = f"{prompt}\n\n{chr(10).join(context_parts)}"
-
-        return prompt, username, None
+        dynamic_context = "\n".join(dynamic_parts) if dynamic_parts else None
+        return prompt, username, dynamic_context
 
     def _build_base_messages(self, user_input: str, images: list = None, files: list = None):
         system_prompt, user_name, dynamic_context = self._get_system_prompt()
@@ -346,6 +358,8 @@ class LLMChat:
 
         # Reserve space for system prompt + current user message in context budget
         reserved_tokens = count_tokens(system_prompt) + count_tokens(user_input)
+        if dynamic_context:
+            reserved_tokens += count_tokens(dynamic_context)
         history_messages = self.session_manager.get_messages_for_llm(reserved_tokens)
 
         # Build user message content - list if images, string otherwise
@@ -362,16 +376,17 @@ class LLMChat:
         else:
             user_content = user_input
 
+        static_msg, dynamic_msg = prompt_layout.system_messages(system_prompt, dynamic_context)
         messages = [
-            {"role": "system", "content": system_prompt},
+            static_msg,
             *history_messages,
             {"role": "user", "content": user_content}
         ]
 
-        # Dynamic story context — injected as separate system content for cache efficiency
-        # This changes every turn (state vars, clues, exits) while the main system prompt stays cached
-        if dynamic_context:
-            messages.insert(1, {"role": "system", "content": dynamic_context, "_dynamic": True})
+        # Per-turn context goes after history, just before the new user turn —
+        # system prompt + history stay a reusable prefix for the provider cache
+        if dynamic_msg:
+            messages.insert(-1, dynamic_msg)
 
         # RAG injection — if chat has uploaded documents, search and inject
         rag_context = self._get_rag_context(user_input)
@@ -679,6 +694,9 @@ class LLMChat:
                     "tokens": tokens_info,
                     "tokens_per_second": round(tokens_info.get("content", 0) / duration, 1) if duration > 0 else 0
                 }
+                prefix = prompt_layout.prefix_report(messages, response_msg.usage)
+                if prefix:
+                    metadata["prompt_prefix"] = prefix
 
                 # Record metrics
                 try:
@@ -758,6 +776,9 @@ class LLMChat:
                 "tokens": tokens_info,
                 "tokens_per_second": round(tokens_info.get("content", 0) / duration, 1) if duration > 0 else 0
             }
+            prefix = prompt_layout.prefix_report(messages, final_response_msg.usage if final_response_msg else None)
+            if prefix:
+                metadata["prompt_prefix"] = prefix
 
             try:
                 chat_name = self.session_manager.get_active_chat_name()
@@ -6,6 +6,7 @@ from typing import Generator, Union, Dict, Any
 import config
 from .chat_tool_calling import strip_ui_markers, wrap_tool_result, _extract_tool_images
 from .llm_providers import LLMResponse, get_generation_params
+from . import prompt_layout
 from core.event_bus import publish, Events
 from core.hooks import hook_runner, HookEvent
 from core.metrics import metrics as token_metrics
@@ -91,7 +92,7 @@ class StreamingChat:
             # Two concurrent streams on same chat had the first finisher set
             # False while the second was still running → append_messages_to_chat
             # guard failed → mid-turn history corruption. Counter fix.
-            self.main_chat.session_manager.begin_streaming()
+            self.main_chat.session_manager.begin_streaming(self.active_chat_name)
 
             # Plugin pre_chat hook — can modify input, bypass LLM, or stop propagation
             if hook_runner.has_handlers("pre_chat"):
@@ -363,6 +364,10 @@ class StreamingChat:
                         for k in ("cache_read_tokens", "cache_write_tokens"):
                             if resp_usage.get(k):
                                 metadata["tokens"][k] = resp_usage[k]
+                    # Which static prefix this request sent, and how much the provider reused
+                    prefix = prompt_layout.prefix_report(messages, resp_usage)
+                    if prefix:
+                        metadata["prompt_prefix"] = prefix
                 
                 # Accumulate tokens across iterations
                 if metadata and metadata.get("tokens"):
@@ -714,6 +719,9 @@ class StreamingChat:
                         for k in ("cache_read_tokens", "cache_write_tokens"):
                             if resp_usage.get(k):
                                 final_metadata["tokens"][k] = resp_usage[k]
+                    prefix = prompt_layout.prefix_report(messages, resp_usage)
+                    if prefix:
+                        final_metadata["prompt_prefix"] = prefix
                 
                 if final_content:
                     full_final = (force_prefill or "") + final_content
@@ -795,6 +803,6 @@ class StreamingChat:
             self._cleanup_stream()
             self.cancel_flag = False
             self.is_streaming = False
+            self.main_chat.session_manager.end_streaming(self.active_chat_name)
             self.active_chat_name = None
-            self.main_chat.session_manager.end_streaming()
             publish(Events.AI_TYPING_END)
\ No newline at end of file
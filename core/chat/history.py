@@ -5,6 +5,7 @@ import os
 import re
 import sqlite3
 import threading
+from collections import OrderedDict
 from contextlib import contextmanager
 from datetime import datetime
 from typing import List, Dict, Optional, Any, Union
@@ -355,7 +356,8 @@ class ConversationHistory:
         self, 
         reserved_tokens: int = 0,
         provider: str = None,
-        in_tool_cycle: bool = False
+        in_tool_cycle: bool = False,
+        summary: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         Get messages formatted for LLM with TRIMMING applied.
@@ -364,6 +366,8 @@ class ConversationHistory:
             reserved_tokens: Tokens to reserve for system prompt + current user message.
             provider: Target provider ('claude', 'lmstudio', etc) for format decisions.
             in_tool_cycle: True if we're mid-tool-cycle and need thinking_raw for Claude.
+            summary: Optional checkpoint {"covers_count", "summary"} — the first
+                covers_count messages are replaced by the summary text.
         
         Notes:
             - Thinking is NEVER sent to LLMs (they don't need previous reasoning)
@@ -372,8 +376,15 @@ class ConversationHistory:
             - Set CONTEXT_LIMIT to 0 to disable token-based trimming
         """
         msgs = []
-        
-        for msg in self.messages:
+        source = self.messages
+        summary_msg = None
+        if summary and 0 < summary.get("covers_count", 0) <= len(self.messages):
+            from core.chat.summarizer import SUMMARY_HEADER
+            source = self.messages[summary["covers_count"]:]
+            summary_msg = {"role": "user", "content": f"{SUMMARY_HEADER}\n{summary['summary']}"}
+            reserved_tokens += count_tokens(summary_msg["content"])
+
+        for msg in source:
             role = msg["role"]
             
             if role == "assistant":
@@ -495,6 +506,11 @@ class ConversationHistory:
                 del msg["tool_calls"]
                 msg.pop("thinking_raw", None)
 
+        # Summary stands in for the covered messages; pinned ahead of the tail
+        # (and outside the trimming above) so it's never the part that's cut.
+        if summary_msg:
+            msgs.insert(0, summary_msg)
+
         return msgs
 
     def clear_thinking_raw(self):
@@ -613,7 +629,30 @@ class ConversationHistory:
                 msg["content"] = new_content
                 return True
         return False
-    
+
+
+# Loaded chats kept in memory (LRU). The active chat and any chat that is
+# streaming are never evicted, so this is a floor on side chats, not a cap.
+SESSION_CACHE_SIZE = 8
+
+
+class ChatSession:
+    """One chat loaded into memory: messages + settings.
+
+    Held in ChatSessionManager's LRU so side chats (continuity tasks,
+    Discord/Telegram/email replies) are parsed once and appended in place
+    instead of re-reading and re-parsing the whole JSON blob per write.
+    Guarded by the manager's _lock like the active chat — a chat switch
+    turns a side session into current_chat, so both paths must share it.
+    `dirty` means messages changed in memory and aren't in SQLite yet.
+    """
+
+    def __init__(self, name: str, history: 'ConversationHistory', settings: Dict[str, Any]):
+        self.name = name
+        self.history = history
+        self.settings = settings
+        self.dirty = False
+
 
 class ChatSessionManager:
     """
@@ -621,11 +660,14 @@ class ChatSessionManager:
     
     Storage: user/history/sapphire_history.db (WAL mode)
     Schema: chats(name TEXT PRIMARY KEY, settings JSON, messages JSON, updated_at TEXT)
+            chat_summaries(chat_name, version, covers_count, covers_hash, summary, ...)
     
     Features:
     - Atomic writes via SQLite transactions
     - Auto-recovery if DB deleted while running
     - One-time migration from legacy JSON files
+    - LRU of loaded ChatSessions; the active chat's session shares its
+      objects with current_chat / current_settings
     """
     
     def __init__(self, max_history: int = 30, history_dir: str = "user/history"):
@@ -651,12 +693,26 @@ class ChatSessionManager:
         # delete / save guards. Counter represents how many streams are
         # currently active; `_is_streaming` property reads > 0.
         self._streaming_count = 0
-        
+        # Per-chat share of the counter, so a stream on one chat doesn't hold
+        # up appends to another.
+        self._streaming_chats = {}
+
+        # Loaded chats, least recently used first — see ChatSession
+        self._sessions = OrderedDict()
+        self._sessions_lock = threading.Lock()
+
+        # Background rolling summaries for long chats (HISTORY_SUMMARY_ENABLED)
+        from core.chat.summarizer import HistoryCompactor
+        self._compactor = HistoryCompactor(self)
+
         # Initialize database
         self._init_db()
         
         # Migrate any existing JSON files
         self._migrate_json_files()
+
+        # Move base64 images still inline in message content into chat_images
+        self._migrate_inline_images()
         
         # Ensure default chat exists and load last active (or default)
         self._ensure_default_exists()
@@ -679,6 +735,8 @@ class ChatSessionManager:
     # whether ANY stream is active. That's a counter, not a bool.
     # Writers use begin_streaming() / end_streaming(). Readers use the
     # `_is_streaming` property. 2026-04-22 H4 follow-up.
+    # Each stream is also counted against its chat (_streaming_chats) so
+    # is_chat_streaming() can answer for one chat.
 
     @property
     def _is_streaming(self) -> bool:
@@ -692,18 +750,152 @@ class ChatSessionManager:
         for atomic concurrency-safe counting."""
         self._streaming_count = 1 if val else 0
 
-    def begin_streaming(self):
-        """Increment active-stream counter. Safe for concurrent streams."""
+    def begin_streaming(self, chat_name: Optional[str] = None):
+        """Increment active-stream counter. Safe for concurrent streams.
+        chat_name defaults to the active chat."""
         with self._lock:
             self._streaming_count = getattr(self, '_streaming_count', 0) + 1
+            if chat_name is None:
+                chat_name = getattr(self, 'active_chat_name', None)
+            if chat_name is not None:
+                self._streaming_chats[chat_name] = self._streaming_chats.get(chat_name, 0) + 1
 
-    def end_streaming(self):
+    def end_streaming(self, chat_name: Optional[str] = None):
         """Decrement active-stream counter (floored at 0). Safe for
         concurrent streams. A double-decrement (bug elsewhere) is silent
         — counter stays at 0."""
         with self._lock:
             cur = getattr(self, '_streaming_count', 0)
             self._streaming_count = cur - 1 if cur > 0 else 0
+            if chat_name is None:
+                chat_name = getattr(self, 'active_chat_name', None)
+            n = self._streaming_chats.get(chat_name, 0)
+            if n > 1:
+                self._streaming_chats[chat_name] = n - 1
+            else:
+                self._streaming_chats.pop(chat_name, None)
+
+    def is_chat_streaming(self, chat_name: str) -> bool:
+        """True if a stream is active on this chat. Streams started through
+        the legacy `_is_streaming = True` setter count against the active chat."""
+        with self._lock:
+            per_chat = self._streaming_chats
+            if per_chat.get(chat_name, 0) > 0:
+                return True
+            unattributed = getattr(self, '_streaming_count', 0) - sum(per_chat.values())
+            return unattributed > 0 and chat_name == getattr(self, 'active_chat_name', None)
+
+    # ── Session cache ──
+
+    def _read_session(self, chat_name: str) -> Optional[ChatSession]:
+        """Parse a chat from SQLite into a new ChatSession (not cached)."""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT settings, messages FROM chats WHERE name = ?", (chat_name,)
+            ).fetchone()
+        if not row:
+            return None
+        raw_messages = row["messages"]
+        # Guard against OOM on massive chat blobs (>50MB)
+        if len(raw_messages) > 50 * 1024 * 1024:
+            logger.warning(f"Chat '{chat_name}' messages blob too large ({len(raw_messages) // 1024 // 1024}MB), truncating to last 5000 messages")
+            messages = json.loads(raw_messages)[-5000:]
+        else:
+            messages = json.loads(raw_messages)
+        history = ConversationHistory(max_history=getattr(self, 'max_history', 30))
+        history.messages = messages
+        settings = get_system_defaults()
+        settings.update(json.loads(row["settings"]) if row["settings"] else {})
+        return ChatSession(chat_name, history, settings)
+
+    def _get_session(self, chat_name: str) -> Optional[ChatSession]:
+        """Cached session for a chat, loading it on a miss. None if the chat doesn't exist."""
+        with self._sessions_lock:
+            session = self._sessions.get(chat_name)
+            if session is not None:
+                self._sessions.move_to_end(chat_name)
+                return session
+        # Parse outside the cache lock — a big chat shouldn't stall other chats
+        loaded = self._read_session(chat_name)
+        if loaded is None:
+            return None
+        with self._sessions_lock:
+            session = self._sessions.setdefault(chat_name, loaded)
+            self._sessions.move_to_end(chat_name)
+        self._evict_sessions()
+        return session
+
+    def _drop_session(self, chat_name: str):
+        with self._sessions_lock:
+            self._sessions.pop(chat_name, None)
+
+    def _evict_sessions(self):
+        """Trim the LRU, skipping the active chat and chats mid-stream.
+        Dirty evictees are written back first; one that can't be written
+        goes back in the cache so flush_sessions() can retry it."""
+        # Read streaming state before taking the cache lock (lock order: _lock → _sessions_lock)
+        with self._lock:
+            pinned = set(self._streaming_chats) | {self.active_chat_name}
+        victims = []
+        with self._sessions_lock:
+            excess = len(self._sessions) - SESSION_CACHE_SIZE
+            for name in list(self._sessions):
+                if excess <= 0:
+                    break
+                if name in pinned:
+                    continue
+                victims.append(self._sessions.pop(name))
+                excess -= 1
+        for session in victims:
+            if not self._persist_session(session) and session.dirty:
+                with self._sessions_lock:
+                    self._sessions.setdefault(session.name, session)
+
+    def _persist_session(self, session: ChatSession) -> bool:
+        """Write a dirty session's messages back to SQLite.
+
+        Only messages are written — settings changes go through the active
+        chat path (_save_current_chat). False if nothing was written: the
+        chat was deleted, or the write failed (the session stays dirty so
+        flush_sessions() can retry).
+        """
+        try:
+            from core.privacy import is_privacy_mode
+            if is_privacy_mode():
+                return True  # stays dirty; written once privacy mode is off
+        except ImportError:
+            pass
+        with self._lock:
+            if not session.dirty:
+                return True
+            self._externalize_messages(session.name, session.history.messages)
+            try:
+                with self._get_connection() as conn:
+                    cur = conn.execute(
+                        "UPDATE chats SET messages = ?, updated_at = ? WHERE name = ?",
+                        (json.dumps(session.history.messages), datetime.now().isoformat(), session.name)
+                    )
+                    conn.commit()
+            except Exception as e:
+                logger.error(f"Failed to save chat '{session.name}': {e}")
+                return False
+            session.dirty = False
+        if cur.rowcount == 0:
+            logger.warning(f"Chat '{session.name}' was deleted — dropping unsaved messages")
+            self._drop_session(session.name)
+            return False
+        return True
+
+    def flush_sessions(self) -> bool:
+        """Write back every dirty cached session (shutdown / before backups).
+        False if any of them could not be written."""
+        with self._sessions_lock:
+            pending = [s for s in self._sessions.values() if s.dirty]
+        ok = True
+        for session in pending:
+            if not self._persist_session(session) and session.dirty:
+                ok = False
+        return ok
 
     @contextmanager
     def _get_connection(self):
@@ -740,6 +932,20 @@ class ChatSessionManager:
                     )
                 """)
                 
+                # Rolling summary checkpoints — see core/chat/summarizer.py
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS chat_summaries (
+                        chat_name TEXT NOT NULL,
+                        version INTEGER NOT NULL,
+                        covers_count INTEGER NOT NULL,
+                        covers_hash TEXT NOT NULL,
+                        summary TEXT NOT NULL,
+                        provider TEXT NOT NULL DEFAULT '',
+                        created_at TEXT NOT NULL,
+                        PRIMARY KEY (chat_name, version)
+                    )
+                """)
+
                 conn.execute("""
                     CREATE TABLE IF NOT EXISTS tool_images (
                         id TEXT PRIMARY KEY,
@@ -750,6 +956,35 @@ class ChatSessionManager:
                     )
                 """)
 
+                # User-attached images, stored once by sha256 — see core/chat/image_store.py
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS chat_images (
+                        id TEXT PRIMARY KEY,
+                        data BLOB NOT NULL,
+                        media_type TEXT NOT NULL DEFAULT 'image/jpeg',
+                        size INTEGER NOT NULL,
+                        created_at TEXT NOT NULL
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS chat_image_refs (
+                        chat_name TEXT NOT NULL,
+                        image_id TEXT NOT NULL,
+                        PRIMARY KEY (chat_name, image_id)
+                    )
+                """)
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_chat_image_refs_image ON chat_image_refs(image_id)"
+                )
+
+                # One-off migration markers, so startup doesn't rescan every chat
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS chat_meta (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL
+                    )
+                """)
+
                 conn.commit()
             logger.debug(f"Database initialized at {self._db_path}")
         except Exception as e:
@@ -830,37 +1065,30 @@ class ChatSessionManager:
         if migrated:
             logger.info(f"Migration complete: {migrated} chats migrated to SQLite")
 
-    def _load_chat(self, chat_name: str) -> bool:
-        """Load chat from SQLite database."""
+    def _load_chat(self, chat_name: str, cached: bool = False) -> bool:
+        """Load chat from SQLite database and make it current.
+
+        cached=True reuses the chat's in-memory session if it has one
+        (chat switching); otherwise the row is re-read, so callers that
+        changed it directly see their change.
+        """
         self._ensure_db()
-        
+
         try:
-            with self._get_connection() as conn:
-                cursor = conn.execute(
-                    "SELECT settings, messages FROM chats WHERE name = ?",
-                    (chat_name,)
-                )
-                row = cursor.fetchone()
-                
-                if not row:
-                    logger.warning(f"Chat not found in database: {chat_name}")
-                    return False
-                
-                raw_messages = row["messages"]
-                # Guard against OOM on massive chat blobs (>50MB)
-                if len(raw_messages) > 50 * 1024 * 1024:
-                    logger.warning(f"Chat '{chat_name}' messages blob too large ({len(raw_messages) // 1024 // 1024}MB), truncating to last 5000 messages")
-                    all_msgs = json.loads(raw_messages)
-                    self.current_chat.messages = all_msgs[-5000:]
-                else:
-                    self.current_chat.messages = json.loads(raw_messages)
-                file_settings = json.loads(row["settings"])
-                self.current_settings = get_system_defaults()
-                self.current_settings.update(file_settings)
+            if not cached:
+                session = self._sessions.get(chat_name)
+                if session is not None:
+                    self._persist_session(session)
+                    self._drop_session(chat_name)
+            session = self._get_session(chat_name)
+            if session is None:
+                logger.warning(f"Chat not found in database: {chat_name}")
+                return False
+            self.current_chat = session.history
+            self.current_settings = session.settings
+            logger.info(f"Loaded chat '{chat_name}' with {len(self.current_chat.messages)} messages")
+            return True
 
-                logger.info(f"Loaded chat '{chat_name}' with {len(self.current_chat.messages)} messages")
-                return True
-                
         except Exception as e:
             logger.error(f"Failed to load chat '{chat_name}': {e}")
             return False
@@ -879,6 +1107,8 @@ class ChatSessionManager:
         self._ensure_db()
         
         with self._lock:
+            # Images attached while privacy mode was on are still inline
+            self._externalize_messages(self.active_chat_name, self.current_chat.messages)
             try:
                 with self._get_connection() as conn:
                     # UPDATE (not INSERT OR REPLACE) + rowcount check so a late
@@ -902,6 +1132,9 @@ class ChatSessionManager:
                             f"chat was deleted. Dropping save to avoid resurrecting it."
                         )
                         return
+                session = self._sessions.get(self.active_chat_name)
+                if session is not None and session.history is self.current_chat:
+                    session.dirty = False
                 logger.debug(f"Saved chat '{self.active_chat_name}' ({len(self.current_chat.messages)} messages)")
             except Exception as e:
                 logger.error(f"Failed to save chat '{self.active_chat_name}': {e}")
@@ -988,7 +1221,7 @@ class ChatSessionManager:
         """Delete chat. Recreates default if deleted, switches active if needed."""
         self._ensure_db()
 
-        if self._is_streaming and chat_name == self.active_chat_name:
+        if self.is_chat_streaming(chat_name):
             logger.warning(f"Cannot delete '{chat_name}' — streaming in progress")
             return False
 
@@ -1011,7 +1244,18 @@ class ChatSessionManager:
                     conn.execute("DELETE FROM tool_images WHERE chat_name = ?", (chat_name,))
                 except Exception:
                     pass  # Table may not exist yet
+                try:
+                    conn.execute("DELETE FROM chat_summaries WHERE chat_name = ?", (chat_name,))
+                except Exception:
+                    pass
+                try:
+                    conn.execute("DELETE FROM chat_image_refs WHERE chat_name = ?", (chat_name,))
+                    self._gc_chat_images(conn)
+                except Exception:
+                    pass
                 conn.commit()
+                self._drop_session(chat_name)
+                self._compactor.forget(chat_name)
                 logger.info(f"Deleted chat: {chat_name}")
                 
                 # Ensure default exists
@@ -1091,7 +1335,7 @@ class ChatSessionManager:
 
             self._save_current_chat()
 
-            if self._load_chat(chat_name):
+            if self._load_chat(chat_name, cached=True):
                 self.active_chat_name = chat_name
                 self._save_last_active(chat_name)
                 self._in_tool_cycle = False  # Reset tool cycle state on chat switch
@@ -1110,6 +1354,7 @@ class ChatSessionManager:
         if persona is None:
             persona = self.current_settings.get("persona")
         with self._lock:
+            content = self._externalize_images(self.active_chat_name, content)
             self.current_chat.add_user_message(content, persona=persona)
             self._save_current_chat()
         publish(Events.MESSAGE_ADDED, {"role": "user"})
@@ -1153,6 +1398,7 @@ class ChatSessionManager:
                 self._in_tool_cycle = False
 
             self._save_current_chat()
+            self._maybe_compact()
         publish(Events.MESSAGE_ADDED, {"role": "assistant"})
 
     def add_message_pair(self, user_content: str, assistant_content: str):
@@ -1170,13 +1416,29 @@ class ChatSessionManager:
         return self.current_chat.get_messages_for_display()
 
     def get_messages_for_llm(self, reserved_tokens: int = 0, provider: str = None) -> List[Dict[str, str]]:
-        """Get messages for LLM with trimming applied."""
+        """Get messages for LLM with trimming applied. If the chat has a valid
+        summary checkpoint, the covered messages are replaced by the summary."""
+        summary = None
+        try:
+            summary = self._compactor.checkpoint_for(self.active_chat_name, self.current_chat.messages)
+        except Exception as e:
+            logger.warning(f"[SUMMARY] Checkpoint lookup failed, sending full history: {e}")
         return self.current_chat.get_messages_for_llm(
-            reserved_tokens, 
+            reserved_tokens,
             provider=provider,
-            in_tool_cycle=self._in_tool_cycle
+            in_tool_cycle=self._in_tool_cycle,
+            summary=summary
         )
 
+    def _maybe_compact(self):
+        """Queue background summarization if this chat crossed the threshold.
+        Caller holds self._lock; the worker only gets a snapshot."""
+        try:
+            self._compactor.maybe_schedule(self.active_chat_name, self.current_chat.messages,
+                                          self.current_settings)
+        except Exception as e:
+            logger.warning(f"[SUMMARY] Could not schedule compaction: {e}")
+
     def get_turn_count(self) -> int:
         return self.current_chat.get_turn_count()
 
@@ -1190,6 +1452,11 @@ class ChatSessionManager:
         non-active chat because the JSON file it expected was never
         written. Silent-default class bug (2026-04-19)."""
         self._ensure_db()
+        session = self._sessions.get(chat_name)
+        if session is not None:
+            with self._lock:
+                return dict(session.settings)
+        # Not loaded — read just the settings column rather than load the chat
         try:
             with self._get_connection() as conn:
                 cursor = conn.execute(
@@ -1210,18 +1477,16 @@ class ChatSessionManager:
         """Read messages from a named chat WITHOUT switching active chat."""
         self._ensure_db()
         try:
-            with self._get_connection() as conn:
-                cursor = conn.execute(
-                    "SELECT messages FROM chats WHERE name = ?", (chat_name,)
-                )
-                row = cursor.fetchone()
-                if not row:
-                    return []
-                messages = json.loads(row["messages"])
-                # Apply same trimming as get_messages_for_llm
-                chat = ConversationHistory()
-                chat.messages = messages
-                return chat.get_messages_for_llm(provider=provider)
+            session = self._get_session(chat_name)
+            if session is None:
+                return []
+            with self._lock:
+                messages = list(session.history.messages)
+            # Apply same trimming as get_messages_for_llm (builds new dicts,
+            # so callers can't mutate the cached session)
+            chat = ConversationHistory()
+            chat.messages = messages
+            return chat.get_messages_for_llm(provider=provider)
         except Exception as e:
             logger.error(f"Failed to read chat '{chat_name}': {e}")
             return []
@@ -1240,26 +1505,31 @@ class ChatSessionManager:
         Preserves the full conversation structure including tool_calls and tool
         results. Each message gets a timestamp if it doesn't already have one.
 
-        If the target chat is the ACTIVE chat and a stream is in progress, wait
-        for the stream to finish before appending. Scout 2 finding (2026-04-19):
-        writing while the stream is mid-flight can interleave cron messages
-        between a tool_call and its tool_result (breaks LLM conversation
-        validity) OR result in a subsequent per-message save overwriting the
-        cron write with a stale in-memory snapshot. The `_is_streaming` guard
-        already protects `delete_chat` and `set_active_chat` — extending it
-        here closes the asymmetry.
+        If a stream is in progress on the target chat, wait for it to finish
+        before appending. Scout 2 finding (2026-04-19): writing while the
+        stream is mid-flight can interleave cron messages between a tool_call
+        and its tool_result (breaks LLM conversation validity) OR result in a
+        subsequent per-message save overwriting the cron write with a stale
+        in-memory snapshot. The same guard protects `delete_chat` and
+        `set_active_chat`. Streams on other chats don't block.
+
+        Non-active chats are appended in their cached ChatSession (parsed
+        once, only the messages column written back). The check for which
+        path applies and the append happen under one hold of the manager
+        lock, so a concurrent chat switch can't make this chat active
+        halfway through.
         """
         import time as _time
         self._ensure_db()
 
-        # Defer if the target is the active chat and a stream is running.
+        # Defer if a stream is running on the target chat.
         # Poll rather than event-wait so this works whether the caller is in
         # an async context or a worker thread.
-        if chat_name == self.active_chat_name and self._is_streaming:
+        if self.is_chat_streaming(chat_name):
             deadline = _time.time() + max_wait_if_streaming
-            while self._is_streaming and _time.time() < deadline:
+            while self.is_chat_streaming(chat_name) and _time.time() < deadline:
                 _time.sleep(0.2)
-            if self._is_streaming:
+            if self.is_chat_streaming(chat_name):
                 logger.warning(
                     f"append_messages_to_chat('{chat_name}') waited "
                     f"{max_wait_if_streaming:.0f}s for active stream to end — "
@@ -1267,37 +1537,34 @@ class ChatSessionManager:
                 )
 
         timestamp = datetime.now().isoformat()
+        for msg in new_messages:
+            if 'timestamp' not in msg:
+                msg['timestamp'] = timestamp
+
         try:
-            with self._lock, self._get_connection() as conn:
-                cursor = conn.execute(
-                    "SELECT messages FROM chats WHERE name = ?", (chat_name,)
-                )
-                row = cursor.fetchone()
-                if not row:
+            # Load a side chat before taking the lock — parsing a big chat
+            # shouldn't stall the active one
+            session = None if chat_name == self.active_chat_name else self._get_session(chat_name)
+            with self._lock:
+                is_active = chat_name == self.active_chat_name
+                if not is_active and session is None:
+                    # Was active a moment ago and got switched away from
+                    session = self._get_session(chat_name)
+                if is_active:
+                    self.current_chat.messages.extend(new_messages)
+                    self._save_current_chat()
+                elif session is not None:
+                    session.history.messages.extend(new_messages)
+                    session.dirty = True
+            if not is_active:
+                if session is None:
                     logger.warning(f"Chat '{chat_name}' not found — skipping append (may have been deleted)")
                     return
-                messages = json.loads(row["messages"])
-
-                for msg in new_messages:
-                    if 'timestamp' not in msg:
-                        msg['timestamp'] = timestamp
-                    messages.append(msg)
-
-                result = conn.execute(
-                    """UPDATE chats SET messages = ?, updated_at = ? WHERE name = ?""",
-                    (json.dumps(messages), timestamp, chat_name)
-                )
-                conn.commit()
-                if result.rowcount == 0:
-                    logger.warning(f"Chat '{chat_name}' was deleted during append — messages lost")
-                logger.debug(f"Appended {len(new_messages)} messages to chat '{chat_name}'")
-
-                # If this is the active chat, sync in-memory list
-                if chat_name == self.active_chat_name:
-                    for msg in new_messages:
-                        self.current_chat.messages.append(msg)
+                if not self._persist_session(session):
+                    return
+            logger.debug(f"Appended {len(new_messages)} messages to chat '{chat_name}'")
 
-                publish(Events.MESSAGE_ADDED, {"role": "pair", "chat_name": chat_name})
+            publish(Events.MESSAGE_ADDED, {"role": "pair", "chat_name": chat_name})
         except Exception as e:
             logger.error(f"Failed to append to chat '{chat_name}': {e}")
 
@@ -1306,6 +1573,7 @@ class ChatSessionManager:
         if result:
             self._save_current_chat()
             self._prune_orphaned_tool_images(self.active_chat_name)
+            self._prune_orphaned_chat_images(self.active_chat_name)
             publish(Events.MESSAGE_REMOVED, {"count": count})
         return result
 
@@ -1314,6 +1582,7 @@ class ChatSessionManager:
         if result:
             self._save_current_chat()
             self._prune_orphaned_tool_images(self.active_chat_name)
+            self._prune_orphaned_chat_images(self.active_chat_name)
             publish(Events.MESSAGE_REMOVED, {"from": "user_message"})
         return result
 
@@ -1322,6 +1591,7 @@ class ChatSessionManager:
         if result:
             self._save_current_chat()
             self._prune_orphaned_tool_images(self.active_chat_name)
+            self._prune_orphaned_chat_images(self.active_chat_name)
             publish(Events.MESSAGE_REMOVED, {"from": "assistant_timestamp"})
         return result
 
@@ -1331,6 +1601,7 @@ class ChatSessionManager:
         if result:
             self._save_current_chat()
             self._prune_orphaned_tool_images(self.active_chat_name)
+            self._prune_orphaned_chat_images(self.active_chat_name)
             publish(Events.MESSAGE_REMOVED, {"tool_call_id": tool_call_id})
         return result
 
@@ -1372,6 +1643,213 @@ class ChatSessionManager:
             logger.warning(f"orphan tool_image prune failed for '{chat_name}': {e}")
             return 0
 
+    # ── Chat images (content-addressed, see core/chat/image_store.py) ──
+
+    def _externalize_images(self, chat_name: str, content):
+        """Swap inline base64 images in user content for chat_images refs.
+        Privacy mode, plain-text content and DB failures leave content as-is
+        (privacy mode also skips the chat save, so inline images stay in
+        memory until the chat is next saved with it off)."""
+        if not isinstance(content, list) or not any(
+            isinstance(b, dict) and b.get('type') == 'image' and b.get('data') for b in content
+        ):
+            return content
+        try:
+            from core.privacy import is_privacy_mode
+            if is_privacy_mode():
+                return content
+        except ImportError:
+            pass
+        from core.chat import image_store
+        blobs = {}
+        new_content, ids = image_store.externalize(
+            content, lambda image_id, data, media_type: blobs.setdefault(image_id, (data, media_type))
+        )
+        if not ids:
+            return content
+        self._ensure_db()
+        try:
+            with self._get_connection() as conn:
+                self._store_chat_images(conn, chat_name, blobs)
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to store chat images for '{chat_name}', keeping them inline: {e}")
+            return content
+        return new_content
+
+    def _externalize_messages(self, chat_name: str, messages: List[Dict]):
+        """_externalize_images over every user message, in place."""
+        for msg in messages:
+            if isinstance(msg, dict) and msg.get("role") == "user" and isinstance(msg.get("content"), list):
+                msg["content"] = self._externalize_images(chat_name, msg["content"])
+        return messages
+
+    def _register_image_refs(self, chat_name: str, messages: List[Dict]):
+        """Add chat_image_refs rows for stored images these messages point at,
+        so a prune elsewhere can't delete blobs an imported chat still uses."""
+        from core.chat.image_store import referenced_ids
+        ids = referenced_ids(json.dumps(messages))
+        if not ids:
+            return
+        try:
+            from core.privacy import is_privacy_mode
+            if is_privacy_mode():
+                return
+        except ImportError:
+            pass
+        self._ensure_db()
+        try:
+            with self._get_connection() as conn:
+                conn.executemany(
+                    """INSERT OR IGNORE INTO chat_image_refs (chat_name, image_id)
+                       SELECT ?, id FROM chat_images WHERE id = ?""",
+                    [(chat_name, image_id) for image_id in ids]
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to register image refs for '{chat_name}': {e}")
+
+    def import_messages(self, messages: List[Dict]):
+        """Replace the active chat's messages with an import. Inline images go
+        to the image store like any attachment; references to images already
+        stored are registered to this chat."""
+        with self._lock:
+            chat_name = self.active_chat_name
+            self._externalize_messages(chat_name, messages)
+            self._register_image_refs(chat_name, messages)
+            self.current_chat.messages = messages
+            self._save_current_chat()
+        self._prune_orphaned_chat_images(chat_name)
+
+    def export_messages(self) -> List[Dict]:
+        """Raw messages with stored images inlined as base64, so an export
+        carries its images and can be re-imported on another install."""
+        from core.chat import image_store
+        out = []
+        for msg in self.get_messages():
+            if msg.get("role") == "user" and isinstance(msg.get("content"), list):
+                msg = dict(msg, content=image_store.inline(msg["content"], self.get_chat_image))
+            out.append(msg)
+        return out
+
+    @staticmethod
+    def _store_chat_images(conn, chat_name: str, blobs: Dict[str, tuple]):
+        now = datetime.now().isoformat()
+        conn.executemany(
+            """INSERT OR IGNORE INTO chat_images (id, data, media_type, size, created_at)
+               VALUES (?, ?, ?, ?, ?)""",
+            [(image_id, data, media_type, len(data), now) for image_id, (data, media_type) in blobs.items()]
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO chat_image_refs (chat_name, image_id) VALUES (?, ?)",
+            [(chat_name, image_id) for image_id in blobs]
+        )
+
+    @staticmethod
+    def _gc_chat_images(conn) -> int:
+        """Delete chat_images no chat references any more."""
+        cur = conn.execute(
+            "DELETE FROM chat_images WHERE id NOT IN (SELECT image_id FROM chat_image_refs)"
+        )
+        return cur.rowcount
+
+    def _prune_orphaned_chat_images(self, chat_name: str) -> int:
+        """Drop this chat's refs to images its messages no longer contain,
+        then delete blobs nothing references. Returns blobs deleted."""
+        from core.chat.image_store import referenced_ids
+        try:
+            with self._lock, self._get_connection() as conn:
+                row = conn.execute(
+                    "SELECT messages FROM chats WHERE name = ?", (chat_name,)
+                ).fetchone()
+                live_ids = referenced_ids(row["messages"]) if row else set()
+                stored = conn.execute(
+                    "SELECT image_id FROM chat_image_refs WHERE chat_name = ?", (chat_name,)
+                ).fetchall()
+                dead = [r["image_id"] for r in stored if r["image_id"] not in live_ids]
+                if not dead:
+                    return 0
+                conn.executemany(
+                    "DELETE FROM chat_image_refs WHERE chat_name = ? AND image_id = ?",
+                    [(chat_name, image_id) for image_id in dead]
+                )
+                removed = self._gc_chat_images(conn)
+                conn.commit()
+                if removed:
+                    logger.debug(f"Pruned {removed} unreferenced chat image(s) after edit of '{chat_name}'")
+                return removed
+        except Exception as e:
+            logger.warning(f"chat image prune failed for '{chat_name}': {e}")
+            return 0
+
+    def get_chat_image(self, image_id: str) -> Optional[tuple]:
+        """Get a chat image by id. Returns (data, media_type) or None."""
+        self._ensure_db()
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute(
+                    "SELECT data, media_type FROM chat_images WHERE id = ?", (image_id,)
+                ).fetchone()
+                return (row[0], row[1]) if row else None
+        except Exception as e:
+            logger.error(f"Failed to get chat image '{image_id}': {e}")
+            return None
+
+    def _migrate_inline_images(self):
+        """One-time pass moving base64 images out of stored message content.
+        Recorded in chat_meta once clean; saves externalize from then on."""
+        from core.chat import image_store
+        try:
+            with self._get_connection() as conn:
+                if conn.execute(
+                    "SELECT 1 FROM chat_meta WHERE key = 'inline_images_migrated'"
+                ).fetchone():
+                    return
+                names = [r["name"] for r in conn.execute(
+                    """SELECT name FROM chats
+                       WHERE messages LIKE '%"type": "image"%' AND messages LIKE '%"data": "%'"""
+                ).fetchall()]
+        except Exception as e:
+            logger.error(f"Inline image scan failed: {e}")
+            return
+        failed = False
+        for name in names:
+            try:
+                with self._lock, self._get_connection() as conn:
+                    row = conn.execute("SELECT messages FROM chats WHERE name = ?", (name,)).fetchone()
+                    if not row:
+                        continue
+                    messages = json.loads(row["messages"])
+                    blobs, moved = {}, 0
+                    for msg in messages:
+                        if msg.get("role") != "user" or not isinstance(msg.get("content"), list):
+                            continue
+                        msg["content"], ids = image_store.externalize(
+                            msg["content"],
+                            lambda image_id, data, media_type: blobs.setdefault(image_id, (data, media_type))
+                        )
+                        moved += len(ids)
+                    if not moved:
+                        continue
+                    self._store_chat_images(conn, name, blobs)
+                    conn.execute("UPDATE chats SET messages = ? WHERE name = ?", (json.dumps(messages), name))
+                    conn.commit()
+                logger.info(f"Moved {moved} inline image(s) in chat '{name}' to the image store")
+            except Exception as e:
+                failed = True
+                logger.error(f"Inline image migration failed for '{name}': {e}")
+        if failed:
+            return  # retried next startup
+        try:
+            with self._get_connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO chat_meta (key, value) VALUES ('inline_images_migrated', ?)",
+                    (datetime.now().isoformat(),)
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to record inline image migration: {e}")
+
     def clear(self):
         self.current_chat.clear()
         self._in_tool_cycle = False
@@ -1384,6 +1862,9 @@ class ChatSessionManager:
                 conn.commit()
         except Exception:
             pass  # Table may not exist yet
+        self._prune_orphaned_chat_images(self.active_chat_name)
+
+        self._compactor.forget(self.active_chat_name, delete=True)
 
         publish(Events.CHAT_CLEARED)
 
@@ -1449,6 +1930,11 @@ class ChatSessionManager:
             return [name for name, _ in affected]
 
         affected_names = [name for name, _ in affected]
+        with self._sessions_lock:
+            cached = [self._sessions[n] for n in affected_names if n in self._sessions]
+        with self._lock:
+            for session in cached:
+                session.settings[setting_key] = reset_to
         # If the active chat was touched, reload its in-memory settings AND
         # re-apply to ContextVars. Without the re-apply, the ContextVar keeps
         # the pre-sweep value (the now-deleted scope name), so the AI writes
@@ -0,0 +1,104 @@
+"""
+Content-addressed storage for images attached to chat messages.
+
+Uploaded images used to sit in message content as base64 `data`, so every
+history save/load, /api/history response and backup carried them. Now the
+session manager moves them into the chat_images table, keyed by the sha256
+of the bytes, and the message keeps a reference:
+
+    {"type": "image", "image_id": "<sha256>", "media_type": "image/png"}
+
+The same image attached twice (or in two chats) is stored once.
+chat_image_refs records which chats use which image; a blob is deleted once
+no chat references it (see ChatSessionManager._prune_orphaned_chat_images).
+The UI loads images from /api/chat-image/<id>. Providers never see the
+references: history is flattened to text for the LLM, and the current
+turn's images go to the provider straight from the request.
+
+Privacy mode keeps images inline in memory and chat saves are skipped, so
+nothing reaches the database while it is on. Inline images still in a chat
+when it is next saved are moved into the store then. Exports inline the
+blobs again (see inline()) so an export can be re-imported elsewhere.
+"""
+
+import base64
+import binascii
+import hashlib
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+IMAGE_ID_RE = re.compile(r'^[0-9a-f]{64}$')
+_REF_RE = re.compile(r'"image_id":\s*"([0-9a-f]{64})"')
+
+# put(image_id, data, media_type) -> None
+PutFn = Callable[[str, bytes, str], None]
+# get(image_id) -> (data, media_type) | None
+GetFn = Callable[[str], Optional[Tuple[bytes, str]]]
+
+
+def image_id_for(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def image_url(image_id: str) -> str:
+    return f"/api/chat-image/{image_id}"
+
+
+def referenced_ids(messages_json: str) -> Set[str]:
+    """Image ids referenced anywhere in a chat's serialized messages."""
+    return set(_REF_RE.findall(messages_json or ""))
+
+
+def externalize(content: Any, put: PutFn) -> Tuple[Any, List[str]]:
+    """Replace inline base64 image blocks in message content with references.
+
+    Returns (new_content, image_ids). Content that isn't a list, and blocks
+    whose data isn't valid base64, come back unchanged.
+    """
+    if not isinstance(content, list):
+        return content, []
+    out, ids = [], []
+    for block in content:
+        if isinstance(block, dict) and block.get("type") == "image" and block.get("data"):
+            try:
+                raw = base64.b64decode(block["data"], validate=True)
+            except (binascii.Error, ValueError, TypeError):
+                out.append(block)
+                continue
+            media_type = block.get("media_type", "image/jpeg")
+            image_id = image_id_for(raw)
+            put(image_id, raw, media_type)
+            ref = {k: v for k, v in block.items() if k != "data"}
+            ref.update({"image_id": image_id, "media_type": media_type})
+            out.append(ref)
+            ids.append(image_id)
+        else:
+            out.append(block)
+    return out, ids
+
+
+def inline(content: Any, get: GetFn) -> Any:
+    """Reverse of externalize(): put base64 `data` back into reference blocks.
+
+    References whose blob is gone are left as they are.
+    """
+    if not isinstance(content, list):
+        return content
+    out = []
+    for block in content:
+        if isinstance(block, dict) and block.get("type") == "image" and block.get("image_id"):
+            found = get(block["image_id"])
+            if found:
+                data, media_type = found
+                block = {k: v for k, v in block.items() if k != "image_id"}
+                block.update({"data": base64.b64encode(data).decode("ascii"), "media_type": media_type})
+        out.append(block)
+    return out
+
+
+def display_image(block: Dict[str, Any]) -> Dict[str, Any]:
+    """The image entry the UI gets for a stored content block."""
+    media_type = block.get("media_type", "image/jpeg")
+    if block.get("image_id"):
+        return {"url": image_url(block["image_id"]), "media_type": media_type}
+    return {"data": block.get("data", ""), "media_type": media_type}
@@ -112,8 +112,8 @@ class ClaudeProvider(BaseProvider):
 
         When caching is active:
           - Static prompt → cached block (cache_control: ephemeral)
-          - Dynamic content (state vars, clues) → uncached block (no cache_control)
-          This way dynamic story content changes without breaking the cache prefix.
+          - Dynamic content (datetime, spice, hook output) → uncached block (no cache_control)
+          This way per-turn content changes without breaking the cache prefix.
 
         When caching is off:
           - Everything combined into a single string.
@@ -142,65 +142,22 @@ class ClaudeProvider(BaseProvider):
         Provider instances are cached, so we read from settings_manager
         at request time to support hot-reload of cache settings.
         
-        System prompt caching is skipped when dynamic content is detected:
-        - Spice: randomizes persona lines each request
-        - Datetime injection: changes every minute
-        - prompt_inject hook registered: plugin-injected content may
-          vary per turn (conservative — caught at hook-count level)
+        Per-turn content (datetime, spice, prompt_inject output) arrives as
+        a separate `_dynamic` system message and goes in an uncached block
+        after the breakpoint (see _build_system_blocks), so the static
+        system prompt is always safe to cache alongside the tools.
 
-        Tools are always cached (they don't change with these features).
-        Skipping avoids 25% write penalty on guaranteed cache misses.
-        
         Returns:
             (cache_enabled, cache_ttl, cache_system_prompt)
         """
         from core.settings_manager import settings
         providers_config = settings.get('LLM_PROVIDERS', {})
         claude_config = providers_config.get('claude', {})
-        # Default True — caching cuts per-turn tool-schema cost ~10x, and
-        # the dynamic-content gate below auto-disables system-prompt caching
-        # when spice/datetime/state injection would cause guaranteed misses.
+        # Default True — caching cuts per-turn tool-schema cost ~10x.
         # Existing users pre-2026-04-21 who never set this key land on True.
         cache_enabled = claude_config.get('cache_enabled', True)
         cache_ttl = claude_config.get('cache_ttl', '5m')
-        
-        # Skip system-prompt caching when we know the prompt text changes
-        # between turns. All these cause guaranteed cache misses plus a
-        # 25% write penalty, so the net is worse than no cache.
-        #
-        # What we catch:
-        #   - spice_enabled: randomized persona lines each turn
-        #   - inject_datetime: "Current time is X" — changes per minute
-        #   - prompt_inject hooks: ANY registered plugin hook can append
-        #     per-turn content to the system prompt (see chat.py:258).
-        #     We don't know what the hook produces, so we assume dynamic.
-        #     Conservative — if a plugin only injects static strings, the
-        #     plugin author can opt its hook out of this by not registering
-        #     when idle, or we can add a per-hook "dynamic" flag later.
-        # Tools still cache separately (they're stable across turns).
-        cache_system_prompt = True
-        if cache_enabled:
-            try:
-                from core import system as sys_module
-                if hasattr(sys_module, 'system_instance') and sys_module.system_instance:
-                    chat_settings = sys_module.system_instance.llm_chat.session_manager.get_chat_settings()
-                    if chat_settings.get('spice_enabled', False):
-                        cache_system_prompt = False
-                        logger.debug("[CACHE] Spice enabled - skipping system prompt cache")
-                    elif chat_settings.get('inject_datetime', False):
-                        cache_system_prompt = False
-                        logger.debug("[CACHE] Datetime injection enabled - skipping system prompt cache")
-                # prompt_inject hook registered by any plugin → assume dynamic.
-                # Checked even when sys_module isn't available since hook_runner
-                # is a module-level singleton.
-                if cache_system_prompt:
-                    from core.hooks import hook_runner
-                    if hook_runner.has_handlers("prompt_inject"):
-                        cache_system_prompt = False
-                        logger.debug("[CACHE] prompt_inject hook registered - skipping system prompt cache")
-            except Exception as e:
-                logger.debug(f"[CACHE] Could not check chat settings: {e}")
-
+        cache_system_prompt = cache_enabled
         return cache_enabled, cache_ttl, cache_system_prompt
     
     def chat_completion(
@@ -24,6 +24,24 @@ from .base import BaseProvider, LLMResponse, ToolCall, retry_on_rate_limit
 logger = logging.getLogger(__name__)
 
 
+def _cached_prompt_tokens(obj) -> int:
+    """Prompt tokens the server reused from its prefix cache, if reported.
+    OpenAI-style: usage.prompt_tokens_details.cached_tokens. llama.cpp server
+    also reports it as timings.cache_n (an extra field on the response)."""
+    usage = getattr(obj, 'usage', None)
+    details = getattr(usage, 'prompt_tokens_details', None) if usage else None
+    cached = getattr(details, 'cached_tokens', None) if details else None
+    if cached:
+        return int(cached)
+    timings = getattr(obj, 'timings', None)
+    if isinstance(timings, dict):
+        try:
+            return int(timings.get('cache_n') or 0)
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+
 class OpenAICompatProvider(BaseProvider):
     """
     Provider for OpenAI-compatible APIs.
@@ -250,6 +268,7 @@ class OpenAICompatProvider(BaseProvider):
         - Converts content lists to strings (Claude uses content blocks)
         - Normalizes tool results from Claude format to OpenAI format
         - Ensures proper message structure for tool calls
+        - Sends the trailing per-turn context block as a user-role message
         """
         clean = []
         
@@ -327,6 +346,13 @@ class OpenAICompatProvider(BaseProvider):
                             text_parts.append(block)
                     content = ' '.join(text_parts).strip()
             
+            # Per-turn context block (datetime, spice, hook output) sits after
+            # the history. Many local chat templates reject a system message
+            # that isn't first, so send it the way RAG context goes — as a
+            # user-role message — keeping system + history a reusable prefix.
+            if role == 'system' and msg.get('_dynamic') and clean:
+                role = 'user'
+
             # Build clean message with only allowed fields
             clean_msg = {'role': role}
             
@@ -579,13 +605,10 @@ class OpenAICompatProvider(BaseProvider):
                     "completion_tokens": chunk.usage.completion_tokens or 0,
                     "total_tokens": chunk.usage.total_tokens or 0
                 }
-                # Some providers include cache stats
-                cache_read = getattr(chunk.usage, 'prompt_tokens_details', None)
-                if cache_read and hasattr(cache_read, 'cached_tokens'):
-                    cached = cache_read.cached_tokens or 0
-                    if cached > 0:
-                        usage["cache_read_tokens"] = cached
-                        logger.info(f"[CACHE] Stream usage: {cached} cached tokens")
+                cached = _cached_prompt_tokens(chunk)
+                if cached > 0:
+                    usage["cache_read_tokens"] = cached
+                    logger.info(f"[CACHE] Stream usage: {cached} cached tokens")
 
             if not chunk.choices:
                 continue
@@ -713,6 +736,9 @@ class OpenAICompatProvider(BaseProvider):
                 "completion_tokens": response.usage.completion_tokens,
                 "total_tokens": response.usage.total_tokens
             }
+            cached = _cached_prompt_tokens(response)
+            if cached > 0:
+                usage["cache_read_tokens"] = cached
         
         return LLMResponse(
             content=message_content,
@@ -0,0 +1,87 @@
+"""
+Cache-stable system prompt layout.
+
+Providers reuse work for a byte-identical request prefix: Claude caches up
+to a cache_control breakpoint, llama.cpp / LM Studio keep the KV cache for
+the longest matching token prefix. Anything that changes per turn inside
+the system prompt moves that match point to the top of the request and
+every turn pays full prompt processing.
+
+So the system prompt is built in two layers:
+
+  static  — base/assembled prompt, persona names, custom_context. Byte-stable
+            while the user doesn't edit anything; sent as the first system
+            message (Claude puts its breakpoint here, after the tools).
+  dynamic — datetime, spice rotation, prompt_inject hook output. Sent as a
+            separate `_dynamic` system message placed right before the new
+            user turn, so history stays inside the reusable prefix.
+
+The static layer's hash rides along on the system message (`_prefix_hash`,
+stripped by every provider) and is reported with the provider's cached-token
+count for each request.
+"""
+
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+PREFIX_HASH_KEY = "_prefix_hash"
+
+_last_prefix = {}  # source -> last static hash seen
+_last_prefix_lock = threading.Lock()
+
+
+def prefix_hash(text: str) -> str:
+    """Short stable hash of the static prompt text."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()[:12]
+
+
+def note_prefix(static_prompt: str, source: str = "chat") -> str:
+    """Hash the static layer and log when it changed since the previous
+    request from the same source — a change here is an expected cache miss
+    (prompt edit, persona switch), one every turn means something volatile
+    leaked into it."""
+    h = prefix_hash(static_prompt)
+    with _last_prefix_lock:
+        previous = _last_prefix.get(source)
+        _last_prefix[source] = h
+    if previous and previous != h:
+        logger.info(f"[CACHE] Static prompt prefix changed ({source}) {previous} → {h}")
+    return h
+
+
+def system_messages(static_prompt: str, dynamic_context: str = None, source: str = "chat"):
+    """(static system message, dynamic system message or None)."""
+    static_msg = {"role": "system", "content": static_prompt,
+                  PREFIX_HASH_KEY: note_prefix(static_prompt, source)}
+    dynamic_msg = None
+    if dynamic_context:
+        dynamic_msg = {"role": "system", "content": dynamic_context, "_dynamic": True}
+    return static_msg, dynamic_msg
+
+
+def request_prefix_hash(messages):
+    """The static prefix hash carried by a built message list, if any."""
+    if messages and messages[0].get("role") == "system":
+        return messages[0].get(PREFIX_HASH_KEY)
+    return None
+
+
+def prefix_report(messages, usage):
+    """Per-request cache report from provider usage: {hash, prompt, cached}.
+    Returns None when the request had no tagged static prefix."""
+    h = request_prefix_hash(messages)
+    if not h:
+        return None
+    usage = usage or {}
+    prompt = usage.get("prompt_tokens", 0) or 0
+    cached = usage.get("cache_read_tokens", 0) or 0
+    if "cache_write_tokens" in usage:
+        # Anthropic counts cache reads/writes outside input_tokens
+        prompt += cached + (usage.get("cache_write_tokens", 0) or 0)
+    report = {"hash": h, "prompt": prompt, "cached": cached}
+    if prompt:
+        logger.info(f"[CACHE] prefix {h}: {cached}/{prompt} prompt tokens reused")
+    return report
@@ -0,0 +1,207 @@
+"""
+Merges bursts of streamed content deltas into fewer SSE frames.
+
+Fast local models yield hundreds of tiny deltas a second, and /api/chat/stream
+used to send each one as its own frame (JSON encode + write + flush on the
+server, a DOM update in the browser). StreamCoalescer sits between
+StreamingChat.chat_stream() and the route:
+
+  - A delta that arrives after a quiet spell (nothing sent for a full
+    window) goes out immediately, so slow streams and the first token
+    see no added latency.
+  - Deltas arriving within the window of the last frame are held and sent
+    together when the window closes, or sooner once max_chars pile up.
+  - Anything that isn't plain content (tool events, iteration/status
+    events, reload) flushes held text first and is passed through at once,
+    as is the end of the stream.
+
+The wrapped generator runs on its own thread so held text is sent on time
+even while the model is stalled. The hand-off queue is bounded, so a slow
+client holds the model back instead of piling events up in memory. close()
+calls `on_cancel` (the route sets the stream's cancel_flag) and waits for
+that thread, so the LLM/tool loop and its cleanup are finished before the
+route unregisters the stream. A window of 0 disables coalescing and
+iterates the generator directly.
+"""
+
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_MS = 25
+DEFAULT_MAX_CHARS = 1024
+# Events buffered between the stream thread and the response
+QUEUE_SIZE = 256
+
+_DONE = object()
+
+
+class _Failure:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def _content_text(event):
+    """Text of a plain content delta, None for any other event."""
+    if isinstance(event, dict):
+        if event.get("type") == "content" and set(event) <= {"type", "text"}:
+            return event.get("text") or ""
+        return None
+    if event and '<<RELOAD_PAGE>>' not in str(event):
+        return str(event)
+    return None
+
+
+class StreamCoalescer:
+    """Iterate chat_stream events with consecutive content deltas merged."""
+
+    def __init__(self, events, window_ms: float = DEFAULT_WINDOW_MS, max_chars: int = DEFAULT_MAX_CHARS,
+                 on_cancel=None):
+        self._events = events
+        self._on_cancel = on_cancel
+        self.window = max(0.0, float(window_ms or 0)) / 1000.0
+        self.max_chars = max(1, int(max_chars or DEFAULT_MAX_CHARS))
+        self.deltas = 0          # content deltas received
+        self.content_frames = 0  # content frames sent
+        self.frames = 0          # all events sent
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._finished = threading.Event()  # wrapped stream returned and was closed
+        self._thread = None
+
+    @property
+    def frames_per_delta(self) -> float:
+        return self.content_frames / self.deltas if self.deltas else 1.0
+
+    def stats(self) -> str:
+        return f"{self.deltas} deltas in {self.content_frames} frames ({self.frames_per_delta:.2f} frames/delta)"
+
+    def close(self, wait: float = None):
+        """Stop reading the wrapped stream and wait for it to finish.
+
+        If the stream is still running it is cancelled via `on_cancel` — a
+        running generator can't be closed from another thread, so it has
+        to notice the flag and return. Waits up to `wait` seconds (None =
+        until done) so its cleanup runs before the caller's.
+        """
+        self._stop.set()
+        thread = self._thread
+        if thread is None:
+            # Iterated in place (window 0) or never started: close it here
+            close = getattr(self._events, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    logger.debug(f"Closing chat stream failed: {e}")
+            return
+        if thread is threading.current_thread():
+            return
+        if not self._finished.is_set() and self._on_cancel is not None:
+            self._on_cancel()
+        thread.join(wait)
+
+    def _put(self, item) -> bool:
+        """Hand an item to the consumer; gives up once close() was called."""
+        while True:
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if self._stop.is_set():
+                    return False
+
+    def _pump(self):
+        try:
+            for event in self._events:
+                if self._stop.is_set() or not self._put(event):
+                    break
+        except BaseException as e:
+            self._put(_Failure(e))
+        finally:
+            close = getattr(self._events, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    logger.debug(f"Closing chat stream failed: {e}")
+            self._finished.set()
+            self._put(_DONE)
+
+    def _emit(self, event):
+        self.frames += 1
+        if _content_text(event) is not None:
+            self.content_frames += 1
+        return event
+
+    def __iter__(self):
+        if self.window <= 0:
+            for event in self._events:
+                if self._stop.is_set():
+                    break
+                if _content_text(event) is not None:
+                    self.deltas += 1
+                yield self._emit(event)
+            return
+
+        self._thread = threading.Thread(target=self._pump, name="stream-coalescer", daemon=True)
+        self._thread.start()
+
+        held, held_chars = [], 0
+        deadline = None
+        last_sent = float("-inf")
+
+        def take():
+            nonlocal held, held_chars, deadline, last_sent
+            event = {"type": "content", "text": "".join(held)}
+            held, held_chars, deadline = [], 0, None
+            last_sent = time.monotonic()
+            return self._emit(event)
+
+        try:
+            while not self._stop.is_set():
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    yield take()
+                    continue
+
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    if held:
+                        yield take()
+                    raise item.exc
+
+                text = _content_text(item)
+                if text is None:
+                    if held:
+                        yield take()
+                    yield self._emit(item)
+                    last_sent = time.monotonic()
+                    continue
+
+                self.deltas += 1
+                now = time.monotonic()
+                if not held and now - last_sent >= self.window:
+                    # Quiet until now — don't make this one wait
+                    last_sent = now
+                    yield self._emit(item)
+                    continue
+                held.append(text)
+                held_chars += len(text)
+                if deadline is None:
+                    deadline = last_sent + self.window
+                if held_chars >= self.max_chars:
+                    yield take()
+
+            if held:
+                yield take()
+        finally:
+            self._stop.set()
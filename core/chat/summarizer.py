@@ -0,0 +1,349 @@
+"""
+Rolling conversation summaries for long chats.
+
+Without this, get_messages_for_llm drops the oldest turns to fit
+LLM_MAX_HISTORY / CONTEXT_LIMIT — the model silently forgets the start of
+the chat while every request still runs near the context limit.
+
+With HISTORY_SUMMARY_ENABLED, once the unsummarized part of a chat grows
+past HISTORY_SUMMARY_TRIGGER_TOKENS, a background worker folds the oldest
+span (everything except the last ~HISTORY_SUMMARY_KEEP_TOKENS) into a
+running summary. The LLM then gets: summary + recent tail.
+
+Checkpoints are versioned rows in the chat_summaries table next to the chat
+in sapphire_history.db. Each row records how many leading messages it covers
+and a hash of them; if those messages are edited or deleted the checkpoint
+no longer matches and the next-older valid one (or none) is used.
+
+Summaries come from HISTORY_SUMMARY_PROVIDER: 'auto' (fallback order),
+a provider key, or 'stub' — a local extractive digest, no LLM call. Private
+chats only use local providers, falling back to the stub. Nothing is written
+in privacy mode.
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Checkpoint rows kept per chat (older ones are only useful as fallbacks
+# when recent history gets edited).
+KEEP_VERSIONS = 5
+# Don't bother summarizing a span smaller than this many messages.
+MIN_SPAN_MESSAGES = 4
+# Per-message cap when rendering the span for the summarizer.
+SPAN_MESSAGE_CHARS = 2000
+
+SUMMARY_HEADER = "[Summary of earlier conversation]"
+
+_SYSTEM_PROMPT = (
+    "You maintain a running summary of a long conversation between a user and an AI assistant. "
+    "Fold the new messages into the existing summary. Keep names, facts, decisions, preferences, "
+    "open questions and anything the assistant promised to do. Drop small talk. "
+    "Write compact third-person notes. Output only the summary."
+)
+
+
+def _est_tokens(msg: Dict[str, Any]) -> int:
+    """Cheap size estimate (chars/4) — this runs on the request path."""
+    content = msg.get("content", "")
+    if not isinstance(content, str):
+        content = json.dumps(content, default=str)
+    return len(content) // 4 + 4
+
+
+def _text_of(msg: Dict[str, Any]) -> str:
+    content = msg.get("content", "")
+    if isinstance(content, list):
+        parts = [b.get("text", "") for b in content if isinstance(b, dict) and b.get("type") == "text"]
+        parts += [b for b in content if isinstance(b, str)]
+        content = " ".join(parts)
+    return re.sub(r"<think>.*?</think>", "", str(content or ""), flags=re.DOTALL | re.IGNORECASE).strip()
+
+
+def span_hash(messages: List[Dict[str, Any]]) -> str:
+    h = hashlib.sha256()
+    for m in messages:
+        h.update(json.dumps([m.get("role"), m.get("timestamp"), m.get("content")],
+                            default=str, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def choose_boundary(messages: List[Dict[str, Any]], keep_tokens: int) -> int:
+    """Index where the verbatim tail starts: the first user message at or
+    after the point where the last `keep_tokens` begin. Starting the tail on
+    a user turn keeps tool calls and their results on the same side."""
+    total = 0
+    start = len(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        total += _est_tokens(messages[i])
+        if total > keep_tokens:
+            break
+        start = i
+    for i in range(start, len(messages)):
+        if messages[i].get("role") == "user":
+            return i
+    return len(messages)
+
+
+def render_span(messages: List[Dict[str, Any]]) -> str:
+    lines = []
+    for m in messages:
+        role = m.get("role")
+        if role == "tool":
+            text = _text_of(m)[:300]
+            lines.append(f"[tool {m.get('name', '')}] {text}")
+            continue
+        text = _text_of(m)
+        if role == "assistant" and m.get("tool_calls") and not text:
+            names = ", ".join(tc.get("function", {}).get("name", "?") for tc in m["tool_calls"])
+            text = f"(called {names})"
+        if not text:
+            continue
+        if len(text) > SPAN_MESSAGE_CHARS:
+            text = text[:SPAN_MESSAGE_CHARS] + " …"
+        lines.append(f"{'User' if role == 'user' else 'Assistant'}: {text}")
+    return "\n".join(lines)
+
+
+def stub_summary(previous: str, messages: List[Dict[str, Any]], max_words: int) -> str:
+    """Local extractive digest: first sentence of each user/assistant turn."""
+    lines = [previous] if previous else []
+    for m in messages:
+        if m.get("role") not in ("user", "assistant"):
+            continue
+        text = _text_of(m)
+        if not text:
+            continue
+        first = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0][:200]
+        lines.append(f"- {'User' if m['role'] == 'user' else 'Assistant'}: {first}")
+    words = "\n".join(lines).split(" ")
+    if len(words) > max_words:
+        # Keep the newest material when over budget
+        words = words[-max_words:]
+    return " ".join(words).strip()
+
+
+class HistoryCompactor:
+    """Owns the chat_summaries table and the background summarizer thread."""
+
+    def __init__(self, session_manager):
+        self._sm = session_manager
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._thread = None
+        self._cache: Dict[str, List[Dict[str, Any]]] = {}  # chat -> rows, newest first
+        self._cache_lock = threading.Lock()
+
+    # ── Settings ──
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(getattr(config, 'HISTORY_SUMMARY_ENABLED', False))
+
+    @staticmethod
+    def _int_setting(name, default):
+        try:
+            return max(0, int(getattr(config, name, default)))
+        except (TypeError, ValueError):
+            return default
+
+    # ── Read path ──
+
+    def checkpoint_for(self, chat_name: str, messages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Newest checkpoint whose covered prefix still matches `messages`."""
+        if not self.enabled() or not messages:
+            return None
+        for row in self._rows(chat_name):
+            covers = row["covers_count"]
+            if covers <= len(messages) and span_hash(messages[:covers]) == row["covers_hash"]:
+                return row
+        return None
+
+    def _rows(self, chat_name: str) -> List[Dict[str, Any]]:
+        with self._cache_lock:
+            if chat_name in self._cache:
+                return self._cache[chat_name]
+        rows = []
+        try:
+            with self._sm._get_connection() as conn:
+                cur = conn.execute(
+                    """SELECT version, covers_count, covers_hash, summary, provider, created_at
+                       FROM chat_summaries WHERE chat_name = ? ORDER BY version DESC""",
+                    (chat_name,))
+                rows = [dict(r) for r in cur.fetchall()]
+        except Exception as e:
+            logger.warning(f"[SUMMARY] Failed to read checkpoints for '{chat_name}': {e}")
+        with self._cache_lock:
+            self._cache[chat_name] = rows
+        return rows
+
+    def forget(self, chat_name: str, delete: bool = False):
+        """Drop cached rows; with delete=True also remove them from the DB."""
+        with self._cache_lock:
+            self._cache.pop(chat_name, None)
+        if not delete:
+            return
+        try:
+            with self._sm._get_connection() as conn:
+                conn.execute("DELETE FROM chat_summaries WHERE chat_name = ?", (chat_name,))
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"[SUMMARY] Failed to delete checkpoints for '{chat_name}': {e}")
+
+    # ── Trigger ──
+
+    def maybe_schedule(self, chat_name: str, messages: List[Dict[str, Any]],
+                       chat_settings: Dict[str, Any]) -> bool:
+        """Queue a compaction if the unsummarized part is over the trigger.
+        Called after each completed turn; cheap when nothing is due."""
+        if not self.enabled() or not messages:
+            return False
+        try:
+            from core.privacy import is_privacy_mode
+            if is_privacy_mode():
+                return False
+        except ImportError:
+            pass
+        trigger = self._int_setting('HISTORY_SUMMARY_TRIGGER_TOKENS', 16000)
+        checkpoint = self.checkpoint_for(chat_name, messages)
+        covered = checkpoint["covers_count"] if checkpoint else 0
+        if sum(_est_tokens(m) for m in messages[covered:]) < trigger:
+            return False
+        with self._pending_lock:
+            if chat_name in self._pending:
+                return False
+            self._pending.add(chat_name)
+        self._queue.put((chat_name, list(messages), dict(chat_settings or {})))
+        self._ensure_worker()
+        return True
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="HistorySummarizer")
+        self._thread.start()
+
+    def _loop(self):
+        while True:
+            chat_name, messages, settings = self._queue.get()
+            try:
+                self.compact(chat_name, messages, settings)
+            except Exception as e:
+                logger.error(f"[SUMMARY] Compaction failed for '{chat_name}': {e}", exc_info=True)
+            finally:
+                with self._pending_lock:
+                    self._pending.discard(chat_name)
+                self._queue.task_done()
+
+    # ── Compaction ──
+
+    def compact(self, chat_name: str, messages: List[Dict[str, Any]],
+                chat_settings: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Fold the span between the current checkpoint and the verbatim tail
+        into a new checkpoint row. Returns the new row, or None if skipped."""
+        keep = self._int_setting('HISTORY_SUMMARY_KEEP_TOKENS', 6000)
+        max_words = self._int_setting('HISTORY_SUMMARY_MAX_WORDS', 400) or 400
+        checkpoint = self.checkpoint_for(chat_name, messages)
+        start = checkpoint["covers_count"] if checkpoint else 0
+        boundary = choose_boundary(messages, keep)
+        if boundary - start < MIN_SPAN_MESSAGES:
+            return None
+
+        previous = checkpoint["summary"] if checkpoint else ""
+        span = messages[start:boundary]
+        summary, provider_key = self._summarize(previous, span, max_words, chat_settings or {})
+        if not summary:
+            return None
+
+        rows = self._rows(chat_name)
+        version = (rows[0]["version"] + 1) if rows else 1
+        row = {
+            "version": version,
+            "covers_count": boundary,
+            "covers_hash": span_hash(messages[:boundary]),
+            "summary": summary,
+            "provider": provider_key,
+            "created_at": datetime.now().isoformat(),
+        }
+        with self._sm._lock:
+            try:
+                with self._sm._get_connection() as conn:
+                    # Chat deleted while we were summarizing — don't leave orphans
+                    if not conn.execute("SELECT 1 FROM chats WHERE name = ?", (chat_name,)).fetchone():
+                        return None
+                    conn.execute(
+                        """INSERT OR REPLACE INTO chat_summaries
+                           (chat_name, version, covers_count, covers_hash, summary, provider, created_at)
+                           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                        (chat_name, version, row["covers_count"], row["covers_hash"],
+                         summary, provider_key, row["created_at"]))
+                    conn.execute(
+                        "DELETE FROM chat_summaries WHERE chat_name = ? AND version <= ?",
+                        (chat_name, version - KEEP_VERSIONS))
+                    conn.commit()
+            except Exception as e:
+                logger.error(f"[SUMMARY] Failed to store checkpoint for '{chat_name}': {e}")
+                return None
+        self.forget(chat_name)
+        logger.info(f"[SUMMARY] '{chat_name}' v{version}: messages {start}-{boundary} folded "
+                    f"({len(span)} msgs → {len(summary)} chars, via {provider_key})")
+        return row
+
+    def _summarize(self, previous: str, span: List[Dict[str, Any]], max_words: int,
+                   chat_settings: Dict[str, Any]):
+        """(summary text, provider key used). Falls back to the stub on any
+        provider problem so a flaky endpoint never blocks compaction."""
+        choice = str(getattr(config, 'HISTORY_SUMMARY_PROVIDER', 'auto') or 'auto')
+        if choice != 'stub':
+            try:
+                resolved = self._resolve_provider(choice, chat_settings)
+                if resolved:
+                    key, provider = resolved
+                    text = self._llm_summary(key, provider, previous, span, max_words)
+                    if text:
+                        return text, key
+            except Exception as e:
+                logger.warning(f"[SUMMARY] Provider summary failed, using local stub: {e}")
+        return stub_summary(previous, span, max_words), 'stub'
+
+    @staticmethod
+    def _resolve_provider(choice: str, chat_settings: Dict[str, Any]):
+        from core.chat.llm_providers import (get_provider_by_key, get_first_available_provider,
+                                             PROVIDER_METADATA)
+        from core.privacy import is_privacy_mode
+        providers_config = {**getattr(config, 'LLM_PROVIDERS', {}), **getattr(config, 'LLM_CUSTOM_PROVIDERS', {})}
+        private = is_privacy_mode() or chat_settings.get('private_chat', False)
+        if choice != 'auto':
+            if private and not PROVIDER_METADATA.get(choice, {}).get('is_local', False):
+                logger.info(f"[SUMMARY] '{choice}' is not local — private chat uses the stub")
+                return None
+            provider = get_provider_by_key(choice, providers_config, config.LLM_REQUEST_TIMEOUT)
+            return (choice, provider) if provider else None
+        fallback_order = getattr(config, 'LLM_FALLBACK_ORDER', list(providers_config.keys()))
+        return get_first_available_provider(providers_config, fallback_order,
+                                            config.LLM_REQUEST_TIMEOUT, force_privacy=private)
+
+    @staticmethod
+    def _llm_summary(key, provider, previous, span, max_words) -> str:
+        from core.chat.llm_providers import get_generation_params
+        providers_config = {**getattr(config, 'LLM_PROVIDERS', {}), **getattr(config, 'LLM_CUSTOM_PROVIDERS', {})}
+        params = dict(get_generation_params(key, provider.model, providers_config))
+        params['max_tokens'] = max(256, int(max_words * 2))
+        params['disable_thinking'] = True
+        user = (f"Existing summary:\n{previous or '(none yet)'}\n\n"
+                f"New messages:\n{render_span(span)}\n\n"
+                f"Write the updated summary in at most {max_words} words.")
+        response = provider.chat_completion(
+            [{"role": "system", "content": _SYSTEM_PROMPT}, {"role": "user", "content": user}],
+            tools=None, generation_params=params)
+        return _text_of({"content": getattr(response, 'content', '') or ''})
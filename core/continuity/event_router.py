@@ -0,0 +1,320 @@
+# core/continuity/event_router.py
+"""
+Daemon event routing — which tasks an incoming Discord/Telegram/email event wakes.
+
+Before: every message went find_tasks_by_event (scan + copy every task under
+the scheduler lock) → fire_event_task per task, which re-parsed the JSON
+payload and re-walked the filter dict each time. Every message was its own
+LLM turn, so someone typing five lines in a row cost five.
+
+Now:
+  - Routes are indexed by source, then account, and only rebuilt after a
+    task changes. Each task's filter is compiled once into predicates.
+  - The payload is parsed once per event; every candidate route is checked
+    against that one dict.
+  - Chat messages (text + channel/chat id) wait out a short per-channel
+    debounce (DAEMON_EVENT_DEBOUNCE, or trigger_config.debounce per task).
+    A burst from one channel is merged into a single event, so it costs one
+    LLM turn. A steady stream is flushed after MAX_HOLD_FACTOR × debounce.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE = 1.5
+MAX_HOLD_FACTOR = 4
+
+# fire_event_task errors that mean "not for this task" rather than "accepted, but..."
+NOT_ACCEPTED = ("Event filtered out", "Account mismatch")
+
+UNPARSED = object()
+
+
+def parse_event(event_data) -> Any:
+    """Payload as parsed JSON, or UNPARSED if it isn't JSON."""
+    if not isinstance(event_data, str):
+        return event_data
+    try:
+        return json.loads(event_data)
+    except (json.JSONDecodeError, TypeError):
+        return UNPARSED
+
+
+class CompiledFilter:
+    """A task's trigger_config account + filter, compiled once.
+
+    Filter keys: `field` (case-insensitive equals), `field_not` (must not
+    equal), `field_contains` (case-insensitive substring).
+    """
+
+    __slots__ = ("account", "checks", "has_filter")
+
+    def __init__(self, trigger_config: Optional[Dict]):
+        tc = trigger_config or {}
+        self.account = tc.get("account", "") or ""
+        task_filter = tc.get("filter")
+        self.has_filter = bool(task_filter) and isinstance(task_filter, dict)
+        self.checks = []
+        if self.has_filter:
+            for key, val in task_filter.items():
+                want = str(val).lower()
+                if key.endswith("_not"):
+                    self.checks.append(("not", key[:-4], want))
+                elif key.endswith("_contains"):
+                    self.checks.append(("contains", key[:-9], want))
+                else:
+                    self.checks.append(("eq", key, want))
+
+    def reject_reason(self, event_obj) -> Optional[str]:
+        """None if the event passes, else the fire_event_task error string."""
+        if self.account and isinstance(event_obj, dict):
+            event_account = event_obj.get("account", "")
+            if event_account and event_account != self.account:
+                return "Account mismatch"
+        if not self.has_filter:
+            return None
+        if event_obj is UNPARSED:
+            # Can't parse event as JSON — filter can't run, reject for safety
+            return "Event data not JSON-parseable, filter requires JSON"
+        if not isinstance(event_obj, dict):
+            return None
+        for op, field, want in self.checks:
+            if op == "not":
+                if str(event_obj.get(field, "")).lower() == want:
+                    return "Event filtered out"
+            elif op == "contains":
+                if want not in str(event_obj.get(field, "")).lower():
+                    return "Event filtered out"
+            elif str(event_obj.get(field)).lower() != want:
+                return "Event filtered out"
+        return None
+
+
+def _text(event: Dict) -> str:
+    return event.get("text") or event.get("content") or ""
+
+
+def _sender(event: Dict) -> str:
+    return (event.get("display_name") or event.get("first_name")
+            or event.get("username") or event.get("sender") or "")
+
+
+def _burst_channel(event_obj) -> Optional[str]:
+    """Channel key for chat-platform messages; None for anything we shouldn't merge."""
+    if not isinstance(event_obj, dict) or not _text(event_obj):
+        return None
+    channel = event_obj.get("channel_id") or event_obj.get("chat_id")
+    return str(channel) if channel else None
+
+
+def merge_events(events: List[Dict]) -> Dict:
+    """Fold a burst into one event: the latest message's fields (reply target,
+    recent history, ids) with every message's text, in order."""
+    merged = dict(events[-1])
+    if len({_sender(e) for e in events}) == 1:
+        lines = [_text(e) for e in events]
+    else:
+        lines = [f"{_sender(e)}: {_text(e)}" if _sender(e) else _text(e) for e in events]
+    merged["text" if "text" in merged or "content" not in merged else "content"] = "\n".join(lines)
+    merged["coalesced"] = len(events)
+    return merged
+
+
+class _Route:
+    __slots__ = ("task_id", "name", "filter", "debounce")
+
+    def __init__(self, task: Dict):
+        tc = task.get("trigger_config") or {}
+        self.task_id = task["id"]
+        self.name = task.get("name", "Unnamed")
+        self.filter = CompiledFilter(tc)
+        debounce = tc.get("debounce")
+        try:
+            self.debounce = float(debounce) if debounce is not None and debounce != "" else None
+        except (TypeError, ValueError):
+            self.debounce = None
+
+
+class _Burst:
+    __slots__ = ("route", "events", "raw", "reply_callback", "first", "timer")
+
+    def __init__(self, route: _Route, now: float):
+        self.route = route
+        self.events = []
+        self.raw = None
+        self.reply_callback = None
+        self.first = now
+        self.timer = None
+
+
+class EventRouter:
+    """Routes daemon events to the scheduler's event tasks. One per scheduler."""
+
+    def __init__(self, scheduler):
+        self._scheduler = scheduler
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Dict]] = None
+        self._gen = 0
+        self._bursts: Dict[tuple, _Burst] = {}
+        self._counts = {"events": 0, "filtered": 0, "fired": 0, "held": 0, "coalesced": 0}
+
+    # ── Index ──
+
+    def invalidate(self):
+        """Drop the index; the next event rebuilds it. Call after any task change."""
+        with self._lock:
+            self._index = None
+            self._gen += 1
+
+    def _build(self) -> Dict[str, Dict]:
+        with self._lock:
+            gen = self._gen
+        index: Dict[str, Dict] = {}
+        sched = self._scheduler
+        with sched._lock:
+            tasks = [t for t in sched._tasks.values()
+                     if t.get("type") == "daemon" and t.get("enabled", True)]
+            routes = [_Route(t) for t in tasks]
+        for task, route in zip(tasks, routes):
+            source = (task.get("trigger_config") or {}).get("source")
+            if not source:
+                continue
+            entry = index.setdefault(source, {"all": [], "any": [], "accounts": {}})
+            entry["all"].append(route)
+            if route.filter.account:
+                entry["accounts"].setdefault(route.filter.account, []).append(route)
+            else:
+                entry["any"].append(route)
+        with self._lock:
+            if self._gen == gen:
+                self._index = index
+        return index
+
+    def routes_for(self, source: str, account: str = "") -> List[_Route]:
+        """Candidate routes: tasks on this source for this account or for any account."""
+        with self._lock:
+            index = self._index
+        if index is None:
+            index = self._build()
+        entry = index.get(source)
+        if not entry:
+            return []
+        if not account:
+            return entry["all"]
+        return entry["accounts"].get(account, []) + entry["any"]
+
+    # ── Routing ──
+
+    def route(self, source: str, event_data, reply_callback=None) -> bool:
+        """Deliver one event. Returns True if any task accepted it."""
+        event_obj = parse_event(event_data)
+        account = event_obj.get("account", "") if isinstance(event_obj, dict) else ""
+        routes = self.routes_for(source, account)
+        self._count("events")
+        if not routes:
+            logger.debug(f"[Continuity] No tasks listening for event source '{source}'")
+            return False
+
+        channel = _burst_channel(event_obj)
+        any_accepted = False
+        for route in routes:
+            reason = route.filter.reject_reason(event_obj)
+            if reason:
+                self._count("filtered")
+                logger.debug(f"[Continuity] '{route.name}' skipped event: {reason}")
+                if reason not in NOT_ACCEPTED:
+                    # Same as fire_event_task's answer: only a filter or
+                    # account mismatch means the task wasn't interested
+                    any_accepted = True
+                continue
+            delay = self._debounce_for(route) if channel else 0
+            if delay > 0:
+                self._hold(route, (account, channel), event_obj, event_data, reply_callback, delay)
+                any_accepted = True
+                continue
+            if self._fire(route, event_data, reply_callback):
+                any_accepted = True
+        return any_accepted
+
+    def _count(self, key: str):
+        with self._lock:
+            self._counts[key] += 1
+
+    @staticmethod
+    def _debounce_for(route: _Route) -> float:
+        if route.debounce is not None:
+            return max(0.0, route.debounce)
+        import config
+        try:
+            return max(0.0, float(getattr(config, 'DAEMON_EVENT_DEBOUNCE', DEFAULT_DEBOUNCE)))
+        except (TypeError, ValueError):
+            return DEFAULT_DEBOUNCE
+
+    def _fire(self, route: _Route, event_data, reply_callback) -> bool:
+        result = self._scheduler.fire_event_task(route.task_id, event_data,
+                                                 reply_callback=reply_callback, matched=True)
+        self._count("fired")
+        return result.get("success", False) or result.get("error") not in NOT_ACCEPTED
+
+    def _hold(self, route: _Route, channel_key: tuple, event_obj, event_data, reply_callback, delay: float):
+        key = (route.task_id,) + channel_key
+        now = time.monotonic()
+        with self._lock:
+            burst = self._bursts.get(key)
+            if burst is None:
+                burst = self._bursts[key] = _Burst(route, now)
+            else:
+                burst.timer.cancel()
+                self._counts["coalesced"] += 1
+            burst.events.append(event_obj)
+            burst.raw = event_data
+            burst.reply_callback = reply_callback
+            wait = min(delay, burst.first + delay * MAX_HOLD_FACTOR - now)
+            burst.timer = threading.Timer(max(0.0, wait), self._flush, args=(key,))
+            burst.timer.daemon = True
+            burst.timer.start()
+            self._counts["held"] += 1
+
+    def _flush(self, key: tuple):
+        with self._lock:
+            burst = self._bursts.pop(key, None)
+        if burst is None:
+            return
+        if len(burst.events) == 1:
+            event_data = burst.raw
+        else:
+            event_data = json.dumps(merge_events(burst.events))
+            logger.info(f"[Continuity] '{burst.route.name}' merged {len(burst.events)} messages into one event")
+        try:
+            self._fire(burst.route, event_data, burst.reply_callback)
+        except Exception as e:
+            logger.error(f"[Continuity] Failed to fire held event for '{burst.route.name}': {e}")
+
+    def flush_all(self):
+        """Fire every held burst now (tests, or before a deliberate drain)."""
+        with self._lock:
+            keys = list(self._bursts)
+            for key in keys:
+                self._bursts[key].timer.cancel()
+        for key in keys:
+            self._flush(key)
+
+    def cancel_pending(self):
+        """Drop held bursts without firing them (scheduler shutdown)."""
+        with self._lock:
+            bursts, self._bursts = self._bursts, {}
+        for burst in bursts.values():
+            burst.timer.cancel()
+        if bursts:
+            logger.info(f"[Continuity] Dropped {len(bursts)} held event burst(s) on shutdown")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._counts)
+            out["holding"] = len(self._bursts)
+        return out
@@ -7,6 +7,7 @@
 # Prompt, tools, scopes, provider are all resolved at construction time.
 
 import logging
+import threading
 import time
 from contextvars import ContextVar
 from datetime import datetime
@@ -23,6 +24,11 @@ logger = logging.getLogger(__name__)
 # from the spawning agent, NOT from the user's foreground chat. Scout #7.
 current_task_persona: ContextVar[Optional[str]] = ContextVar('current_task_persona', default=None)
 
+# Cancellation flag of the agent worker running in this thread, set by
+# BaseWorker._run_wrapper(). The LLM + tool loop checks it between steps so
+# a dismissed agent stops at the next boundary instead of running to the end.
+current_cancel_event: ContextVar[Optional[threading.Event]] = ContextVar('current_cancel_event', default=None)
+
 
 class ExecutionContext:
     """Self-contained execution environment for a single task run.
@@ -44,6 +50,8 @@ class ExecutionContext:
         self.provider_key, self.provider, self.model_override = self._resolve_provider()
         self.gen_params = self._build_gen_params()
         self.tool_log = []  # List of tool names called during run()
+        # Wall time spent in the LLM and in tool execution, for the run log
+        self.timings = {"llm_s": 0.0, "llm_calls": 0, "tools_s": 0.0, "tool_calls": 0}
         # Populated by run() when the LLM loop didn't produce a real reply
         # (tool-round exhaustion, context overflow, empty LLM output). Lets
         # callers distinguish "clean done with response" from "done with a
@@ -51,6 +59,11 @@ class ExecutionContext:
         # success for a no-op run. Scout #15 — 2026-04-20. None = clean run.
         self.degraded_reason: Optional[str] = None
 
+    @staticmethod
+    def _cancelled() -> bool:
+        event = current_cancel_event.get()
+        return event is not None and event.is_set()
+
     # ── Construction (read-only) ──
 
     def _build_prompt(self) -> str:
@@ -69,20 +82,23 @@ class ExecutionContext:
         ai_name = 'Sapphire'
         system_prompt = system_prompt.replace("{user_name}", username).replace("{ai_name}", ai_name)
 
-        # Datetime injection
-        if self.task_settings.get("inject_datetime"):
-            try:
-                from zoneinfo import ZoneInfo
-                tz_name = getattr(config, 'USER_TIMEZONE', 'UTC') or 'UTC'
-                now = datetime.now(ZoneInfo(tz_name))
-                tz_label = f" ({tz_name})"
-            except Exception:
-                now = datetime.now()
-                tz_label = ""
-            system_prompt = f"{system_prompt}\n\nCurrent date/time: {now.strftime('%A, %B %d, %Y at %I:%M %p')}{tz_label}"
-
         return system_prompt
 
+    def _dynamic_context(self) -> Optional[str]:
+        """Per-run context kept out of the system prompt so the prompt stays a
+        cacheable prefix (see core/chat/prompt_layout.py)."""
+        if not self.task_settings.get("inject_datetime"):
+            return None
+        try:
+            from zoneinfo import ZoneInfo
+            tz_name = getattr(config, 'USER_TIMEZONE', 'UTC') or 'UTC'
+            now = datetime.now(ZoneInfo(tz_name))
+            tz_label = f" ({tz_name})"
+        except Exception:
+            now = datetime.now()
+            tz_label = ""
+        return f"Current date/time: {now.strftime('%A, %B %d, %Y at %I:%M %p')}{tz_label}"
+
     def _resolve_tools(self) -> Optional[List[Dict]]:
         """Resolve toolset to tool list. READ-ONLY — no mutation of FunctionManager."""
         toolset_name = self.task_settings.get("toolset", "none")
@@ -244,21 +260,28 @@ class ExecutionContext:
         finally:
             current_task_persona.reset(_persona_token)
 
+    def _add_timing(self, kind: str, seconds: float, calls: int = 1):
+        t = self.timings
+        t[f"{kind}_s"] = round(t[f"{kind}_s"] + seconds, 3)
+        t["llm_calls" if kind == "llm" else "tool_calls"] += calls
+
     def _run_inner(self, user_input, history_messages, filter_to_thinking_only, _inject_tool_images):
         # Build messages
+        from core.chat import prompt_layout
+        static_msg, dynamic_msg = prompt_layout.system_messages(
+            self.system_prompt, self._dynamic_context(),
+            source=f"task:{self.task_settings.get('prompt', '')}")
         if history_messages is not None:
             # Foreground mode — use existing chat history
-            messages = [{"role": "system", "content": self.system_prompt}] + history_messages
-            # Track where new messages start BEFORE adding the user message
-            msg_start_idx = len(messages)
-            messages.append({"role": "user", "content": user_input})
+            messages = [static_msg] + history_messages
         else:
             # Ephemeral — no history
-            messages = [
-                {"role": "system", "content": self.system_prompt},
-            ]
-            msg_start_idx = len(messages)
-            messages.append({"role": "user", "content": user_input})
+            messages = [static_msg]
+        if dynamic_msg:
+            messages.append(dynamic_msg)
+        # Track where new messages start BEFORE adding the user message
+        msg_start_idx = len(messages)
+        messages.append({"role": "user", "content": user_input})
 
         # `or config.X` coerces falsy values to the default — but an explicit
         # 0 is a valid-looking-but-actually-lethal value here: max_parallel=0
@@ -281,6 +304,7 @@ class ExecutionContext:
         final_content = None
 
         overflow_reason = None
+        cancel_reason = None
         for i in range(max_iterations):
             # Context limit check — auto-trim oldest messages rather than bail.
             # Previously this break fired before we ever called the LLM whenever
@@ -320,9 +344,16 @@ class ExecutionContext:
                         logger.error(f"[ExecCtx] {overflow_reason}")
                         break
 
+            if self._cancelled():
+                cancel_reason = "(Cancelled before the task finished.)"
+                logger.info("[ExecCtx] Cancelled — stopping before the next LLM call")
+                break
+
+            t0 = time.monotonic()
             response_msg = self.tool_engine.call_llm_with_metrics(
                 self.provider, messages, self.gen_params, tools=self.tools
             )
+            self._add_timing("llm", time.monotonic() - t0)
 
             if response_msg.has_tool_calls:
                 filtered = filter_to_thinking_only(response_msg.content or "")
@@ -337,10 +368,17 @@ class ExecutionContext:
                 # is the actual bound. Keep the last 500. Scout longevity #3.
                 if len(self.tool_log) > 500:
                     del self.tool_log[:-500]
+                if self._cancelled():
+                    # Dangling tool_calls get placeholders below
+                    cancel_reason = "(Cancelled before the task finished.)"
+                    logger.info("[ExecCtx] Cancelled — skipping requested tool calls")
+                    break
+                t0 = time.monotonic()
                 tools_executed, tool_images = self.tool_engine.execute_tool_calls(
                     tool_calls, messages, None, self.provider, scopes=self.scopes,
                     allowed_tools=self._allowed_tool_names
                 )
+                self._add_timing("tools", time.monotonic() - t0, calls=len(tool_calls))
                 if tool_images:
                     _inject_tool_images(messages, tool_images)
                 logger.info(f"[ExecCtx] Loop {i+1}: {tools_executed} tools executed")
@@ -366,10 +404,12 @@ class ExecutionContext:
                     if len(self.tool_log) > 500:
                         del self.tool_log[:-500]
                     filtered = filter_to_thinking_only(response_msg.content)
+                    t0 = time.monotonic()
                     _, tool_images = self.tool_engine.execute_text_based_tool_call(
                         fn_data, filtered, messages, None, self.provider, scopes=self.scopes,
                         allowed_tools=self._allowed_tool_names
                     )
+                    self._add_timing("tools", time.monotonic() - t0)
                     if tool_images:
                         _inject_tool_images(messages, tool_images)
                     continue
@@ -450,8 +490,8 @@ class ExecutionContext:
                 # by keeping final_content empty here so caller truthy-checks
                 # (`if response:`) drop the output cleanly. Scout #15 / Krem
                 # 2026-04-24.
-                if overflow_reason:
-                    self.degraded_reason = overflow_reason
+                if overflow_reason or cancel_reason:
+                    self.degraded_reason = overflow_reason or cancel_reason
                 else:
                     self.degraded_reason = (
                         f"Tool loop exhausted after {max_iterations} rounds without "
@@ -1,19 +1,26 @@
 # core/continuity/executor.py
 """
 Continuity Executor - Runs scheduled tasks with proper context isolation.
-Switches chat context, applies settings, runs LLM, restores original state.
+Each task runs in its own ExecutionContext; up to CONTINUITY_MAX_CONCURRENT_TASKS
+run their LLM/tool work at once. Spoken output goes through one ordered
+playback queue with the task's own voice — the shared TTS voice is never
+mutated, so tasks don't need to take turns.
 """
 
 import copy
 import json
 import logging
 import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, Any
 from core.event_bus import publish, Events
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_CONCURRENT_TASKS = 3
+
 
 class ContinuityExecutor:
     """Executes continuity tasks with context isolation."""
@@ -24,13 +31,70 @@ class ContinuityExecutor:
             system: VoiceChatSystem instance with llm_chat, tts, etc.
         """
         self.system = system
-        # RLock (reentrant) — guards TTS voice snapshot/apply/restore. Non-reentrant
-        # Lock caused a self-deadlock this morning when the finally block re-entered
-        # via `with self._voice_lock:`. RLock also defends against any future tool
-        # that calls back into the executor while a task is running (spawn_agent,
-        # nested continuity triggers, future cross-task coordination) — that path
-        # would deadlock on re-acquire with a plain Lock. Scout chaos #17/#18.
-        self._voice_lock = threading.RLock()
+        import config
+        try:
+            limit = int(getattr(config, 'CONTINUITY_MAX_CONCURRENT_TASKS', DEFAULT_MAX_CONCURRENT_TASKS))
+        except (TypeError, ValueError):
+            limit = DEFAULT_MAX_CONCURRENT_TASKS
+        self._max_concurrent = max(1, limit)
+        self._slots = threading.BoundedSemaphore(self._max_concurrent)
+        self._slot_local = threading.local()
+        from core.tts.speech_queue import SpeechQueue
+        self._speech = SpeechQueue(lambda: getattr(self.system, 'tts', None), name="ContinuitySpeech")
+        # Foreground tasks aimed at the same chat take turns so their
+        # read-history → run → append sequences don't interleave.
+        self._chat_locks: Dict[str, threading.Lock] = {}
+        self._chat_locks_guard = threading.Lock()
+
+    # ─── Concurrency / output plumbing ──────────────────────────────────
+
+    @contextmanager
+    def _task_slot(self, task_name: str):
+        """Hold one of the bounded execution slots for the task's LLM/tool work.
+        Re-entrant per thread: a task whose tool calls back into the executor
+        (nested continuity run) reuses its slot instead of deadlocking on a
+        full pool — the reason the old voice lock had to be an RLock."""
+        local = self._slot_local
+        slots = self._slots
+        depth = getattr(local, 'depth', 0)
+        if depth == 0:
+            if not slots.acquire(blocking=False):
+                logger.info(f"[Continuity] '{task_name}' waiting for a free task slot "
+                            f"({self._max_concurrent} running)")
+                slots.acquire()
+        local.depth = depth + 1
+        try:
+            yield
+        finally:
+            local.depth -= 1
+            if local.depth == 0:
+                slots.release()
+
+    def _chat_lock(self, chat_name: str) -> threading.Lock:
+        with self._chat_locks_guard:
+            return self._chat_locks.setdefault(chat_name, threading.Lock())
+
+    def _voice_settings(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-task voice/pitch/speed for TTS, or None fields to use the
+        current TTS settings. Voice is validated against the active provider."""
+        voice = task.get("voice") or None
+        if voice:
+            voice = self._validate_voice(voice)
+        return {"voice": voice, "speed": task.get("speed"), "pitch": task.get("pitch")}
+
+    def _speak(self, task: Dict[str, Any], response: str) -> None:
+        """Route a task's response to speech without blocking the task:
+        browser TTS via the event bus, local TTS via the ordered playback queue."""
+        task_name = task.get("name", "")
+        if task.get("browser_tts", False):
+            publish(Events.TTS_SPEAK, {"text": response, "task": task_name})
+            return
+        if not task.get("tts_enabled", True) or not getattr(self.system, 'tts', None):
+            return
+        try:
+            self._speech.submit(response, label=task_name, **self._voice_settings(task))
+        except Exception as tts_err:
+            logger.warning(f"[Continuity] TTS failed: {tts_err}")
 
     @staticmethod
     def _format_event_data(event_data: str) -> str:
@@ -140,8 +204,19 @@ class ContinuityExecutor:
             response_callback: Optional callable(response_text) called before TTS
 
         Returns:
-            Result dict with success, responses, errors
+            Result dict with success, responses, errors, and timings
+            (slot_wait_s, plus llm_s/llm_calls/tools_s/tool_calls for LLM runs)
         """
+        asked = time.monotonic()
+        with self._task_slot(task.get("name", "Unnamed")):
+            slot_wait = time.monotonic() - asked
+            result = self._run(task, event_data, progress_callback, response_callback)
+        if isinstance(result, dict):
+            result.setdefault("timings", {})["slot_wait_s"] = round(slot_wait, 3)
+        return result
+
+    def _run(self, task: Dict[str, Any], event_data: str = None,
+             progress_callback=None, response_callback=None) -> Dict[str, Any]:
         # Plugin-sourced tasks run their handler directly
         source = task.get("source", "")
         if source.startswith("plugin:"):
@@ -265,77 +340,44 @@ class ContinuityExecutor:
         task_name = task.get("name", "Unknown")
         logger.info(f"[Continuity] Running '{task_name}' in BACKGROUND mode (ExecutionContext)")
 
-        with self._voice_lock:
-            original_voice = self._snapshot_voice()
-            try:
-                self._apply_voice(task)
-            except Exception:
-                self._restore_voice(original_voice)
-                raise
+        try:
+            task_settings = self._extract_task_settings(task)
+            ctx = ExecutionContext(
+                self.system.llm_chat.function_manager,
+                self.system.llm_chat.tool_engine,
+                task_settings
+            )
 
-            try:
-                task_settings = self._extract_task_settings(task)
-                ctx = ExecutionContext(
-                    self.system.llm_chat.function_manager,
-                    self.system.llm_chat.tool_engine,
-                    task_settings
-                )
+            # Set Discord reply channel for auto-reply targeting
+            reply_ch = task.get("_discord_reply_channel_id")
+            if reply_ch:
+                try:
+                    from plugins.discord.tools.discord_tools import _reply_channel_id
+                    _reply_channel_id.set(reply_ch)
+                except ImportError:
+                    pass
 
-                # Set Discord reply channel for auto-reply targeting
-                reply_ch = task.get("_discord_reply_channel_id")
-                if reply_ch:
-                    try:
-                        from plugins.discord.tools.discord_tools import _reply_channel_id
-                        _reply_channel_id.set(reply_ch)
-                    except ImportError:
-                        pass
+            msg = task.get("initial_message", "Hello.")
 
-                tts_enabled = task.get("tts_enabled", True)
-                browser_tts = task.get("browser_tts", False)
-                msg = task.get("initial_message", "Hello.")
+            try:
+                response = ctx.run(msg)
 
-                try:
-                    response = ctx.run(msg)
-
-                    if response_cb and response:
-                        try: response_cb(response)
-                        except Exception as _e: logger.error(f"[Continuity] Response callback failed: {_e}")
-
-                    if response:
-                        if browser_tts:
-                            publish(Events.TTS_SPEAK, {"text": response, "task": task_name})
-                        elif tts_enabled and hasattr(self.system, 'tts') and self.system.tts:
-                            try:
-                                self.system.tts.speak_sync(response)
-                            except Exception as tts_err:
-                                logger.warning(f"[Continuity] TTS failed: {tts_err}")
-
-                    result["responses"].append({
-                        "iteration": 1,
-                        "input": msg,
-                        "output": response or None
-                    })
-                except Exception as e:
-                    from core.chat.chat import friendly_llm_error
-                    friendly = friendly_llm_error(e)
-                    error_msg = f"Task failed: {friendly or e}"
-                    logger.error(f"[Continuity] {error_msg}", exc_info=True)
-                    result["errors"].append(error_msg)
-                    from core.event_bus import publish, Events
-                    publish(Events.CONTINUITY_TASK_ERROR, {
-                        "task": task.get("name", "Unknown"),
-                        "error": friendly or str(e),
-                    })
-
-                if progress_cb:
-                    progress_cb(1, 1)
-
-                result["success"] = len(result["errors"]) == 0
+                if response_cb and response:
+                    try: response_cb(response)
+                    except Exception as _e: logger.error(f"[Continuity] Response callback failed: {_e}")
+
+                if response:
+                    self._speak(task, response)
 
+                result["responses"].append({
+                    "iteration": 1,
+                    "input": msg,
+                    "output": response or None
+                })
             except Exception as e:
                 from core.chat.chat import friendly_llm_error
                 friendly = friendly_llm_error(e)
-                error_msg = f"Background task failed: {friendly or e}"
+                error_msg = f"Task failed: {friendly or e}"
                 logger.error(f"[Continuity] {error_msg}", exc_info=True)
                 result["errors"].append(error_msg)
                 from core.event_bus import publish, Events
@@ -344,8 +386,26 @@ class ContinuityExecutor:
                     "error": friendly or str(e),
                 })
 
-            finally:
-                self._restore_voice(original_voice)
+            timings = getattr(ctx, "timings", None)
+            if isinstance(timings, dict):
+                result["timings"] = dict(timings)
+
+            if progress_cb:
+                progress_cb(1, 1)
+
+            result["success"] = len(result["errors"]) == 0
+
+        except Exception as e:
+            from core.chat.chat import friendly_llm_error
+            friendly = friendly_llm_error(e)
+            error_msg = f"Background task failed: {friendly or e}"
+            logger.error(f"[Continuity] {error_msg}", exc_info=True)
+            result["errors"].append(error_msg)
+            from core.event_bus import publish, Events
+            publish(Events.CONTINUITY_TASK_ERROR, {
+                "task": task.get("name", "Unknown"),
+                "error": friendly or str(e),
+            })
 
         result["completed_at"] = datetime.now().isoformat()
         return result
@@ -354,30 +414,16 @@ class ContinuityExecutor:
                         progress_cb=None, response_cb=None) -> Dict[str, Any]:
         """Run task with persistent chat history — no UI switching.
 
-        Voice-lock discipline: the lock is held for the ENTIRE duration of
-        the task (snapshot → apply → LLM → TTS → restore). Before 2026-04-19
-        the lock was released between apply and restore, which let a second
-        concurrent task's `_apply_voice` run over the first's — task A would
-        then speak with B's voice during overlap, and if B finished first
-        and restored "original" (really A's voice), the user could hear
-        half-swapped voices for the rest of A's run. Holding the lock across
-        serializes concurrent foreground tasks but keeps TTS correctness.
+        Holds the per-chat lock from history read to append, so two tasks
+        targeting the same chat can't each read the old history and then
+        append interleaved turns. Tasks on different chats run in parallel;
+        voice is per-utterance (see _speak), nothing global to guard.
         """
         from core.continuity.execution_context import ExecutionContext
 
         session_manager = self.system.llm_chat.session_manager
-        original_voice: Dict[str, Any] = {}
-        self._voice_lock.acquire()
-        try:
-            original_voice = self._snapshot_voice()
-            self._apply_voice(task)
-        except Exception:
-            # Apply failed — restore whatever we captured and release BEFORE re-raising.
-            try: self._restore_voice(original_voice)
-            except Exception: pass
-            self._voice_lock.release()
-            raise
         target_chat = task.get("chat_target", "").strip()
+        chat_lock = None
 
         try:
             logger.info(f"[Continuity] Running '{task.get('name')}' with chat persistence, chat='{target_chat}'")
@@ -395,6 +441,8 @@ class ContinuityExecutor:
                     f"chat_target {target_chat!r} normalizes to empty — "
                     "refusing to create/write blank-named chat."
                 )
+            chat_lock = self._chat_lock(normalized)
+            chat_lock.acquire()
             existing_chats = {c["name"]: c["name"] for c in session_manager.list_chat_files()}
             match = existing_chats.get(normalized)
             if match:
@@ -434,8 +482,6 @@ class ContinuityExecutor:
                         f"(plugin loaded but broken): {e}"
                     )
 
-            tts_enabled = task.get("tts_enabled", True)
-            browser_tts = task.get("browser_tts", False)
             msg = task.get("initial_message", "Hello.")
 
             # Read history from target chat WITHOUT switching active chat
@@ -462,13 +508,7 @@ class ContinuityExecutor:
                     except Exception as _e: logger.error(f"[Continuity] Response callback failed: {_e}")
 
                 if response:
-                    if browser_tts:
-                        publish(Events.TTS_SPEAK, {"text": response, "task": task.get("name", "")})
-                    elif tts_enabled and hasattr(self.system, 'tts') and self.system.tts:
-                        try:
-                            self.system.tts.speak_sync(response)
-                        except Exception as tts_err:
-                            logger.warning(f"[Continuity] TTS failed: {tts_err}")
+                    self._speak(task, response)
 
                 result["responses"].append({
                     "iteration": 1,
@@ -487,6 +527,10 @@ class ContinuityExecutor:
                     "error": friendly or str(e),
                 })
 
+            timings = getattr(ctx, "timings", None)
+            if isinstance(timings, dict):
+                result["timings"] = dict(timings)
+
             if progress_cb:
                 progress_cb(1, 1)
 
@@ -505,14 +549,8 @@ class ContinuityExecutor:
             })
 
         finally:
-            # Voice lock is already held by this thread from the acquire above —
-            # re-acquiring via `with self._voice_lock:` would deadlock against
-            # ourselves (threading.Lock is NON-reentrant). Just restore + release.
-            try:
-                self._restore_voice(original_voice)
-            except Exception as _e:
-                logger.warning(f"[Continuity] _restore_voice in finally failed: {_e}")
-            self._voice_lock.release()
+            if chat_lock is not None:
+                chat_lock.release()
 
         result["completed_at"] = datetime.now().isoformat()
         return result
@@ -655,80 +693,9 @@ class ContinuityExecutor:
             logger.error(f"[Continuity] Persona resolution failed for '{persona_name}': {e}", exc_info=True)
             raise
 
-    def _snapshot_voice(self) -> Dict[str, Any]:
-        """Snapshot current TTS voice/pitch/speed for later restore."""
-        tts = getattr(self.system, 'tts', None)
-        if not tts:
-            return {}
-        try:
-            return {
-                "voice": getattr(tts, 'voice_name', None),
-                "pitch": getattr(tts, 'pitch_shift', None),
-                "speed": getattr(tts, 'speed', None),
-            }
-        except Exception:
-            return {}
-
     def _validate_voice(self, voice: str) -> str:
         """Validate voice matches current TTS provider, substitute default if mismatched."""
         from core.tts.utils import validate_voice
         return validate_voice(voice)
 
-    def _restore_voice(self, snapshot: Dict[str, Any]) -> None:
-        """Restore TTS voice/pitch/speed from snapshot. Each setter gets its own
-        try — a single failure can't short-circuit the others, and we log which
-        one failed rather than swallowing the whole restore. Scout chaos #1/#2/#14."""
-        if not snapshot:
-            return
-        tts = getattr(self.system, 'tts', None)
-        if not tts:
-            return
-        for field, setter_name in (("voice", "set_voice"), ("pitch", "set_pitch"), ("speed", "set_speed")):
-            val = snapshot.get(field)
-            if val is None:
-                continue
-            try:
-                setter = getattr(tts, setter_name)
-                if field == "voice":
-                    setter(self._validate_voice(val))
-                else:
-                    setter(val)
-            except Exception as e:
-                logger.warning(f"[Continuity] Failed to restore TTS {field}={val!r}: {e}")
-        logger.debug(f"[Continuity] Restored voice settings: {snapshot}")
-
-    def _apply_voice(self, task: Dict[str, Any]) -> None:
-        """Apply voice/pitch/speed settings to TTS. Per-setter try so a
-        mid-apply failure doesn't silently leave TTS half-configured — we
-        RAISE on any failure so the caller (_run_foreground / _run_background)
-        can restore from snapshot and mark the task errored, rather than
-        continuing with a mixed voice that then persists across tasks.
-        Scout chaos #1/#2/#14 — 2026-04-21."""
-        tts = getattr(self.system, 'tts', None)
-        if not tts:
-            return
-        for field, setter_name in (("voice", "set_voice"), ("pitch", "set_pitch"), ("speed", "set_speed")):
-            val = task.get(field)
-            # "voice" uses truthy check (empty string = unset); numeric fields
-            # use is-not-None (0.0 is a legit speed-multiplier on some setups,
-            # although unusual).
-            if field == "voice":
-                if not val:
-                    continue
-            else:
-                if val is None:
-                    continue
-            try:
-                setter = getattr(tts, setter_name)
-                if field == "voice":
-                    setter(self._validate_voice(val))
-                else:
-                    setter(val)
-            except Exception as e:
-                # Re-raise so the caller rolls back to snapshot. Logging here
-                # identifies WHICH setter failed — restore path will log its
-                # own recovery attempt.
-                logger.error(f"[Continuity] TTS apply failed at {field}={val!r}: {e}")
-                raise
-
     # _apply_task_settings removed — ExecutionContext handles all isolation now
\ No newline at end of file
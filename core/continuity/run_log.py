@@ -0,0 +1,328 @@
+# core/continuity/run_log.py
+"""
+Continuity run history — one SQLite row per task run.
+
+Replaces user/continuity/activity.json, which held the last 50 activity
+entries and was rewritten in full (indent=2, tmp + rename) on every
+started/queued/complete event. Busy daemon tasks kept the disk busy and
+anything older than 50 entries was gone.
+
+Each run is a row: start/end time, trigger, outcome, time spent waiting
+(scheduler queue, then a free executor slot), LLM and tool time, and
+response/error counts. "queued"/"skipped" notes are zero-length rows.
+
+Writes are buffered and committed in one transaction by a writer thread
+(at most FLUSH_INTERVAL behind); reads flush first. WAL mode, so dashboard
+reads don't block the writer. Old rows are pruned by age and row count.
+Runs still marked 'running' when the log is opened were cut off by a crash
+or kill and are closed as 'aborted'.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 1.0
+BATCH_SIZE = 200
+PRUNE_INTERVAL = 6 * 3600
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_MAX_ROWS = 100_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT UNIQUE,
+    kind TEXT NOT NULL DEFAULT 'run',
+    task_id TEXT NOT NULL,
+    task_name TEXT,
+    trigger TEXT,
+    status TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    started REAL NOT NULL,
+    ended_at TEXT,
+    ended REAL,
+    duration REAL,
+    queue_wait REAL DEFAULT 0,
+    slot_wait REAL DEFAULT 0,
+    llm_seconds REAL DEFAULT 0,
+    llm_calls INTEGER DEFAULT 0,
+    tool_seconds REAL DEFAULT 0,
+    tool_calls INTEGER DEFAULT 0,
+    responses INTEGER DEFAULT 0,
+    error TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started);
+CREATE INDEX IF NOT EXISTS idx_runs_task ON runs(task_id, started);
+"""
+
+
+def _start_details(trigger: Optional[str]) -> Dict:
+    if trigger == "manual":
+        return {"manual": True}
+    if trigger in ("daemon", "webhook"):
+        return {"trigger": trigger}
+    return {}
+
+
+class RunLog:
+    """Append-only run history with batched writes. One per scheduler."""
+
+    def __init__(self, db_path: Path, retention_days: int = DEFAULT_RETENTION_DAYS,
+                 max_rows: int = DEFAULT_MAX_ROWS):
+        self.db_path = Path(db_path)
+        self.retention_days = retention_days
+        self.max_rows = max_rows
+        self._db_lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._closed = False
+        self._last_prune = 0.0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._abort_orphans()
+        self.prune()
+
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True, name="RunLogWriter")
+        self._thread.start()
+
+    # ── Writes (buffered) ──
+
+    def start(self, task_id: str, task_name: str, trigger: str, when: datetime,
+              queue_wait: float = 0.0) -> str:
+        """Open a run row. Returns its run_id for finish()."""
+        run_id = uuid.uuid4().hex
+        self._enqueue(("start", run_id, task_id, task_name, trigger, when.isoformat(),
+                       when.timestamp(), round(queue_wait, 3)))
+        return run_id
+
+    def finish(self, run_id: str, status: str, when: datetime, timings: Optional[Dict] = None,
+               responses: int = 0, error: Optional[str] = None, details: Optional[Dict] = None):
+        """Close a run with its outcome and timings (see ContinuityExecutor.run)."""
+        t = timings or {}
+        self._enqueue(("finish", run_id, status, when.isoformat(), when.timestamp(),
+                       t.get("slot_wait_s", 0.0), t.get("llm_s", 0.0), t.get("llm_calls", 0),
+                       t.get("tools_s", 0.0), t.get("tool_calls", 0), responses, error,
+                       json.dumps(details) if details else None))
+
+    def note(self, task_id: str, task_name: str, status: str, when: datetime,
+             details: Optional[Dict] = None):
+        """Record a point event that isn't a run (queued, skipped)."""
+        self._enqueue(("note", task_id, task_name, status, when.isoformat(), when.timestamp(),
+                       json.dumps(details) if details else None))
+
+    def _enqueue(self, op: tuple):
+        with self._pending_lock:
+            if self._closed:
+                return
+            self._pending.append(op)
+            full = len(self._pending) >= BATCH_SIZE
+        self._wake.set()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Commit everything buffered so far, in one transaction."""
+        with self._pending_lock:
+            ops, self._pending = self._pending, []
+        if not ops:
+            return
+        try:
+            with self._db_lock:
+                with self._conn:
+                    for op in ops:
+                        self._apply(op)
+        except Exception as e:
+            logger.error(f"[Continuity] Run log write failed ({len(ops)} ops dropped): {e}")
+
+    def _apply(self, op: tuple):
+        kind = op[0]
+        if kind == "start":
+            _, run_id, task_id, task_name, trigger, started_at, started, queue_wait = op
+            self._conn.execute(
+                "INSERT INTO runs (run_id, task_id, task_name, trigger, status, started_at, started, queue_wait) "
+                "VALUES (?, ?, ?, ?, 'running', ?, ?, ?)",
+                (run_id, task_id, task_name, trigger, started_at, started, queue_wait))
+        elif kind == "finish":
+            (_, run_id, status, ended_at, ended, slot_wait, llm_s, llm_calls,
+             tools_s, tool_calls, responses, error, details) = op
+            self._conn.execute(
+                "UPDATE runs SET status = ?, ended_at = ?, ended = ?, duration = ? - started, "
+                "slot_wait = ?, llm_seconds = ?, llm_calls = ?, tool_seconds = ?, tool_calls = ?, "
+                "responses = ?, error = ?, details = ? WHERE run_id = ?",
+                (status, ended_at, ended, ended, slot_wait, llm_s, llm_calls, tools_s, tool_calls,
+                 responses, error, details, run_id))
+        elif kind == "note":
+            _, task_id, task_name, status, at, ts, details = op
+            self._conn.execute(
+                "INSERT INTO runs (kind, task_id, task_name, status, started_at, started, "
+                "ended_at, ended, duration, details) VALUES ('note', ?, ?, ?, ?, ?, ?, ?, 0, ?)",
+                (task_id, task_name, status, at, ts, at, ts, details))
+
+    def _writer_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            # Let a burst of events land in the same transaction
+            if self._stop.wait(FLUSH_INTERVAL):
+                break
+            self._wake.clear()
+            self.flush()
+            if time.time() - self._last_prune > PRUNE_INTERVAL:
+                self.prune()
+
+    def close(self):
+        """Stop the writer, commit what's buffered, close the database."""
+        if self._closed:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=FLUSH_INTERVAL + 2)
+        self.flush()
+        with self._pending_lock:
+            self._closed = True
+        with self._db_lock:
+            self._conn.close()
+
+    def _abort_orphans(self) -> int:
+        """Close runs left 'running' by a previous process. Nothing can finish
+        them now; the end time is unknown, so duration stays NULL."""
+        try:
+            with self._db_lock:
+                with self._conn:
+                    count = self._conn.execute(
+                        "UPDATE runs SET status = 'aborted', ended_at = started_at, ended = started, "
+                        "error = 'Interrupted: Sapphire stopped while the task was running' "
+                        "WHERE kind = 'run' AND status = 'running'").rowcount
+        except Exception as e:
+            logger.error(f"[Continuity] Failed to close interrupted runs: {e}")
+            return 0
+        if count:
+            logger.warning(f"[Continuity] Marked {count} interrupted run(s) as aborted")
+        return count
+
+    # ── Retention ──
+
+    def prune(self) -> int:
+        """Drop rows older than retention_days, then the oldest beyond max_rows."""
+        self._last_prune = time.time()
+        deleted = 0
+        try:
+            with self._db_lock:
+                with self._conn:
+                    if self.retention_days and self.retention_days > 0:
+                        cutoff = time.time() - self.retention_days * 86400
+                        deleted += self._conn.execute("DELETE FROM runs WHERE started < ?", (cutoff,)).rowcount
+                    if self.max_rows and self.max_rows > 0:
+                        deleted += self._conn.execute(
+                            "DELETE FROM runs WHERE id <= (SELECT id FROM runs ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                            (self.max_rows,)).rowcount
+        except Exception as e:
+            logger.error(f"[Continuity] Run log prune failed: {e}")
+        if deleted:
+            logger.info(f"[Continuity] Pruned {deleted} old run log rows")
+        return deleted
+
+    # ── Reads ──
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        self.flush()
+        with self._db_lock:
+            self._conn.row_factory = sqlite3.Row
+            try:
+                return [dict(r) for r in self._conn.execute(sql, params).fetchall()]
+            finally:
+                self._conn.row_factory = None
+
+    def runs(self, since: Optional[float] = None, task_id: Optional[str] = None,
+             limit: int = 200) -> List[Dict[str, Any]]:
+        """Run rows (not notes), newest first, with timings and parsed details."""
+        sql = "SELECT * FROM runs WHERE kind = 'run'"
+        params: list = []
+        if since is not None:
+            sql += " AND started >= ?"
+            params.append(since)
+        if task_id:
+            sql += " AND task_id = ?"
+            params.append(task_id)
+        sql += " ORDER BY started DESC LIMIT ?"
+        params.append(limit)
+        rows = self._query(sql, tuple(params))
+        for r in rows:
+            r["details"] = json.loads(r["details"]) if r.get("details") else {}
+        return rows
+
+    def activity(self, since: Optional[float] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Rows as the old activity entries, oldest first: a "started" entry
+        per run plus one for its outcome, and the queued/skipped notes."""
+        sql = "SELECT * FROM runs"
+        params: list = []
+        if since is not None:
+            sql += " WHERE started >= ?"
+            params.append(since)
+        sql += " ORDER BY started DESC LIMIT ?"
+        params.append(limit)
+        entries = []
+        for r in self._query(sql, tuple(params)):
+            details = json.loads(r["details"]) if r.get("details") else {}
+            base = {"task_id": r["task_id"], "task_name": r["task_name"]}
+            if r["kind"] == "note":
+                entries.append({**base, "timestamp": r["started_at"], "status": r["status"], "details": details})
+                continue
+            entries.append({**base, "timestamp": r["started_at"], "status": "started",
+                            "details": _start_details(r["trigger"])})
+            if r["ended_at"]:
+                entries.append({**base, "timestamp": r["ended_at"], "status": r["status"],
+                                "details": details, "duration": r["duration"]})
+        entries.sort(key=lambda e: (e["timestamp"], e["status"] != "started"))
+        return entries[-limit:]
+
+    def task_stats(self, since: float) -> List[Dict[str, Any]]:
+        """Per-task run counts and timing aggregates since an epoch time."""
+        rows = self._query("""
+            SELECT task_id, MAX(task_name) AS task_name,
+                   COUNT(*) AS runs,
+                   SUM(status = 'error') AS errors,
+                   SUM(status = 'running') AS running,
+                   ROUND(AVG(duration), 3) AS avg_duration,
+                   ROUND(MAX(duration), 3) AS max_duration,
+                   ROUND(AVG(queue_wait + slot_wait), 3) AS avg_wait,
+                   ROUND(MAX(queue_wait + slot_wait), 3) AS max_wait,
+                   ROUND(AVG(llm_seconds), 3) AS avg_llm,
+                   ROUND(AVG(tool_seconds), 3) AS avg_tools,
+                   SUM(llm_calls) AS llm_calls,
+                   SUM(tool_calls) AS tool_calls
+            FROM runs
+            WHERE kind = 'run' AND started >= ?
+            GROUP BY task_id
+            ORDER BY runs DESC
+        """, (since,))
+        return rows
+
+    def import_activity(self, entries: List[Dict]) -> int:
+        """One-time import of legacy activity.json entries as notes."""
+        count = 0
+        for e in entries:
+            try:
+                when = datetime.fromisoformat(e["timestamp"])
+            except (KeyError, ValueError, TypeError):
+                continue
+            self.note(e.get("task_id", ""), e.get("task_name", ""), e.get("status", ""),
+                      when, e.get("details") or None)
+            count += 1
+        self.flush()
+        return count
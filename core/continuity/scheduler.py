@@ -1,12 +1,14 @@
 # core/continuity/scheduler.py
 """
-Continuity Scheduler - Background thread that checks cron schedules and fires tasks.
+Continuity Scheduler - Background thread that fires cron tasks at their next due time.
 """
 
 import os
 import re
 import json
+import time
 import uuid
+import heapq
 import random
 import logging
 import threading
@@ -15,6 +17,9 @@ from zoneinfo import ZoneInfo
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+from core.continuity.event_router import CompiledFilter, EventRouter, parse_event
+from core.continuity.run_log import RunLog
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,13 +61,38 @@ def _user_now():
         return datetime.now(ZoneInfo('UTC'))
 
 
+class _FireQueue:
+    """Next-fire bookkeeping for cron tasks.
+
+    heap holds (epoch, seq, task_id, gen). Rescheduling a task bumps its gen
+    and pushes a new entry; the old one is dropped lazily when it surfaces.
+    next_fire maps task_id -> (gen, datetime) for the live entry. version
+    bumps on any schedule change so cached timeline projections know when
+    they're stale. tz is the timezone the times were computed in — a change
+    forces a full rebuild.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.next_fire: Dict[str, tuple] = {}
+        self.gen = 0
+        self.seq = 0
+        self.version = 0
+        self.tz: Optional[str] = None
+        self.wake = threading.Event()
+        self.timeline_cache: Dict[int, tuple] = {}  # hours -> (version, tz, valid_until, timeline)
+
+
 class ContinuityScheduler:
     """
     Background scheduler for continuity tasks.
-    Checks every 30 seconds, matches cron expressions, respects cooldowns.
+    Keeps a heap of precomputed next-fire times and sleeps until the earliest
+    one; task edits wake the loop so a new schedule takes effect right away.
     """
-    
-    CHECK_INTERVAL = 30  # seconds between schedule checks
+
+    MAX_SLEEP = 60  # upper bound on one sleep — picks up timezone/clock changes
+    MISFIRE_GRACE = 90  # seconds late a fire may still run (else skipped, like a missed minute)
+    TIMELINE_CACHE_SECONDS = 60
     
     def __init__(self, system, executor):
         """
@@ -80,21 +110,23 @@ class ContinuityScheduler:
         # Paths
         self._base_dir = Path(__file__).parent.parent.parent / "user" / "continuity"
         self._tasks_path = self._base_dir / "tasks.json"
-        self._activity_path = self._base_dir / "activity.json"
+        self._activity_path = self._base_dir / "activity.json"  # legacy, imported into runs.db
         
         # In-memory caches
         self._tasks: Dict[str, Dict] = {}
-        self._activity: List[Dict] = []
+        self._activity: List[Dict] = []  # recent entries; history lives in the run log
 
         # Per-task run state: tracks busy flag, queued fires, and last matched minute
         self._task_running: Dict[str, bool] = {}
-        self._task_pending: Dict[str, list] = {}  # task_id -> [(event_data, reply_cb), ...]
+        self._task_pending: Dict[str, list] = {}  # task_id -> [(event_data, reply_cb, queued_at), ...]
         self._task_last_matched: Dict[str, str] = {}  # task_id -> "YYYY-MM-DD HH:MM"
         self._task_progress: Dict[str, Dict] = {}  # task_id -> {iteration, total}
         self._event_threads: list = []  # track spawned event worker threads
-        self._concurrency_sem = threading.Semaphore(3)  # max 3 concurrent task threads
+        self._fire = _FireQueue()  # next-fire heap for cron tasks
+        self._router = EventRouter(self)  # daemon events → tasks
         
         self._ensure_dirs()
+        self._run_log = self._open_run_log()
         self._load_tasks()
         self._load_activity()
     
@@ -135,6 +167,10 @@ class ContinuityScheduler:
                     all_tasks[tid]["trigger_config"] = {}
 
             self._tasks = all_tasks
+            self._router.invalidate()
+            fq = self._fire
+            fq.tz = None  # rebuild next-fire times on the next pass
+            fq.wake.set()
             if plugin_count or migrated:
                 self._save_tasks()
                 if plugin_count:
@@ -162,8 +198,22 @@ class ContinuityScheduler:
         except Exception as e:
             logger.error(f"[Continuity] Failed to save tasks: {e}")
     
+    def _open_run_log(self) -> Optional[RunLog]:
+        """Open user/continuity/runs.db with the configured retention."""
+        import config
+        try:
+            return RunLog(
+                self._base_dir / "runs.db",
+                retention_days=int(getattr(config, 'CONTINUITY_RUN_RETENTION_DAYS', 90)),
+                max_rows=int(getattr(config, 'CONTINUITY_RUN_MAX_ROWS', 100000)),
+            )
+        except Exception as e:
+            logger.error(f"[Continuity] Failed to open run log, keeping activity in memory only: {e}")
+            return None
+
     def _load_activity(self):
-        """Load activity log from JSON file."""
+        """Load recent activity. A legacy activity.json is imported into the
+        run log once, then renamed out of the way."""
         if not self._activity_path.exists():
             self._activity = []
             return
@@ -175,35 +225,52 @@ class ContinuityScheduler:
         except Exception as e:
             logger.error(f"[Continuity] Failed to load activity: {e}")
             self._activity = []
-    
-    def _save_activity(self):
-        """Save activity log to JSON file (atomic write)."""
-        try:
-            import tempfile
-            data = {"activity": self._activity[-50:]}  # Keep last 50
-            fd, tmp = tempfile.mkstemp(dir=self._activity_path.parent, suffix='.tmp')
+            return
+
+        runs = self._run_log
+        if runs is not None:
             try:
-                with os.fdopen(fd, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
-                Path(tmp).replace(self._activity_path)
-            except Exception:
-                Path(tmp).unlink(missing_ok=True)
-                raise
-        except Exception as e:
-            logger.error(f"[Continuity] Failed to save activity: {e}")
+                count = runs.import_activity(self._activity)
+                self._activity_path.replace(self._activity_path.with_suffix('.json.imported'))
+                logger.info(f"[Continuity] Imported {count} activity entries into the run log")
+            except Exception as e:
+                logger.error(f"[Continuity] Failed to import activity.json: {e}")
     
-    def _log_activity(self, task_id: str, task_name: str, status: str, details: Optional[Dict] = None):
-        """Add entry to activity log."""
+    def _log_activity(self, task_id: str, task_name: str, status: str, details: Optional[Dict] = None,
+                      run_id: Optional[str] = None, timings: Optional[Dict] = None,
+                      queue_wait: float = 0.0) -> Optional[str]:
+        """Add entry to activity log.
+
+        "started" opens a run in the run log and returns its id; pass that
+        id (plus the executor's timings) with the outcome to close it.
+        Anything else without a run_id (queued, skipped) is a point note.
+        """
+        now = _user_now()
+        details = details or {}
         entry = {
-            "timestamp": _user_now().isoformat(),
+            "timestamp": now.isoformat(),
             "task_id": task_id,
             "task_name": task_name,
             "status": status,
-            "details": details or {}
+            "details": details
         }
         self._activity.append(entry)
         self._activity = self._activity[-50:]  # Trim
-        self._save_activity()
+
+        runs = self._run_log
+        if runs is not None:
+            if status == "started":
+                trigger = "manual" if details.get("manual") else details.get("trigger", "cron")
+                run_id = runs.start(task_id, task_name, trigger, now, queue_wait=queue_wait)
+            elif run_id:
+                errors = details.get("errors") or []
+                error = details.get("exception") or ("; ".join(str(e) for e in errors)[:500] or None)
+                responses = details.get("responses", 0)
+                runs.finish(run_id, status, now, timings=timings,
+                            responses=responses if isinstance(responses, int) else 0,
+                            error=error, details=details)
+            else:
+                runs.note(task_id, task_name, status, now, details)
         
         # Publish event
         from core.event_bus import publish, Events
@@ -215,6 +282,7 @@ class ContinuityScheduler:
         }
         event_type = event_map.get(status, Events.CONTINUITY_TASK_COMPLETE)
         publish(event_type, {"task_id": task_id, "task_name": task_name, **entry})
+        return run_id
     
     # =========================================================================
     # TASK CRUD
@@ -241,11 +309,15 @@ class ContinuityScheduler:
                 self._task_pending.pop(task_id, None)
                 self._task_running.pop(task_id, None)
                 self._task_last_matched.pop(task_id, None)
+                self._reschedule(task_id)
+                self._router.invalidate()
                 return
 
         # Auto-disable at max runs
         if max_runs > 0 and task.get("run_count", 0) >= max_runs:
             task["enabled"] = False
+            self._reschedule(task_id)
+            self._router.invalidate()
             logger.info(f"[Continuity] '{task_name}' completed {task['run_count']}/{max_runs} runs — auto-disabled")
 
     # =========================================================================
@@ -354,6 +426,8 @@ class ContinuityScheduler:
         
         with self._lock:
             self._tasks[task["id"]] = task
+            self._reschedule(task["id"])
+            self._router.invalidate()
             self._save_tasks()
         
         logger.info(f"[Continuity] Created task: {task['name']} ({task['id']})")
@@ -401,6 +475,8 @@ class ContinuityScheduler:
             # Reset run state — clears pending queue and allows fresh cron match
             self._task_pending[task_id] = []
             self._task_last_matched.pop(task_id, None)
+            self._reschedule(task_id)
+            self._router.invalidate()
 
             self._save_tasks()
             logger.info(f"[Continuity] Updated task: {task['name']} ({task_id})")
@@ -418,6 +494,8 @@ class ContinuityScheduler:
             self._task_running.pop(task_id, None)
             self._task_last_matched.pop(task_id, None)
             self._task_progress.pop(task_id, None)
+            self._reschedule(task_id)
+            self._router.invalidate()
             self._save_tasks()
             logger.info(f"[Continuity] Deleted task: {name} ({task_id})")
             return True
@@ -426,35 +504,107 @@ class ContinuityScheduler:
     # SCHEDULE CHECKING
     # =========================================================================
     
-    def _cron_matches_now(self, cron_expr: str, last_check: datetime) -> bool:
-        """
-        Check if cron expression matches current minute.
-        Uses croniter to get next scheduled time and compares.
-        """
+    @staticmethod
+    def _is_cron_task(task: Dict) -> bool:
+        return task.get("enabled", True) and task.get("type", "task") not in ("daemon", "webhook")
+
+    def _next_fire_after(self, schedule: str, after: datetime) -> Optional[datetime]:
+        """First cron time strictly after `after`, or None if the schedule has
+        no next date or is invalid."""
         try:
-            cron = _get_croniter()(cron_expr, last_check - timedelta(minutes=1))
-            next_time = cron.get_next(datetime)
-            now = _user_now()
-            
-            matched = (next_time.year == now.year and
-                       next_time.month == now.month and
-                       next_time.day == now.day and
-                       next_time.hour == now.hour and
-                       next_time.minute == now.minute)
-            
-            if not matched:
-                logger.debug(f"[Continuity] Cron '{cron_expr}': next={next_time.strftime('%H:%M')}, now={now.strftime('%H:%M')}")
-            
-            return matched
+            return _get_croniter()(schedule, after).get_next(datetime)
         except Exception as e:
             # "failed to find next date" is expected for daemon/webhook tasks that use
             # impossible schedules like "0 0 31 2 *" (Feb 31) to prevent cron firing.
             if 'next date' in str(e).lower() or 'next due' in str(e).lower():
-                logger.debug(f"[Continuity] Cron '{cron_expr}' has no next date (expected for daemon/webhook tasks)")
+                logger.debug(f"[Continuity] Cron '{schedule}' has no next date")
             else:
-                logger.error(f"[Continuity] Cron check failed for '{cron_expr}': {e}")
-            return False
-    
+                logger.error(f"[Continuity] Cron check failed for '{schedule}': {e}")
+            return None
+
+    def _schedule_task_locked(self, task_id: str, now: Optional[datetime] = None, after: Optional[datetime] = None):
+        """(Re)compute one task's next fire time. Call under self._lock.
+
+        Without `after`, the search starts just before the current minute so
+        a task created or edited during a matching minute still fires in it.
+        """
+        fq = self._fire
+        fq.version += 1
+        fq.next_fire.pop(task_id, None)
+        task = self._tasks.get(task_id)
+        if not task or not self._is_cron_task(task):
+            return
+        if after is None:
+            now = now or _user_now()
+            after = now.replace(second=0, microsecond=0) - timedelta(seconds=1)
+        due = self._next_fire_after(task.get("schedule", ""), after)
+        if due is None:
+            return
+        fq.gen += 1
+        fq.seq += 1
+        fq.next_fire[task_id] = (fq.gen, due)
+        heapq.heappush(fq.heap, (due.timestamp(), fq.seq, task_id, fq.gen))
+
+    def _reschedule(self, task_id: str):
+        """Recompute after create/update/delete and wake the loop. Call under self._lock."""
+        fq = self._fire
+        if fq.tz is not None:
+            self._schedule_task_locked(task_id)
+        fq.wake.set()
+
+    def _sync_schedule_locked(self, now: datetime):
+        """Full rebuild on first use or when the user's timezone changed."""
+        fq = self._fire
+        tz = str(now.tzinfo)
+        if fq.tz == tz:
+            return
+        if fq.tz is not None:
+            logger.info(f"[Continuity] Timezone changed ({fq.tz} -> {tz}), recomputing schedules")
+        fq.tz = tz
+        fq.heap = []
+        fq.next_fire = {}
+        for task_id in list(self._tasks):
+            self._schedule_task_locked(task_id, now=now)
+        fq.version += 1
+
+    def _pop_due_locked(self, now: datetime) -> List[tuple]:
+        """Pop every entry due by `now`, rescheduling each from its due time.
+        Returns [(task, due)] for entries still within the misfire grace."""
+        fq = self._fire
+        now_ts = now.timestamp()
+        due_list = []
+        while fq.heap and fq.heap[0][0] <= now_ts:
+            _, _, task_id, gen = heapq.heappop(fq.heap)
+            live = fq.next_fire.get(task_id)
+            if not live or live[0] != gen:
+                continue  # superseded by a reschedule
+            due = live[1]
+            task = self._tasks.get(task_id)
+            if not task or not self._is_cron_task(task):
+                fq.next_fire.pop(task_id, None)
+                continue
+            if now_ts - due.timestamp() > self.MISFIRE_GRACE:
+                logger.info(f"[Continuity] '{task.get('name', 'Unnamed')}' missed {due.strftime('%H:%M')} "
+                            f"(scheduler was not running), skipping")
+                self._schedule_task_locked(task_id, now=now)
+                continue
+            self._schedule_task_locked(task_id, after=due)
+            due_list.append((task, due))
+        return due_list
+
+    def _seconds_until_next(self, now: datetime) -> float:
+        with self._lock:
+            fq = self._fire
+            while fq.heap:
+                _, _, task_id, gen = fq.heap[0]
+                live = fq.next_fire.get(task_id)
+                if live and live[0] == gen:
+                    break
+                heapq.heappop(fq.heap)
+            if not fq.heap:
+                return self.MAX_SLEEP
+            return min(self.MAX_SLEEP, max(0.0, fq.heap[0][0] - now.timestamp()))
+
     def _make_progress_callback(self, task_id: str):
         """Create a progress callback for the executor."""
         def callback(iteration: int, total: int):
@@ -480,16 +630,11 @@ class ContinuityScheduler:
         return callback
 
     def _execute_task(self, task: Dict):
-        """Execute a task and drain any pending queue. Runs on a worker thread."""
-        self._concurrency_sem.acquire()
-        try:
-            self._execute_task_inner(task)
-        finally:
-            self._concurrency_sem.release()
-
-    def _execute_task_inner(self, task: Dict):
+        """Execute a task and drain any pending queue. Runs on a worker thread.
+        Concurrency is bounded per run by the executor's task slots."""
         task_id = task["id"]
         task_name = task.get("name", "Unnamed")
+        queue_wait = 0.0
 
         while True:
             # Re-check enabled state (task dict is shared, updated by update_task)
@@ -502,7 +647,7 @@ class ContinuityScheduler:
                     self._task_progress.pop(task_id, None)
                     break
 
-            self._log_activity(task_id, task_name, "started")
+            run_id = self._log_activity(task_id, task_name, "started", queue_wait=queue_wait)
             try:
                 result = self.executor.run(
                     task,
@@ -522,10 +667,10 @@ class ContinuityScheduler:
                 self._log_activity(task_id, task_name, status, {
                     "responses": len(result.get("responses", [])),
                     "errors": result.get("errors", [])
-                })
+                }, run_id=run_id, timings=result.get("timings"))
             except Exception as e:
                 logger.error(f"[Continuity] Task '{task_name}' execution failed: {e}", exc_info=True)
-                self._log_activity(task_id, task_name, "error", {"exception": str(e)})
+                self._log_activity(task_id, task_name, "error", {"exception": str(e)}, run_id=run_id)
                 with self._lock:
                     self._task_progress.pop(task_id, None)
 
@@ -533,7 +678,7 @@ class ContinuityScheduler:
             with self._lock:
                 queue = self._task_pending.get(task_id, [])
                 if queue:
-                    queue.pop(0)  # Cron queues don't carry data, just drain
+                    queue_wait = time.monotonic() - queue.pop(0)[2]  # Cron queues don't carry data
                     logger.info(f"[Continuity] '{task_name}' draining queue ({len(queue)} remaining)")
                     continue  # Run again immediately
                 else:
@@ -552,44 +697,27 @@ class ContinuityScheduler:
         return hour >= start or hour < end  # wrap-around (e.g. 20→04)
 
     def _check_and_run(self):
-        """Single check cycle - evaluate all tasks, run eligible ones."""
+        """Single scheduling pass - fire every task whose next-fire time has arrived."""
         now = _user_now()
 
         with self._lock:
-            tasks_snapshot = list(self._tasks.values())
-
-        if not tasks_snapshot:
-            return
-
-        logger.debug(f"[Continuity] Checking {len(tasks_snapshot)} tasks at {now.strftime('%H:%M:%S')}")
-
-        for task in tasks_snapshot:
-            if not task.get("enabled", True):
-                continue
-
-            # Event-triggered tasks don't fire via cron
-            task_type = task.get("type", "task")
-            if task_type in ("daemon", "webhook"):
-                continue
+            self._sync_schedule_locked(now)
+            due_tasks = self._pop_due_locked(now)
 
+        for task, due in due_tasks:
             task_id = task["id"]
             task_name = task.get("name", "Unnamed")
             schedule = task.get("schedule", "")
 
-            # Check cron match
-            cron_matched = self._cron_matches_now(schedule, now - timedelta(seconds=self.CHECK_INTERVAL))
-            if not cron_matched:
-                logger.debug(f"[Continuity] '{task_name}' schedule '{schedule}' - no match at {now.strftime('%H:%M')}")
+            # Dedup: only fire once per matching minute (an edit during the
+            # minute reschedules from the minute's start)
+            due_minute = due.strftime('%Y-%m-%d %H:%M')
+            if self._task_last_matched.get(task_id) == due_minute:
                 continue
-
-            # Dedup: only fire once per matching minute (scheduler checks every 30s)
-            current_minute = now.strftime('%Y-%m-%d %H:%M')
-            if self._task_last_matched.get(task_id) == current_minute:
-                continue
-            self._task_last_matched[task_id] = current_minute
+            self._task_last_matched[task_id] = due_minute
 
             # Check active hours window
-            if not self._in_active_hours(task):
+            if not self._in_active_hours(task, due.hour):
                 start = task.get("active_hours_start")
                 end = task.get("active_hours_end")
                 logger.info(f"[Continuity] '{task_name}' outside active hours ({start}:00-{end}:00), skipping")
@@ -603,13 +731,14 @@ class ContinuityScheduler:
                     logger.info(f"[Continuity] '{task_name}' failed chance roll ({roll} > {chance}%), skipping")
                     continue
 
-            logger.info(f"[Continuity] '{task_name}' schedule '{schedule}' - MATCHED at {now.strftime('%H:%M')}")
+            lag = max(0.0, now.timestamp() - due.timestamp())
+            logger.info(f"[Continuity] '{task_name}' schedule '{schedule}' - DUE at {due.strftime('%H:%M')} (+{lag:.1f}s)")
 
             # If task is already running, queue it instead of overlapping
             with self._lock:
                 if self._task_running.get(task_id, False):
                     queue = self._task_pending.setdefault(task_id, [])
-                    queue.append((None, None))  # Cron queues don't carry event data
+                    queue.append((None, None, time.monotonic()))  # Cron queues don't carry event data
                     logger.info(f"[Continuity] '{task_name}' busy — queued (pending: {len(queue)})")
                     self._log_activity(task_id, task_name, "queued", {"pending": len(queue)})
                     continue
@@ -659,7 +788,7 @@ class ContinuityScheduler:
             self._task_running[task_id] = True
 
         logger.info(f"[Continuity] Manual run: {task_name}")
-        self._log_activity(task_id, task_name, "started", {"manual": True})
+        run_id = self._log_activity(task_id, task_name, "started", {"manual": True})
 
         try:
             result = self.executor.run(
@@ -680,13 +809,13 @@ class ContinuityScheduler:
                 "manual": True,
                 "responses": len(result.get("responses", [])),
                 "errors": result.get("errors", [])
-            })
+            }, run_id=run_id, timings=result.get("timings"))
 
             return result
 
         except Exception as e:
             logger.error(f"[Continuity] Manual run failed: {e}", exc_info=True)
-            self._log_activity(task_id, task_name, "error", {"manual": True, "exception": str(e)})
+            self._log_activity(task_id, task_name, "error", {"manual": True, "exception": str(e)}, run_id=run_id)
             return {"success": False, "error": str(e)}
 
         finally:
@@ -698,13 +827,16 @@ class ContinuityScheduler:
     # EVENT-TRIGGERED EXECUTION
     # =========================================================================
 
-    def fire_event_task(self, task_id: str, event_data: str, reply_callback=None) -> Dict[str, Any]:
+    def fire_event_task(self, task_id: str, event_data: str, reply_callback=None,
+                        matched: bool = False) -> Dict[str, Any]:
         """Fire an event-triggered task (daemon or webhook) with event data.
         Runs on a worker thread, returns immediately.
 
         Args:
             reply_callback: Optional callable(task, event_data_dict, response_text)
                             called when the LLM responds, for routing back to source.
+            matched: The event router already checked account + filter for this
+                     event; skip re-checking.
         """
         with self._lock:
             task = self._tasks.get(task_id)
@@ -721,52 +853,12 @@ class ContinuityScheduler:
 
         task_name = task.get("name", "Unnamed")
 
-        # Auto-filter by account: if task specifies an account in trigger_config,
-        # only process events from that account (e.g., multi-bot Discord/Telegram)
-        trigger_config = task.get("trigger_config", {})
-        task_account = trigger_config.get("account", "")
-        if task_account:
-            try:
-                event_obj = json.loads(event_data) if isinstance(event_data, str) else event_data
-                event_account = event_obj.get("account", "") if isinstance(event_obj, dict) else ""
-                if event_account and event_account != task_account:
-                    logger.debug(f"[Continuity] '{task_name}' skipped — event from '{event_account}', task wants '{task_account}'")
-                    return {"success": False, "error": "Account mismatch"}
-            except (json.JSONDecodeError, TypeError):
-                pass
-
-        # Check filter (daemon and webhook tasks)
-        if task_type in ("daemon", "webhook"):
-            trigger_config = task.get("trigger_config", {})
-            task_filter = trigger_config.get("filter")
-            if task_filter and isinstance(task_filter, dict):
-                try:
-                    event_obj = json.loads(event_data) if isinstance(event_data, str) else event_data
-                    if isinstance(event_obj, dict):
-                        for key, val in task_filter.items():
-                            # Support _not suffix for negative matching
-                            if key.endswith("_not"):
-                                field = key[:-4]  # strip _not
-                                ev_val = str(event_obj.get(field, ""))
-                                if ev_val.lower() == str(val).lower():
-                                    logger.debug(f"[Continuity] '{task_name}' filter excluded on '{field}' (not): {ev_val!r} == {val!r}")
-                                    return {"success": False, "error": "Event filtered out"}
-                            # Support _contains suffix for substring matching
-                            elif key.endswith("_contains"):
-                                field = key[:-9]  # strip _contains
-                                ev_val = str(event_obj.get(field, ""))
-                                if str(val).lower() not in ev_val.lower():
-                                    logger.debug(f"[Continuity] '{task_name}' filter mismatch on '{field}' (contains): {val!r} not in {ev_val!r}")
-                                    return {"success": False, "error": "Event filtered out"}
-                            else:
-                                ev_val = event_obj.get(key)
-                                if str(ev_val).lower() != str(val).lower():
-                                    logger.debug(f"[Continuity] '{task_name}' filter mismatch on '{key}': {ev_val!r} != {val!r}")
-                                    return {"success": False, "error": "Event filtered out"}
-                except (json.JSONDecodeError, TypeError):
-                    # Can't parse event as JSON — filter can't run, reject for safety
-                    logger.debug(f"[Continuity] '{task_name}' filter active but event data not parseable as JSON, rejecting")
-                    return {"success": False, "error": "Event data not JSON-parseable, filter requires JSON"}
+        # Account (multi-bot Discord/Telegram) and filter checks
+        if not matched:
+            reason = CompiledFilter(task.get("trigger_config", {})).reject_reason(parse_event(event_data))
+            if reason:
+                logger.debug(f"[Continuity] '{task_name}' skipped event: {reason}")
+                return {"success": False, "error": reason}
 
         # If already running, queue with actual event data (not just a counter)
         with self._lock:
@@ -775,7 +867,7 @@ class ContinuityScheduler:
                 if len(queue) >= 50:
                     logger.warning(f"[Continuity] '{task_name}' queue full ({len(queue)} pending), dropping event")
                     return {"success": False, "error": "Event queue full"}
-                queue.append((event_data, reply_callback))
+                queue.append((event_data, reply_callback, time.monotonic()))
                 self._task_pending[task_id] = queue
                 logger.info(f"[Continuity] '{task_name}' busy — queued event ({len(queue)} pending)")
                 return {"success": True, "queued": True}
@@ -802,6 +894,7 @@ class ContinuityScheduler:
         cur_reply_callback = reply_callback
         def _run():
             nonlocal cur_event_data, cur_reply_callback
+            queue_wait = 0.0
             while True:
                 # Re-fetch live task per iteration. The outer `task` is a
                 # snapshot from the moment this event fired; if the user
@@ -819,7 +912,8 @@ class ContinuityScheduler:
                         break
                     active_task = dict(live_task)
 
-                self._log_activity(task_id, task_name, "started", {"trigger": task_type})
+                run_id = self._log_activity(task_id, task_name, "started", {"trigger": task_type},
+                                            queue_wait=queue_wait)
                 try:
                     result = self.executor.run(
                         active_task,
@@ -838,10 +932,10 @@ class ContinuityScheduler:
                     self._log_activity(task_id, task_name, status, {
                         "trigger": task_type,
                         "responses": len(result.get("responses", [])),
-                    })
+                    }, run_id=run_id, timings=result.get("timings"))
                 except Exception as e:
                     logger.error(f"[Continuity] Event task '{task_name}' failed: {e}", exc_info=True)
-                    self._log_activity(task_id, task_name, "error", {"exception": str(e)})
+                    self._log_activity(task_id, task_name, "error", {"exception": str(e)}, run_id=run_id)
                     with self._lock:
                         self._task_progress.pop(task_id, None)
 
@@ -849,7 +943,8 @@ class ContinuityScheduler:
                 with self._lock:
                     queue = self._task_pending.get(task_id, [])
                     if queue:
-                        cur_event_data, cur_reply_callback = queue.pop(0)
+                        cur_event_data, cur_reply_callback, queued_at = queue.pop(0)
+                        queue_wait = time.monotonic() - queued_at
                         logger.info(f"[Continuity] '{task_name}' draining event queue ({len(queue)} remaining)")
                         continue
                     else:
@@ -864,6 +959,11 @@ class ContinuityScheduler:
         logger.info(f"[Continuity] Event-triggered: {task_name} ({task_type})")
         return {"success": True, "queued": False}
 
+    def route_event(self, source: str, event_data: str, reply_callback=None) -> bool:
+        """Deliver a daemon event to every matching task (indexed, filters
+        precompiled, chat bursts coalesced). Returns True if any task took it."""
+        return self._router.route(source, event_data, reply_callback=reply_callback)
+
     def find_tasks_by_event(self, source: str) -> List[Dict]:
         """Find enabled daemon tasks that listen to a specific event source."""
         results = []
@@ -925,6 +1025,8 @@ class ContinuityScheduler:
     def stop(self):
         """Stop the scheduler and wait for any in-flight event threads."""
         self._running = False
+        self._fire.wake.set()
+        self._router.cancel_pending()
         if self._thread:
             self._thread.join(timeout=5)
             self._thread = None
@@ -935,34 +1037,39 @@ class ContinuityScheduler:
             for t in alive:
                 t.join(timeout=10)
         self._event_threads.clear()
+        runs = self._run_log
+        if runs is not None:
+            runs.close()
         logger.info("[Continuity] Scheduler stopped")
     
     def _run_loop(self):
-        """Main scheduler loop."""
-        import time
-        
+        """Main scheduler loop — sleep until the earliest next-fire time (or
+        an edit wakes us), fire what's due, repeat."""
         logger.info("[Continuity] Scheduler loop running")
-        check_count = 0
-        
+        wake = self._fire.wake
+        last_heartbeat = time.monotonic()
+
         while self._running:
             try:
                 self._check_and_run()
-                check_count += 1
-                
-                # Heartbeat every 120 checks (~1 hour)
-                if check_count % 120 == 0:
+
+                # Heartbeat about once an hour
+                if time.monotonic() - last_heartbeat >= 3600:
+                    last_heartbeat = time.monotonic()
                     with self._lock:
                         enabled = sum(1 for t in self._tasks.values() if t.get("enabled"))
-                    logger.info(f"[Continuity] Heartbeat: {enabled} enabled tasks, {check_count} checks since start")
-                    
+                        scheduled = len(self._fire.next_fire)
+                    logger.info(f"[Continuity] Heartbeat: {enabled} enabled tasks, {scheduled} scheduled")
+
+                timeout = self._seconds_until_next(_user_now())
             except Exception as e:
                 logger.error(f"[Continuity] Scheduler loop error: {e}", exc_info=True)
-            
-            # Sleep in small increments for responsive shutdown
-            for _ in range(self.CHECK_INTERVAL):
-                if not self._running:
-                    break
-                time.sleep(1)
+                timeout = self.MAX_SLEEP
+
+            if not self._running:
+                break
+            wake.wait(timeout)
+            wake.clear()
     
     def is_running(self) -> bool:
         """Check if scheduler is running."""
@@ -983,83 +1090,102 @@ class ContinuityScheduler:
             "running": self._running,
             "total_tasks": len(self._tasks),
             "enabled_tasks": enabled_count,
-            "next_task": next_task
+            "next_task": next_task,
+            "events": self._router.stats(),
         }
     
     def _get_next_scheduled(self) -> Optional[Dict]:
-        """Get the next task that will run."""
+        """Get the next task that will run (from precomputed next-fire times)."""
         now = _user_now()
-        next_task = None
-        next_time = None
-        
         with self._lock:
-            for task in self._tasks.values():
-                if not task.get("enabled"):
-                    continue
-                if task.get("type", "task") in ("daemon", "webhook"):
-                    continue
-
-                try:
-                    cron = _get_croniter()(task.get("schedule", ""), now)
-                    task_next = cron.get_next(datetime)
-
-                    if next_time is None or task_next < next_time:
-                        next_time = task_next
-                        next_task = {
-                            "id": task["id"],
-                            "name": task.get("name"),
-                            "scheduled_for": task_next.isoformat()
-                        }
-                except Exception:
-                    continue
-        
-        return next_task
+            self._sync_schedule_locked(now)
+            fq = self._fire
+            if not fq.next_fire:
+                return None
+            task_id, (_, when) = min(fq.next_fire.items(), key=lambda kv: kv[1][1])
+            task = self._tasks.get(task_id, {})
+            return {
+                "id": task_id,
+                "name": task.get("name"),
+                "scheduled_for": when.isoformat()
+            }
     
     def get_activity(self, limit: int = 50) -> List[Dict]:
         """Get recent activity log."""
+        runs = self._run_log
+        if runs is not None:
+            return runs.activity(limit=limit)
         return self._activity[-limit:]
+
+    def get_runs(self, task_id: Optional[str] = None, hours: Optional[float] = None,
+                 limit: int = 200) -> List[Dict]:
+        """Run history with per-run timings, newest first."""
+        runs = self._run_log
+        if runs is None:
+            return []
+        since = time.time() - hours * 3600 if hours else None
+        return runs.runs(since=since, task_id=task_id, limit=limit)
+
+    def get_run_stats(self, hours: float = 24) -> List[Dict]:
+        """Per-task run counts, error counts, and duration/wait/LLM/tool averages."""
+        runs = self._run_log
+        if runs is None:
+            return []
+        return runs.task_stats(time.time() - hours * 3600)
     
     def get_timeline(self, hours: int = 24) -> List[Dict]:
-        """Get timeline of scheduled tasks for next N hours."""
+        """Get timeline of scheduled tasks for next N hours.
+
+        Projections are cached until a task changes, the earliest entry
+        passes, or TIMELINE_CACHE_SECONDS elapse (so the window's far edge
+        keeps moving) — dashboard polling doesn't rebuild croniters.
+        """
         now = _user_now()
         end = now + timedelta(hours=hours)
-        timeline = []
-        
+        now_ts = now.timestamp()
+
         with self._lock:
-            for task in self._tasks.values():
-                if not task.get("enabled"):
-                    continue
-                if task.get("type", "task") in ("daemon", "webhook"):
+            self._sync_schedule_locked(now)
+            fq = self._fire
+            cached = fq.timeline_cache.get(hours)
+            if cached and cached[0] == fq.version and cached[1] == fq.tz and now_ts < cached[2]:
+                return [dict(e) for e in cached[3]]
+
+            timeline = []
+            for task_id, (_, first) in fq.next_fire.items():
+                task = self._tasks.get(task_id)
+                if not task:
                     continue
+                next_time = first
+                # Max 10 per task; continue from the cached next fire
+                for i in range(10):
+                    if i:
+                        next_time = self._next_fire_after(task.get("schedule", ""), next_time)
+                    if next_time is None or next_time > end:
+                        break
 
-                try:
-                    cron = _get_croniter()(task.get("schedule", ""), now)
-
-                    # Get next occurrences within window
-                    for _ in range(10):  # Max 10 per task
-                        next_time = cron.get_next(datetime)
-                        if next_time > end:
-                            break
-
-                        if not self._in_active_hours(task, next_time.hour):
-                            continue
-
-                        timeline.append({
-                            "task_id": task["id"],
-                            "task_name": task.get("name"),
-                            "scheduled_for": next_time.isoformat(),
-                            "chance": task.get("chance", 100),
-                            "heartbeat": task.get("heartbeat", False),
-                            "emoji": task.get("emoji", ""),
-                            "task_type": task.get("type", "task"),
-                            "type": "upcoming"
-                        })
-                except Exception:
-                    continue
-        
-        # Sort by time
-        timeline.sort(key=lambda x: x["scheduled_for"])
-        return timeline
+                    if not self._in_active_hours(task, next_time.hour):
+                        continue
+
+                    timeline.append({
+                        "task_id": task["id"],
+                        "task_name": task.get("name"),
+                        "scheduled_for": next_time.isoformat(),
+                        "chance": task.get("chance", 100),
+                        "heartbeat": task.get("heartbeat", False),
+                        "emoji": task.get("emoji", ""),
+                        "task_type": task.get("type", "task"),
+                        "type": "upcoming"
+                    })
+
+            # Sort by time
+            timeline.sort(key=lambda x: x["scheduled_for"])
+            valid_until = now_ts + self.TIMELINE_CACHE_SECONDS
+            if fq.next_fire:
+                earliest = min(when for _, when in fq.next_fire.values()).timestamp()
+                valid_until = min(valid_until, earliest)
+            fq.timeline_cache[hours] = (fq.version, fq.tz, valid_until, timeline)
+            return [dict(e) for e in timeline]
 
     def get_merged_timeline(self, hours_back: int = 12, hours_ahead: int = 12) -> Dict[str, Any]:
         """Get merged timeline: past activity + future schedule with NOW marker."""
@@ -1073,7 +1199,12 @@ class ContinuityScheduler:
         past = []
         with self._lock:
             task_map = {t["id"]: t for t in self._tasks.values()}
-        for entry in self._activity:
+        runs = self._run_log
+        if runs is not None:
+            activity = runs.activity(since=cutoff.timestamp(), limit=500)
+        else:
+            activity = self._activity
+        for entry in activity:
             try:
                 ts = datetime.fromisoformat(entry["timestamp"])
                 if ts.tzinfo is None:
@@ -1091,7 +1222,8 @@ class ContinuityScheduler:
                 "heartbeat": task.get("heartbeat", False),
                 "emoji": task.get("emoji", ""),
                 "type": "past",
-                "details": entry.get("details", {})
+                "details": entry.get("details", {}),
+                "duration": entry.get("duration"),
             })
 
         return {
@@ -10,6 +10,8 @@ from pathlib import Path as _Path
 import numpy as np
 import config
 
+from core.embeddings.storage import prepare_batch
+
 logger = logging.getLogger(__name__)
 
 EMBEDDING_MODEL = 'nomic-ai/nomic-embed-text-v1.5'
@@ -47,11 +49,22 @@ class LocalEmbedder:
     # Advertised dimension — actual stamped dim on write is derived from the
     # returned vector, this is for contract-checks at register time.
     DIMENSION = 768
+    # nomic-embed-text-v1.5 is Matryoshka-trained: these prefixes stay usable
+    # when EMBEDDING_STORAGE_DIM asks for truncated storage (see storage.py).
+    MATRYOSHKA_DIMS = (768, 512, 256, 128, 64)
 
     def __init__(self):
         self.session = None
         self.tokenizer = None
         self.input_names = None
+        # Every caller funnels through one batcher so concurrent embeds share
+        # a padded batch instead of queueing batch-of-1 runs inside ORT.
+        from core.embeddings.batcher import EmbeddingBatcher, DEFAULT_WINDOW_MS
+        self._batcher = EmbeddingBatcher(
+            self._embed_batch,
+            window_ms=float(getattr(config, 'EMBEDDING_BATCH_WINDOW_MS', DEFAULT_WINDOW_MS) or 0),
+            name='embed-local-batcher',
+        )
 
     @property
     def provider_id(self):
@@ -124,7 +137,10 @@ class LocalEmbedder:
                     EMBEDDING_MODEL, EMBEDDING_ONNX_FILE, revision=rev,
                 )
 
-            self.session = ort.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+            self.session = ort.InferenceSession(
+                model_path, sess_options=_onnx_session_options(ort),
+                providers=['CPUExecutionProvider'],
+            )
             self.input_names = [i.name for i in self.session.get_inputs()]
             self.load_error = None
             rev_note = f" (revision pinned: {rev})" if rev else " (revision: latest)"
@@ -138,6 +154,14 @@ class LocalEmbedder:
         self._load()
         if self.session is None:
             return None
+        return prepare_batch(self._batcher.submit(texts, prefix), self)
+
+    def batch_stats(self):
+        """Coalescing counters (batches, rows, avg batch size, queue wait)."""
+        return self._batcher.stats()
+
+    def _embed_batch(self, texts, prefix):
+        """One ORT run over `texts`. Called only from the batcher thread."""
         try:
             prefixed = [f'{prefix}: {t}' for t in texts]
             encoded = self.tokenizer(prefixed, return_tensors='np', padding=True,
@@ -164,6 +188,27 @@ class LocalEmbedder:
         return self.session is not None
 
 
+def _onnx_session_options(ort):
+    """Session tuned for the batcher's access pattern: one run at a time, so
+    all parallelism goes to intra-op threads and inter-op stays at 1.
+    EMBEDDING_ONNX_THREADS overrides the thread count (0 = physical cores,
+    leaving the audio/LLM side of the box some headroom on big machines)."""
+    opts = ort.SessionOptions()
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    opts.inter_op_num_threads = 1
+    threads = int(getattr(config, 'EMBEDDING_ONNX_THREADS', 0) or 0)
+    if threads <= 0:
+        try:
+            import psutil
+            threads = psutil.cpu_count(logical=False) or 0
+        except Exception:
+            threads = 0
+        threads = threads or max(1, (os.cpu_count() or 2) // 2)
+    opts.intra_op_num_threads = threads
+    return opts
+
+
 class RemoteEmbedder:
     """OpenAI-compatible embedding API client (for Nomic via TEI, etc.)."""
 
@@ -172,6 +217,11 @@ class RemoteEmbedder:
     # is defined by whatever model the server runs). Swapping the API URL to a
     # different model's endpoint is effectively a different provider.
     PROVIDER_ID = 'remote-api'
+    # Bulk callers (re-embed) may keep this many requests in flight at once.
+    # The shared httpx client is thread-safe; the server does the batching.
+    MAX_CONCURRENT_REQUESTS = 4
+    # Requests EMBEDDING_MODEL (nomic) by name, so the same prefixes apply.
+    MATRYOSHKA_DIMS = LocalEmbedder.MATRYOSHKA_DIMS
 
     def __init__(self):
         # Dimension discovered at first successful call and cached.
@@ -236,7 +286,7 @@ class RemoteEmbedder:
             result = (vecs / norms).astype(np.float32)
             # Cache observed dimension for provenance stamping.
             self._observed_dim = int(result.shape[-1])
-            return result
+            return prepare_batch(result, self)
         except Exception as e:
             logger.error(f"Remote embedding failed: {e}")
             return None
@@ -250,6 +300,7 @@ class SapphireRouterEmbedder:
     """Forwards embedding requests to a Sapphire Router."""
 
     PROVIDER_ID = 'sapphire-router'
+    MAX_CONCURRENT_REQUESTS = 4
 
     def __init__(self):
         self._observed_dim = None
@@ -611,6 +662,13 @@ def switch_embedding_provider(provider_name):
     with _embedder_lock:
         logger.info(f"Switching embedding provider to: {provider_name}")
         _embedder = embedding_registry.create(provider_name or 'none')
+    # A cancelled run's cursor belongs to the old provider; switching back
+    # later must not resume past rows re-stamped in between.
+    try:
+        from core.embeddings.reembed import _clear_checkpoint
+        _clear_checkpoint()
+    except Exception:
+        pass
     # Reset backfill flag so new provider can re-embed missing memories
     try:
         import plugins.memory.tools.memory_tools as mem
@@ -632,11 +690,13 @@ def current_provenance():
     Write paths stamp rows with this. Read paths filter by this. The pair is
     the load-bearing identity that prevents silently mixing vector spaces.
     """
+    from core.embeddings.storage import effective_dim
     embedder = get_embedder()
     if not embedder:
         return None, None
     provider_id = getattr(embedder, 'provider_id', None)
-    dim = getattr(embedder, 'dimension', None)
+    # Stamped dim, which is the truncated length when Matryoshka storage is on.
+    dim = effective_dim(embedder)
     return provider_id, dim
 
 
@@ -652,16 +712,19 @@ def stamp_embedding(vector, embedder):
     to vector search forever. Every caller already has a reference at this
     point; pass it. Race scout #6 — 2026-04-20.
 
+    The blob is raw float32. Vectors from embed() are already
+    Matryoshka-truncated when EMBEDDING_STORAGE_DIM applies; full-length
+    vectors decoded for a re-stamp are truncated here. `dim` is the stored
+    length.
+
     Returned values stamp the row: use `(blob, provider_id, dim)` on INSERT.
     """
-    import numpy as _np
+    from core.embeddings.storage import encode_vector, prepare_vector
     if vector is None:
         return None, None, None
-    arr = _np.asarray(vector, dtype=_np.float32)
-    if arr.ndim != 1:
-        arr = arr.reshape(-1)
+    arr = prepare_vector(vector, embedder)
     provider_id = getattr(embedder, 'provider_id', None) if embedder else None
-    return arr.tobytes(), provider_id, int(arr.shape[0])
+    return encode_vector(arr), provider_id, int(arr.shape[0])
 
 
 def integrity_report():
@@ -0,0 +1,156 @@
+"""Micro-batching front for in-process embedding models.
+
+Chat RAG, agent workers, continuity tasks, knowledge uploads and daemon
+replies all call `embed()` independently, usually with one text each. Run
+naively, every call is its own batch-of-1 ONNX inference and concurrent calls
+just queue inside the runtime. The batcher puts one worker thread in front of
+the model: a request waits at most `window_ms` for company, everything that
+arrived in that window (and anything that queued while the previous batch
+was running) goes through as one padded batch, and each caller gets back its
+own slice. `embed()` callers see the same contract — array or None.
+
+Requests are grouped by prefix since the prefix is part of the model input
+(`search_query:` vs `search_document:`), and identical texts in one batch are
+embedded once.
+"""
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Defaults when config doesn't say otherwise. A lone request pays at most the
+# window in added latency, small next to a CPU inference.
+DEFAULT_WINDOW_MS = 3.0
+DEFAULT_MAX_BATCH = 64
+
+
+class _Request:
+    __slots__ = ('texts', 'prefix', 'done', 'result', 'enqueued')
+
+    def __init__(self, texts, prefix):
+        self.texts = list(texts)
+        self.prefix = prefix
+        self.done = threading.Event()
+        self.result = None
+        self.enqueued = time.monotonic()
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embed requests into shared batches.
+
+    `run_batch(texts, prefix)` is the real inference: it takes a list of
+    texts and returns an (N, D) float32 array or None. It's only ever called
+    from the batcher's worker thread, one batch at a time.
+    """
+
+    def __init__(self, run_batch, window_ms=DEFAULT_WINDOW_MS, max_batch=DEFAULT_MAX_BATCH,
+                 name='embed-batcher'):
+        self._run_batch = run_batch
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self._name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'batches': 0, 'rows': 0, 'deduped': 0, 'wait_ms': 0.0}
+
+    # ─── Caller side ────────────────────────────────────────────────────
+
+    def submit(self, texts, prefix='search_document'):
+        """Embed `texts` as part of whatever batch is forming. Blocks until
+        this caller's rows are ready. Same return contract as embed()."""
+        if not texts:
+            return None
+        self._ensure_worker()
+        req = _Request(texts, prefix)
+        self._queue.put(req)
+        req.done.wait()
+        return req.result
+
+    def stats(self):
+        """Counters since start: requests, batches, rows embedded, rows saved
+        by dedup, mean time queued before inference started. rows/batches is
+        the achieved batch size."""
+        with self._stats_lock:
+            s = dict(self._stats)
+        s['avg_batch_rows'] = round(s['rows'] / s['batches'], 2) if s['batches'] else 0.0
+        s['avg_wait_ms'] = round(s.pop('wait_ms') / s['requests'], 2) if s['requests'] else 0.0
+        return s
+
+    # ─── Worker side ────────────────────────────────────────────────────
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, daemon=True, name=self._name)
+                self._thread.start()
+
+    def _collect(self, first):
+        """Gather requests for up to window_ms after `first` arrived, capped
+        at max_batch rows. Anything already queued is taken immediately."""
+        batch = [first]
+        rows = len(first.texts)
+        deadline = time.monotonic() + self.window_ms / 1000.0
+        while rows < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                req = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(req)
+            rows += len(req.texts)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                batch = self._collect(batch[0])
+                by_prefix = {}
+                for req in batch:
+                    by_prefix.setdefault(req.prefix, []).append(req)
+                for prefix, reqs in by_prefix.items():
+                    self._run_group(prefix, reqs)
+            except Exception as e:
+                logger.error(f"[embedding] batcher loop error: {e}")
+            finally:
+                # Never strand a caller — anything not answered gets None.
+                for req in batch:
+                    req.done.set()
+
+    def _run_group(self, prefix, reqs):
+        started = time.monotonic()
+        unique = {}
+        spans = []
+        for req in reqs:
+            idx = [unique.setdefault(t, len(unique)) for t in req.texts]
+            spans.append(idx)
+        texts = list(unique)
+        try:
+            out = self._run_batch(texts, prefix)
+        except Exception as e:
+            logger.error(f"[embedding] batched inference failed: {e}")
+            out = None
+        if out is not None:
+            out = np.asarray(out)
+            if out.ndim != 2 or out.shape[0] != len(texts):
+                logger.error(f"[embedding] batched inference returned shape {out.shape}, "
+                             f"expected ({len(texts)}, D)")
+                out = None
+        for req, idx in zip(reqs, spans):
+            req.result = None if out is None else out[idx]
+            req.done.set()
+        total_rows = sum(len(r.texts) for r in reqs)
+        with self._stats_lock:
+            self._stats['requests'] += len(reqs)
+            self._stats['batches'] += 1
+            self._stats['rows'] += len(texts)
+            self._stats['deduped'] += total_rows - len(texts)
+            self._stats['wait_ms'] += sum(started - r.enqueued for r in reqs) * 1000.0
@@ -7,10 +7,31 @@ people), re-generates embeddings under the active provider, and re-stamps.
 
 Runs in a background thread, publishes progress via the event bus, supports
 cancel. Only one re-embed runs at a time.
+
+Pipeline shape (per table):
+  - rows stream in id order, PAGE_SIZE at a time, via an `id > cursor` query —
+    nothing is loaded whole into memory
+  - each page is bucketed by text length so a batch of short memories isn't
+    padded out to the one 2 KB knowledge chunk that happened to share it
+  - embedding runs on a small pool while this thread writes finished batches
+    to SQLite, so inference and write I/O overlap. Remote providers declare
+    MAX_CONCURRENT_REQUESTS to get more than one request in flight
+  - the cursor is checkpointed after every fully-written page; cancel or a
+    crash resumes from there on the next start under the same provider and
+    storage dimension; any other checkpoint is discarded
+
+The same pass migrates storage layout (storage.py): rows already under the
+active provider but at another Matryoshka length are re-stamped straight
+from their stored full-length vector, no model call.
 """
+import collections
+import json
 import logging
+import os
 import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
@@ -35,14 +56,28 @@ class _ReembedState:
         self.done = 0
         self.current_table = None
         self.errors = 0
+        self.restamped = 0
         self.last_error = None
         self.started_at = None
         self.finished_at = None
+        # True when this run picked up a checkpoint left by a cancelled or
+        # crashed earlier run — `total` then only covers the remainder.
+        self.resumed = False
 
 
 _state = _ReembedState()
 
 
+def _rows_per_sec_locked():
+    """Throughput over the run so far. Caller holds _state.lock."""
+    if not _state.started_at or not _state.done:
+        return 0.0
+    elapsed = (_state.finished_at or time.time()) - _state.started_at
+    if elapsed <= 0:
+        return 0.0
+    return round(_state.done / elapsed, 1)
+
+
 def _snapshot():
     """Lock-respecting snapshot of state (used for status + events)."""
     with _state.lock:
@@ -52,10 +87,13 @@ def _snapshot():
             'done': _state.done,
             'current_table': _state.current_table,
             'errors': _state.errors,
+            'restamped': _state.restamped,
             'last_error': _state.last_error,
             'started_at': _state.started_at,
             'finished_at': _state.finished_at,
             'cancel_requested': _state.cancel_requested,
+            'resumed': _state.resumed,
+            'rows_per_sec': _rows_per_sec_locked(),
         }
 
 
@@ -99,9 +137,11 @@ def start_reembed():
         _state.done = 0
         _state.current_table = None
         _state.errors = 0
+        _state.restamped = 0
         _state.last_error = None
         _state.started_at = time.time()
         _state.finished_at = None
+        _state.resumed = False
 
     thread = threading.Thread(target=_run, daemon=True, name='embed-reembed')
     # Guard thread.start() — if pthread spawn fails (OS resource exhaustion,
@@ -127,8 +167,9 @@ def start_reembed():
 
 
 def cancel_reembed():
-    """Request a graceful stop at the next batch boundary. The worker will
-    finish the current batch (so no row is left half-stamped) then exit."""
+    """Request a graceful stop at the next batch boundary. The worker stops
+    submitting new batches, writes the ones already embedded (so no row is
+    left half-stamped), checkpoints its cursor, then exits."""
     with _state.lock:
         if not _state.running:
             return False, "No re-embed running"
@@ -136,48 +177,161 @@ def cancel_reembed():
     return True, "Cancel requested"
 
 
-# ─── Worker ─────────────────────────────────────────────────────────────────
+# ─── Tables ─────────────────────────────────────────────────────────────────
 
 
-def _count_pending(embedder):
-    """Count rows across all tables that would be re-embedded. Rows with
-    matching provenance are skipped (already current)."""
-    from core.embeddings import current_provenance
-    import sqlite3 as _sql
-    active_pid = getattr(embedder, 'provider_id', None)
-    counts = {}
+# Rows fetched per cursor page. Also the checkpoint granularity.
+PAGE_SIZE = 256
+# Rows per embed() call. Pages are length-bucketed before being cut into
+# batches of this size.
+BATCH_SIZE = 16
+# Embedded batches allowed to sit ahead of the writer, per unit of provider
+# concurrency. Bounds memory if SQLite is slow (WAL checkpoint, busy DB).
+QUEUE_DEPTH = 2
+# Remote providers are I/O bound, so more than one request in flight helps.
+# Capped so a misdeclared plugin can't open a hundred sockets.
+MAX_CONCURRENCY = 8
+
+
+def _memory_conn():
+    from plugins.memory.tools import memory_tools as _mt
+    return _mt._get_connection()
+
+
+def _knowledge_conn():
+    from plugins.memory.tools import knowledge_tools as _kt
+    return _kt._get_connection()
+
+
+def _content_text(cols):
+    return cols[0] or ''
+
+
+def _person_text(cols):
+    """Same composition create_or_update_person embeds, so re-embedded people
+    land where a fresh save would."""
+    name, rel, phone, email, addr, notes = cols
+    parts = [name or '']
+    if rel: parts.append(f"relationship: {rel}")
+    if phone: parts.append(f"phone: {phone}")
+    if email: parts.append(f"email: {email}")
+    if addr: parts.append(f"address: {addr}")
+    if notes: parts.append(f"notes: {notes}")
+    return '. '.join(parts)
+
+
+# (table, connection opener, text columns, text columns -> embed text)
+_TABLES = (
+    ('memories', _memory_conn, 'content', _content_text),
+    ('knowledge_entries', _knowledge_conn, 'content', _content_text),
+    ('people', _knowledge_conn, 'name, relationship, phone, email, address, notes', _person_text),
+)
+
 
-    def _count(open_conn, table):
-        try:
-            with open_conn() as conn:
-                cur = conn.cursor()
-                cur.execute(
-                    f'SELECT COUNT(*) FROM {table} WHERE embedding_provider IS NOT ? '
-                    f'OR embedding_provider IS NULL',
-                    (active_pid,)
-                )
-                return cur.fetchone()[0]
-        except _sql.OperationalError:
-            return 0
 
+def _pending_clause(embedder):
+    """WHERE fragment + params for rows needing work: wrong or missing
+    provider (re-embed), or the active provider at a different Matryoshka
+    length — stamped dim or blob length off target (re-stamp)."""
+    from core.embeddings.storage import blob_nbytes, effective_dim
+    clause = 'embedding_provider IS NOT ? OR embedding_provider IS NULL'
+    params = [getattr(embedder, 'provider_id', None)]
+    dim = effective_dim(embedder)
+    if dim:
+        clause += ' OR embedding_dim IS NOT ? OR length(embedding) IS NOT ?'
+        params += [dim, blob_nbytes(dim)]
+    return f'({clause})', params
+
+
+# ─── Checkpoint ─────────────────────────────────────────────────────────────
+
+
+def _checkpoint_path():
+    """Checkpoint sits next to memory.db so it follows the user's data dir
+    (and tests' tmp dirs) without its own config knob."""
+    from plugins.memory.tools import memory_tools as _mt
+    return Path(_mt._get_db_path()).parent / 'reembed_checkpoint.json'
+
+
+def _checkpoint_key(embedder):
+    """What a cursor is only valid under: the provider and the dimension it
+    stamps under current settings. Rows are always raw float32, so there's
+    no storage format to key on."""
+    from core.embeddings.storage import effective_dim
+    return getattr(embedder, 'provider_id', None), effective_dim(embedder)
+
+
+def _load_checkpoint(key):
+    """Return {table: last_written_id} for a previous unfinished run under
+    the SAME (provider, dim) key. Rows at or below a cursor written under
+    another provider or storage dimension may be pending again, so a
+    mismatched checkpoint is deleted rather than resumed."""
     try:
-        from plugins.memory.tools import memory_tools as _mt
-        counts['memories'] = _count(_mt._get_connection, 'memories')
+        path = _checkpoint_path()
+        if not path.exists():
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        provider_id, dim = key
+        if data.get('provider') != provider_id or data.get('dim') != dim:
+            _clear_checkpoint()
+            return {}
+        return {k: int(v) for k, v in (data.get('cursors') or {}).items()}
     except Exception as e:
-        logger.debug(f"reembed count memories failed: {e}")
-        counts['memories'] = 0
+        logger.debug(f"reembed checkpoint load failed: {e}")
+        return {}
+
+
+def _save_checkpoint(key, cursors):
+    """Atomic write (temp + rename) so a crash mid-write can't leave a
+    truncated checkpoint that resumes from garbage."""
     try:
-        from plugins.memory.tools import knowledge_tools as _kt
-        counts['knowledge_entries'] = _count(_kt._get_connection, 'knowledge_entries')
-        counts['people'] = _count(_kt._get_connection, 'people')
+        import tempfile
+        path = _checkpoint_path()
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                provider_id, dim = key
+                json.dump({'provider': provider_id, 'dim': dim, 'cursors': cursors}, f)
+            Path(tmp).replace(path)
+        except Exception:
+            Path(tmp).unlink(missing_ok=True)
+            raise
     except Exception as e:
-        logger.debug(f"reembed count knowledge failed: {e}")
-        counts.setdefault('knowledge_entries', 0)
-        counts.setdefault('people', 0)
-    return counts
+        logger.debug(f"reembed checkpoint save failed: {e}")
 
 
-BATCH_SIZE = 16
+def _clear_checkpoint():
+    try:
+        _checkpoint_path().unlink(missing_ok=True)
+    except Exception as e:
+        logger.debug(f"reembed checkpoint clear failed: {e}")
+
+
+# ─── Worker ─────────────────────────────────────────────────────────────────
+
+
+def _count_pending(embedder, cursors=None):
+    """Count rows across all tables that would be re-embedded. Rows with
+    matching provenance are skipped (already current), as are rows at or
+    below a resumed checkpoint cursor."""
+    import sqlite3 as _sql
+    pending_sql, pending_params = _pending_clause(embedder)
+    cursors = cursors or {}
+    counts = {}
+    for table, open_conn, _cols, _text in _TABLES:
+        try:
+            with open_conn() as conn:
+                counts[table] = conn.execute(
+                    f'SELECT COUNT(*) FROM {table} WHERE id > ? AND {pending_sql}',
+                    [cursors.get(table, 0)] + pending_params
+                ).fetchone()[0]
+        except _sql.OperationalError:
+            counts[table] = 0
+        except Exception as e:
+            logger.debug(f"reembed count {table} failed: {e}")
+            counts[table] = 0
+    return counts
 
 
 def _cancel_check():
@@ -192,140 +346,164 @@ def _bump_done(n, current_table=None):
             _state.current_table = current_table
 
 
+def _bump_restamped(n):
+    with _state.lock:
+        _state.restamped += n
+
+
 def _bump_error(msg):
     with _state.lock:
         _state.errors += 1
         _state.last_error = msg
 
 
-def _process_memories(embedder):
-    from plugins.memory.tools import memory_tools as mt
-    from core.embeddings import stamp_embedding
-    active_pid = getattr(embedder, 'provider_id', None)
-
-    with mt._get_connection() as conn:
-        rows = conn.execute(
-            'SELECT id, content FROM memories WHERE embedding_provider IS NOT ? '
-            'OR embedding_provider IS NULL',
-            (active_pid,)
-        ).fetchall()
-
-    for i in range(0, len(rows), BATCH_SIZE):
-        if _cancel_check():
-            return
-        batch = rows[i:i + BATCH_SIZE]
-        ids = [r[0] for r in batch]
-        texts = [r[1] for r in batch]
-        embs = embedder.embed(texts, prefix='search_document')
-        if embs is None:
-            _bump_error(f"embedder returned None on memories batch starting at id {ids[0]}")
-            return
-        try:
-            with mt._get_connection() as conn:
-                cur = conn.cursor()
-                for row_id, emb in zip(ids, embs):
-                    blob, pid, dim = stamp_embedding(emb, embedder)
-                    cur.execute(
-                        'UPDATE memories SET embedding = ?, embedding_provider = ?, '
-                        'embedding_dim = ? WHERE id = ?',
-                        (blob, pid, dim, row_id)
-                    )
-                conn.commit()
-            _bump_done(len(batch), 'memories')
-            _publish()
-        except Exception as e:
-            _bump_error(f"memories batch failed: {e}")
+def _embed_concurrency(embedder):
+    """Requests the provider is willing to have in flight. Local ONNX already
+    saturates the cores from one call, so anything that doesn't declare
+    MAX_CONCURRENT_REQUESTS gets 1."""
+    n = getattr(type(embedder), 'MAX_CONCURRENT_REQUESTS', 1)
+    if not isinstance(n, int) or isinstance(n, bool) or n < 1:
+        return 1
+    return min(n, MAX_CONCURRENCY)
+
+
+def _iter_pages(table, open_conn, cols, embedder, cursor):
+    """Yield pending rows PAGE_SIZE at a time in id order, starting after
+    `cursor`. Each page is its own short read so the writer never waits on
+    a long-lived read transaction. Rows are
+    (id, embedding_provider, embedding_dim, embedding, *text columns)."""
+    pending_sql, pending_params = _pending_clause(embedder)
+    while True:
+        with open_conn() as conn:
+            rows = conn.execute(
+                f'SELECT id, embedding_provider, embedding_dim, embedding, {cols} '
+                f'FROM {table} WHERE id > ? AND {pending_sql} ORDER BY id LIMIT ?',
+                [cursor] + pending_params + [PAGE_SIZE]
+            ).fetchall()
+        if not rows:
             return
+        yield rows
+        cursor = rows[-1][0]
 
 
-def _process_knowledge_entries(embedder):
-    from plugins.memory.tools import knowledge_tools as kt
-    from core.embeddings import stamp_embedding
-    active_pid = getattr(embedder, 'provider_id', None)
-
-    with kt._get_connection() as conn:
-        rows = conn.execute(
-            'SELECT id, content FROM knowledge_entries WHERE embedding_provider IS NOT ? '
-            'OR embedding_provider IS NULL',
-            (active_pid,)
-        ).fetchall()
+def _bucket_batches(items, batch_size=None):
+    """Cut (id, text) pairs into batches of similar length.
 
-    for i in range(0, len(rows), BATCH_SIZE):
-        if _cancel_check():
-            return
-        batch = rows[i:i + BATCH_SIZE]
-        ids = [r[0] for r in batch]
-        texts = [r[1] for r in batch]
-        embs = embedder.embed(texts, prefix='search_document')
-        if embs is None:
-            _bump_error(f"embedder returned None on knowledge_entries batch starting at id {ids[0]}")
-            return
-        try:
-            with kt._get_connection() as conn:
-                cur = conn.cursor()
-                for row_id, emb in zip(ids, embs):
-                    blob, pid, dim = stamp_embedding(emb, embedder)
-                    cur.execute(
-                        'UPDATE knowledge_entries SET embedding = ?, embedding_provider = ?, '
-                        'embedding_dim = ? WHERE id = ?',
-                        (blob, pid, dim, row_id)
-                    )
-                conn.commit()
-            _bump_done(len(batch), 'knowledge_entries')
-            _publish()
-        except Exception as e:
-            _bump_error(f"knowledge_entries batch failed: {e}")
-            return
+    A batch is padded to its longest member, so sorting before cutting keeps
+    short rows together and long rows together. Character length stands in
+    for token count — close enough to group by, and free.
+    """
+    batch_size = batch_size or BATCH_SIZE
+    ordered = sorted(items, key=lambda it: len(it[1] or ''))
+    return [ordered[i:i + batch_size] for i in range(0, len(ordered), batch_size)]
 
 
-def _process_people(embedder):
-    """People get one-at-a-time treatment since their embed text is composed
-    from multiple columns — matches the shape that create_or_update_person uses."""
-    from plugins.memory.tools import knowledge_tools as kt
+def _write_batch(table, open_conn, batch, embs, embedder):
     from core.embeddings import stamp_embedding
+    params = []
+    for (row_id, _text), emb in zip(batch, embs):
+        blob, pid, dim = stamp_embedding(emb, embedder)
+        params.append((blob, pid, dim, row_id))
+    with open_conn() as conn:
+        conn.executemany(
+            f'UPDATE {table} SET embedding = ?, embedding_provider = ?, '
+            f'embedding_dim = ? WHERE id = ?',
+            params
+        )
+        conn.commit()
+
+
+def _process_table(spec, embedder, cursors, provenance_changed):
+    """Run one table through the pipeline. Returns False if the run should
+    stop (cancel, provider drift, or an error already recorded)."""
+    table, open_conn, cols, text_fn = spec
     active_pid = getattr(embedder, 'provider_id', None)
-
-    with kt._get_connection() as conn:
-        rows = conn.execute(
-            'SELECT id, name, relationship, phone, email, address, notes '
-            'FROM people WHERE embedding_provider IS NOT ? OR embedding_provider IS NULL',
-            (active_pid,)
-        ).fetchall()
-
-    for pid_row, name, rel, phone, email, addr, notes in rows:
-        if _cancel_check():
-            return
-        parts = [name or '']
-        if rel: parts.append(f"relationship: {rel}")
-        if phone: parts.append(f"phone: {phone}")
-        if email: parts.append(f"email: {email}")
-        if addr: parts.append(f"address: {addr}")
-        if notes: parts.append(f"notes: {notes}")
-        embed_text = '. '.join(parts)
-        embs = embedder.embed([embed_text], prefix='search_document')
+    checkpoint_key = _checkpoint_key(embedder)
+    workers = _embed_concurrency(embedder)
+    max_inflight = workers * QUEUE_DEPTH
+    # FIFO of (batch, page_end_id | None, future). Drained in submit order so
+    # the checkpoint only ever advances past fully-written pages.
+    inflight = collections.deque()
+    ok = True
+    stopping = False
+
+    def _drain_one():
+        batch, page_end, fut = inflight.popleft()
+        try:
+            embs = fut.result()
+        except Exception as e:
+            _bump_error(f"embedder raised on {table} batch starting at id {batch[0][0]}: {e}")
+            return False
         if embs is None:
-            _bump_error(f"embedder returned None on person id {pid_row}")
-            return
+            _bump_error(f"embedder returned None on {table} batch starting at id {batch[0][0]}")
+            return False
         try:
-            blob, prov, dim = stamp_embedding(embs[0], embedder)
-            with kt._get_connection() as conn:
-                conn.execute(
-                    'UPDATE people SET embedding = ?, embedding_provider = ?, '
-                    'embedding_dim = ? WHERE id = ?',
-                    (blob, prov, dim, pid_row)
-                )
-                conn.commit()
-            _bump_done(1, 'people')
-            _publish()
+            _write_batch(table, open_conn, batch, embs, embedder)
         except Exception as e:
-            _bump_error(f"person {pid_row} re-embed failed: {e}")
-            return
+            _bump_error(f"{table} batch failed: {e}")
+            return False
+        _bump_done(len(batch), table)
+        if batch[0][1] is None:
+            _bump_restamped(len(batch))
+        if page_end is not None:
+            cursors[table] = page_end
+            _save_checkpoint(checkpoint_key, cursors)
+        _publish()
+        return True
+
+    from core.embeddings.storage import can_restamp, decode_vector
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='embed-reembed-io')
+    try:
+        for rows in _iter_pages(table, open_conn, cols, embedder, cursors.get(table, 0)):
+            if _cancel_check() or provenance_changed():
+                break
+            # Rows already under the active provider whose stored vector can
+            # be converted in place skip the model. Their "future" is already
+            # resolved so they ride the same ordered write/checkpoint path.
+            units = []
+            to_embed = []
+            restamp_batch, restamp_vecs = [], []
+            for r in rows:
+                row_id, prov, stored_dim, blob = r[:4]
+                if prov == active_pid and can_restamp(blob, stored_dim, embedder):
+                    restamp_batch.append((row_id, None))
+                    restamp_vecs.append(decode_vector(blob))
+                else:
+                    to_embed.append((row_id, text_fn(r[4:])))
+            if restamp_batch:
+                done_fut = Future()
+                done_fut.set_result(restamp_vecs)
+                units.append((restamp_batch, done_fut))
+            units.extend((b, None) for b in _bucket_batches(to_embed))
+            for i, (batch, fut) in enumerate(units):
+                if _cancel_check():
+                    stopping = True
+                    break
+                page_end = rows[-1][0] if i == len(units) - 1 else None
+                if fut is None:
+                    texts = [t for _, t in batch]
+                    fut = pool.submit(embedder.embed, texts, prefix='search_document')
+                inflight.append((batch, page_end, fut))
+                while ok and len(inflight) >= max_inflight:
+                    ok = _drain_one()
+                if not ok:
+                    break
+            if stopping or not ok:
+                break
+        # Flush whatever is already embedded — on cancel too, the work is paid for.
+        while ok and inflight:
+            ok = _drain_one()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return ok and not _cancel_check()
 
 
 def _run():
     """Main worker. Walks all 3 tables, re-embedding rows not stamped with
     the active provider. Cancellable between batches. Never raises — writes
     any failure to _state.last_error so the UI can surface it."""
+    finished = False
     try:
         from core.embeddings import get_embedder, current_provenance
         embedder = get_embedder()
@@ -342,14 +520,19 @@ def _run():
         # it. That was the race. Scout race #1/#2.
         start_prov = _state.start_prov
 
-        counts = _count_pending(embedder)
+        cursors = _load_checkpoint(_checkpoint_key(embedder))
+        counts = _count_pending(embedder, cursors)
         with _state.lock:
-            _state.total = counts['memories'] + counts['knowledge_entries'] + counts['people']
+            _state.total = sum(counts.values())
+            _state.resumed = bool(cursors)
         _publish()
+        if cursors:
+            logger.info(f"Re-embed: resuming from checkpoint {cursors}")
 
         if _state.total == 0:
             with _state.lock:
                 _state.current_table = 'done'
+            _clear_checkpoint()
             logger.info("Re-embed: nothing to do (all rows already current)")
             return
 
@@ -365,22 +548,23 @@ def _run():
                 return True
             return False
 
-        _process_memories(embedder)
-        if _cancel_check() or _provenance_changed():
-            return
-        _process_knowledge_entries(embedder)
-        if _cancel_check() or _provenance_changed():
-            return
-        _process_people(embedder)
+        for spec in _TABLES:
+            if not _process_table(spec, embedder, cursors, _provenance_changed):
+                return
 
+        finished = True
+        with _state.lock:
+            rate = _rows_per_sec_locked()
         logger.info(f"Re-embed complete: {_state.done}/{_state.total} rows processed, "
-                    f"{_state.errors} errors")
+                    f"{_state.errors} errors, {rate} rows/sec")
 
     except Exception as e:
         logger.error(f"Re-embed worker crashed: {e}", exc_info=True)
         with _state.lock:
             _state.last_error = f"Worker crashed: {e}"
     finally:
+        if finished:
+            _clear_checkpoint()
         with _state.lock:
             _state.running = False
             _state.finished_at = time.time()
@@ -0,0 +1,114 @@
+"""Stored-vector layout — Matryoshka truncation and the float32 blob codec.
+
+Vectors are stored as raw little-endian float32 blobs with no header. That's
+what every row written so far holds and what the memory plugin's vector
+search decodes itself.
+
+Matryoshka-trained models (nomic-embed-text-v1.5) can be stored truncated to
+a prefix of their dimensions (EMBEDDING_STORAGE_DIM). Truncation is
+layer-norm → slice → L2-normalize, applied by the embedders to everything
+they return, so stored vectors and queries share the space without callers
+knowing. The stamped `embedding_dim` is the truncated length and provenance
+filtering keeps truncated and full-length rows apart.
+"""
+import logging
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Settings ───────────────────────────────────────────────────────────────
+
+
+def storage_dim(embedder):
+    """Matryoshka truncation target for this embedder, or None for full length.
+
+    Only applies to providers that declare MATRYOSHKA_DIMS and only to a
+    dimension they list — truncating a model that wasn't trained for it
+    wrecks ranking, so anything else is stored full-length.
+    """
+    try:
+        want = int(getattr(config, 'EMBEDDING_STORAGE_DIM', 0) or 0)
+    except (TypeError, ValueError):
+        return None
+    if want <= 0 or embedder is None:
+        return None
+    dims = getattr(type(embedder), 'MATRYOSHKA_DIMS', None)
+    if not isinstance(dims, (tuple, list)) or want not in dims:
+        return None
+    full = getattr(embedder, 'dimension', None)
+    if isinstance(full, int) and want >= full:
+        return None
+    return want
+
+
+def effective_dim(embedder):
+    """Dimension stamped on rows this embedder writes under current settings."""
+    if embedder is None:
+        return None
+    target = storage_dim(embedder)
+    if target:
+        return target
+    dim = getattr(embedder, 'dimension', None)
+    return dim if isinstance(dim, int) and not isinstance(dim, bool) else None
+
+
+def blob_nbytes(dim):
+    """Exact blob length for a `dim`-length vector. Lets SQL find rows whose
+    length differs from the target via length(embedding)."""
+    return 4 * dim
+
+
+# ─── Encode / decode ────────────────────────────────────────────────────────
+
+
+def prepare_vector(vector, embedder):
+    """Apply Matryoshka truncation if configured for this embedder; otherwise
+    return the vector untouched (byte-identical to the historical path).
+    Already-truncated vectors pass through, so applying it twice is safe."""
+    arr = np.asarray(vector, dtype=np.float32).reshape(-1)
+    target = storage_dim(embedder)
+    if not target or arr.shape[0] <= target:
+        return arr
+    # nomic's recipe: layer-norm over the full vector, slice, re-normalize.
+    centered = arr - arr.mean()
+    normed = centered / np.sqrt(centered.var() + 1e-5)
+    out = normed[:target]
+    norm = np.linalg.norm(out)
+    if norm > 0:
+        out = out / norm
+    return out.astype(np.float32)
+
+
+def prepare_batch(vectors, embedder):
+    """prepare_vector over an embed() result (2-D array, or None on failure)."""
+    if vectors is None or not storage_dim(embedder):
+        return vectors
+    return np.stack([prepare_vector(v, embedder) for v in vectors])
+
+
+def encode_vector(vector):
+    """Encode a 1-D float vector into a raw float32 blob."""
+    return np.asarray(vector, dtype=np.float32).reshape(-1).astype('<f4').tobytes()
+
+
+def decode_vector(blob):
+    """Decode a stored blob to a float32 vector. None if malformed."""
+    if not blob or len(blob) % 4:
+        return None
+    return np.frombuffer(blob, dtype='<f4')
+
+
+def can_restamp(blob, stored_dim, embedder):
+    """Whether a stored vector can be converted to the target length without
+    re-running the model: it's already that length, or the full untruncated
+    length (truncating an already-truncated vector would layer-norm over the
+    wrong span)."""
+    if not blob or not stored_dim or blob_nbytes(stored_dim) != len(blob):
+        return False
+    target = effective_dim(embedder)
+    full = getattr(embedder, 'dimension', None)
+    return stored_dim == target or stored_dim == full
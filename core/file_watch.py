@@ -0,0 +1,497 @@
+"""
+One file-watch service for everything that hot-reloads from disk.
+
+Before: settings, prompts, toolsets and spice sets each ran a thread that
+stat()ed its files every 2 s and slept through a debounce, and the dev-mode
+plugin watcher walked every plugin tree on its own thread. Five threads
+waking up forever, and an external edit took 2-3 s to apply. Our own saves
+were told apart from external edits by recording the mtime right after the
+write — racy, and the reason for the sleep-and-recheck dance in settings.
+
+Now components register paths and a callback here:
+
+  - On Linux one thread blocks on inotify (via libc, no extra package) and
+    only wakes when something under a watched directory changes. Elsewhere,
+    or if inotify is unavailable / out of watches, that watch is polled by
+    stat() instead.
+  - Events for a watch are coalesced: the callback fires once the files have
+    been quiet for `debounce` seconds, with the list of changed paths.
+  - A change only counts if the file's content hash differs from the last
+    one seen. Components call note_write(path) after saving, so their own
+    writes are recognised by content, not by mtime timing.
+  - Per-watch counters (reloads, suppressed self-writes, reload latency from
+    first event to callback done) are served at /api/metrics/watch.
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE = 0.15
+POLL_INTERVAL = 2.0
+
+# inotify(7)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = (_IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE
+               | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct("iIII")
+
+_UNSEEN = object()
+
+
+def _content_hash(path: Path) -> Optional[str]:
+    """sha1 of the file's bytes, or None if it doesn't exist / can't be read."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class _Inotify:
+    """Minimal ctypes wrapper around inotify_init1/add_watch/rm_watch."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm = libc.inotify_rm_watch
+        self._rm.argtypes = (ctypes.c_int, ctypes.c_int)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add(self, path: str) -> int:
+        wd = self._add(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def remove(self, wd: int):
+        self._rm(self.fd, wd)
+
+    def read(self):
+        """Yield (wd, mask, name) for every queued event."""
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, pos)
+            pos += _EVENT_HEADER.size
+            name = buf[pos:pos + length].rstrip(b"\0")
+            pos += length
+            yield wd, mask, os.fsdecode(name)
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class _Watch:
+    def __init__(self, watch_id, name, callback, files, trees, suffixes, debounce):
+        self.id = watch_id
+        self.name = name
+        self.callback = callback
+        self.files = files          # set of Paths watched individually
+        self.trees = trees          # list of (root Path, recursive) directories
+        self.suffixes = suffixes    # None = any file under a tree
+        self.debounce = debounce
+        self.polled = False         # inotify couldn't cover it (or isn't available)
+        self.kernel_dirs = set()    # directories this watch holds an inotify ref on
+        self.hashes: Dict[Path, Optional[str]] = {}
+        self.snapshot: Dict[Path, tuple] = {}  # polling only: path -> (mtime_ns, size)
+        self.pending: set = set()
+        self.first_event = 0.0
+        self.deadline = 0.0
+        self.reloads = 0
+        self.suppressed = 0
+        self.errors = 0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self.total_ms = 0.0
+
+    def covers(self, path: Path) -> bool:
+        if path in self.files:
+            return True
+        if self.suffixes is not None and path.suffix not in self.suffixes:
+            return False
+        for root, recursive in self.trees:
+            if path.parent == root or (recursive and root in path.parents):
+                return True
+        return False
+
+    def poll_state(self) -> Dict[Path, tuple]:
+        state = {}
+        for path in self.files:
+            try:
+                st = path.stat()
+                state[path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass
+        for root, recursive in self.trees:
+            try:
+                entries = root.rglob("*") if recursive else root.iterdir()
+                for path in entries:
+                    if self.suffixes is not None and path.suffix not in self.suffixes:
+                        continue
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    if not path.is_dir():
+                        state[path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass
+        return state
+
+
+class FileWatchService:
+    """Shared watcher. Use the `file_watcher` singleton."""
+
+    def __init__(self, use_inotify: Optional[bool] = None, poll_interval: float = POLL_INTERVAL):
+        if use_inotify is None:
+            use_inotify = sys.platform.startswith("linux")
+        self._use_inotify = use_inotify
+        self.poll_interval = poll_interval
+        self._lock = threading.RLock()
+        self._watches: Dict[int, _Watch] = {}
+        self._next_id = 1
+        self._inotify: Optional[_Inotify] = None
+        self._wd_dirs: Dict[int, Path] = {}
+        self._dir_wds: Dict[Path, int] = {}
+        self._dir_refs: Dict[Path, int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._wake_event = threading.Event()
+        self._wake_pipe = None
+        self._last_poll = 0.0
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify is not None else "poll"
+
+    # ── Registration ──
+
+    def watch(self, paths: Iterable, callback: Callable[[List[Path]], None], name: str = None,
+              recursive: bool = False, suffixes: Iterable[str] = None,
+              debounce: float = DEFAULT_DEBOUNCE) -> int:
+        """Call callback(changed_paths) when any of `paths` changes content.
+
+        Paths that are files (or don't exist yet) are watched individually.
+        Directories watch the files directly inside them — or the whole tree
+        with recursive=True — optionally filtered to `suffixes` (".py", ...).
+        Returns an id for unwatch().
+        """
+        files, trees = set(), []
+        for p in paths:
+            p = Path(p).absolute()
+            if p.is_dir():
+                trees.append((p, recursive))
+            else:
+                files.add(p)
+        suffixes = set(suffixes) if suffixes else None
+
+        with self._lock:
+            watch = _Watch(self._next_id, name or f"watch-{self._next_id}", callback,
+                           files, trees, suffixes, debounce)
+            self._next_id += 1
+            for path in files:
+                watch.hashes[path] = _content_hash(path)
+            self._watches[watch.id] = watch
+            self._ensure_started()
+            if self._inotify is not None:
+                self._attach(watch)
+            else:
+                watch.polled = True
+            if watch.polled:
+                watch.snapshot = watch.poll_state()
+        self._wake()
+        logger.debug(f"[WATCH] {watch.name}: {len(files)} file(s), {len(trees)} dir(s) via "
+                     f"{'poll' if watch.polled else 'inotify'}")
+        return watch.id
+
+    def unwatch(self, watch_id: int):
+        with self._lock:
+            watch = self._watches.pop(watch_id, None)
+            if watch is None:
+                return
+            for d in watch.kernel_dirs:
+                self._release_dir(d)
+            watch.kernel_dirs.clear()
+
+    def note_write(self, path):
+        """Record our own write to `path` so it doesn't trigger a reload.
+
+        Call after the file is in place (after the atomic rename).
+        """
+        path = Path(path).absolute()
+        with self._lock:
+            watches = [w for w in self._watches.values() if w.covers(path)]
+        if not watches:
+            return
+        digest = _content_hash(path)
+        with self._lock:
+            for w in watches:
+                w.hashes[path] = digest
+
+    # ── inotify bookkeeping (call with _lock held) ──
+
+    def _attach(self, watch: _Watch):
+        dirs = {p.parent for p in watch.files}
+        for root, recursive in watch.trees:
+            dirs.add(root)
+            if recursive:
+                dirs.update(d for d in root.rglob("*") if d.is_dir())
+        for d in dirs:
+            if not self._hold_dir(watch, d):
+                watch.polled = True
+
+    def _hold_dir(self, watch: _Watch, d: Path) -> bool:
+        if d in watch.kernel_dirs:
+            return True
+        if d not in self._dir_wds:
+            try:
+                wd = self._inotify.add(str(d))
+            except OSError as e:
+                logger.warning(f"[WATCH] inotify can't watch {d} ({e.strerror}), polling instead")
+                return False
+            self._dir_wds[d] = wd
+            self._wd_dirs[wd] = d
+        self._dir_refs[d] = self._dir_refs.get(d, 0) + 1
+        watch.kernel_dirs.add(d)
+        return True
+
+    def _release_dir(self, d: Path):
+        refs = self._dir_refs.get(d, 0) - 1
+        if refs > 0:
+            self._dir_refs[d] = refs
+            return
+        self._dir_refs.pop(d, None)
+        wd = self._dir_wds.pop(d, None)
+        if wd is not None:
+            self._wd_dirs.pop(wd, None)
+            if self._inotify is not None:
+                self._inotify.remove(wd)
+
+    # ── Thread ──
+
+    def _ensure_started(self):
+        if self._running:
+            return
+        if self._use_inotify and self._inotify is None:
+            try:
+                self._inotify = _Inotify()
+                self._wake_pipe = os.pipe()
+            except (OSError, AttributeError) as e:
+                logger.info(f"[WATCH] inotify unavailable ({e}), using polling")
+                self._inotify = None
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="FileWatch")
+        self._thread.start()
+        logger.info(f"[WATCH] File watch service started ({self.backend})")
+
+    def stop(self):
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+        self._wake()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        with self._lock:
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+            if self._wake_pipe is not None:
+                for fd in self._wake_pipe:
+                    os.close(fd)
+                self._wake_pipe = None
+            self._wd_dirs.clear()
+            self._dir_wds.clear()
+            self._dir_refs.clear()
+            for w in self._watches.values():
+                w.kernel_dirs.clear()
+                w.polled = True
+                w.snapshot = w.poll_state()
+        logger.info("[WATCH] File watch service stopped")
+
+    def _wake(self):
+        self._wake_event.set()
+        pipe = self._wake_pipe
+        if pipe is not None:
+            try:
+                os.write(pipe[1], b"x")
+            except OSError:
+                pass
+
+    def _timeout(self, now: float) -> Optional[float]:
+        with self._lock:
+            deadlines = [w.deadline for w in self._watches.values() if w.pending]
+            if any(w.polled for w in self._watches.values()):
+                deadlines.append(self._last_poll + self.poll_interval)
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - now)
+
+    def _loop(self):
+        while self._running:
+            try:
+                timeout = self._timeout(time.monotonic())
+                if self._inotify is not None:
+                    ready, _, _ = select.select([self._inotify.fd, self._wake_pipe[0]], [], [], timeout)
+                    if self._wake_pipe[0] in ready:
+                        os.read(self._wake_pipe[0], 4096)
+                    if self._inotify.fd in ready:
+                        self._read_events()
+                else:
+                    self._wake_event.wait(timeout)
+                    self._wake_event.clear()
+                if not self._running:
+                    break
+                now = time.monotonic()
+                if now - self._last_poll >= self.poll_interval:
+                    self._last_poll = now
+                    self._poll(now)
+                self._fire_due(time.monotonic())
+            except Exception as e:
+                logger.error(f"[WATCH] Watch loop error: {e}")
+                time.sleep(1)
+
+    def _read_events(self):
+        now = time.monotonic()
+        with self._lock:
+            for wd, mask, name in self._inotify.read():
+                if mask & _IN_Q_OVERFLOW:
+                    # Lost events — treat every watched path as possibly changed
+                    for w in self._watches.values():
+                        self._mark(w, list(w.files) + [root for root, _ in w.trees], now)
+                    continue
+                d = self._wd_dirs.get(wd)
+                if d is None:
+                    continue
+                if mask & _IN_IGNORED:
+                    # Directory itself went away; the kernel dropped the watch
+                    self._wd_dirs.pop(wd, None)
+                    self._dir_wds.pop(d, None)
+                    self._dir_refs.pop(d, None)
+                    for w in self._watches.values():
+                        if d in w.kernel_dirs:
+                            w.kernel_dirs.discard(d)
+                            w.polled = True
+                            w.snapshot = w.poll_state()
+                    continue
+                if not name:
+                    continue
+                path = d / name
+                is_dir = bool(mask & _IN_ISDIR)
+                for w in self._watches.values():
+                    if is_dir:
+                        if mask & (_IN_CREATE | _IN_MOVED_TO) and any(
+                                rec and (root == d or root in d.parents) for root, rec in w.trees):
+                            for sub in [path, *(p for p in path.rglob("*") if p.is_dir())]:
+                                self._hold_dir(w, sub)
+                            self._mark(w, [p for p in path.rglob("*") if w.covers(p)], now)
+                    elif w.covers(path):
+                        self._mark(w, [path], now)
+
+    def _poll(self, now: float):
+        with self._lock:
+            watches = [w for w in self._watches.values() if w.polled]
+        for w in watches:
+            state = w.poll_state()
+            changed = [p for p in state.keys() | w.snapshot.keys() if state.get(p) != w.snapshot.get(p)]
+            w.snapshot = state
+            if changed:
+                with self._lock:
+                    self._mark(w, changed, now)
+
+    @staticmethod
+    def _mark(watch: _Watch, paths, now: float):
+        if not paths:
+            return
+        if not watch.pending:
+            watch.first_event = now
+        watch.pending.update(paths)
+        watch.deadline = now + watch.debounce
+
+    def _fire_due(self, now: float):
+        with self._lock:
+            due = [w for w in self._watches.values() if w.pending and w.deadline <= now]
+            batches = []
+            for w in due:
+                batches.append((w, sorted(w.pending), w.first_event))
+                w.pending = set()
+        for w, paths, first_event in batches:
+            changed = []
+            for path in paths:
+                digest = _content_hash(path)
+                with self._lock:
+                    if w.hashes.get(path, _UNSEEN) != digest:
+                        w.hashes[path] = digest
+                        changed.append(path)
+            if not changed:
+                w.suppressed += 1
+                continue
+            try:
+                w.callback(changed)
+            except Exception as e:
+                w.errors += 1
+                logger.error(f"[WATCH] {w.name} reload failed: {e}")
+                continue
+            ms = (time.monotonic() - first_event) * 1000
+            w.reloads += 1
+            w.last_ms = ms
+            w.total_ms += ms
+            w.max_ms = max(w.max_ms, ms)
+            logger.info(f"[WATCH] {w.name}: reloaded {len(changed)} changed file(s) in {ms:.0f} ms")
+
+    # ── Stats ──
+
+    def stats(self) -> dict:
+        with self._lock:
+            watches = list(self._watches.values())
+            dirs = len(self._dir_wds)
+        return {
+            "backend": self.backend,
+            "kernel_watches": dirs,
+            "watches": [{
+                "name": w.name,
+                "mode": "poll" if w.polled else self.backend,
+                "reloads": w.reloads,
+                "suppressed": w.suppressed,
+                "errors": w.errors,
+                "last_ms": round(w.last_ms, 1),
+                "avg_ms": round(w.total_ms / w.reloads, 1) if w.reloads else 0.0,
+                "max_ms": round(w.max_ms, 1),
+            } for w in watches],
+        }
+
+
+file_watcher = FileWatchService()
@@ -0,0 +1,275 @@
+"""
+Persistent caches for image galleries: thumbnails, composed grid pages and
+recursive folder image counts.
+
+The gallery plugin decodes and LANCZOS-resizes every original each time it
+builds a grid page, and walks every subfolder with rglob to count images on
+each browse. This module keeps that work on disk under the gallery root's
+_sapphire_cache folder, for the plugin to use from its next signed release:
+
+    cache = gallery_cache.get_cache(root)
+    thumbs = cache.thumbnails(page_images, 200)     # PIL images, None on failure
+    png = cache.grid_page(page_images, "3x2@200", build)
+    counts = cache.folder_counts(subfolders)        # {folder: images below it}
+
+  - thumbs/<key>.png — one per image, keyed by path + mtime + size (and the
+    thumbnail size), so editing a file regenerates it. JPEGs are opened in
+    draft mode so the decoder downscales instead of decoding full size.
+    Misses on a page are generated on a small thread pool.
+  - grids/<key>.png — finished pages keyed by layout and the page's file
+    keys. build() reports whether every tile rendered; pages with failed
+    tiles aren't stored, so the next call retries them.
+  - counts.json — per folder (relative to the root): its mtime, the images
+    directly in it and its subfolder names. A folder's mtime changes when an
+    entry is added, removed or renamed in it, so only folders whose mtime
+    moved are re-listed and totals are summed from the stored entries.
+
+A root where the cache folder can't be created (read-only collection)
+works uncached. Both file caches are capped and drop their oldest entries.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_NAME = "_sapphire_cache"
+IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tiff', '.tif'}
+
+THUMB_WORKERS = min(4, os.cpu_count() or 1)
+THUMB_CACHE_MAX = 20000   # cached thumbnails kept (oldest dropped past this)
+GRID_CACHE_MAX = 200      # cached grid pages kept
+
+_caches: Dict[Path, "GalleryCache"] = {}
+_caches_lock = threading.Lock()
+
+
+def file_key(img_path: Path, *extra) -> str:
+    """Cache key for an image: path + mtime + size, so edits invalidate it."""
+    st = img_path.stat()
+    raw = "|".join(str(p) for p in (img_path, st.st_mtime_ns, st.st_size) + extra)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def make_thumbnail(img_path: Path, size: int = 200):
+    """Square thumbnail padded onto a dark background. Returns a PIL Image."""
+    from PIL import Image
+    with Image.open(img_path) as img:
+        # JPEG: let the decoder downscale by 1/2..1/8 instead of decoding full size
+        img.draft("RGB", (size, size))
+        img.thumbnail((size, size), Image.LANCZOS)
+        result = Image.new("RGB", (size, size), (30, 30, 40))
+        offset = ((size - img.width) // 2, (size - img.height) // 2)
+        result.paste(img.convert("RGB"), offset)
+    return result
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _prune(folder: Path, keep: int):
+    """Drop the least recently written files past `keep`."""
+    try:
+        entries = [e for e in os.scandir(folder) if e.is_file()]
+    except OSError:
+        return
+    if len(entries) <= keep:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for e in entries[:len(entries) - keep]:
+        try:
+            os.unlink(e.path)
+        except OSError:
+            pass
+
+
+class GalleryCache:
+    """Caches for one gallery root. Use get_cache() to share instances."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.dir = self._open_dir()
+        self._counts_lock = threading.Lock()
+
+    def _open_dir(self) -> Optional[Path]:
+        cache = self.root / CACHE_DIR_NAME
+        try:
+            cache.mkdir(exist_ok=True)
+        except OSError as e:
+            logger.debug(f"Gallery cache unavailable at {cache}: {e}")
+            return None
+        return cache
+
+    def _subdir(self, name: str) -> Optional[Path]:
+        if self.dir is None:
+            return None
+        sub = self.dir / name
+        try:
+            sub.mkdir(exist_ok=True)
+        except OSError as e:
+            logger.debug(f"Gallery cache folder {sub} unavailable: {e}")
+            return None
+        return sub
+
+    # ── Thumbnails ──
+
+    def _thumbnail(self, img_path: Path, size: int, thumb_dir: Optional[Path]):
+        """(thumbnail, created) — from the cache, or generated and stored."""
+        from PIL import Image
+        if thumb_dir is None:
+            return make_thumbnail(img_path, size), False
+        cached = thumb_dir / f"{file_key(img_path, size)}.png"
+        try:
+            with Image.open(cached) as img:
+                img.load()
+                return img.convert("RGB"), False
+        except (OSError, ValueError):
+            pass
+        thumb = make_thumbnail(img_path, size)
+        try:
+            buf = io.BytesIO()
+            thumb.save(buf, format="PNG")
+            _write_atomic(cached, buf.getvalue())
+        except OSError as e:
+            logger.debug(f"Could not cache thumbnail for {img_path.name}: {e}")
+        return thumb, True
+
+    def thumbnails(self, images: List[Path], size: int = 200) -> list:
+        """Thumbnails for a page of images, in order (None where one failed).
+        Misses are generated in parallel — PIL releases the GIL while decoding."""
+        thumb_dir = self._subdir("thumbs")
+
+        def one(img_path):
+            try:
+                return self._thumbnail(img_path, size, thumb_dir)
+            except Exception as e:
+                logger.debug(f"Thumbnail failed for {img_path.name}: {e}")
+                return None, False
+
+        if THUMB_WORKERS > 1 and len(images) > 1:
+            with ThreadPoolExecutor(max_workers=THUMB_WORKERS, thread_name_prefix="gallery-thumb") as pool:
+                results = list(pool.map(one, images))
+        else:
+            results = [one(p) for p in images]
+
+        if thumb_dir is not None and any(created for _, created in results):
+            _prune(thumb_dir, THUMB_CACHE_MAX)
+        return [thumb for thumb, _ in results]
+
+    # ── Grid pages ──
+
+    def grid_page(self, images: List[Path], layout: str,
+                  build: Callable[[], Tuple[bytes, bool]]) -> bytes:
+        """A composed page of `images` from the cache, or from build().
+
+        `layout` is anything that changes the rendering (e.g. "3x2@200").
+        build() returns (png_bytes, complete); incomplete pages aren't kept.
+        """
+        grid_dir = self._subdir("grids")
+        grid_path = None
+        if grid_dir is not None:
+            try:
+                page_key = hashlib.sha1("\n".join(
+                    [layout] + [file_key(p) for p in images]
+                ).encode("utf-8")).hexdigest()
+                grid_path = grid_dir / f"{page_key}.png"
+                return grid_path.read_bytes()
+            except OSError:
+                pass
+        data, complete = build()
+        if grid_path is not None and complete:
+            try:
+                _write_atomic(grid_path, data)
+                _prune(grid_dir, GRID_CACHE_MAX)
+            except OSError as e:
+                logger.debug(f"Could not cache grid page: {e}")
+        return data
+
+    # ── Folder image counts ──
+
+    def _load_counts(self) -> dict:
+        if self.dir is None:
+            return {}
+        try:
+            with open(self.dir / "counts.json", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_counts(self, counts: dict):
+        if self.dir is None:
+            return
+        try:
+            _write_atomic(self.dir / "counts.json", json.dumps(counts).encode("utf-8"))
+        except OSError as e:
+            logger.debug(f"Could not save gallery counts: {e}")
+
+    def _count(self, folder: Path, counts: dict, exts) -> Tuple[int, bool]:
+        """Images in folder and everything below it, refreshing stale entries
+        in `counts`. Returns (total, changed)."""
+        total, changed = 0, False
+        stack = [folder]
+        while stack:
+            current = stack.pop()
+            key = current.relative_to(self.root).as_posix()
+            try:
+                mtime = os.stat(current).st_mtime_ns
+            except OSError:
+                continue
+            entry = counts.get(key)
+            if not entry or entry.get("mtime") != mtime:
+                direct, subdirs = 0, []
+                try:
+                    with os.scandir(current) as it:
+                        for e in it:
+                            if e.is_dir(follow_symlinks=False):
+                                if e.name != CACHE_DIR_NAME:
+                                    subdirs.append(e.name)
+                            elif os.path.splitext(e.name)[1].lower() in exts:
+                                direct += 1
+                except OSError:
+                    continue
+                entry = counts[key] = {"mtime": mtime, "images": direct, "dirs": subdirs}
+                changed = True
+            total += entry["images"]
+            stack.extend(current / name for name in entry["dirs"])
+        return total, changed
+
+    def folder_counts(self, folders: Iterable[Path], exts=IMAGE_EXTS) -> Dict[Path, int]:
+        """Recursive image counts for folders under the root, sharing one
+        counts.json. Editing an image in place doesn't change a count, so
+        file mtimes aren't checked."""
+        with self._counts_lock:
+            counts = self._load_counts()
+            result, dirty = {}, False
+            for folder in folders:
+                result[folder], changed = self._count(Path(folder), counts, exts)
+                dirty = dirty or changed
+            if dirty:
+                self._save_counts(counts)
+        return result
+
+
+def get_cache(root) -> GalleryCache:
+    """The shared GalleryCache for a gallery root."""
+    root = Path(root)
+    with _caches_lock:
+        cache = _caches.get(root)
+        if cache is None or (cache.dir is not None and not cache.dir.exists()):
+            cache = _caches[root] = GalleryCache(root)
+        return cache
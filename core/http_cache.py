@@ -0,0 +1,343 @@
+"""
+Disk-backed HTTP response cache for web tool fetches.
+
+Mounted on socks_proxy.get_caching_session(), which web tools use for
+pages and Wikipedia. get_session() stays uncached, so IP checks and the
+SOCKS connectivity test always hit the network. GET responses are stored
+under user/cache/http and reused according to the server's own headers:
+
+  - Cache-Control max-age / s-maxage or Expires → fresh for that long
+  - no-store (or Vary: *) → never stored
+  - no-cache, or fresh time used up → revalidated with If-None-Match /
+    If-Modified-Since; a 304 serves the stored body and refreshes it
+  - no freshness headers at all → HTML pages get WEB_CACHE_TTL, anything
+    else (APIs) is only reused via revalidation
+  - Vary: <headers> → the request's values for those headers are stored
+    with the entry; a request that differs in any of them is a miss
+
+Only complete 200 responses on non-streamed requests are stored. Entries
+are keyed by URL plus proxy, so turning SOCKS on or off never serves a body
+fetched over the other route.
+"""
+
+import email.utils
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+import config
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(__file__).parent.parent / 'user' / 'cache' / 'http'
+
+DEFAULT_TTL = 600
+DEFAULT_MAX_MB = 100
+# Bodies larger than this aren't worth the disk churn (downloads, media).
+MAX_ENTRY_BYTES = 5 * 1024 * 1024
+# Prune check runs every N stores rather than on every write.
+_PRUNE_EVERY = 50
+
+# Response headers not carried over to a replayed response — the body is
+# stored decoded, so encoding/length must not claim otherwise.
+_DROP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+_HTML_TYPES = ('text/html', 'application/xhtml+xml')
+
+
+def _enabled():
+    return bool(getattr(config, 'WEB_CACHE_ENABLED', True))
+
+
+def _fallback_ttl():
+    try:
+        return max(0, int(getattr(config, 'WEB_CACHE_TTL', DEFAULT_TTL)))
+    except (TypeError, ValueError):
+        return DEFAULT_TTL
+
+
+def _max_bytes():
+    try:
+        return max(1, int(getattr(config, 'WEB_CACHE_MAX_MB', DEFAULT_MAX_MB))) * 1024 * 1024
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_MB * 1024 * 1024
+
+
+def _parse_cache_control(value):
+    directives = {}
+    for part in (value or '').split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        name, _, arg = part.partition('=')
+        directives[name.strip()] = arg.strip().strip('"')
+    return directives
+
+
+def _http_date(value):
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def _vary_values(resp_headers, req_headers):
+    """The request's values for each header the response varies on."""
+    names = [n.strip().lower() for n in resp_headers.get('Vary', '').split(',') if n.strip()]
+    return {n: req_headers.get(n) for n in names}
+
+
+def freshness_lifetime(headers, now=None):
+    """Seconds a response may be served without revalidation, or None if it
+    must not be stored at all. 0 means store, but revalidate before reuse."""
+    cc = _parse_cache_control(headers.get('Cache-Control'))
+    if 'no-store' in cc or headers.get('Vary', '').strip() == '*':
+        return None
+    if 'no-cache' in cc:
+        return 0
+    for name in ('s-maxage', 'max-age'):
+        if name in cc:
+            try:
+                return max(0, int(cc[name]))
+            except ValueError:
+                return 0
+    expires = headers.get('Expires')
+    if expires is not None:
+        exp = _http_date(expires)
+        if exp is None:
+            return 0
+        now = time.time() if now is None else now
+        date = _http_date(headers.get('Date')) or now
+        return max(0, int(exp - date))
+    ctype = headers.get('Content-Type', '').lower()
+    if ctype.startswith(_HTML_TYPES):
+        return _fallback_ttl()
+    return 0
+
+
+class HTTPCache:
+    """Entry store: <key>.json (metadata) + <key>.body (decoded bytes)."""
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else CACHE_DIR
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0}
+
+    @staticmethod
+    def key_for(url, proxy=''):
+        return hashlib.sha256(f"{proxy}|{url}".encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def load(self, key):
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None, None
+        if len(body) != meta.get('size', -1):
+            return None, None
+        return meta, body
+
+    def store(self, key, meta, body):
+        meta = dict(meta, size=len(body))
+        meta_path, body_path = self._paths(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._atomic_write(body_path, body)
+            self._atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"[WEB] cache write failed: {e}")
+            return
+        with self._lock:
+            self._stats['stored'] += 1
+            self._writes += 1
+            prune = self._writes % _PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def touch(self, key, meta):
+        """Rewrite metadata only (after a 304)."""
+        meta_path, _ = self._paths(key)
+        try:
+            self._atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"[WEB] cache meta update failed: {e}")
+
+    def _atomic_write(self, path, data):
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            Path(tmp).replace(path)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def prune(self, max_bytes=None):
+        """Drop least-recently-stored entries until under the size cap."""
+        max_bytes = max_bytes or _max_bytes()
+        try:
+            bodies = [(p.stat().st_mtime, p.stat().st_size, p) for p in self.directory.glob('*.body')]
+        except OSError:
+            return 0
+        total = sum(size for _, size, _ in bodies)
+        removed = 0
+        for _, size, body in sorted(bodies):
+            if total <= max_bytes:
+                break
+            for p in (body, body.with_suffix('.json')):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+            total -= size
+            removed += 1
+        if removed:
+            logger.info(f"[WEB] cache pruned {removed} entries")
+        return removed
+
+    def clear(self):
+        if not self.directory.exists():
+            return
+        for p in self.directory.iterdir():
+            if p.suffix in ('.json', '.body', '.tmp'):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+
+    def count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+_cache = HTTPCache()
+
+
+def get_cache():
+    return _cache
+
+
+class CachingAdapter(HTTPAdapter):
+    """HTTPAdapter that answers GETs from HTTPCache when allowed."""
+
+    def __init__(self, cache=None, **kwargs):
+        self.cache = cache or _cache
+        super().__init__(**kwargs)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        kw = dict(stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        cacheable = (
+            _enabled() and not stream and request.method == 'GET'
+            and 'Range' not in request.headers and 'Authorization' not in request.headers
+        )
+        if not cacheable:
+            return super().send(request, **kw)
+
+        proxy = (proxies or {}).get(request.url.split(':', 1)[0], '')
+        key = self.cache.key_for(request.url, proxy)
+        meta, body = self.cache.load(key)
+        if meta is not None and _vary_values(meta['headers'], request.headers) != meta.get('vary', {}):
+            meta = body = None  # stored for another variant; refetch and replace it
+        now = time.time()
+
+        if meta is not None and now < meta.get('fresh_until', 0):
+            self.cache.count('hits')
+            return self._replay(request, meta, body)
+
+        if meta is not None:
+            etag = meta['headers'].get('ETag')
+            modified = meta['headers'].get('Last-Modified')
+            if etag:
+                request.headers['If-None-Match'] = etag
+            if modified:
+                request.headers['If-Modified-Since'] = modified
+
+        resp = super().send(request, **kw)
+
+        if resp.status_code == 304 and meta is not None:
+            # Server confirmed the stored body — refresh freshness from the
+            # 304's headers layered over the stored ones.
+            merged = CaseInsensitiveDict(meta['headers'])
+            for k, v in resp.headers.items():
+                if k.lower() not in _DROP_HEADERS:
+                    merged[k] = v
+            lifetime = freshness_lifetime(merged, now)
+            meta['headers'] = dict(merged)
+            meta['vary'] = _vary_values(merged, request.headers)
+            meta['fresh_until'] = now + (lifetime or 0)
+            self.cache.touch(key, meta)
+            self.cache.count('revalidated')
+            resp.close()
+            return self._replay(request, meta, body)
+
+        self.cache.count('misses')
+        if resp.status_code == 200:
+            self._maybe_store(key, request, resp, now)
+        return resp
+
+    def _maybe_store(self, key, request, resp, now):
+        lifetime = freshness_lifetime(resp.headers, now)
+        if lifetime is None:
+            return
+        if lifetime == 0 and not (resp.headers.get('ETag') or resp.headers.get('Last-Modified')):
+            return  # Nothing to reuse it with
+        try:
+            body = resp.content
+        except Exception:
+            return
+        if len(body) > MAX_ENTRY_BYTES:
+            return
+        headers = {k: v for k, v in resp.headers.items() if k.lower() not in _DROP_HEADERS}
+        self.cache.store(key, {
+            'url': resp.url,
+            'headers': headers,
+            'encoding': resp.encoding,
+            'vary': _vary_values(resp.headers, request.headers),
+            'stored_at': now,
+            'fresh_until': now + lifetime,
+        }, body)
+
+    def _replay(self, request, meta, body):
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.reason = 'OK'
+        resp.headers = CaseInsensitiveDict(meta['headers'])
+        resp._content = body
+        resp._content_consumed = True
+        resp.encoding = meta.get('encoding')
+        resp.url = meta.get('url') or request.url
+        resp.request = request
+        resp.connection = self
+        resp.from_cache = True
+        return resp
+
+
+def install(session):
+    """Mount the caching adapter on a requests session for http and https."""
+    adapter = CachingAdapter()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
@@ -0,0 +1,160 @@
+"""
+Request logging, CSRF check and security headers as one pure-ASGI middleware.
+
+This replaces three @app.middleware("http") functions. Starlette runs each of
+those as a BaseHTTPMiddleware: a task plus memory stream per request, and
+every body chunk is re-sent through each layer — including every SSE frame
+of /api/chat/stream and /api/events. Here the only per-message work is a
+header merge on http.response.start; body messages pass straight through.
+
+Also keeps per-route latency counters (time to first byte and total) keyed
+by the matched route template, served at /api/metrics/routes.
+"""
+
+import logging
+import threading
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger("core.api_fastapi")
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Form-based endpoints handle their own CSRF
+CSRF_EXEMPT_PATHS = ("/login", "/setup")
+
+_SECURITY_HEADERS = (
+    ("X-Content-Type-Options", "nosniff"),
+    ("X-Frame-Options", "DENY"),
+    ("X-XSS-Protection", "1; mode=block"),
+    ("Connection", "keep-alive"),
+)
+
+
+class RouteLatency:
+    """In-memory per-route counters. Keys are "METHOD /route/{template}",
+    so path parameters don't explode the table."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, key: str, status: int, ttfb: float, total: float):
+        with self._lock:
+            r = self._routes.get(key)
+            if r is None:
+                r = self._routes[key] = {"count": 0, "errors": 0, "ttfb_sum": 0.0, "ttfb_max": 0.0,
+                                         "total_sum": 0.0, "total_max": 0.0}
+            r["count"] += 1
+            if status >= 500:
+                r["errors"] += 1
+            r["ttfb_sum"] += ttfb
+            r["total_sum"] += total
+            if ttfb > r["ttfb_max"]:
+                r["ttfb_max"] = ttfb
+            if total > r["total_max"]:
+                r["total_max"] = total
+
+    def snapshot(self):
+        """List of per-route stats in ms, busiest (by total time) first."""
+        with self._lock:
+            items = [(k, dict(v)) for k, v in self._routes.items()]
+        out = []
+        for key, r in items:
+            n = r["count"] or 1
+            out.append({
+                "route": key,
+                "count": r["count"],
+                "errors": r["errors"],
+                "avg_ttfb_ms": round(r["ttfb_sum"] / n * 1000, 2),
+                "max_ttfb_ms": round(r["ttfb_max"] * 1000, 2),
+                "avg_ms": round(r["total_sum"] / n * 1000, 2),
+                "max_ms": round(r["total_max"] * 1000, 2),
+            })
+        out.sort(key=lambda r: r["avg_ms"] * r["count"], reverse=True)
+        return out
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_latency = RouteLatency()
+
+
+def _route_key(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return f"{scope['method']} {path or '<unmatched>'}"
+
+
+class SapphireHTTPMiddleware:
+    """Pure-ASGI replacement for log_requests + csrf_protection + security_headers.
+
+    Must sit inside SessionMiddleware (CSRF reads scope["session"]).
+    """
+
+    def __init__(self, app, latency: RouteLatency = None):
+        self.app = app
+        self.latency = latency if latency is not None else route_latency
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        path = scope["path"]
+        is_static = path.startswith("/static/")
+        if is_static:
+            logger.debug(f"REQ: {method} {path}")
+        else:
+            logger.info(f"REQ: {method} {path}")
+
+        start = time.perf_counter()
+        state = {"status": 500, "ttfb": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                state["ttfb"] = time.perf_counter() - start
+                headers = MutableHeaders(scope=message)
+                for name, value in _SECURITY_HEADERS:
+                    headers[name] = value
+                # Static assets set their own Cache-Control (core/static_assets.py)
+                if not is_static and "cache-control" not in headers:
+                    # API responses must never be cached — prevents stale fetch() after hard refresh
+                    # (Ctrl+Shift+R only bypasses cache for HTML, not JS fetch() calls)
+                    headers["Cache-Control"] = "no-store"
+            await send(message)
+
+        try:
+            if method not in SAFE_METHODS and self._csrf_failed(scope):
+                response = JSONResponse(status_code=403, content={"detail": "CSRF validation failed"})
+                await response(scope, receive, send_wrapper)
+            else:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            total = time.perf_counter() - start
+            status = state["status"]
+            if status >= 400 and not is_static:
+                logger.warning(f"RSP: {status} {method} {path}")
+            ttfb = state["ttfb"] if state["ttfb"] is not None else total
+            self.latency.record(_route_key(scope), status, ttfb, total)
+
+    @staticmethod
+    def _csrf_failed(scope) -> bool:
+        """Validate CSRF token on state-changing requests from browser sessions."""
+        headers = Headers(scope=scope)
+        # API key auth (internal/tool calls) — skip CSRF
+        if headers.get("x-api-key"):
+            return False
+        if scope["path"] in CSRF_EXEMPT_PATHS:
+            return False
+        session = scope.get("session") or {}
+        if not session.get("logged_in"):
+            return False
+        csrf_header = headers.get("x-csrf-token")
+        session_token = session.get("csrf_token")
+        return not csrf_header or not session_token or csrf_header != session_token
@@ -13,6 +13,7 @@ import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Callable, Tuple
 
+from core.file_watch import file_watcher
 from core.hooks import hook_runner
 from core.plugin_verify import verify_plugin
 
@@ -152,8 +153,7 @@ class PluginLoader:
         self._load_errors: list = []  # Accumulates startup errors for frontend display
         self._function_manager = None  # Set via scan() for plugin tool loading
         self._scheduler = None  # Set via set_scheduler() for plugin schedule tasks
-        self._watcher_running = False
-        self._watcher_thread = None
+        self._watch_id = None  # core.file_watch registration (dev mode)
         # Route registry: {plugin_name: [(method, compiled_regex, param_names, handler_func), ...]}
         self._routes: Dict[str, list] = {}
         # Daemon event source registry: {plugin_name: [source_defs]}
@@ -1307,23 +1307,16 @@ class PluginLoader:
         Args:
             source_name: The event source name (matches trigger_config.source)
             event_data: String payload to pass to the task
+
+        Returns True if any task accepted the event (possibly held briefly
+        to coalesce a burst — see core/continuity/event_router.py).
         """
         if not self._scheduler:
             logger.warning(f"[PLUGINS] Cannot emit event '{source_name}': no scheduler")
             return
 
-        tasks = self._scheduler.find_tasks_by_event(source_name)
-        if not tasks:
-            logger.debug(f"[PLUGINS] No tasks listening for event source '{source_name}'")
-            return
-
         reply_handler = self._get_reply_handler(source_name)
-        any_accepted = False
-        for task in tasks:
-            result = self._scheduler.fire_event_task(task["id"], event_data, reply_callback=reply_handler)
-            if result.get("success", False) or result.get("error") not in ("Event filtered out", "Account mismatch"):
-                any_accepted = True
-        return any_accepted
+        return self._scheduler.route_event(source_name, event_data, reply_callback=reply_handler)
 
     def active_daemon_accounts(self, source_name: str) -> set:
         """Return set of account names with enabled daemon tasks for a given event source."""
@@ -1410,69 +1403,32 @@ class PluginLoader:
     # ── File watcher (dev mode) ──
 
     def start_watcher(self):
-        """Start mtime-based file watcher for loaded plugins. Dev mode only."""
-        if self._watcher_running:
+        """Watch plugin trees for .py/.json edits and reload the owning plugin. Dev mode only."""
+        if self._watch_id is not None:
             return
-        self._watcher_running = True
-        self._watcher_thread = threading.Thread(
-            target=self._watcher_loop, daemon=True, name="PluginFileWatcher"
-        )
-        self._watcher_thread.start()
+        roots = [d for d in (SYSTEM_PLUGINS_DIR, USER_PLUGINS_DIR) if d.is_dir()]
+        self._watch_id = file_watcher.watch(roots, self._on_files_changed, name="plugins",
+                                            recursive=True, suffixes=(".py", ".json"))
         logger.info("[PLUGINS] File watcher started (dev mode)")
 
     def stop_watcher(self):
         """Stop the file watcher."""
-        self._watcher_running = False
-        if self._watcher_thread:
-            self._watcher_thread.join(timeout=5)
-            self._watcher_thread = None
-
-    def _watcher_loop(self):
-        """Poll loaded plugin dirs for file changes, reload on change."""
-        import time as _time
+        if self._watch_id is None:
+            return
+        file_watcher.unwatch(self._watch_id)
+        self._watch_id = None
 
-        # Snapshot initial mtimes
-        mtimes: Dict[str, float] = {}
+    def _on_files_changed(self, changed):
+        """Reload each loaded plugin that owns one of the changed files."""
         with self._lock:
             snapshot = list(self._plugins.items())
         for name, info in snapshot:
-            if info.get("loaded"):
-                mtimes[name] = self._dir_mtime(info["path"])
-
-        while self._watcher_running:
-            _time.sleep(2)
-            with self._lock:
-                snapshot = list(self._plugins.items())
-            for name, info in snapshot:
-                if not info.get("loaded"):
-                    # Track newly loaded plugins so first poll doesn't spuriously reload
-                    if name not in mtimes and info["path"].exists():
-                        mtimes[name] = self._dir_mtime(info["path"])
-                    continue
-                current = self._dir_mtime(info["path"])
-                prev = mtimes.get(name, 0)
-                if prev == 0:
-                    # First time seeing this plugin loaded — snapshot, don't reload
-                    mtimes[name] = current
-                    continue
-                if current > prev:
-                    logger.info(f"[PLUGINS] File change detected in '{name}', reloading...")
-                    self.reload_plugin(name)
-                    mtimes[name] = self._dir_mtime(info["path"])
-
-    @staticmethod
-    def _dir_mtime(path: Path) -> float:
-        """Get max mtime of all .py and .json files in a directory tree."""
-        max_mtime = 0.0
-        try:
-            for f in path.rglob("*"):
-                if f.suffix in (".py", ".json") and f.is_file():
-                    mt = f.stat().st_mtime
-                    if mt > max_mtime:
-                        max_mtime = mt
-        except Exception:
-            pass
-        return max_mtime
+            if not info.get("loaded"):
+                continue
+            root = Path(info["path"]).absolute()
+            if any(root in p.parents for p in changed):
+                logger.info(f"[PLUGINS] File change detected in '{name}', reloading...")
+                self.reload_plugin(name)
 
 
 # Singleton
@@ -2,10 +2,11 @@ import logging
 import json
 import shutil
 import threading
-import time
 from datetime import datetime
 from pathlib import Path
 
+from core.file_watch import file_watcher
+
 logger = logging.getLogger(__name__)
 
 class PromptManager:
@@ -24,9 +25,7 @@ class PromptManager:
         self._disabled_categories = set()
         
         self._lock = threading.Lock()
-        self._watcher_thread = None
-        self._watcher_running = False
-        self._last_mtimes = {}
+        self._watch_id = None
         self._active_preset_name = 'unknown'
 
         # 2026-04-22 fix E — load-failure tracking. If a load function fails
@@ -175,63 +174,31 @@ class PromptManager:
             logger.info("Prompt data reloaded")
     
     def start_file_watcher(self):
-        """Start background file watcher for user prompts."""
-        if self._watcher_thread is not None and self._watcher_thread.is_alive():
+        """Register user prompt files with the shared file watch service."""
+        if self._watch_id is not None:
             logger.warning("File watcher already running")
             return
         
-        self._watcher_running = True
-        self._watcher_thread = threading.Thread(
-            target=self._file_watcher_loop,
-            daemon=True,
-            name="PromptFileWatcher"
-        )
-        self._watcher_thread.start()
+        self._watch_id = file_watcher.watch([
+            self.USER_DIR / "prompt_pieces.json",
+            self.USER_DIR / "prompt_monoliths.json",
+            self.USER_DIR / "prompt_spices.json"
+        ], self._on_file_change, name="prompts")
         logger.info("Prompt file watcher started")
     
     def stop_file_watcher(self):
         """Stop the file watcher."""
-        if self._watcher_thread is None:
+        if self._watch_id is None:
             return
         
-        self._watcher_running = False
-        if self._watcher_thread.is_alive():
-            self._watcher_thread.join(timeout=5)
+        file_watcher.unwatch(self._watch_id)
+        self._watch_id = None
         logger.info("Prompt file watcher stopped")
     
-    def _file_watcher_loop(self):
-        """Watch user prompt files for changes."""
-        watch_files = [
-            self.USER_DIR / "prompt_pieces.json",
-            self.USER_DIR / "prompt_monoliths.json",
-            self.USER_DIR / "prompt_spices.json"
-        ]
-        
-        while self._watcher_running:
-            try:
-                time.sleep(2)
-                
-                changed = False
-                for path in watch_files:
-                    if not path.exists():
-                        continue
-                    
-                    current_mtime = path.stat().st_mtime
-                    last_mtime = self._last_mtimes.get(str(path))
-                    
-                    if last_mtime is not None and current_mtime != last_mtime:
-                        logger.info(f"Detected change in {path.name}")
-                        changed = True
-                    
-                    self._last_mtimes[str(path)] = current_mtime
-                
-                if changed:
-                    time.sleep(0.5)  # Debounce
-                    self.reload()
-            
-            except Exception as e:
-                logger.error(f"File watcher error: {e}")
-                time.sleep(5)
+    def _on_file_change(self, changed):
+        """File watch callback — a user prompt file changed on disk."""
+        logger.info(f"Detected change in {', '.join(p.name for p in changed)}")
+        self.reload()
     
     def assemble_from_components(self, components):
         """Assemble prompt text from component structure."""
@@ -312,6 +279,7 @@ class PromptManager:
             with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2)
             tmp_path.replace(target_path)
+            file_watcher.note_write(target_path)
             logger.info(f"Saved scenario presets to {target_path}")
     
     def save_monoliths(self):
@@ -358,6 +326,7 @@ class PromptManager:
             with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2)
             tmp_path.replace(target_path)
+            file_watcher.note_write(target_path)
             logger.info(f"Saved monoliths to {target_path}")
     
     def save_components(self):
@@ -388,6 +357,7 @@ class PromptManager:
             with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2)
             tmp_path.replace(target_path)
+            file_watcher.note_write(target_path)
             logger.info(f"Saved components to {target_path}")
     
     def save_spices(self):
@@ -415,6 +385,7 @@ class PromptManager:
             with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
             tmp_path.replace(target_path)
+            file_watcher.note_write(target_path)
             logger.info(f"Saved spices to {target_path}")
     
     def is_category_enabled(self, category: str) -> bool:
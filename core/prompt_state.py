@@ -275,13 +275,39 @@ def assemble_prompt():
         if emotion in emotions:
             parts.append(emotions[emotion])
     
-    if _assembled_state["spice"]:
-        parts.append(f'URGENT ALERT: {_assembled_state["spice"]}')
-    
+    spice = spice_line(_assembled_state["spice"])
+    if spice:
+        parts.append(spice)
+
     assembled = "\n".join(filter(None, parts))
     return {"role": "system", "content": prompt_manager._replace_templates(assembled)}
 
 
+def spice_line(spice=None):
+    """The line assemble_prompt appends for the active spice ('' if none)."""
+    spice = _assembled_state.get("spice", "") if spice is None else spice
+    return f'URGENT ALERT: {spice}' if spice else ""
+
+
+def split_spice(content):
+    """Split the active spice line off an assembled prompt.
+
+    Spice rotates every few turns; kept inside the prompt it would change
+    the cache-stable prefix (see core/chat/prompt_layout.py). Returns
+    (content_without_spice, spice_line). If the prompt doesn't end with the
+    current spice line (monolith prompt, stale content) it is returned as-is.
+    """
+    line = spice_line()
+    if not line or not content:
+        return content, ""
+    rendered = prompt_manager._replace_templates(line)
+    if content.endswith("\n" + rendered):
+        return content[:-len(rendered) - 1], rendered
+    if content == rendered:
+        return "", rendered
+    return content, ""
+
+
 def is_assembled_mode():
     """Check if currently using piece-based assembly."""
     preset = _assembled_state.get("active_preset", "default")
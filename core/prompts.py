@@ -37,6 +37,7 @@ from .prompt_state import (
     get_current_spice,
     get_next_spice,
     invalidate_spice_picks,
+    split_spice,
     assemble_prompt,
     is_assembled_mode,
     set_component,
@@ -93,6 +94,7 @@ __all__ = [
     'get_current_spice',
     'get_next_spice',
     'invalidate_spice_picks',
+    'split_spice',
     'assemble_prompt',
     'is_assembled_mode',
     'set_component',
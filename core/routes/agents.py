@@ -48,6 +48,15 @@ async def agent_status(chat: str = Query('', description="Filter by chat name"),
     return {"agents": system.agent_manager.check_all(chat_name=chat)}
 
 
+@router.get("/api/agents/stats")
+async def agent_stats(_=Depends(require_login)):
+    """Agent pool occupancy, queue depth, throughput and wait/run latency."""
+    system = get_system()
+    if not hasattr(system, 'agent_manager'):
+        return {}
+    return system.agent_manager.stats()
+
+
 @router.get("/api/agents/providers")
 async def agent_providers(_=Depends(require_login)):
     import config as cfg
@@ -14,6 +14,7 @@ from core.auth import require_login, check_endpoint_rate
 from core.api_fastapi import get_system, _apply_chat_settings, PROJECT_ROOT
 from core.event_bus import publish, Events
 from core import prompts
+from core.chat.image_store import display_image
 from core.stt.stt_null import NullWhisperClient as _NullWhisperClient
 from core.stt.utils import can_transcribe
 from core.wakeword.wakeword_null import NullWakeWordDetector as _NullWakeWordDetector
@@ -65,10 +66,7 @@ def format_messages_for_display(messages):
                         if block.get("type") == "text":
                             text_parts.append(block.get("text", ""))
                         elif block.get("type") == "image":
-                            images.append({
-                                "data": block.get("data", ""),
-                                "media_type": block.get("media_type", "image/jpeg")
-                            })
+                            images.append(display_image(block))
                         elif block.get("type") == "file":
                             user_files.append({
                                 "filename": block.get("filename", ""),
@@ -221,10 +219,18 @@ async def handle_chat_stream(request: Request, _=Depends(require_login), system=
     stream, sid, active_chat = system.llm_chat.begin_stream()
     system.web_active_inc()
 
+    from core.chat.stream_coalescer import StreamCoalescer, DEFAULT_WINDOW_MS, DEFAULT_MAX_CHARS
+    events = StreamCoalescer(
+        stream.chat_stream(data['text'], prefill=prefill, skip_user_message=skip_user_message, images=images, files=files),
+        window_ms=getattr(config, 'STREAM_COALESCE_MS', DEFAULT_WINDOW_MS),
+        max_chars=getattr(config, 'STREAM_COALESCE_MAX_CHARS', DEFAULT_MAX_CHARS),
+        on_cancel=lambda: setattr(stream, 'cancel_flag', True),
+    )
+
     def generate():
         try:
             chunk_count = 0
-            for event in stream.chat_stream(data['text'], prefill=prefill, skip_user_message=skip_user_message, images=images, files=files):
+            for event in events:
                 if stream.cancel_flag:
                     logger.info(f"STREAMING CANCELLED at chunk {chunk_count}")
                     yield f"data: {json.dumps({'cancelled': True})}\n\n"
@@ -260,7 +266,7 @@ async def handle_chat_stream(request: Request, _=Depends(require_login), system=
 
             if not stream.cancel_flag:
                 ephemeral = stream.ephemeral
-                logger.info(f"STREAMING COMPLETE: {chunk_count} chunks, ephemeral={ephemeral}, chat={active_chat!r}")
+                logger.info(f"STREAMING COMPLETE: {chunk_count} chunks, {events.stats()}, ephemeral={ephemeral}, chat={active_chat!r}")
                 yield f"data: {json.dumps({'done': True, 'ephemeral': ephemeral})}\n\n"
 
         except ConnectionError as e:
@@ -274,6 +280,9 @@ async def handle_chat_stream(request: Request, _=Depends(require_login), system=
             msg = friendly_llm_error(e) or str(e)
             yield f"data: {json.dumps({'error': msg})}\n\n"
         finally:
+            # Cancels the stream if it's still running (client went away)
+            # and waits for chat_stream's own cleanup before unregistering.
+            events.close()
             system.llm_chat.end_stream(sid, active_chat)
             system.web_active_dec()
 
@@ -764,8 +773,8 @@ async def edit_message(request: Request, _=Depends(require_login), system=Depend
 
 @router.get("/api/history/raw")
 async def get_raw_history(request: Request, _=Depends(require_login), system=Depends(get_system)):
-    """Get raw history structure."""
-    return system.llm_chat.session_manager.get_messages()
+    """Get raw history structure, with attached images inlined for re-import."""
+    return system.llm_chat.session_manager.export_messages()
 
 
 @router.post("/api/history/import")
@@ -776,9 +785,7 @@ async def import_history(request: Request, _=Depends(require_login), system=Depe
     if not messages or not isinstance(messages, list):
         raise HTTPException(status_code=400, detail="Invalid messages array")
     try:
-        session_manager = system.llm_chat.session_manager
-        session_manager.current_chat.messages = messages
-        session_manager._save_current_chat()
+        system.llm_chat.session_manager.import_messages(messages)
         return {"status": "success", "message": f"Imported {len(messages)} messages"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,4 +1,4 @@
-# core/routes/media.py - Tool image serving and SDXL image proxy
+# core/routes/media.py - Tool/chat image serving and SDXL image proxy
 import asyncio
 import io
 import json
@@ -35,6 +35,28 @@ async def serve_tool_image(image_id: str, request: Request, _=Depends(require_lo
     return Response(content=data, media_type=media_type)
 
 
+@router.get("/api/chat-image/{image_id}")
+async def serve_chat_image(image_id: str, request: Request, _=Depends(require_login)):
+    """Serve a user-attached chat image. Ids are content hashes, so the
+    response never changes and the browser can cache it for good."""
+    from core.chat.image_store import IMAGE_ID_RE
+    if not IMAGE_ID_RE.match(image_id):
+        raise HTTPException(status_code=400, detail="Invalid image ID")
+
+    etag = f'"{image_id}"'
+    headers = {"Cache-Control": "private, max-age=31536000, immutable", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    system = get_system()
+    result = await asyncio.to_thread(system.llm_chat.session_manager.get_chat_image, image_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    data, media_type = result
+    return Response(content=data, media_type=media_type, headers=headers)
+
+
 @router.get("/api/sdxl-image/{image_id}")
 async def proxy_sdxl_image(image_id: str, request: Request, _=Depends(require_login)):
     """Proxy SDXL images."""
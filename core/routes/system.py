@@ -73,6 +73,15 @@ async def delete_backup(filename: str, request: Request, _=Depends(require_login
 async def download_backup(filename: str, request: Request, _=Depends(require_login)):
     """Download a backup."""
     from core.backup import backup_manager
+    if filename.endswith(".json"):
+        # Incremental backup — assemble a tar.gz from its chunks, delete after sending
+        from starlette.background import BackgroundTask
+        filepath = backup_manager.export_backup(filename)
+        if not filepath:
+            raise HTTPException(status_code=404, detail="Backup not found")
+        return FileResponse(filepath, filename=filename[:-len(".json")] + ".tar.gz",
+                            media_type='application/gzip',
+                            background=BackgroundTask(filepath.unlink, missing_ok=True))
     filepath = backup_manager.get_backup_path(filename)
     if filepath:
         return FileResponse(filepath, filename=filename, media_type='application/gzip')
@@ -80,6 +89,16 @@ async def download_backup(filename: str, request: Request, _=Depends(require_log
         raise HTTPException(status_code=404, detail="Backup not found")
 
 
+@router.post("/api/backup/verify/{filename}")
+def verify_backup(filename: str, request: Request, _=Depends(require_login)):
+    """Verify an incremental backup's chunks. Sync so hashing runs in the threadpool."""
+    from core.backup import backup_manager
+    result = backup_manager.verify_backup(filename)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Incremental backup not found")
+    return result
+
+
 # =============================================================================
 # AUDIO DEVICE ROUTES
 # =============================================================================
@@ -326,6 +345,39 @@ async def get_continuity_activity(request: Request, _=Depends(require_login), sy
     return {"activity": system.continuity_scheduler.get_activity(limit)}
 
 
+def _hours_param(raw, default=None):
+    """Parse an `hours` query param; 400 on anything that isn't a positive number."""
+    if raw in (None, ""):
+        return default
+    try:
+        hours = float(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid hours")
+    if not hours > 0 or hours == float("inf"):
+        raise HTTPException(status_code=400, detail="Invalid hours")
+    return hours
+
+
+@router.get("/api/continuity/runs")
+async def get_continuity_runs(request: Request, _=Depends(require_login), system=Depends(get_system)):
+    """Get task run history with per-run timings (newest first)."""
+    if not hasattr(system, 'continuity_scheduler') or not system.continuity_scheduler:
+        return {"runs": []}
+    params = request.query_params
+    hours = _hours_param(params.get("hours"))
+    limit = min(int(params.get("limit", 200)), 1000)
+    return {"runs": system.continuity_scheduler.get_runs(params.get("task_id"), hours, limit)}
+
+
+@router.get("/api/continuity/run-stats")
+async def get_continuity_run_stats(request: Request, _=Depends(require_login), system=Depends(get_system)):
+    """Get per-task run counts and timing averages over the last N hours."""
+    if not hasattr(system, 'continuity_scheduler') or not system.continuity_scheduler:
+        return {"stats": []}
+    hours = _hours_param(request.query_params.get("hours"), 24)
+    return {"stats": system.continuity_scheduler.get_run_stats(hours)}
+
+
 @router.get("/api/continuity/timeline")
 async def get_continuity_timeline(request: Request, _=Depends(require_login), system=Depends(get_system)):
     """Get continuity task timeline (future only, legacy)."""
@@ -629,6 +681,20 @@ async def metrics_daily(request: Request, _=Depends(require_login)):
     return {"daily": metrics.daily_usage(days=days)}
 
 
+@router.get("/api/metrics/routes")
+async def metrics_routes(request: Request, _=Depends(require_login)):
+    """Per-route request latency since startup (time to first byte and total)."""
+    from core.http_middleware import route_latency
+    return {"routes": route_latency.snapshot()}
+
+
+@router.get("/api/metrics/watch")
+async def metrics_watch(request: Request, _=Depends(require_login)):
+    """File watch service: backend and per-watch reload counts / latency."""
+    from core.file_watch import file_watcher
+    return file_watcher.stats()
+
+
 # =============================================================================
 # EVENT ROUTES (Daemons + Webhooks)
 # =============================================================================
@@ -12,7 +12,8 @@ from fastapi.responses import StreamingResponse
 import config
 from core.auth import require_login, check_endpoint_rate
 from core.api_fastapi import get_system
-from core.stt.utils import can_transcribe
+from core.stt.service import TranscriptionQueueFull
+from core.stt.utils import can_transcribe, transcribe as _transcribe
 from core.tts.utils import validate_voice as _validate_tts_voice, default_voice as _tts_default_voice
 
 logger = logging.getLogger(__name__)
@@ -192,11 +193,16 @@ async def handle_transcribe(request: Request, audio: UploadFile = File(...), _=D
         with open(temp_path, 'wb') as f:
             f.write(contents)
         try:
+            # Queued providers get a slightly shorter deadline so a clip still
+            # waiting in the queue is dropped rather than transcribed for nobody
             transcribed_text = await asyncio.wait_for(
-                asyncio.to_thread(system.whisper_client.transcribe_file, temp_path),
+                asyncio.to_thread(_transcribe, system.whisper_client, temp_path, timeout=85.0),
                 timeout=90.0
             )
-        except asyncio.TimeoutError:
+        except TranscriptionQueueFull as e:
+            logger.warning(f"Transcription rejected: {e}")
+            raise HTTPException(status_code=503, detail="Speech model is busy — try again in a moment")
+        except (asyncio.TimeoutError, TimeoutError):
             logger.warning("Transcription timed out (90s) — model may be too slow on CPU")
             raise HTTPException(status_code=504, detail="Transcription timed out — try a smaller model or lower beam size in STT settings")
     except HTTPException:
@@ -232,6 +238,15 @@ async def handle_transcribe(request: Request, audio: UploadFile = File(...), _=D
     return {"text": transcribed_text, "quiet": transcribed_text == ""}
 
 
+@router.get("/api/stt/stats")
+async def stt_stats(request: Request, _=Depends(require_login), system=Depends(get_system)):
+    """Transcription queue depth, queue wait and real-time factor."""
+    client = system.whisper_client
+    stats = client.stats() if hasattr(client, 'stats') else {}
+    return {"provider": getattr(config, 'STT_PROVIDER', 'none'), "queued": bool(getattr(client, 'queued', False)),
+            "stats": stats}
+
+
 @router.post("/api/mic/active")
 async def set_mic_active(request: Request, _=Depends(require_login), system=Depends(get_system)):
     """Signal browser mic open/close to suppress wakeword during web UI recording."""
@@ -8,9 +8,10 @@ import sys
 import shutil
 import logging
 import threading
-import time
 from pathlib import Path
 
+from core.file_watch import file_watcher
+
 logger = logging.getLogger(__name__)
 
 IS_WINDOWS = sys.platform == 'win32'
@@ -27,11 +28,8 @@ class SettingsManager:
         self._reload_callbacks = {}
         self._lock = threading.RLock()
         
-        # File watcher state
-        self._watcher_thread = None
-        self._watcher_running = False
-        self._last_mtime = None
-        self._last_check = 0
+        # File watch registration (core/file_watch.py)
+        self._watch_id = None
         
         # Restart tracking
         self._restart_pending = False
@@ -46,7 +44,6 @@ class SettingsManager:
         self._load_user_settings()
         self._merge_settings()
         self._ensure_example_file()
-        self._update_mtime()
     
     def _flatten_dict(self, nested_dict, parent_key=''):
         """Flatten nested dict to single level for backward compatibility"""
@@ -183,8 +180,7 @@ class SettingsManager:
             with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(nested, f, indent=2)
             tmp_path.replace(user_path)
-            # Update mtime immediately — no gap for file watcher
-            self._last_mtime = user_path.stat().st_mtime
+            file_watcher.note_write(user_path)
             logger.info(f"[SETTINGS] Migration persisted to disk")
         except Exception as e:
             logger.error(f"[SETTINGS] Failed to persist migration: {e}")
@@ -428,9 +424,8 @@ class SettingsManager:
             with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(nested, f, indent=2)
             tmp_path.replace(user_path)
-            # Update mtime IMMEDIATELY after rename — no gap for the file watcher
-            # to see a new mtime before _last_mtime is updated (fixes spurious reloads)
-            self._last_mtime = user_path.stat().st_mtime
+            # Our own write — the watcher sees the same content hash and skips the reload
+            file_watcher.note_write(user_path)
             logger.info(f"Saved user settings to {user_path}")
             return True
         except Exception as e:
@@ -493,7 +488,6 @@ class SettingsManager:
         with self._lock:
             self._load_user_settings()
             self._merge_settings()
-            self._update_mtime()
             logger.info("Settings reloaded from disk")
     
     def reset_to_defaults(self):
@@ -511,7 +505,7 @@ class SettingsManager:
                 with open(tmp_path, 'w', encoding='utf-8') as f:
                     json.dump({"_comment": "Your custom settings - edit freely or use web UI"}, f, indent=2)
                 tmp_path.replace(user_path)
-                self._last_mtime = user_path.stat().st_mtime
+                file_watcher.note_write(user_path)
                 logger.info("Settings reset to defaults")
                 return True
             except Exception as e:
@@ -626,18 +620,21 @@ class SettingsManager:
             'FORCE_THINKING', 'THINKING_PREFILL',
             'CLAUDE_THINKING_ENABLED', 'CLAUDE_THINKING_BUDGET',
             'LLM_PROVIDERS', 'LLM_CUSTOM_PROVIDERS', 'LLM_FALLBACK_ORDER', 'LLM_REQUEST_TIMEOUT',
+            'STREAM_COALESCE_MS', 'STREAM_COALESCE_MAX_CHARS',
             # SOCKS can be hot-reloaded - session cache is cleared on change
             'SOCKS_ENABLED', 'SOCKS_HOST', 'SOCKS_PORT', 'SOCKS_TIMEOUT',
             # Privacy mode is runtime-only, always hot
             'PRIVACY_MODE', 'PRIVACY_NETWORK_WHITELIST', 'START_IN_PRIVACY_MODE',
             # Providers hot-swap at runtime via switch_*_provider() methods
             'STT_PROVIDER', 'TTS_PROVIDER', 'EMBEDDING_PROVIDER', 'STT_LANGUAGE',
+            # Read per transcription job
+            'FASTER_WHISPER_BATCH_SIZE',
             # Tool settings - read per-request
             'MAX_TOOL_ITERATIONS', 'MAX_PARALLEL_TOOLS', 'DEBUG_TOOL_CALLING',
             'TOOL_HISTORY_MAX_ENTRIES', 'RAG_SIMILARITY_THRESHOLD',
             # Backup settings - read per-request by backup scheduler
             'BACKUPS_ENABLED', 'BACKUPS_KEEP_DAILY', 'BACKUPS_KEEP_WEEKLY',
-            'BACKUPS_KEEP_MONTHLY', 'BACKUPS_KEEP_MANUAL',
+            'BACKUPS_KEEP_MONTHLY', 'BACKUPS_KEEP_MANUAL', 'BACKUPS_MODE', 'BACKUPS_COMPRESSION_LEVEL',
             # Setup wizard progress
             'SETUP_WIZARD_STEP',
         }
@@ -663,90 +660,36 @@ class SettingsManager:
             if hasattr(self, '_pending_restart_keys'):
                 self._pending_restart_keys.clear()
     
-    def _update_mtime(self):
-        """Update last known mtime of user settings file"""
-        user_path = self.BASE_DIR / 'user' / 'settings.json'
-        try:
-            if user_path.exists():
-                self._last_mtime = user_path.stat().st_mtime
-            else:
-                self._last_mtime = None
-        except Exception as e:
-            logger.error(f"Failed to update mtime: {e}")
-    
-    def _file_watcher_loop(self):
-        """Background thread that watches for file changes"""
-        user_path = self.BASE_DIR / 'user' / 'settings.json'
-        logger.info("File watcher started")
-
-        while self._watcher_running:
-            try:
-                time.sleep(2)  # Poll every 2 seconds
+    def _on_file_change(self, changed):
+        """File watch callback — settings.json changed on disk (not by us)."""
+        logger.info("Detected settings file change, reloading...")
+        self.reload()
 
-                if not user_path.exists():
-                    continue
-
-                current_mtime = user_path.stat().st_mtime
-
-                # Check if file was modified externally (not by our own save/migration)
-                if self._last_mtime is not None and current_mtime != self._last_mtime:
-                    # Debounce: wait 0.5s to ensure file write is complete
-                    now = time.time()
-                    if now - self._last_check < 0.5:
-                        continue
-
-                    self._last_check = now
-                    time.sleep(0.5)
-
-                    # Re-check mtime after debounce — our own save() may have
-                    # updated _last_mtime during the sleep, meaning WE wrote
-                    # the file, not an external editor.
-                    if user_path.stat().st_mtime == self._last_mtime:
-                        continue
+        # Trigger all registered callbacks
+        with self._lock:
+            for key, callback in self._reload_callbacks.items():
+                if key in self._config:
+                    try:
+                        callback(self._config[key])
+                    except Exception as e:
+                        logger.error(f"Callback failed for {key}: {e}")
 
-                    # Reload settings
-                    logger.info("Detected settings file change, reloading...")
-                    self.reload()
-                    
-                    # Trigger all registered callbacks
-                    with self._lock:
-                        for key, callback in self._reload_callbacks.items():
-                            if key in self._config:
-                                try:
-                                    callback(self._config[key])
-                                except Exception as e:
-                                    logger.error(f"Callback failed for {key}: {e}")
-            
-            except Exception as e:
-                logger.error(f"File watcher error: {e}")
-                time.sleep(5)  # Back off on errors
-        
-        logger.info("File watcher stopped")
-    
     def start_file_watcher(self):
-        """Start the background file watcher thread"""
-        if self._watcher_thread is not None and self._watcher_thread.is_alive():
+        """Register user/settings.json with the shared file watch service"""
+        if self._watch_id is not None:
             logger.warning("File watcher already running")
             return
-        
-        self._watcher_running = True
-        self._watcher_thread = threading.Thread(
-            target=self._file_watcher_loop,
-            daemon=True,
-            name="SettingsFileWatcher"
-        )
-        self._watcher_thread.start()
-        logger.info("File watcher thread started")
-    
+        user_path = self.BASE_DIR / 'user' / 'settings.json'
+        self._watch_id = file_watcher.watch([user_path], self._on_file_change, name="settings")
+        logger.info("Settings file watcher registered")
+
     def stop_file_watcher(self):
-        """Stop the background file watcher thread"""
-        if self._watcher_thread is None:
+        """Unregister from the shared file watch service"""
+        if self._watch_id is None:
             return
-        
-        self._watcher_running = False
-        if self._watcher_thread.is_alive():
-            self._watcher_thread.join(timeout=5)
-        logger.info("File watcher stopped")
+        file_watcher.unwatch(self._watch_id)
+        self._watch_id = None
+        logger.info("Settings file watcher stopped")
     
     def remove_user_override(self, key):
         """
@@ -786,7 +729,7 @@ class SettingsManager:
                 with open(tmp_path, 'w', encoding='utf-8') as f:
                     json.dump(nested, f, indent=2)
                 tmp_path.replace(user_path)
-                self._last_mtime = user_path.stat().st_mtime
+                file_watcher.note_write(user_path)
                 logger.debug(f"Removed '{key}' from settings file")
         except Exception as e:
             logger.error(f"Failed to remove key from file: {e}")
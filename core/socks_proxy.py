@@ -6,11 +6,13 @@ Simple core feature for routing HTTP requests through SOCKS5 proxy
 import logging
 import requests
 import config
+from core import http_cache
 from core.setup import get_socks_credentials, CONFIG_DIR
 
 logger = logging.getLogger(__name__)
 
 _cached_session = None
+_caching_session = None
 
 
 class SocksAuthError(Exception):
@@ -20,8 +22,9 @@ class SocksAuthError(Exception):
 
 def clear_session_cache():
     """Clear cached session - useful when headers change"""
-    global _cached_session
+    global _cached_session, _caching_session
     _cached_session = None
+    _caching_session = None
     logger.info("Session cache cleared")
 
 
@@ -126,4 +129,28 @@ def get_session():
     })
     
     _cached_session = session
-    return session
\ No newline at end of file
+    return session
+
+
+def get_caching_session():
+    """
+    Same proxy and headers as get_session(), with the on-disk HTTP response
+    cache mounted (core/http_cache.py). For web tool fetches whose answer
+    may be reused: pages, Wikipedia. IP checks, connectivity tests and
+    anything that must reach the network stay on get_session().
+
+    Raises the same errors as get_session().
+    """
+    global _caching_session
+
+    if _caching_session:
+        return _caching_session
+
+    base = get_session()
+    session = requests.Session()
+    session.headers = base.headers.copy()
+    session.proxies = dict(base.proxies)
+    http_cache.install(session)
+
+    _caching_session = session
+    return session
@@ -2,9 +2,10 @@
 import logging
 import json
 import threading
-import time
 from pathlib import Path
 
+from core.file_watch import file_watcher
+
 logger = logging.getLogger(__name__)
 
 class SpiceSetManager:
@@ -24,9 +25,7 @@ class SpiceSetManager:
         self._active_name = 'default'
 
         self._lock = threading.Lock()
-        self._watcher_thread = None
-        self._watcher_running = False
-        self._last_mtimes = {}
+        self._watch_id = None
 
         try:
             self.USER_DIR.mkdir(parents=True, exist_ok=True)
@@ -75,49 +74,23 @@ class SpiceSetManager:
             logger.info("Spice sets reloaded")
 
     def start_file_watcher(self):
-        if self._watcher_thread is not None and self._watcher_thread.is_alive():
+        if self._watch_id is not None:
             return
-        self._watcher_running = True
-        self._watcher_thread = threading.Thread(
-            target=self._file_watcher_loop, daemon=True, name="SpiceSetFileWatcher"
-        )
-        self._watcher_thread.start()
+        self._watch_id = file_watcher.watch(
+            [self.BASE_DIR / "spice_sets.json", self.USER_DIR / "spice_sets.json"],
+            self._on_file_change, name="spice_sets")
         logger.info("Spice set file watcher started")
 
     def stop_file_watcher(self):
-        if self._watcher_thread is None:
+        if self._watch_id is None:
             return
-        self._watcher_running = False
-        if self._watcher_thread.is_alive():
-            self._watcher_thread.join(timeout=5)
+        file_watcher.unwatch(self._watch_id)
+        self._watch_id = None
         logger.info("Spice set file watcher stopped")
 
-    def _file_watcher_loop(self):
-        watch_files = [
-            self.BASE_DIR / "spice_sets.json",
-            self.USER_DIR / "spice_sets.json"
-        ]
-        while self._watcher_running:
-            try:
-                time.sleep(2)
-                for path in watch_files:
-                    if not path.exists():
-                        continue
-                    path_key = str(path)
-                    current_mtime = path.stat().st_mtime
-                    last_mtime = self._last_mtimes.get(path_key)
-                    if last_mtime is not None and current_mtime != last_mtime:
-                        logger.info(f"Detected change in {path.name}")
-                        time.sleep(0.5)
-                        self.reload()
-                        for p in watch_files:
-                            if p.exists():
-                                self._last_mtimes[str(p)] = p.stat().st_mtime
-                        break
-                    self._last_mtimes[path_key] = current_mtime
-            except Exception as e:
-                logger.error(f"Spice set file watcher error: {e}")
-                time.sleep(5)
+    def _on_file_change(self, changed):
+        logger.info(f"Detected change in {', '.join(p.name for p in changed)}")
+        self.reload()
 
     # === Getters ===
 
@@ -184,7 +157,7 @@ class SpiceSetManager:
             with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2)
             tmp_path.replace(user_path)
-            self._last_mtimes[str(user_path)] = user_path.stat().st_mtime
+            file_watcher.note_write(user_path)
             logger.info(f"Saved {len(self._sets)} spice sets to {user_path}")
             return True
         except Exception as e:
@@ -0,0 +1,277 @@
+"""
+Content-hashed, precompressed static assets for the web UI.
+
+Before: every JS/CSS URL carried ?v=BOOT_VERSION with a one-hour max-age,
+so each restart made every browser (and wall tablet) re-download all ~100
+modules, uncompressed.
+
+Now a manifest fingerprints each file under interfaces/web/static by
+content hash:
+
+  - The import map (and the few <link>/<script> tags in index.html) point
+    at /static/<path>?h=<hash>. URLs only change when the file does, so
+    those responses are `immutable` for a year.
+  - Anything requested without the current hash (theme CSS, plugin-built
+    URLs, old bookmarks) gets `no-cache` + a content ETag → cheap 304s.
+  - Compressible files get .gz (and .br when the `brotli` package is
+    installed) variants, built once and kept under user/cache/static keyed
+    by content hash, so later boots just stat them. The best variant the
+    client accepts is served, with Vary: Accept-Encoding.
+
+Files edited while the server runs are noticed by stat (mtime/size) and
+re-hashed on their next request.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(__file__).parent.parent / 'user' / 'cache' / 'static'
+
+COMPRESSIBLE = {'.js', '.mjs', '.css', '.json', '.svg', '.html', '.txt', '.map', '.xml', '.wasm'}
+# Below this the compression framing eats most of the win.
+MIN_COMPRESS_BYTES = 1024
+HASH_LEN = 16
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+try:
+    import brotli as _brotli
+except ImportError:
+    _brotli = None
+
+# Preference order when the client accepts several
+_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+@dataclass
+class Asset:
+    rel: str
+    hash: str
+    size: int
+    mtime_ns: int
+    variants: Dict[str, Path] = field(default_factory=dict)  # encoding -> file
+
+
+def _hash_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()[:HASH_LEN]
+
+
+def _write_atomic(target: Path, data: bytes):
+    tmp = target.with_name(target.name + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, target)
+
+
+class AssetManifest:
+    """rel path → Asset for one static directory."""
+
+    def __init__(self, root: Path, cache_dir: Path = None, compress: bool = True):
+        self.root = Path(root)
+        self.cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+        self.compress = compress
+        self._assets: Dict[str, Asset] = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._built = False
+
+    # ── Build ──
+
+    def ensure_built(self) -> 'AssetManifest':
+        """Build on first use — importing the app must not touch the disk cache."""
+        if not self._built:
+            with self._build_lock:
+                if not self._built:
+                    self.build()
+        return self
+
+    def build(self) -> 'AssetManifest':
+        assets = {}
+        for path in sorted(self.root.rglob('*')):
+            if path.is_file():
+                asset = self._scan(path)
+                if asset:
+                    assets[asset.rel] = asset
+        with self._lock:
+            self._assets = assets
+        self._built = True
+        self._prune()
+        compressed = sum(1 for a in assets.values() if a.variants)
+        logger.info(f"[STATIC] {len(assets)} assets fingerprinted, {compressed} precompressed"
+                    f"{'' if _brotli else ' (gzip only, brotli not installed)'}")
+        return self
+
+    def _scan(self, path: Path) -> Optional[Asset]:
+        try:
+            st = path.stat()
+            rel = path.relative_to(self.root).as_posix()
+            asset = Asset(rel=rel, hash=_hash_file(path), size=st.st_size, mtime_ns=st.st_mtime_ns)
+        except OSError as e:
+            logger.warning(f"[STATIC] Could not read {path}: {e}")
+            return None
+        if self.compress and path.suffix.lower() in COMPRESSIBLE and st.st_size >= MIN_COMPRESS_BYTES:
+            asset.variants = self._variants(path, asset)
+        return asset
+
+    def _variants(self, path: Path, asset: Asset) -> Dict[str, Path]:
+        """Build (or reuse from disk) compressed copies. Kept only if smaller."""
+        variants = {}
+        data = None
+        for encoding, ext in _ENCODINGS:
+            if encoding == 'br' and _brotli is None:
+                continue
+            target = self.cache_dir / f"{asset.hash}{path.suffix.lower()}{ext}"
+            skip = target.with_name(target.name + '.skip')
+            if target.exists():
+                variants[encoding] = target
+                continue
+            if skip.exists():
+                continue
+            try:
+                if data is None:
+                    data = path.read_bytes()
+                if encoding == 'br':
+                    packed = _brotli.compress(data, quality=11)
+                else:
+                    packed = gzip.compress(data, compresslevel=9, mtime=0)
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                if len(packed) < len(data) * 0.9:
+                    _write_atomic(target, packed)
+                    variants[encoding] = target
+                else:
+                    skip.touch()  # incompressible — don't retry every boot
+            except OSError as e:
+                logger.warning(f"[STATIC] Could not write {encoding} variant for {asset.rel}: {e}")
+        return variants
+
+    def _prune(self):
+        """Drop cached variants for content that no longer exists."""
+        if not self.cache_dir.is_dir():
+            return
+        with self._lock:
+            live = {a.hash for a in self._assets.values()}
+        for f in self.cache_dir.iterdir():
+            if f.name.split('.', 1)[0] not in live:
+                try:
+                    f.unlink()
+                except OSError:
+                    pass
+
+    # ── Lookup ──
+
+    def get(self, rel: str, st: os.stat_result = None) -> Optional[Asset]:
+        """Current asset for `rel`, re-hashing if the file changed on disk."""
+        self.ensure_built()
+        with self._lock:
+            asset = self._assets.get(rel)
+        path = self.root / rel
+        if st is None:
+            try:
+                st = path.stat()
+            except OSError:
+                return None
+        if asset is not None and asset.mtime_ns == st.st_mtime_ns and asset.size == st.st_size:
+            return asset
+        fresh = self._scan(path)
+        if fresh is not None:
+            with self._lock:
+                self._assets[rel] = fresh
+            logger.debug(f"[STATIC] Re-fingerprinted {rel} → {fresh.hash}")
+        return fresh
+
+    def url(self, rel: str, prefix: str = '/static') -> str:
+        rel = rel.lstrip('/')
+        asset = self.get(rel)
+        return f"{prefix}/{rel}?h={asset.hash}" if asset else f"{prefix}/{rel}"
+
+    def import_map(self, prefix: str = '/static') -> str:
+        """ES module import map: every JS file → its fingerprinted URL."""
+        self.ensure_built()
+        with self._lock:
+            assets = sorted(self._assets.values(), key=lambda a: a.rel)
+        imports = {f"{prefix}/{a.rel}": f"{prefix}/{a.rel}?h={a.hash}"
+                   for a in assets if a.rel.endswith(('.js', '.mjs'))}
+        return json.dumps({"imports": imports})
+
+
+def _accepted(accept_encoding: str) -> set:
+    accepted = set()
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                pass
+        if name:
+            accepted.add(name)
+    return accepted
+
+
+class AssetStaticFiles(StaticFiles):
+    """StaticFiles that serves manifest fingerprints, ETags and precompressed variants.
+
+    Path resolution and traversal checks stay with StaticFiles; only the
+    final response for a resolved file is built here.
+    """
+
+    def __init__(self, *, manifest: AssetManifest, **kwargs):
+        super().__init__(**kwargs)
+        self.manifest = manifest
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        try:
+            rel = Path(full_path).resolve().relative_to(self.manifest.root.resolve()).as_posix()
+        except ValueError:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        asset = self.manifest.get(rel, stat_result)
+        if asset is None:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        request_headers = Headers(scope=scope)
+        media_type = mimetypes.guess_type(str(full_path))[0] or 'application/octet-stream'
+        if media_type.startswith('text/') or media_type in ('application/javascript', 'application/json'):
+            media_type += '; charset=utf-8'
+        query = QueryParams(scope.get('query_string', b''))
+        headers = {
+            'cache-control': IMMUTABLE if query.get('h') == asset.hash else REVALIDATE,
+        }
+        serve_path = full_path
+        etag = asset.hash
+        if asset.variants:
+            headers['vary'] = 'Accept-Encoding'
+            accepted = _accepted(request_headers.get('accept-encoding', ''))
+            for encoding, ext in _ENCODINGS:
+                variant = asset.variants.get(encoding)
+                if encoding in accepted and variant is not None and variant.exists():
+                    serve_path = variant
+                    headers['content-encoding'] = encoding
+                    etag = f"{asset.hash}-{ext[1:]}"
+                    break
+        headers['etag'] = f'"{etag}"'
+
+        response = FileResponse(serve_path, status_code=status_code, headers=headers, media_type=media_type)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
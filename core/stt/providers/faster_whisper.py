@@ -1,141 +1,210 @@
-"""Local faster-whisper STT provider."""
-import os
-import time
-import tempfile
+"""Local faster-whisper STT provider.
+
+The model lives in a shared TranscriptionService (core/stt/service.py): it
+stays warm across provider re-creates with the same settings, and clips
+queue by priority instead of serializing on one lock.
+"""
 import logging
-import threading
 from typing import Optional
 
 import soundfile as sf
 import numpy as np
 
 import config
+from core.audio import dsp
 from core.stt.providers.base import BaseSTTProvider
+from core.stt.service import (
+    PRIORITY_UPLOAD, TranscriptionQueueFull, TranscriptionService,
+    acquire_service, release_service,
+)
 
 logger = logging.getLogger(__name__)
 
+WHISPER_SAMPLE_RATE = 16000
+BATCH_MIN_SECONDS = 30.0   # shorter clips are one Whisper window — nothing to batch
+
+
+def _load_model(model_size, device, compute_type, num_workers, cuda_device):
+    """Load a WhisperModel, trying GPU compute types before falling back to CPU int8."""
+    logger.info(f"Loading faster-whisper model: {model_size}")
+    try:
+        from faster_whisper import WhisperModel
+        import torch
+
+        gpu_compute_types = ["int8", "int8_float16", "float16", "int8_float32"]
+        if compute_type in gpu_compute_types:
+            gpu_compute_types.remove(compute_type)
+            gpu_compute_types.insert(0, compute_type)
+
+        if device == "cuda" and torch.cuda.is_available():
+            available_gpus = torch.cuda.device_count()
+
+            if cuda_device < available_gpus:
+                torch.cuda.set_device(cuda_device)
+                device_name = torch.cuda.get_device_name(cuda_device)
+                logger.info(f"Using CUDA device {cuda_device} ({device_name})")
+
+                for compute in gpu_compute_types:
+                    try:
+                        logger.info(f"Loading with device=cuda:{cuda_device}, compute_type={compute}")
+                        model = WhisperModel(model_size, device=device,
+                                             compute_type=compute, num_workers=num_workers)
+                        logger.info(f"Successfully loaded model with compute_type={compute}")
+                        return model
+                    except Exception as e:
+                        logger.warning(f"Failed with compute_type={compute}: {e}")
+            else:
+                logger.warning(f"CUDA device {cuda_device} not available ({available_gpus} GPUs)")
+
+        logger.info("Falling back to CPU model with int8")
+        model = WhisperModel(model_size, device="cpu",
+                             compute_type="int8", num_workers=num_workers)
+        logger.info("Successfully loaded model on CPU")
+        return model
+
+    except ImportError as e:
+        raise RuntimeError(f"Faster Whisper not installed: {e}")
+    except Exception as e:
+        raise RuntimeError(f"Failed to initialize STT model: {e}")
 
-def _safe_unlink(path, retries=3, delay=0.2):
-    """Windows-safe file deletion with retries."""
-    for attempt in range(retries):
+
+def _batched_pipeline(model):
+    """BatchedInferencePipeline over `model`, built once per loaded model.
+    None when this faster-whisper version doesn't have it."""
+    pipeline = getattr(model, '_sapphire_batched', None)
+    if pipeline is None:
         try:
-            if os.path.exists(path):
-                os.unlink(path)
-            return True
-        except PermissionError:
-            if attempt < retries - 1:
-                time.sleep(delay)
-            else:
-                logger.warning(f"Could not delete temp file after {retries} attempts: {path}")
-                return False
-        except Exception as e:
-            logger.warning(f"Error deleting {path}: {e}")
-            return False
-    return True
+            from faster_whisper import BatchedInferencePipeline
+        except ImportError:
+            return None
+        pipeline = BatchedInferencePipeline(model=model)
+        try:
+            model._sapphire_batched = pipeline
+        except AttributeError:
+            pass
+    return pipeline
+
+
+def _run(model, job):
+    """Transcribe one prepared 16kHz float32 clip."""
+    transcription_params = {
+        'language': config.STT_LANGUAGE,
+        'beam_size': getattr(config, 'FASTER_WHISPER_BEAM_SIZE', 3),
+        'vad_filter': getattr(config, 'FASTER_WHISPER_VAD_FILTER', True),
+        'vad_parameters': getattr(config, 'FASTER_WHISPER_VAD_PARAMETERS', None)
+    }
+
+    # Long uploads: decode their 30s windows as one batch. Live mic clips
+    # are short and latency-bound, so they always take the sequential path.
+    batch_size = int(getattr(config, 'FASTER_WHISPER_BATCH_SIZE', 0) or 0)
+    if batch_size > 0 and not job.live and job.duration > BATCH_MIN_SECONDS:
+        pipeline = _batched_pipeline(model)
+        if pipeline is not None:
+            segments, _ = pipeline.transcribe(job.audio, batch_size=batch_size, **transcription_params)
+            return _join(segments)
+
+    segments, _ = model.transcribe(job.audio, **transcription_params)
+    return _join(segments)
+
+
+def _join(segments) -> str:
+    # Filter out segments where Whisper thinks there's no speech
+    return " ".join([
+        segment.text for segment in segments
+        if segment.no_speech_prob < 0.7
+    ]).strip()
 
 
 class FasterWhisperProvider(BaseSTTProvider):
     """Local faster-whisper STT — no HTTP, just transcribe."""
 
+    queued = True  # transcribe_file() takes priority / timeout
+
     def __init__(self, model_size=None, language=None):
         model_size = model_size or config.STT_MODEL_SIZE
-        language = language or config.STT_LANGUAGE
-        logger.info(f"Loading faster-whisper model: {model_size}")
-        self.model = None
-        self._lock = threading.Lock()
-
+        device = getattr(config, 'FASTER_WHISPER_DEVICE', 'cuda')
+        compute_type = getattr(config, 'FASTER_WHISPER_COMPUTE_TYPE', 'int8')
+        cuda_device = getattr(config, 'FASTER_WHISPER_CUDA_DEVICE', 0)
+        workers = max(1, int(getattr(config, 'STT_WORKERS', 1) or 1))
+        # num_workers lets that many transcribe() calls run at once on the
+        # one model — at least one per service worker
+        num_workers = max(int(getattr(config, 'FASTER_WHISPER_NUM_WORKERS', 2) or 1), workers)
+
+        def factory():
+            return TranscriptionService(
+                lambda: _load_model(model_size, device, compute_type, num_workers, cuda_device),
+                _run,
+                workers=workers,
+                max_queue=getattr(config, 'STT_QUEUE_SIZE', 16),
+                idle_unload=getattr(config, 'STT_IDLE_UNLOAD_SECONDS', 0),
+                name='faster-whisper',
+            )
+
+        self._key = ('faster_whisper', model_size, device, compute_type, cuda_device, num_workers, workers)
+        self._service = acquire_service(self._key, factory)
+        # Settings that are safe to change on a running service
+        self._service.idle_unload = float(getattr(config, 'STT_IDLE_UNLOAD_SECONDS', 0) or 0)
+        self._service.max_queue = max(1, int(getattr(config, 'STT_QUEUE_SIZE', 16) or 16))
         try:
-            from faster_whisper import WhisperModel
-            import torch
-
-            device = getattr(config, 'FASTER_WHISPER_DEVICE', 'cuda')
-            compute_type = getattr(config, 'FASTER_WHISPER_COMPUTE_TYPE', 'int8')
-            num_workers = getattr(config, 'FASTER_WHISPER_NUM_WORKERS', 2)
-            cuda_device = getattr(config, 'FASTER_WHISPER_CUDA_DEVICE', 0)
-
-            gpu_compute_types = ["int8", "int8_float16", "float16", "int8_float32"]
-            if compute_type in gpu_compute_types:
-                gpu_compute_types.remove(compute_type)
-                gpu_compute_types.insert(0, compute_type)
-
-            if device == "cuda" and torch.cuda.is_available():
-                available_gpus = torch.cuda.device_count()
-
-                if cuda_device < available_gpus:
-                    torch.cuda.set_device(cuda_device)
-                    device_name = torch.cuda.get_device_name(cuda_device)
-                    logger.info(f"Using CUDA device {cuda_device} ({device_name})")
-
-                    for compute in gpu_compute_types:
-                        try:
-                            logger.info(f"Loading with device=cuda:{cuda_device}, compute_type={compute}")
-                            self.model = WhisperModel(model_size, device=device,
-                                                      compute_type=compute, num_workers=num_workers)
-                            logger.info(f"Successfully loaded model with compute_type={compute}")
-                            return
-                        except Exception as e:
-                            logger.warning(f"Failed with compute_type={compute}: {e}")
-                else:
-                    logger.warning(f"CUDA device {cuda_device} not available ({available_gpus} GPUs)")
-
-            logger.info("Falling back to CPU model with int8")
-            self.model = WhisperModel(model_size, device="cpu",
-                                      compute_type="int8", num_workers=num_workers)
-            logger.info("Successfully loaded model on CPU")
-
-        except ImportError as e:
-            raise RuntimeError(f"Faster Whisper not installed: {e}")
+            self._service.warm()
+        except Exception:
+            release_service(self._key, self._service)
+            self._service = None
+            raise
+
+    @property
+    def model(self):
+        """The loaded WhisperModel, or None while unloaded."""
+        return self._service.model if self._service else None
+
+    def transcribe_file(self, audio_path: str, priority: int = PRIORITY_UPLOAD,
+                        timeout: Optional[float] = None) -> Optional[str]:
+        """Transcribe an audio file. Thread-safe.
+
+        Raises TranscriptionQueueFull when too many clips are waiting and
+        TimeoutError when `timeout` passes first; other errors return None.
+        """
+        service = self._service
+        if service is None or service.closed:
+            logger.error("Transcription error: provider closed")
+            return None
+        try:
+            audio_data, sample_rate = sf.read(audio_path, dtype='float32')
+            audio_data = dsp.to_mono(audio_data)
+
+            rms = dsp.rms(audio_data)
+            duration = len(audio_data) / sample_rate if sample_rate > 0 else 0
+            max_val = dsp.peak(audio_data)
+
+            # Skip near-silent audio — likely wrong mic selected in browser
+            if rms < 0.001:
+                logger.warning(f"[STT] Audio too quiet ({duration:.1f}s, RMS={rms:.6f}) — check mic selection")
+                return ""
+
+            # Whisper takes 16kHz float32 arrays directly — resample here
+            # with the cached filter instead of a temp WAV it decodes again
+            if sample_rate != WHISPER_SAMPLE_RATE:
+                audio_data = dsp.resample(audio_data, sample_rate, WHISPER_SAMPLE_RATE)
+            if max_val > 0:
+                audio_data = np.multiply(audio_data, np.float32(1.0 / max_val),
+                                         out=audio_data if audio_data.flags.writeable else None)
+
+            return service.transcribe(audio_data, duration, priority=priority, timeout=timeout)
+
+        except (TranscriptionQueueFull, TimeoutError):
+            raise
         except Exception as e:
-            raise RuntimeError(f"Failed to initialize STT model: {e}")
-
-    def transcribe_file(self, audio_path: str) -> Optional[str]:
-        """Transcribe an audio file. Thread-safe."""
-        temp_path = None
-
-        with self._lock:
-            try:
-                audio_data, sample_rate = sf.read(audio_path)
-                if len(audio_data.shape) > 1:
-                    audio_data = audio_data.mean(axis=1)
-
-                rms = np.sqrt(np.mean(audio_data ** 2))
-                duration = len(audio_data) / sample_rate if sample_rate > 0 else 0
-                max_val = np.max(np.abs(audio_data))
-
-                # Skip near-silent audio — likely wrong mic selected in browser
-                if rms < 0.001:
-                    logger.warning(f"[STT] Audio too quiet ({duration:.1f}s, RMS={rms:.6f}) — check mic selection")
-                    return ""
-
-                if max_val > 0:
-                    audio_data = audio_data / max_val
-
-                fd, temp_path = tempfile.mkstemp(suffix=".wav", prefix="stt_processed_")
-                os.close(fd)
-                sf.write(temp_path, audio_data, sample_rate)
-
-                transcription_params = {
-                    'language': config.STT_LANGUAGE,
-                    'beam_size': getattr(config, 'FASTER_WHISPER_BEAM_SIZE', 3),
-                    'vad_filter': getattr(config, 'FASTER_WHISPER_VAD_FILTER', True),
-                    'vad_parameters': getattr(config, 'FASTER_WHISPER_VAD_PARAMETERS', None)
-                }
-
-                segments, _ = self.model.transcribe(temp_path, **transcription_params)
-                # Filter out segments where Whisper thinks there's no speech
-                text = " ".join([
-                    segment.text for segment in segments
-                    if segment.no_speech_prob < 0.7
-                ]).strip()
-                return text
-
-            except Exception as e:
-                logger.error(f"Transcription error: {e}")
-                return None
-
-            finally:
-                if temp_path:
-                    _safe_unlink(temp_path)
+            logger.error(f"Transcription error: {e}")
+            return None
+
+    def stats(self) -> dict:
+        return self._service.stats() if self._service else {}
+
+    def close(self):
+        """Release the shared service; the model unloads once nobody holds it."""
+        service, self._service = self._service, None
+        if service is not None:
+            release_service(self._key, service)
 
     def is_available(self) -> bool:
-        return self.model is not None
+        return self._service is not None and not self._service.closed
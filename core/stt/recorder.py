@@ -17,7 +17,8 @@ from core.audio import (
     get_device_manager, 
     classify_audio_error, 
     convert_to_mono,
-    get_temp_dir
+    get_temp_dir,
+    dsp,
 )
 from . import system_audio
 from core.event_bus import publish, Events
@@ -25,6 +26,11 @@ import config
 
 logger = logging.getLogger(__name__)
 
+# Recordings are saved at Whisper's native rate. Device audio is resampled
+# chunk by chunk while recording, so nothing is left to do after the user
+# stops talking and every STT provider gets a file a third the size of 48kHz.
+STT_SAMPLE_RATE = 16000
+
 
 class AudioRecorder:
     """
@@ -92,7 +98,7 @@ class AudioRecorder:
 
     def _is_silent(self, audio_data: np.ndarray) -> bool:
         """Check if audio chunk is silent using adaptive threshold."""
-        level = np.max(np.abs(audio_data.astype(np.float32) / 32768.0))
+        level = dsp.peak(audio_data)
         self._update_threshold(level)
         print(f"Level: {level:.4f} | Threshold: {self.adaptive_threshold:.4f}", end='\r')
         return level < self.adaptive_threshold
@@ -168,6 +174,7 @@ class AudioRecorder:
         publish(Events.STT_RECORDING_START)
         
         frames = []
+        resampler = dsp.StreamResampler(self.rate, STT_SAMPLE_RATE)
         silent_chunks = speech_chunks = 0
         has_speech = False
         start_time = time.time()
@@ -189,7 +196,7 @@ class AudioRecorder:
                 if self._needs_stereo_downmix:
                     audio_data = convert_to_mono(data)
                 else:
-                    audio_data = data.flatten().astype(np.int16)
+                    audio_data = data.reshape(-1)  # already int16 — no copy
                 
                 is_silent = self._is_silent(audio_data)
                 
@@ -206,7 +213,8 @@ class AudioRecorder:
                                        config.RECORDER_SPEECH_DURATION):
                         has_speech = True
                 
-                frames.append(audio_data)
+                frames.append(audio_data if resampler.passthrough
+                              else dsp.to_int16(resampler.process(audio_data)))
                 
                 # Early abort if no speech detected within timeout (accidental wakeword trigger)
                 if not has_speech and (time.time() - start_time) > config.RECORDER_NO_SPEECH_TIMEOUT:
@@ -243,12 +251,13 @@ class AudioRecorder:
         
         try:
             # Combine all frames into single array
+            frames.append(dsp.to_int16(resampler.flush()))
             audio_data = np.concatenate(frames)
             
             # Write WAV file using soundfile (always mono output)
             timestamp = int(time.time())
             temp_path = os.path.join(self.temp_dir, f"voice_assistant_{timestamp}.wav")
-            sf.write(temp_path, audio_data, self.rate)
+            sf.write(temp_path, audio_data, STT_SAMPLE_RATE)
             
             return temp_path
             
@@ -0,0 +1,301 @@
+"""
+Warm transcription service for local speech models.
+
+Local Whisper used to run behind one lock per provider instance: the live
+mic, web uploads and API clips queued in arrival order, and every
+provider re-create (a settings save, a provider switch) loaded the model
+from disk again. TranscriptionService owns the model instead:
+
+  - Jobs go into a priority queue; live mic audio (PRIORITY_LIVE) is
+    served before uploads. Only non-live jobs count against max_queue —
+    past that, submit() raises TranscriptionQueueFull rather than letting
+    the backlog grow without bound. A job cancelled (timed out) while
+    still queued is skipped, not transcribed.
+  - `workers` threads share one resident model. faster-whisper runs
+    concurrent transcribe() calls in parallel when loaded with enough
+    num_workers, so extra workers don't duplicate the weights.
+  - The model loads on warm() or first use and, when idle_unload > 0, is
+    dropped after that many idle seconds; the next job reloads it.
+  - Services are shared per model key through acquire_service() /
+    release_service(). Re-creating the provider with the same settings
+    reuses the loaded model; acquiring a different key retires the old
+    service once its queue drains.
+  - stats() reports queue wait and real-time factor (processing seconds
+    per second of audio) over recent jobs.
+"""
+
+import gc
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_LIVE = 0      # local mic: someone is waiting for a reply
+PRIORITY_UPLOAD = 10   # web / API clips
+
+DEFAULT_MAX_QUEUE = 16
+STATS_WINDOW = 100     # recent jobs kept for wait / RTF stats
+_RETIRE = 1 << 30      # sentinel priority — after every queued job
+
+
+class TranscriptionQueueFull(RuntimeError):
+    """Too many clips are already waiting for transcription."""
+
+
+class TranscriptionJob:
+    __slots__ = ("audio", "duration", "priority", "future", "enqueued")
+
+    def __init__(self, audio: Any, duration: float, priority: int):
+        self.audio = audio
+        self.duration = duration
+        self.priority = priority
+        self.future: Future = Future()
+        self.enqueued = time.monotonic()
+
+    @property
+    def live(self) -> bool:
+        return self.priority <= PRIORITY_LIVE
+
+
+def _summary(values, scale=1.0) -> Dict[str, float]:
+    if not values:
+        return {"avg": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {"avg": round(sum(ordered) / len(ordered) * scale, 3),
+            "p95": round(p95 * scale, 3), "max": round(ordered[-1] * scale, 3)}
+
+
+class TranscriptionService:
+    """Priority-queued transcription over one shared, lazily loaded model.
+
+    load_model() returns the model; run(model, job) returns the text.
+    """
+
+    def __init__(self, load_model: Callable[[], Any], run: Callable[[Any, TranscriptionJob], Any],
+                 workers: int = 1, max_queue: int = DEFAULT_MAX_QUEUE,
+                 idle_unload: float = 0.0, name: str = "stt"):
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.max_queue = max(1, int(max_queue))
+        self.idle_unload = float(idle_unload or 0)
+        self._load_model = load_model
+        self._run = run
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()          # counters + queue admission
+        self._model_lock = threading.Lock()    # load / unload
+        self._model = None
+        self._pending = 0                      # queued non-live jobs
+        self._active = 0                       # jobs being transcribed
+        self._last_used = time.monotonic()
+        self._threads = []
+        self._closed = False
+        self._waits = deque(maxlen=STATS_WINDOW)
+        self._rtfs = deque(maxlen=STATS_WINDOW)
+        self._counts = {"completed": 0, "failed": 0, "rejected": 0, "cancelled": 0,
+                        "loads": 0, "unloads": 0}
+        self._load_seconds = 0.0
+
+    # ─── Lifecycle ───────────────────────────────────────────────────────
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def model(self):
+        return self._model
+
+    def _start(self):
+        with self._lock:
+            if self._threads or self._closed:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"{self.name}-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def warm(self):
+        """Load the model now (errors propagate) and start the workers."""
+        self._acquire_model()
+        self._start()
+
+    def shutdown(self):
+        """Finish queued jobs, then stop the workers and unload the model.
+        Returns immediately."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._queue.put((_RETIRE, next(self._seq), None))
+        if not threads:
+            self._unload()
+
+    # ─── Model residency ─────────────────────────────────────────────────
+
+    def _acquire_model(self):
+        with self._model_lock:
+            if self._model is None:
+                started = time.monotonic()
+                self._model = self._load_model()
+                self._load_seconds = round(time.monotonic() - started, 3)
+                self._counts["loads"] += 1
+                logger.info(f"[{self.name}] Model loaded in {self._load_seconds:.1f}s")
+            self._last_used = time.monotonic()
+            return self._model
+
+    def _unload(self):
+        with self._model_lock:
+            if self._model is None:
+                return
+            self._model = None
+            self._counts["unloads"] += 1
+        gc.collect()
+        logger.info(f"[{self.name}] Model unloaded")
+
+    def _maybe_unload_idle(self):
+        idle = self.idle_unload
+        if idle <= 0 or self._model is None:
+            return
+        with self._lock:
+            busy = self._active or self._pending
+        if not busy and time.monotonic() - self._last_used >= idle:
+            logger.info(f"[{self.name}] Idle for {idle:.0f}s")
+            self._unload()
+
+    # ─── Queue ───────────────────────────────────────────────────────────
+
+    def submit(self, audio: Any, duration: float, priority: int = PRIORITY_UPLOAD) -> Future:
+        """Queue a clip; returns a Future for the text."""
+        job = TranscriptionJob(audio, duration, priority)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} service is shut down")
+            if not job.live:
+                if self._pending >= self.max_queue:
+                    self._counts["rejected"] += 1
+                    raise TranscriptionQueueFull(
+                        f"{self._pending} clips already waiting for transcription")
+                self._pending += 1
+            self._queue.put((priority, next(self._seq), job))
+        self._start()
+        return job.future
+
+    def transcribe(self, audio: Any, duration: float, priority: int = PRIORITY_UPLOAD,
+                   timeout: Optional[float] = None):
+        """submit() and wait. On timeout a still-queued job is cancelled
+        and TimeoutError is raised."""
+        future = self.submit(audio, duration, priority)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            if future.cancel():
+                with self._lock:
+                    self._counts["cancelled"] += 1
+            raise TimeoutError(f"Transcription not finished after {timeout}s")
+
+    def _worker(self):
+        while True:
+            # Re-read each pass — idle_unload can change on a running service
+            poll = min(5.0, max(0.05, self.idle_unload / 2)) if self.idle_unload > 0 else 5.0
+            try:
+                priority, _, job = self._queue.get(timeout=poll)
+            except queue.Empty:
+                self._maybe_unload_idle()
+                continue
+            if job is None:
+                break
+            with self._lock:
+                if not job.live:
+                    self._pending -= 1
+                if not job.future.set_running_or_notify_cancel():
+                    continue  # cancelled while queued
+                self._active += 1
+            wait = time.monotonic() - job.enqueued
+            try:
+                model = self._acquire_model()
+                started = time.monotonic()
+                result = self._run(model, job)
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self._waits.append(wait)
+                    if job.duration > 0:
+                        self._rtfs.append(elapsed / job.duration)
+                    self._counts["completed"] += 1
+                logger.debug(f"[{self.name}] {job.duration:.1f}s clip: waited {wait * 1000:.0f}ms, "
+                             f"took {elapsed * 1000:.0f}ms (RTF {elapsed / max(job.duration, 1e-6):.2f})")
+                job.future.set_result(result)
+            except BaseException as e:
+                with self._lock:
+                    self._counts["failed"] += 1
+                job.future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                self._last_used = time.monotonic()
+
+        # Retired: the last worker out unloads
+        with self._lock:
+            self._threads = [t for t in self._threads if t is not threading.current_thread()]
+            last = not self._threads
+        if last:
+            self._unload()
+
+    # ─── Metrics ─────────────────────────────────────────────────────────
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "loaded": self._model is not None,
+                "workers": self.workers,
+                "queued": self._pending,
+                "running": self._active,
+                "max_queue": self.max_queue,
+                "idle_unload_seconds": self.idle_unload,
+                "load_seconds": self._load_seconds,
+                "queue_wait_ms": _summary(list(self._waits), 1000.0),
+                "real_time_factor": _summary(list(self._rtfs)),
+                **self._counts,
+            }
+
+
+# ─── Shared services ──────────────────────────────────────────────────────────
+
+_services: Dict[Hashable, list] = {}   # key -> [service, refcount]
+_services_lock = threading.Lock()
+
+
+def acquire_service(key: Hashable, factory: Callable[[], TranscriptionService]) -> TranscriptionService:
+    """The live service for `key`, created by factory() if needed. Services
+    for other keys are retired — one local model configuration at a time."""
+    with _services_lock:
+        entry = _services.get(key)
+        if entry is None or entry[0].closed:
+            entry = _services[key] = [factory(), 0]
+        entry[1] += 1
+        for other in [k for k in _services if k != key]:
+            _services.pop(other)[0].shutdown()
+        return entry[0]
+
+
+def release_service(key: Hashable, service: TranscriptionService):
+    """Drop one reference; the service shuts down when none are left."""
+    with _services_lock:
+        entry = _services.get(key)
+        if entry is None or entry[0] is not service:
+            service.shutdown()
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            _services.pop(key)
+            service.shutdown()
@@ -17,3 +17,16 @@ def can_transcribe(whisper_client) -> tuple[bool, str]:
     if hasattr(whisper_client, 'is_available') and not whisper_client.is_available():
         return False, "STT provider not ready (check API key or model)"
     return True, ""
+
+
+def transcribe(whisper_client, audio_path: str, live: bool = False, timeout: float = None):
+    """Transcribe through whichever provider is active.
+
+    Queued providers (local Whisper) serve live mic audio ahead of uploads
+    and give up after `timeout` seconds; other providers just run.
+    """
+    if getattr(whisper_client, 'queued', False):
+        from core.stt.service import PRIORITY_LIVE, PRIORITY_UPLOAD
+        return whisper_client.transcribe_file(
+            audio_path, priority=PRIORITY_LIVE if live else PRIORITY_UPLOAD, timeout=timeout)
+    return whisper_client.transcribe_file(audio_path)
@@ -2,9 +2,10 @@
 import logging
 import json
 import threading
-import time
 from pathlib import Path
 
+from core.file_watch import file_watcher
+
 logger = logging.getLogger(__name__)
 
 class ToolsetManager:
@@ -25,9 +26,7 @@ class ToolsetManager:
         self._toolsets = {}
         
         self._lock = threading.Lock()
-        self._watcher_thread = None
-        self._watcher_running = False
-        self._last_mtimes = {}  # Per-file mtime tracking
+        self._watch_id = None
         
         # Ensure user directory exists
         try:
@@ -98,66 +97,26 @@ class ToolsetManager:
             logger.info("Toolsets reloaded")
     
     def start_file_watcher(self):
-        """Start background file watcher."""
-        if self._watcher_thread is not None and self._watcher_thread.is_alive():
+        """Register toolset files with the shared file watch service."""
+        if self._watch_id is not None:
             logger.warning("Toolset file watcher already running")
             return
-        
-        self._watcher_running = True
-        self._watcher_thread = threading.Thread(
-            target=self._file_watcher_loop,
-            daemon=True,
-            name="ToolsetFileWatcher"
-        )
-        self._watcher_thread.start()
+        self._watch_id = file_watcher.watch(
+            [self.BASE_DIR / "toolsets.json", self.USER_DIR / "toolsets.json"],
+            self._on_file_change, name="toolsets")
         logger.info("Toolset file watcher started")
     
     def stop_file_watcher(self):
         """Stop the file watcher."""
-        if self._watcher_thread is None:
+        if self._watch_id is None:
             return
-        
-        self._watcher_running = False
-        if self._watcher_thread.is_alive():
-            self._watcher_thread.join(timeout=5)
+        file_watcher.unwatch(self._watch_id)
+        self._watch_id = None
         logger.info("Toolset file watcher stopped")
     
-    def _file_watcher_loop(self):
-        """Watch for file changes."""
-        watch_files = [
-            self.BASE_DIR / "toolsets.json",
-            self.USER_DIR / "toolsets.json"
-        ]
-        
-        while self._watcher_running:
-            try:
-                time.sleep(2)
-                
-                for path in watch_files:
-                    if not path.exists():
-                        continue
-                    
-                    path_key = str(path)
-                    current_mtime = path.stat().st_mtime
-                    last_mtime = self._last_mtimes.get(path_key)
-                    
-                    if last_mtime is not None and current_mtime != last_mtime:
-                        logger.info(f"Detected change in {path.name}")
-                        time.sleep(0.5)  # Debounce
-                        self.reload()
-                        # Update all mtimes after reload to prevent re-trigger
-                        for p in watch_files:
-                            if p.exists():
-                                self._last_mtimes[str(p)] = p.stat().st_mtime
-                        break  # Exit inner loop, start fresh
-                    
-                    self._last_mtimes[path_key] = current_mtime
-            
-            except Exception as e:
-                logger.error(f"Toolset file watcher error: {e}")
-                time.sleep(5)
-    
-    # === Getters ===
+    def _on_file_change(self, changed):
+        logger.info(f"Detected change in {', '.join(p.name for p in changed)}")
+        self.reload()
     
     def get_toolset(self, name: str) -> dict:
         """Get a toolset by name."""
@@ -234,8 +193,8 @@ class ToolsetManager:
                 json.dump(data, f, indent=2)
             tmp_path.replace(user_path)
             
-            # Update mtime after save to prevent watcher from triggering
-            self._last_mtimes[str(user_path)] = user_path.stat().st_mtime
+            # Our own write — don't let the watcher reload it
+            file_watcher.note_write(user_path)
             
             logger.info(f"Saved {len(self._toolsets)} toolsets to {user_path}")
             return True
@@ -0,0 +1,88 @@
+"""
+Ordered playback queue for spoken output from background work.
+
+Continuity tasks (scheduled, daemon and webhook) run their LLM and tool work
+concurrently, but there is one speaker. Each finished response is queued
+here with the voice it should be spoken in, and a single worker plays them
+one at a time in the order they were queued. The task that queued the
+speech doesn't wait for playback — its execution slot is free as soon as
+the text exists.
+"""
+
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Utterances waiting to play. A backlog past this means speech is minutes
+# stale; new items are dropped (and logged) rather than queued forever.
+MAX_PENDING = 16
+
+
+class SpeechQueue:
+    """FIFO of (text, voice settings) played through `get_tts().speak_sync`."""
+
+    def __init__(self, get_tts, max_pending=MAX_PENDING, name="SpeechQueue"):
+        """
+        Args:
+            get_tts: callable returning the current TTS client (or None). Looked
+                     up per item so a provider swap mid-queue is picked up.
+        """
+        self._get_tts = get_tts
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._name = name
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._idle_lock = threading.Lock()  # keeps idle flag and queue count in step
+
+    def submit(self, text, voice=None, speed=None, pitch=None, label=""):
+        """Queue `text` to be spoken with the given voice settings. Returns
+        False if the queue is full and the utterance was dropped."""
+        if not text:
+            return False
+        item = {"text": text, "voice": voice, "speed": speed, "pitch": pitch, "label": label}
+        self._ensure_worker()
+        with self._idle_lock:
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                logger.warning(f"[TTS] Speech queue full, dropping utterance from '{label}'")
+                return False
+            self._idle.clear()
+        logger.debug(f"[TTS] Queued speech from '{label}' ({self._queue.qsize()} pending)")
+        return True
+
+    def pending(self):
+        """Utterances queued but not yet started."""
+        return self._queue.qsize()
+
+    def wait_idle(self, timeout=None):
+        """Block until everything queued has finished playing."""
+        return self._idle.wait(timeout)
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, daemon=True, name=self._name)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                tts = self._get_tts()
+                if tts:
+                    tts.speak_sync(item["text"], voice=item["voice"],
+                                   speed=item["speed"], pitch=item["pitch"])
+            except Exception as e:
+                logger.warning(f"[TTS] Queued speech from '{item['label']}' failed: {e}")
+            finally:
+                with self._idle_lock:
+                    self._queue.task_done()
+                    if self._queue.unfinished_tasks == 0:
+                        self._idle.set()
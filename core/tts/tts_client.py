@@ -10,6 +10,7 @@ import gc
 import numpy as np
 import sounddevice as sd
 import soundfile as sf
+from core.audio import dsp
 from core.event_bus import publish, Events
 
 logger = logging.getLogger(__name__)
@@ -135,22 +136,10 @@ class TTSClient:
             return False
 
     def _resample(self, audio_data, from_rate, to_rate):
-        """Resample audio from one rate to another using linear interpolation."""
+        """Resample mono audio to another rate (cached polyphase filter, float32)."""
         if from_rate == to_rate:
             return audio_data
-        
-        ratio = to_rate / from_rate
-        old_length = len(audio_data)
-        new_length = int(old_length * ratio)
-        
-        if new_length == 0:
-            return np.array([], dtype=audio_data.dtype)
-        
-        old_indices = np.arange(old_length)
-        new_indices = np.linspace(0, old_length - 1, new_length)
-        resampled = np.interp(new_indices, old_indices, audio_data.astype(np.float64))
-        
-        return resampled.astype(audio_data.dtype)
+        return dsp.resample(audio_data, from_rate, to_rate)
 
     def set_voice(self, voice_name):
         """Set the voice for TTS"""
@@ -160,15 +149,19 @@ class TTSClient:
         logger.info(f"Voice set to: {self.voice_name}")
         return True
     
-    def set_speed(self, speed):
-        """Set the speech speed, clamped to provider's valid range."""
+    def _clamp_speed(self, speed):
+        """Clamp a speed to the provider's valid range."""
         speed = float(speed)
         lo, hi = self._provider.SPEED_MIN, self._provider.SPEED_MAX
         if speed < lo or speed > hi:
             clamped = max(lo, min(hi, speed))
             logger.warning(f"Speed {speed} outside range [{lo}-{hi}], clamped to {clamped}")
             speed = clamped
-        self.speed = speed
+        return speed
+
+    def set_speed(self, speed):
+        """Set the speech speed, clamped to provider's valid range."""
+        self.speed = self._clamp_speed(speed)
         logger.info(f"Speed set to: {self.speed}")
         return True
     
@@ -261,8 +254,13 @@ class TTSClient:
 
         return True
 
-    def speak_sync(self, text):
-        """Send text to TTS server, play audio, and block until playback finishes."""
+    def speak_sync(self, text, voice=None, speed=None, pitch=None):
+        """Send text to TTS server, play audio, and block until playback finishes.
+
+        voice/speed/pitch override the client's current settings for this
+        utterance only — shared state is never touched, so concurrent callers
+        (background tasks) can each speak in their own voice.
+        """
         if not self.audio_available:
             logger.warning("Audio playback unavailable - skipping TTS")
             return False
@@ -287,39 +285,35 @@ class TTSClient:
         self.should_stop.clear()
 
         # Run synchronously on calling thread — no daemon, no race
-        self._generate_and_play_audio(processed_text)
+        voice_opts = {
+            "voice": voice or None,
+            "speed": self._clamp_speed(speed) if speed is not None else None,
+            "pitch": float(pitch) if pitch is not None else None,
+        }
+        self._generate_and_play_audio(processed_text, voice_opts=voice_opts)
         return True
         
     def _apply_pitch_shift(self, audio_data, samplerate, pitch=None):
-        """Apply pitch shifting to audio data in memory"""
+        """Apply pitch shifting to audio data in memory (same sample rate out)."""
         pitch = pitch if pitch is not None else self.pitch_shift
         if pitch == 1.0:
             return audio_data, samplerate
 
         try:
-            # Convert to mono if stereo for pitch processing
-            if len(audio_data.shape) > 1:
-                mono_data = audio_data.mean(axis=1)
-            else:
-                mono_data = audio_data
-
-            # Resample to shift pitch
-            original_length = len(mono_data)
-            new_length = int(original_length / pitch)
-            indices = np.linspace(0, original_length - 1, new_length)
-            shifted_data = np.interp(indices, np.arange(original_length), mono_data)
-            
-            return shifted_data.astype(audio_data.dtype), samplerate
-            
+            return dsp.change_speed(dsp.to_mono(audio_data), pitch), samplerate
         except Exception as e:
             logger.error(f"Error applying pitch shift: {e}")
             return audio_data, samplerate
 
-    def _fetch_audio(self, text):
-        """Fetch audio from provider. Returns (audio_data, samplerate) or (None, None)."""
+    def _fetch_audio(self, text, voice=None, speed=None, pitch=None):
+        """Fetch audio from provider. Returns (audio_data, samplerate) or (None, None).
+        voice/speed/pitch default to the client's current settings."""
+        use_voice = voice or self.voice_name
+        use_speed = speed if speed is not None else self.speed
+        use_pitch = pitch if pitch is not None else self.pitch_shift
         temp_path = None
         try:
-            audio_bytes = self._provider.generate(text, self.voice_name, self.speed)
+            audio_bytes = self._provider.generate(text, use_voice, use_speed)
             if not audio_bytes:
                 return None, None
 
@@ -335,12 +329,15 @@ class TTSClient:
             if self.should_stop.is_set():
                 return None, None
 
-            # Load audio data
-            audio_data, samplerate = sf.read(temp_path)
+            # Load audio data as mono float32 — what playback wants
+            audio_data, samplerate = sf.read(temp_path, dtype='float32')
+            audio_data = dsp.to_mono(audio_data)
 
-            # Apply pitch shift if needed (Kokoro supports this; cloud providers may not benefit)
-            if self.pitch_shift != 1.0:
-                audio_data, samplerate = self._apply_pitch_shift(audio_data, samplerate)
+            # Pitch shift (Kokoro supports this; cloud providers may not benefit).
+            # Shifting by p is the same as playing the samples at samplerate * p,
+            # so relabel the rate and let playback's single resample do both.
+            if use_pitch != 1.0:
+                samplerate = samplerate * use_pitch
 
             return audio_data, samplerate
 
@@ -358,7 +355,7 @@ class TTSClient:
                     except Exception:
                         break
         
-    def _generate_and_play_audio(self, text, gen=None):
+    def _generate_and_play_audio(self, text, gen=None, voice_opts=None):
         """Generate audio from server and play it using sounddevice OutputStream"""
         if not self.audio_available:
             return
@@ -367,7 +364,7 @@ class TTSClient:
             return gen is not None and gen != self._generation
 
         try:
-            audio_data, samplerate = self._fetch_audio(text)
+            audio_data, samplerate = self._fetch_audio(text, **(voice_opts or {}))
             if _stale():
                 logger.debug(f"[TTS] Stale generation {gen} (current {self._generation}), discarding")
                 return
@@ -384,18 +381,11 @@ class TTSClient:
                 self._is_playing = True
                 publish(Events.TTS_PLAYING)
 
-            # Convert stereo to mono if needed
-            if len(audio_data.shape) > 1:
-                audio_data = audio_data.mean(axis=1)
-
-            # Resample to output device rate if different
+            # Resample to output device rate if different (also applies pitch)
             if samplerate != self.output_rate:
-                logger.debug(f"Resampling audio from {samplerate}Hz to {self.output_rate}Hz")
+                logger.debug(f"Resampling audio from {samplerate:g}Hz to {self.output_rate}Hz")
                 audio_data = self._resample(audio_data, samplerate, self.output_rate)
                 samplerate = self.output_rate
-
-            # Ensure float32 for sounddevice
-            audio_data = audio_data.astype(np.float32)
             duration = len(audio_data) / samplerate
             logger.debug(f"[TTS] Playing {duration:.1f}s audio ({len(audio_data)} samples @ {samplerate}Hz) on device {self.output_device}")
 
@@ -502,7 +492,7 @@ class TTSClient:
                 with open(temp_path, 'wb') as f:
                     f.write(audio_bytes)
 
-                audio_data, samplerate = sf.read(temp_path)
+                audio_data, samplerate = sf.read(temp_path, dtype='float32')
                 audio_data, samplerate = self._apply_pitch_shift(audio_data, samplerate, pitch=use_pitch)
                 # Re-encode as OGG regardless of input format (consistent output)
                 sf.write(temp_path, audio_data, samplerate, format='OGG', subtype='OPUS')
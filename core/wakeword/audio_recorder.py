@@ -4,7 +4,9 @@ Audio recorder for wake word detection using sounddevice.
 Uses the unified audio subsystem for device management.
 
 OpenWakeWord expects 16kHz audio, so this module handles
-resampling if the device doesn't support native 16kHz.
+resampling if the device doesn't support native 16kHz. The resampler
+keeps filter state across reads (core.audio.dsp.StreamResampler), so
+consecutive frames join without clicks.
 """
 
 import numpy as np
@@ -16,7 +18,7 @@ from core.audio import (
     get_device_manager,
     classify_audio_error,
     convert_to_mono,
-    resample_audio
+    dsp,
 )
 import config
 
@@ -45,6 +47,7 @@ class AudioRecorder:
         self.stream = None
         self.available = False
         self._resample_ratio = 1.0
+        self._resampler = None
         self._needs_stereo_downmix = False
         
         # Frame skipping parameters (hardcoded to 1 - process every frame)
@@ -101,6 +104,8 @@ class AudioRecorder:
         self.actual_blocksize = device_config.blocksize
         self._resample_ratio = device_config.resample_ratio
         self._needs_stereo_downmix = device_config.needs_stereo_downmix
+        self._resampler = (dsp.StreamResampler(self.actual_rate, self.target_rate)
+                           if self.actual_rate != self.target_rate else None)
 
     def start_recording(self):
         """Open audio input stream. Retries once with device re-resolution on failure."""
@@ -145,6 +150,7 @@ class AudioRecorder:
             blocksize=actual_chunk
         )
         self.stream.start()
+        self.reset_resampler()
         logger.info(f"Wakeword audio stream opened: device={self.device_index}, "
                    f"rate={self.actual_rate}, channels={self.channels}, chunk={actual_chunk}")
 
@@ -185,6 +191,33 @@ class AudioRecorder:
         """Return the underlying stream (for compatibility)."""
         return self.stream
 
+    def reset_resampler(self):
+        """Drop resampler history — call when input audio was discarded."""
+        if self._resampler is not None:
+            self._resampler.reset()
+
+    def _to_target(self, data):
+        """Device block -> 16kHz mono int16."""
+        if self._resampler is None:
+            return convert_to_mono(data) if self._needs_stereo_downmix else data.reshape(-1)
+        return dsp.to_int16(self._resampler.process(dsp.to_mono(data)))
+
+    def read_frames(self, frames):
+        """
+        Read about `frames` samples of 16kHz mono int16 audio.
+        
+        Reads the matching number of device-rate samples and converts
+        them. Returns None without a stream; stream errors propagate so
+        the caller can recover.
+        """
+        stream = self.stream
+        if stream is None:
+            return None
+        data, overflowed = stream.read(max(1, round(frames * self._resample_ratio)))
+        if overflowed:
+            logger.debug("Wakeword audio buffer overflow (non-fatal)")
+        return self._to_target(data)
+
     def get_latest_chunk(self, duration):
         """
         Get latest audio chunk with frame skipping optimization.
@@ -200,28 +233,10 @@ class AudioRecorder:
         if self.stream is None:
             return self.previous_result
         
-        # Calculate how many samples to read at actual device rate
-        actual_samples = int(duration * self.actual_rate)
-        
         try:
-            data, overflowed = self.stream.read(actual_samples)
-            if overflowed:
-                logger.debug("Wakeword audio buffer overflow (non-fatal)")
-            
-            # Convert stereo to mono if needed
-            if self._needs_stereo_downmix:
-                audio = convert_to_mono(data)
-            else:
-                audio = data.flatten().astype(np.int16)
-            
-            # Resample to target rate if needed
-            if self._resample_ratio != 1.0:
-                audio = resample_audio(audio, self.actual_rate, self.target_rate)
-            
-            self.previous_result = audio
-            
+            self.previous_result = self.read_frames(int(duration * self.target_rate))
         except Exception as e:
             logger.warning(f"Error reading wakeword audio chunk: {classify_audio_error(e)}")
             # Return previous result to avoid breaking detection loop
         
-        return self.previous_result
\ No newline at end of file
+        return self.previous_result
@@ -7,6 +7,7 @@ import logging
 from concurrent.futures import ThreadPoolExecutor
 import config
 from core.event_bus import publish, Events
+from core.stt.utils import transcribe as stt_transcribe
 
 logger = logging.getLogger(__name__)
 
@@ -229,6 +230,8 @@ class WakeWordDetector:
             if stream and stream.read_available > 0:
                 available = stream.read_available
                 stream.read(available)  # Discard the data
+                if hasattr(self.audio_recorder, 'reset_resampler'):
+                    self.audio_recorder.reset_resampler()
                 logger.debug(f"Flushed {available} samples from audio buffer")
         except Exception as e:
             logger.debug(f"Buffer flush: {e}")
@@ -307,7 +310,7 @@ class WakeWordDetector:
 
             process_time = time.time()
             try:
-                text = self.system.whisper_client.transcribe_file(audio_file)
+                text = stt_transcribe(self.system.whisper_client, audio_file, live=True)
             finally:
                 try:
                     os.unlink(audio_file)
@@ -382,11 +385,11 @@ class WakeWordDetector:
                     time.sleep(0.1)
                     continue
 
-                # Read audio frame (sounddevice returns numpy array directly)
-                audio_data, overflowed = stream.read(frame_samples)
-                if overflowed:
-                    logger.debug("Audio buffer overflow in wake detection")
-                audio_array = audio_data.flatten().astype(np.int16)
+                # Read one frame, downmixed and resampled to 16kHz by the recorder
+                audio_array = self.audio_recorder.read_frames(frame_samples)
+                if audio_array is None:
+                    time.sleep(0.1)
+                    continue
 
                 # Get prediction from OWW
                 predictions = self.model.predict(audio_array)
@@ -21,6 +21,10 @@ class NullAudioRecorder:
         """Return None - no stream available"""
         return None
         
+    def read_frames(self, frames):
+        """Return None - no stream available"""
+        return None
+        
     def get_latest_chunk(self, duration):
         """Return empty array"""
         import numpy as np
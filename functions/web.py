@@ -2,11 +2,14 @@
 
 import json
 import logging
+import threading
+import time
 import urllib.parse
+from collections import OrderedDict
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, CData, NavigableString
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from core.socks_proxy import get_session, clear_session_cache, SocksAuthError
+from core.socks_proxy import get_session, get_caching_session, clear_session_cache, SocksAuthError
 import config
 
 logger = logging.getLogger(__name__)
@@ -17,6 +20,20 @@ EMOJI = '🌐'
 WORK_SEARCH_MAX_RESULTS = 8
 WORK_WEBSITE_MAX_CONTENT = 12000
 WORK_WEBSITE_STRIP_ELEMENTS = ["script", "style", "nav", "footer", "header", "aside", "iframe"]
+WORK_SEARCH_CACHE_SIZE = 64
+WORK_PAGE_CACHE_SIZE = 8
+
+# lxml builds the tree several times faster than the pure-Python parser;
+# use it when installed, otherwise fall back to the stdlib one.
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+_CONTENT_SKIP = frozenset(WORK_WEBSITE_STRIP_ELEMENTS + ['form'])
+_NAV_SKIP = frozenset(['header', 'footer', 'nav', 'aside'])
+_TEXT_TYPES = (NavigableString, CData)
 
 AVAILABLE_FUNCTIONS = [
     'web_search',
@@ -130,7 +147,7 @@ TOOLS = [
 
 def _parse_ddg_results(html: str, max_results: int = 15) -> list:
     """Parse DDG HTML response into result dicts."""
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = BeautifulSoup(html, HTML_PARSER)
     result_divs = soup.find_all('div', class_='result')
     results = []
     for div in result_divs[:max_results]:
@@ -159,7 +176,50 @@ def _parse_ddg_results(html: str, max_results: int = 15) -> list:
     return results
 
 
+_search_cache = OrderedDict()
+_search_cache_lock = threading.Lock()
+
+
+def _search_cache_get(key):
+    ttl = getattr(config, 'WEB_SEARCH_CACHE_TTL', 900)
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if not entry:
+            return None
+        stored_at, results = entry
+        if not ttl or time.time() - stored_at > ttl:
+            del _search_cache[key]
+            return None
+        _search_cache.move_to_end(key)
+        return [dict(r) for r in results]
+
+
+def _search_cache_put(key, results):
+    with _search_cache_lock:
+        _search_cache[key] = (time.time(), [dict(r) for r in results])
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > WORK_SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+
+
 def search_ddg_html(query: str, max_results: int = 15) -> list:
+    """DDG results for a query. Non-empty result lists are reused for
+    WEB_SEARCH_CACHE_TTL seconds — the HTML endpoint sends no cache headers,
+    and research_topic / web_search often repeat a query within a turn."""
+    cache_key = (query.strip().lower(), max_results)
+    if getattr(config, 'WEB_CACHE_ENABLED', True):
+        cached = _search_cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"[WEB] DDG search served from cache ({len(cached)} results)")
+            return cached
+
+    results = _search_ddg_uncached(query, max_results)
+    if results and getattr(config, 'WEB_CACHE_ENABLED', True):
+        _search_cache_put(cache_key, results)
+    return results
+
+
+def _search_ddg_uncached(query: str, max_results: int) -> list:
     logger.info(f"[WEB] DDG search requested")
     encoded = urllib.parse.quote_plus(query)
     url = f"https://html.duckduckgo.com/html/?q={encoded}&kp=-1&kl=us-en"
@@ -221,17 +281,26 @@ def search_ddg_html(query: str, max_results: int = 15) -> list:
     return results
 
 
-def extract_content(html: str) -> str:
-    """Extract readable content from HTML using BeautifulSoup."""
-    soup = BeautifulSoup(html, 'html.parser')
-    for tag in soup(WORK_WEBSITE_STRIP_ELEMENTS + ['form']):
-        tag.decompose()
-    
-    text = soup.get_text(separator=' ', strip=True)
-    lines = (line.strip() for line in text.splitlines())
-    result = '\n'.join(chunk for line in lines for chunk in line.split("  ") if chunk)
-    logger.info(f"[WEB] Extracted {len(result)} chars")
-    return result
+def _inside(tag, names) -> bool:
+    """True if any ancestor of `tag` is one of `names`."""
+    return any(parent.name in names for parent in tag.parents)
+
+
+def _visible_strings(root, skip):
+    """Text nodes under `root` in document order, skipping whole subtrees
+    rooted at tags in `skip`. Same string types get_text() collects."""
+    stack = [iter(root.children)]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            continue
+        if isinstance(node, NavigableString):
+            if type(node) in _TEXT_TYPES:
+                yield node
+        elif node.name not in skip:
+            stack.append(iter(node.children))
+
 
 def _best_srcset_url(srcset: str) -> str:
     """Pick best URL from srcset, preferring ~1920w."""
@@ -268,119 +337,186 @@ _JUNK_PATTERNS = ['logo', 'icon', 'sprite', 'pixel', 'badge', 'emoji', 'favicon'
                   'avatar', '1x1', 'spacer', 'blank', 'tracking', 'spinner', 'loader']
 
 
-def extract_images(html: str, base_url: str) -> list:
-    """Extract content images from HTML, stripping nav/header/footer."""
-    soup = BeautifulSoup(html, 'html.parser')
-    for tag in soup(WORK_WEBSITE_STRIP_ELEMENTS + ['form']):
-        tag.decompose()
+class WebPage:
+    """One parsed HTML document; content, links and images all come from the
+    same tree. Strip lists are applied by skipping subtrees during the walk
+    rather than decomposing, so no extraction disturbs another."""
+
+    def __init__(self, html: str, base_url: str = ''):
+        self.base_url = base_url
+        self.soup = BeautifulSoup(html, HTML_PARSER)
+        self._content = None
+        self._images = None
+        self._links = {}
+
+    def content(self) -> str:
+        """Readable text with scripts, chrome and forms stripped."""
+        if self._content is None:
+            text = ' '.join(s for s in (t.strip() for t in _visible_strings(self.soup, _CONTENT_SKIP)) if s)
+            lines = (line.strip() for line in text.splitlines())
+            self._content = '\n'.join(chunk for line in lines for chunk in line.split("  ") if chunk)
+            logger.info(f"[WEB] Extracted {len(self._content)} chars")
+        return self._content
+
+    def images(self) -> list:
+        """Content images (outside nav/header/footer), up to 30."""
+        if self._images is not None:
+            return self._images
+        base_url = self.base_url
+        images = []
+        seen_urls = set()
+
+        for img in self.soup.find_all('img'):
+            if _inside(img, _CONTENT_SKIP):
+                continue
+            src = (img.get('data-src') or img.get('data-lazy-src') or
+                   _best_srcset_url(img.get('srcset')) or img.get('src'))
+            if not src:
+                continue
+            if src.startswith('data:') or src.endswith('.svg'):
+                continue
 
-    images = []
-    seen_urls = set()
+            full_src = urllib.parse.urljoin(base_url, src)
 
-    for img in soup.find_all('img'):
-        src = (img.get('data-src') or img.get('data-lazy-src') or
-               _best_srcset_url(img.get('srcset')) or img.get('src'))
-        if not src:
-            continue
-        if src.startswith('data:') or src.endswith('.svg'):
-            continue
+            if full_src in seen_urls:
+                continue
+            seen_urls.add(full_src)
 
-        full_src = urllib.parse.urljoin(base_url, src)
+            src_lower = full_src.lower()
+            if any(p in src_lower for p in _JUNK_PATTERNS):
+                continue
 
-        if full_src in seen_urls:
-            continue
-        seen_urls.add(full_src)
+            # Skip tiny images
+            width, height = img.get('width', ''), img.get('height', '')
+            try:
+                if width and height and (int(width) < 80 or int(height) < 80):
+                    continue
+            except (ValueError, TypeError):
+                pass
+
+            alt = img.get('alt', '').strip()
+            title = img.get('title', '').strip()
+
+            # Check for figcaption
+            caption = ''
+            figure = img.find_parent('figure')
+            if figure:
+                figcaption = figure.find('figcaption')
+                if figcaption:
+                    caption = figcaption.get_text(strip=True)
+
+            # Parent link
+            parent_link = ''
+            parent_a = img.find_parent('a')
+            if parent_a and parent_a.get('href'):
+                parent_link = urllib.parse.urljoin(base_url, parent_a['href'])
+
+            images.append({
+                'url': full_src,
+                'name': caption or alt or title or '',
+                'link': parent_link
+            })
 
-        src_lower = full_src.lower()
-        if any(p in src_lower for p in _JUNK_PATTERNS):
-            continue
+        logger.info(f"[WEB] Extracted {len(images)} images from {base_url}")
+        self._images = images[:30]
+        return self._images
 
-        # Skip tiny images
-        width, height = img.get('width', ''), img.get('height', '')
-        try:
-            if width and height and (int(width) < 80 or int(height) < 80):
+    def links(self, strip_nav: bool = True) -> list:
+        """Internal text links, up to 50."""
+        if strip_nav in self._links:
+            return self._links[strip_nav]
+        base_url = self.base_url
+        parsed_base = urllib.parse.urlparse(base_url)
+        base_domain = parsed_base.netloc.lower().lstrip('www.')
+
+        seen = set()
+        links = []
+
+        for a in self.soup.find_all('a', href=True):
+            if strip_nav and _inside(a, _NAV_SKIP):
+                continue
+            href = a['href'].strip()
+            if not href or href.startswith('#') or href.startswith('javascript:') or href.startswith('mailto:'):
                 continue
-        except (ValueError, TypeError):
-            pass
 
-        alt = img.get('alt', '').strip()
-        title = img.get('title', '').strip()
+            # Text anchors only - skip image-only links
+            text = a.get_text(strip=True)
+            if not text:
+                continue
+
+            full_url = urllib.parse.urljoin(base_url, href)
 
-        # Check for figcaption
-        caption = ''
-        figure = img.find_parent('figure')
-        if figure:
-            figcaption = figure.find('figcaption')
-            if figcaption:
-                caption = figcaption.get_text(strip=True)
+            # Internal links only
+            parsed = urllib.parse.urlparse(full_url)
+            link_domain = parsed.netloc.lower().lstrip('www.')
+            if link_domain != base_domain:
+                continue
 
-        # Parent link
-        parent_link = ''
-        parent_a = img.find_parent('a')
-        if parent_a and parent_a.get('href'):
-            parent_link = urllib.parse.urljoin(base_url, parent_a['href'])
+            if full_url in seen:
+                continue
+            seen.add(full_url)
 
-        images.append({
-            'url': full_src,
-            'name': caption or alt or title or '',
-            'link': parent_link
-        })
+            links.append({'text': text, 'url': full_url})
 
-    logger.info(f"[WEB] Extracted {len(images)} images from {base_url}")
-    return images[:30]
+        logger.info(f"[WEB] Extracted {len(links)} internal links from {base_url}")
+        self._links[strip_nav] = links[:50]
+        return self._links[strip_nav]
 
 
-def extract_site_links(html: str, base_url: str, strip_nav: bool = True) -> list:
-    """Extract internal text links from HTML."""
-    soup = BeautifulSoup(html, 'html.parser')
+def extract_content(html: str) -> str:
+    """Extract readable content from HTML."""
+    return WebPage(html).content()
 
-    if strip_nav:
-        for tag in soup(['header', 'footer', 'nav', 'aside']):
-            tag.decompose()
 
-    parsed_base = urllib.parse.urlparse(base_url)
-    base_domain = parsed_base.netloc.lower().lstrip('www.')
+def extract_images(html: str, base_url: str) -> list:
+    """Extract content images from HTML, stripping nav/header/footer."""
+    return WebPage(html, base_url).images()
 
-    seen = set()
-    links = []
 
-    for a in soup.find_all('a', href=True):
-        href = a['href'].strip()
-        if not href or href.startswith('#') or href.startswith('javascript:') or href.startswith('mailto:'):
-            continue
+def extract_site_links(html: str, base_url: str, strip_nav: bool = True) -> list:
+    """Extract internal text links from HTML."""
+    return WebPage(html, base_url).links(strip_nav)
 
-        # Text anchors only - skip image-only links
-        text = a.get_text(strip=True)
-        if not text:
-            continue
 
-        full_url = urllib.parse.urljoin(base_url, href)
+# Recently parsed pages, so get_site_links → get_images → get_website on the
+# same URL parse once. Keyed on the body too, so a changed page re-parses.
+_page_cache = OrderedDict()
+_page_cache_lock = threading.Lock()
 
-        # Internal links only
-        parsed = urllib.parse.urlparse(full_url)
-        link_domain = parsed.netloc.lower().lstrip('www.')
-        if link_domain != base_domain:
-            continue
 
-        if full_url in seen:
-            continue
-        seen.add(full_url)
+def _parsed_page(url: str, html: str) -> WebPage:
+    key = (url, len(html), hash(html))
+    with _page_cache_lock:
+        page = _page_cache.get(key)
+        if page is not None:
+            _page_cache.move_to_end(key)
+            return page
+    page = WebPage(html, url)
+    with _page_cache_lock:
+        _page_cache[key] = page
+        while len(_page_cache) > WORK_PAGE_CACHE_SIZE:
+            _page_cache.popitem(last=False)
+    return page
 
-        links.append({'text': text, 'url': full_url})
 
-    logger.info(f"[WEB] Extracted {len(links)} internal links from {base_url}")
-    return links[:50]
+def fetch_page(url: str, timeout: float = 12):
+    """GET a URL through the caching session. Returns (response, page);
+    page is None unless the status is 200. Network errors propagate."""
+    resp = get_caching_session().get(url, timeout=timeout)
+    if resp.status_code != 200:
+        return resp, None
+    return resp, _parsed_page(url, resp.text)
 
 
 def fetch_single_site(url: str, max_chars: int = 10000) -> dict:
     logger.info(f"[WEB] Fetching site: {url}")
     try:
-        resp = get_session().get(url, timeout=12)
+        resp, page = fetch_page(url)
         logger.info(f"[WEB] Site response {url}: {resp.status_code}")
-        if resp.status_code != 200:
+        if page is None:
             return {'url': url, 'content': None, 'error': f'HTTP {resp.status_code}'}
         
-        content = extract_content(resp.text)
+        content = page.content()
         if not content:
             logger.warning(f"[WEB] No content extracted from {url}")
             return {'url': url, 'content': None, 'error': 'No content extracted'}
@@ -433,13 +569,13 @@ def execute(function_name, arguments, config):
             
             logger.info(f"[WEB] get_website: Fetching {url}")
             try:
-                resp = get_session().get(url, timeout=12)
+                resp, page = fetch_page(url)
                 logger.info(f"[WEB] get_website: Response {resp.status_code}")
-                if resp.status_code != 200:
+                if page is None:
                     logger.warning(f"[WEB] get_website: Non-200 status {resp.status_code}")
                     return f"Couldn't access website. HTTP {resp.status_code}", False
                 
-                content = extract_content(resp.text)
+                content = page.content()
                 if not content:
                     logger.warning(f"[WEB] get_website: No content extracted from {url}")
                     return "Could not extract content from that website.", False
@@ -474,7 +610,7 @@ def execute(function_name, arguments, config):
             try:
                 # Use search API for better results than opensearch
                 search_url = f"https://en.wikipedia.org/w/api.php?action=query&list=search&srsearch={urllib.parse.quote(topic)}&srlimit=5&format=json"
-                resp = get_session().get(search_url, timeout=12)
+                resp = get_caching_session().get(search_url, timeout=12)
                 logger.info(f"[WEB] get_wikipedia: Search response {resp.status_code}")
                 
                 if resp.status_code != 200:
@@ -505,7 +641,7 @@ def execute(function_name, arguments, config):
                 
                 # Fetch the summary
                 api_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{urllib.parse.quote(title)}"
-                resp = get_session().get(api_url, timeout=12)
+                resp = get_caching_session().get(api_url, timeout=12)
                 logger.info(f"[WEB] get_wikipedia: Article fetch response {resp.status_code}")
                 
                 if resp.status_code != 200:
@@ -520,7 +656,7 @@ def execute(function_name, arguments, config):
                     
                     # Get the actual page content to find real article links
                     links_url = f"https://en.wikipedia.org/w/api.php?action=query&titles={urllib.parse.quote(title)}&prop=links&pllimit=20&format=json"
-                    links_resp = get_session().get(links_url, timeout=12)
+                    links_resp = get_caching_session().get(links_url, timeout=12)
                     
                     if links_resp.status_code == 200:
                         links_data = json.loads(links_resp.text)
@@ -534,7 +670,7 @@ def execute(function_name, arguments, config):
                                 if link_title and not any(x in link_title.lower() for x in ['wikipedia:', 'help:', 'category:', 'template:', 'disambiguation']):
                                     # Fetch this article instead
                                     alt_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{urllib.parse.quote(link_title)}"
-                                    alt_resp = get_session().get(alt_url, timeout=12)
+                                    alt_resp = get_caching_session().get(alt_url, timeout=12)
                                     if alt_resp.status_code == 200:
                                         article = json.loads(alt_resp.text)
                                         if article.get('type') != 'disambiguation':
@@ -631,11 +767,11 @@ def execute(function_name, arguments, config):
             strip_nav = arguments.get('strip_nav', True)
             logger.info(f"[WEB] get_site_links: Fetching {url} (strip_nav={strip_nav})")
             try:
-                resp = get_session().get(url, timeout=12)
-                if resp.status_code != 200:
+                resp, page = fetch_page(url)
+                if page is None:
                     return f"Couldn't access website. HTTP {resp.status_code}", False
 
-                links = extract_site_links(resp.text, url, strip_nav)
+                links = page.links(strip_nav)
                 if not links:
                     return "No internal text links found on that page.", True
 
@@ -662,11 +798,11 @@ def execute(function_name, arguments, config):
 
             logger.info(f"[WEB] get_images: Fetching {url}")
             try:
-                resp = get_session().get(url, timeout=12)
-                if resp.status_code != 200:
+                resp, page = fetch_page(url)
+                if page is None:
                     return f"Couldn't access website. HTTP {resp.status_code}", False
 
-                images = extract_images(resp.text, url)
+                images = page.images()
                 if not images:
                     return "No images found in the content area of that page.", True
 
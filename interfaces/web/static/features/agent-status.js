@@ -14,6 +14,7 @@ let draining = false;
 let workspaces = new Map(); // project -> {type, url, running}
 
 const STATUS_COLORS = {
+    queued: '#5bc0de',
     running: '#f0ad4e',
     pending: '#f0ad4e',
     done: '#5cb85c',
@@ -50,7 +51,7 @@ function renderPills() {
     // Check if we have anything to show (agents or workspaces)
     if (visible.size === 0 && workspaces.size === 0) {
         bar.style.display = 'none';
-        const anyRunning = [...agents.values()].some(a => a.status === 'running');
+        const anyRunning = [...agents.values()].some(a => a.status === 'running' || a.status === 'queued');
         if (!anyRunning) stopPolling();
         return;
     }
@@ -93,7 +94,8 @@ function renderPills() {
         pill.dataset.status = effectiveStatus;
         pill.style.borderColor = STATUS_COLORS[effectiveStatus] || '#888';
         const warnTip = agent.warning ? `\nWarning: ${agent.warning}` : '';
-        pill.title = `${agent.name}: ${agent.mission || ''}\nStatus: ${effectiveStatus}${warnTip}`;
+        const queueTip = agent.status === 'queued' && agent.queue_position ? ` (#${agent.queue_position})` : '';
+        pill.title = `${agent.name}: ${agent.mission || ''}\nStatus: ${effectiveStatus}${queueTip}${warnTip}`;
     }
 
     for (const pill of bar.querySelectorAll('.agent-pill')) {
@@ -307,7 +309,7 @@ export function initAgentStatus() {
         agents.set(data.id, {
             id: data.id,
             name: data.name,
-            status: 'running',
+            status: data.status || 'running',
             mission: data.mission || '',
             chat_name: data.chat_name || '',
         });
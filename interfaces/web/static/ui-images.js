@@ -311,7 +311,9 @@ export const createUserImageThumbnails = (images) => {
     
     images.forEach(img => {
         const imgEl = document.createElement('img');
-        imgEl.src = `data:${img.media_type};base64,${img.data}`;
+        // Stored images come as a cacheable url; just-sent ones still carry base64
+        imgEl.src = img.url || `data:${img.media_type};base64,${img.data}`;
+        imgEl.loading = 'lazy';
         imgEl.className = 'user-image-thumb';
         imgEl.alt = 'Attached image';
         imgEl.onclick = (e) => {
@@ -9,7 +9,7 @@ export default {
     name: 'Backup',
     icon: '\uD83D\uDCBE',
     description: 'Automatic and manual backups of user data',
-    keys: ['BACKUPS_ENABLED', 'BACKUPS_KEEP_DAILY', 'BACKUPS_KEEP_WEEKLY', 'BACKUPS_KEEP_MONTHLY', 'BACKUPS_KEEP_MANUAL'],
+    keys: ['BACKUPS_ENABLED', 'BACKUPS_KEEP_DAILY', 'BACKUPS_KEEP_WEEKLY', 'BACKUPS_KEEP_MONTHLY', 'BACKUPS_KEEP_MANUAL', 'BACKUPS_MODE', 'BACKUPS_COMPRESSION_LEVEL'],
 
     render(ctx) {
         return `
@@ -115,7 +115,7 @@ export default {
                         ${items.length ? items.map(b => `
                             <div class="backup-item" data-filename="${esc(b.filename)}">
                                 <span class="backup-item-date">${b.date} ${b.time}</span>
-                                <span class="backup-item-size">${fmtSize(b.size)}</span>
+                                <span class="backup-item-size" title="${b.incremental ? `incremental \u00B7 ${fmtSize(b.logical_size)} total` : ''}">${b.incremental ? '+' : ''}${fmtSize(b.size)}</span>
                                 <div class="backup-item-actions">
                                     <a class="btn-icon backup-dl" href="/api/backup/download/${encodeURIComponent(b.filename)}" download title="Download">\u2B07</a>
                                     <button class="btn-icon danger backup-del" data-filename="${esc(b.filename)}" title="Delete">\u2715</button>
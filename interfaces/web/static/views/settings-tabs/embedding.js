@@ -81,7 +81,8 @@ function _renderReembedProgress(el, status) {
                 progressEl.textContent = `Finished with error: ${status.last_error}`;
                 progressEl.style.color = 'var(--color-error,#f44336)';
             } else {
-                progressEl.textContent = `Done: ${done} vectors re-embedded` + (errors ? ` (${errors} errors)` : '');
+                const rate = status.rows_per_sec ? `, ${status.rows_per_sec} rows/s` : '';
+                progressEl.textContent = `Done: ${done} vectors re-embedded${rate}` + (errors ? ` (${errors} errors)` : '');
                 progressEl.style.color = 'var(--color-success,#4caf50)';
             }
         } else {
@@ -98,7 +99,9 @@ function _renderReembedProgress(el, status) {
     const pct = status.total > 0 ? Math.round(100 * status.done / status.total) : 0;
     const tbl = status.current_table ? ` [${status.current_table}]` : '';
     progressEl.style.color = '';
-    progressEl.textContent = `${status.done}/${status.total} (${pct}%)${tbl}`;
+    const rate = status.rows_per_sec ? ` · ${status.rows_per_sec} rows/s` : '';
+    const resumed = status.resumed ? ' (resumed)' : '';
+    progressEl.textContent = `${status.done}/${status.total} (${pct}%)${tbl}${rate}${resumed}`;
 }
 
 let _reembedUnsubscribe = null;
@@ -172,7 +175,7 @@ const tabConfig = {
     },
 
     commonKeys: [],
-    commonAdvancedKeys: []
+    commonAdvancedKeys: ['EMBEDDING_STORAGE_DIM']
 };
 
 export default {
@@ -17,7 +17,9 @@ export default {
     name: 'LLM',
     icon: '\uD83E\uDDE0',
     description: 'Language model providers and fallback order',
-    generalKeys: ['LLM_MAX_HISTORY', 'CONTEXT_LIMIT', 'LLM_REQUEST_TIMEOUT', 'FORCE_THINKING', 'THINKING_PREFILL', 'IMAGE_UPLOAD_MAX_WIDTH'],
+    generalKeys: ['LLM_MAX_HISTORY', 'CONTEXT_LIMIT', 'LLM_REQUEST_TIMEOUT', 'STREAM_COALESCE_MS', 'STREAM_COALESCE_MAX_CHARS', 'FORCE_THINKING', 'THINKING_PREFILL', 'IMAGE_UPLOAD_MAX_WIDTH',
+                  'HISTORY_SUMMARY_ENABLED', 'HISTORY_SUMMARY_TRIGGER_TOKENS', 'HISTORY_SUMMARY_KEEP_TOKENS',
+                  'HISTORY_SUMMARY_PROVIDER', 'HISTORY_SUMMARY_MAX_WORDS'],
 
     render(ctx) {
         const coreProviders = ctx.settings.LLM_PROVIDERS || {};
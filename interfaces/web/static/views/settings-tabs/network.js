@@ -6,8 +6,9 @@ export default {
     id: 'network',
     name: 'Network',
     icon: '\uD83C\uDF10',
-    description: 'SOCKS proxy and privacy network settings',
-    keys: ['SOCKS_ENABLED', 'SOCKS_HOST', 'SOCKS_PORT', 'SOCKS_TIMEOUT'],
+    description: 'SOCKS proxy, web cache and privacy network settings',
+    keys: ['SOCKS_ENABLED', 'SOCKS_HOST', 'SOCKS_PORT', 'SOCKS_TIMEOUT',
+           'WEB_CACHE_ENABLED', 'WEB_CACHE_TTL', 'WEB_CACHE_MAX_MB', 'WEB_SEARCH_CACHE_TTL'],
 
     render(ctx) {
         const whitelist = ctx.settings.PRIVACY_NETWORK_WHITELIST || [];
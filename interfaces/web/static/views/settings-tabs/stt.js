@@ -18,7 +18,8 @@ const tabConfig = {
             essentialKeys: ['STT_MODEL_SIZE'],
             advancedKeys: [
                 'FASTER_WHISPER_DEVICE', 'FASTER_WHISPER_CUDA_DEVICE', 'FASTER_WHISPER_COMPUTE_TYPE',
-                'FASTER_WHISPER_BEAM_SIZE', 'FASTER_WHISPER_NUM_WORKERS', 'FASTER_WHISPER_VAD_FILTER'
+                'FASTER_WHISPER_BEAM_SIZE', 'FASTER_WHISPER_NUM_WORKERS', 'FASTER_WHISPER_VAD_FILTER',
+                'FASTER_WHISPER_BATCH_SIZE', 'STT_WORKERS', 'STT_QUEUE_SIZE', 'STT_IDLE_UNLOAD_SECONDS'
             ]
         },
         fireworks_whisper: {
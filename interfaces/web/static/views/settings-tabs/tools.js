@@ -5,7 +5,7 @@ export default {
     icon: '\uD83D\uDD27',
     description: 'Function calling and tool settings',
     essentialKeys: ['MAX_TOOL_ITERATIONS', 'MAX_PARALLEL_TOOLS'],
-    advancedKeys: ['DEBUG_TOOL_CALLING'],
+    advancedKeys: ['CONTINUITY_MAX_CONCURRENT_TASKS', 'DAEMON_EVENT_DEBOUNCE', 'CONTINUITY_RUN_RETENTION_DAYS', 'CONTINUITY_RUN_MAX_ROWS', 'AGENT_MAX_CONCURRENT', 'AGENT_QUEUE_SIZE', 'DEBUG_TOOL_CALLING'],
 
     render(ctx) {
         return ctx.renderFields(this.essentialKeys) +
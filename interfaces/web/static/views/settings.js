@@ -387,6 +387,15 @@ function renderInput(key, value, type) {
             ${models.map(([v, l]) => `<option value="${v}" ${value === v ? 'selected' : ''}>${l}</option>`).join('')}
         </select>`;
     }
+    if (key === 'BACKUPS_MODE') {
+        const modes = [
+            ['full', 'Full (tar.gz each time)'],
+            ['incremental', 'Incremental (deduplicated)']
+        ];
+        return `<select id="${id}" data-key="${key}">
+            ${modes.map(([v, l]) => `<option value="${v}" ${value === v ? 'selected' : ''}>${l}</option>`).join('')}
+        </select>`;
+    }
     if (key === 'TTS_ELEVENLABS_MODEL') {
         const models = [
             ['eleven_flash_v2_5', 'Flash v2.5 (Fast, 50% cheaper)'],
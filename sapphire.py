@@ -100,7 +100,10 @@ class VoiceChatSystem:
         # Agent system — background workers (types registered by plugins during scan)
         from core.agents import AgentManager
         import core.agents as agents_module
-        self.agent_manager = AgentManager()
+        self.agent_manager = AgentManager(
+            max_concurrent=getattr(config, 'AGENT_MAX_CONCURRENT', 3),
+            max_queued=getattr(config, 'AGENT_QUEUE_SIZE', 25),
+        )
         agents_module.agent_manager = self.agent_manager
         logger.info("Agent manager initialized")
 
@@ -347,13 +350,19 @@ class VoiceChatSystem:
             from core.stt.stt_null import NullAudioRecorder
             if not isinstance(self.whisper_client, NullWhisperClient):
                 logger.info("STT stopped, unloading provider")
+                old_client = self.whisper_client
                 self.whisper_client = NullWhisperClient()
                 self.whisper_recorder = NullAudioRecorder()
+                self._close_stt_client(old_client)
             return True
 
+        old_client = self.whisper_client
         try:
             logger.info(f"Hot-loading STT provider: {provider_name}")
             self.whisper_client = get_stt_provider(provider_name)
+            # Same local model settings reuse the warm model; anything else
+            # lets the old one unload
+            self._close_stt_client(old_client)
             # Ensure real recorder if switching from disabled (not needed for router)
             from core.stt.stt_null import NullAudioRecorder
             if provider_name == 'sapphire_router':
@@ -380,9 +389,20 @@ class VoiceChatSystem:
             from core.stt.stt_null import NullAudioRecorder as _NullRec
             self.whisper_client = NullWhisperClient()
             self.whisper_recorder = _NullRec()
+            self._close_stt_client(old_client)
             self._publish_stt_fallback_event(provider_name, e)
             return False
 
+    @staticmethod
+    def _close_stt_client(client):
+        """Release a replaced STT provider's resources (local model services)."""
+        close = getattr(client, 'close', None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logger.debug(f"STT provider close failed: {e}")
+
     def toggle_stt(self, enabled: bool):
         """Legacy compat — maps to switch_stt_provider. Persists STT_PROVIDER."""
         from core.settings_manager import settings as _settings
@@ -646,6 +666,7 @@ class VoiceChatSystem:
             ("agents", lambda: hasattr(self, 'agent_manager') and self.agent_manager and self.agent_manager.shutdown()),
             ("voice components", self.stop_components),
             ("continuity scheduler", lambda: hasattr(self, 'continuity_scheduler') and self.continuity_scheduler and self.continuity_scheduler.stop()),
+            ("chat sessions", lambda: self.llm_chat.session_manager.flush_sessions()),
             ("backup scheduler", lambda: __import__('core.backup', fromlist=['backup_manager']).backup_manager.stop()),
             ("TTS server", lambda: self.tts_server_manager and self.tts_server_manager.stop()),
             ("settings watcher", settings.stop_file_watcher),
@@ -653,6 +674,7 @@ class VoiceChatSystem:
             ("toolset watcher", toolset_manager.stop_file_watcher),
             ("spice set watcher", lambda: __import__('core.spice_sets', fromlist=['spice_set_manager']).spice_set_manager.stop_file_watcher()),
             ("plugin watcher", _pl.stop_watcher),
+            ("file watch service", lambda: __import__('core.file_watch', fromlist=['file_watcher']).file_watcher.stop()),
         ]
 
         for name, action in stop_actions:
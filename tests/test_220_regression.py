@@ -357,6 +357,11 @@ class TestForegroundDoesNotHijackUI:
         with patch.object(ContinuityExecutor, '__init__', lambda self: None):
             executor = ContinuityExecutor()
             executor._voice_lock = threading.Lock()
+            executor._max_concurrent = 1
+            executor._slots = threading.BoundedSemaphore(1)
+            executor._slot_local = threading.local()
+            executor._chat_locks = {}
+            executor._chat_locks_guard = threading.Lock()
             executor._resolve_persona = lambda t: t
             executor._snapshot_voice = MagicMock(return_value={})
             executor._restore_voice = MagicMock()
@@ -0,0 +1,194 @@
+"""AgentManager worker pool + bounded queue.
+
+Covers:
+  - spawns past max_concurrent queue (status + queue_position) instead of failing
+  - queue is bounded — spawns past running + queued are refused
+  - queued agents start as slots free, on pool threads (no thread per agent)
+  - dispatch fairness: chats take turns; priority jumps the line
+  - dismissing a queued agent removes it without ever running it
+  - a chat's batch report waits for its queued agents
+  - stats report throughput and wait/run latency
+  - a dismissed agent's ExecutionContext stops before running requested tools
+"""
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def make_manager(blocking_worker_cls):
+    from core.agents.manager import AgentManager
+    managers = []
+
+    def _make(max_concurrent=2, max_queued=10):
+        mgr = AgentManager(max_concurrent=max_concurrent, max_queued=max_queued)
+        started = []
+
+        class _Recording(blocking_worker_cls):
+            def run(self):
+                started.append((self.chat_name, self.mission))
+                super().run()
+
+        def factory(agent_id, name, mission, chat_name='', on_complete=None, **kwargs):
+            return _Recording(agent_id=agent_id, name=name, mission=mission,
+                              chat_name=chat_name, on_complete=on_complete)
+        mgr.register_type('test', display_name='Test Agent', factory=factory)
+        mgr.started = started
+        managers.append(mgr)
+        return mgr
+
+    yield _make
+    for mgr in managers:
+        for w in list(mgr._agents.values()):
+            w._gate.set()
+        mgr.shutdown(timeout=1)
+
+
+def _wait_for(cond, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _running(mgr):
+    """Running agents that haven't been told to finish yet."""
+    return [a for a in mgr._agents.values() if a.status == 'running' and not a._gate.is_set()]
+
+
+def _finish_one(mgr, chat=None):
+    worker = next(a for a in _running(mgr) if chat is None or a.chat_name == chat)
+    worker.finish_with_result('ok')
+    return worker
+
+
+def test_spawn_past_cap_queues(make_manager):
+    mgr = make_manager(max_concurrent=2, max_queued=3)
+    results = [mgr.spawn('test', f'm{i}', chat_name='c') for i in range(5)]
+    assert [r['status'] for r in results] == ['running', 'running', 'queued', 'queued', 'queued']
+    assert [r.get('queue_position') for r in results[2:]] == [1, 2, 3]
+    refused = mgr.spawn('test', 'm5', chat_name='c')
+    assert 'limit reached' in refused['error'].lower()
+
+    listed = {a['id']: a for a in mgr.check_all(chat_name='c')}
+    assert listed[results[4]['id']]['status'] == 'queued'
+    assert listed[results[4]['id']]['queue_position'] == 3
+    assert 'queue_position' not in listed[results[0]['id']]
+
+
+def test_queue_drains_on_pool_threads(make_manager):
+    mgr = make_manager(max_concurrent=2, max_queued=20)
+    ids = [mgr.spawn('test', f'm{i}', chat_name='c')['id'] for i in range(8)]
+    threads_before = threading.active_count()
+    for _ in range(8):
+        assert _wait_for(lambda: _running(mgr))
+        _finish_one(mgr)
+    assert _wait_for(lambda: len(mgr.started) == 8)
+    assert len(mgr._pool) == 2
+    assert threading.active_count() <= threads_before
+    assert _wait_for(lambda: not mgr._agents)  # batch swept the chat
+    assert len(ids) == 8
+
+
+def test_chats_take_turns(make_manager):
+    mgr = make_manager(max_concurrent=1, max_queued=20)
+    for i in range(4):
+        mgr.spawn('test', f'a{i}', chat_name='A')
+    for i in range(2):
+        mgr.spawn('test', f'b{i}', chat_name='B')
+    for _ in range(5):
+        assert _wait_for(lambda: _running(mgr))
+        _finish_one(mgr)
+        n = len(mgr.started)
+        assert _wait_for(lambda: len(mgr.started) > n)
+    order = [m for _, m in mgr.started]
+    assert order == ['a0', 'b0', 'a1', 'b1', 'a2', 'a3']
+
+
+def test_priority_jumps_the_line(make_manager):
+    mgr = make_manager(max_concurrent=1, max_queued=20)
+    mgr.spawn('test', 'first', chat_name='A')
+    mgr.spawn('test', 'low', chat_name='A')
+    urgent = mgr.spawn('test', 'urgent', chat_name='B', priority=5)
+    assert urgent['queue_position'] == 1
+    _finish_one(mgr)
+    assert _wait_for(lambda: len(mgr.started) == 2)
+    assert mgr.started[1] == ('B', 'urgent')
+
+
+def test_dismiss_queued_never_runs(make_manager):
+    mgr = make_manager(max_concurrent=1, max_queued=5)
+    mgr.spawn('test', 'running', chat_name='c')
+    queued = mgr.spawn('test', 'skipped', chat_name='c')
+    assert mgr.recall(queued['id'])['status'] == 'queued'
+    out = mgr.dismiss(queued['id'])
+    assert out['status'] == 'dismissed'
+    _finish_one(mgr)
+    assert _wait_for(lambda: not mgr._agents)
+    time.sleep(0.05)
+    assert [m for _, m in mgr.started] == ['running']
+
+
+def test_batch_waits_for_queued(make_manager, event_bus_capture):
+    mgr = make_manager(max_concurrent=1, max_queued=5)
+    mgr.spawn('test', 'one', chat_name='c')
+    mgr.spawn('test', 'two', chat_name='c')
+    _finish_one(mgr)
+    assert _wait_for(lambda: len(mgr.started) == 2)
+    assert not [e for e, _ in event_bus_capture.events if e == 'agent_batch_complete']
+    _finish_one(mgr)
+    assert _wait_for(lambda: any(e == 'agent_batch_complete' for e, _ in event_bus_capture.events))
+    batch = next(d for e, d in event_bus_capture.events if e == 'agent_batch_complete')
+    assert batch['agent_count'] == 2
+
+
+def test_stats(make_manager):
+    mgr = make_manager(max_concurrent=1, max_queued=5)
+    mgr.spawn('test', 'one', chat_name='c')
+    mgr.spawn('test', 'two', chat_name='c')
+    stats = mgr.stats()
+    assert (stats['running'], stats['queued'], stats['workers']) == (1, 1, 1)
+    time.sleep(0.05)
+    _finish_one(mgr)
+    assert _wait_for(lambda: len(mgr.started) == 2)
+    _finish_one(mgr)
+    assert _wait_for(lambda: mgr.stats()['finished'] == 2)
+    stats = mgr.stats()
+    assert stats['done'] == 2 and stats['running'] == 0 and stats['queued'] == 0
+    assert stats['max_wait_s'] >= 0.05
+    assert stats['per_minute'] > 0
+
+
+def test_cancel_stops_execution_context_between_steps():
+    from core.agents.base_worker import BaseWorker
+    from core.continuity.execution_context import ExecutionContext
+
+    response = MagicMock(has_tool_calls=True, content="")
+    response.get_tool_calls_as_dicts.return_value = [
+        {"id": "tc1", "function": {"name": "noop", "arguments": "{}"}}]
+    te = MagicMock()
+    te.call_llm_with_metrics.side_effect = lambda *a, **kw: (worker.cancel(), response)[1]
+
+    class _LoopWorker(BaseWorker):
+        def run(self):
+            with patch.object(ExecutionContext, "_build_prompt", return_value="sys"), \
+                 patch.object(ExecutionContext, "_resolve_provider", return_value=("k", MagicMock(), "")), \
+                 patch.object(ExecutionContext, "_build_gen_params", return_value={}), \
+                 patch.object(ExecutionContext, "_resolve_tools", return_value=[{"function": {"name": "noop"}}]), \
+                 patch.object(ExecutionContext, "_build_scopes", return_value={}):
+                self.ctx = ExecutionContext(MagicMock(), te, {"prompt": "agent", "max_tool_rounds": 5, "context_limit": 0})
+                self.result = self.ctx.run(self.mission)
+
+    worker = _LoopWorker("id-1", "Alpha", "mission")
+    worker.status = 'running'
+    with patch("core.event_bus.publish"):
+        worker._run_wrapper()
+
+    assert te.call_llm_with_metrics.call_count == 1
+    te.execute_tool_calls.assert_not_called()
+    assert worker.status == 'cancelled' and worker.result is None
+    assert "Cancelled" in worker.ctx.degraded_reason
@@ -0,0 +1,156 @@
+"""
+Tests for the shared audio DSP module (core/audio/dsp.py).
+
+Pure numpy — no audio hardware. sounddevice is mocked when PortAudio is
+missing, as in test_audio_fallbacks.py, because core.audio imports it.
+
+Run with: pytest tests/test_audio_dsp.py -v
+"""
+import sys
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+
+def sounddevice_available():
+    try:
+        import sounddevice  # noqa: F401
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+if not sounddevice_available():
+    mock_sd = MagicMock()
+    mock_sd.query_devices.return_value = []
+    mock_sd.default.device = (0, 0)
+    sys.modules['sounddevice'] = mock_sd
+
+from core.audio import dsp  # noqa: E402
+
+
+def _tone(freq, rate, seconds=0.5):
+    return np.sin(2 * np.pi * freq * np.arange(int(rate * seconds)) / rate).astype(np.float32)
+
+
+# =============================================================================
+# Conversions and levels
+# =============================================================================
+
+class TestConversions:
+    def test_int16_round_trip(self):
+        pcm = np.array([-32768, -1, 0, 1, 16384, 32767], dtype=np.int16)
+        f = dsp.to_float32(pcm)
+        assert f.dtype == np.float32 and f[0] == -1.0 and f[4] == 0.5
+        assert np.array_equal(dsp.to_int16(f), pcm)
+
+    def test_to_int16_clips(self):
+        out = dsp.to_int16(np.array([2.0, -2.0], dtype=np.float32))
+        assert out.tolist() == [32767, -32768]
+
+    def test_into_existing_buffer(self):
+        buf = np.empty(3, dtype=np.float32)
+        assert dsp.to_float32(np.array([0, 16384, -16384], dtype=np.int16), out=buf) is buf
+        assert buf.tolist() == [0.0, 0.5, -0.5]
+        f = np.zeros(4, dtype=np.float32)
+        assert dsp.to_float32(f) is f  # float32 passes through uncopied
+
+    def test_to_mono(self):
+        stereo = np.array([[16384, 0], [-32768, -32768]], dtype=np.int16)
+        assert dsp.to_mono(stereo).tolist() == [0.25, -1.0]
+
+    def test_levels(self):
+        pcm = np.array([0, -16384, 8192], dtype=np.int16)
+        assert dsp.peak(pcm) == 0.5
+        assert dsp.rms(np.ones(10, dtype=np.float32)) == pytest.approx(1.0)
+        assert dsp.peak(np.array([], dtype=np.int16)) == 0.0
+
+
+# =============================================================================
+# Polyphase resampling
+# =============================================================================
+
+class TestResample:
+    @pytest.mark.parametrize("src,dst", [(24000, 48000), (48000, 16000), (22050, 48000), (44100, 16000)])
+    def test_tone_preserved(self, src, dst):
+        out = dsp.resample(_tone(440, src), src, dst)
+        assert out.dtype == np.float32
+        assert len(out) == int(np.ceil(len(_tone(440, src)) * dst / src))
+        ref = _tone(440, dst)[:len(out)]
+        assert np.max(np.abs(out - ref)[100:-100]) < 1e-3
+
+    def test_anti_aliasing(self):
+        # 12kHz is above the 8kHz Nyquist of 16kHz; linear interpolation
+        # folds it to 4kHz at nearly full level, the filter removes it
+        out = dsp.resample(_tone(12000, 48000), 48000, 16000)
+        assert np.max(np.abs(out[100:-100])) < 1e-3
+
+    @pytest.mark.parametrize("src,dst", [(48000, 16000), (22050, 48000)])
+    def test_streaming_matches_one_shot(self, src, dst):
+        audio = (np.random.default_rng(1).standard_normal(src // 2) * 0.2).astype(np.float32)
+        rs = dsp.StreamResampler(src, dst)
+        rng = np.random.default_rng(2)
+        parts, pos = [], 0
+        while pos < len(audio):
+            step = int(rng.integers(1, 2000))
+            parts.append(rs.process(audio[pos:pos + step]))
+            pos += step
+        parts.append(rs.flush())
+        streamed = np.concatenate(parts)
+        oneshot = dsp.resample(audio, src, dst)
+        assert streamed.shape == oneshot.shape
+        assert np.allclose(streamed, oneshot, atol=1e-5)
+
+    def test_same_rate_passthrough(self):
+        rs = dsp.StreamResampler(16000, 16000)
+        pcm = np.array([0, 16384], dtype=np.int16)
+        assert rs.passthrough and rs.process(pcm).tolist() == [0.0, 0.5]
+        assert len(rs.flush()) == 0
+
+    def test_filter_bank_cached(self):
+        up, down = dsp.rate_ratio(44100, 48000)
+        assert (up, down) == (160, 147)
+        assert dsp.filter_bank(up, down)[0] is dsp.filter_bank(up, down)[0]
+        assert dsp.rate_ratio(16000, 16001) != (16001, 16000)  # huge terms approximated
+
+    def test_change_speed(self):
+        out = dsp.change_speed(_tone(440, 24000), 0.98)
+        assert len(out) == pytest.approx(12000 / 0.98, abs=2)
+
+    def test_resample_audio_keeps_int16_contract(self):
+        from core.audio.utils import resample_audio
+        pcm = (_tone(440, 48000) * 10000).astype(np.int16)
+        out = resample_audio(pcm, 48000, 16000)
+        assert out.dtype == np.int16 and len(out) == 8000
+
+
+# =============================================================================
+# Consumers
+# =============================================================================
+
+class TestWakewordRecorder:
+    def _recorder(self, rate, channels=1):
+        from core.wakeword.audio_recorder import AudioRecorder
+        rec = AudioRecorder.__new__(AudioRecorder)
+        rec.actual_rate, rec.target_rate = rate, 16000
+        rec._resample_ratio = rate / 16000
+        rec._needs_stereo_downmix = channels == 2
+        rec._resampler = dsp.StreamResampler(rate, 16000) if rate != 16000 else None
+        rec.stream = MagicMock()
+        return rec
+
+    def test_read_frames_resamples_device_audio(self):
+        rec = self._recorder(48000, channels=2)
+        block = (np.stack([_tone(440, 48000, 0.08)] * 2, axis=1) * 10000).astype(np.int16)
+        rec.stream.read.return_value = (block, False)
+        out = rec.read_frames(1280)
+        rec.stream.read.assert_called_once_with(3840)
+        assert out.dtype == np.int16 and 1200 <= len(out) <= 1280
+
+    def test_native_rate_no_copy(self):
+        rec = self._recorder(16000)
+        block = np.arange(1280, dtype=np.int16).reshape(-1, 1)
+        rec.stream.read.return_value = (block, False)
+        out = rec.read_frames(1280)
+        assert np.shares_memory(out, block)
@@ -0,0 +1,301 @@
+"""
+Incremental backups (core/backup_store.py + BACKUPS_MODE=incremental in core/backup.py).
+
+Covers:
+  - unchanged files are skipped on the next snapshot, identical content is stored once
+  - SQLite databases go through the online backup (WAL content included,
+    -wal/-shm not copied) and are skipped when untouched
+  - restore and tar export reproduce the tree; verify catches missing/corrupt chunks
+  - deleting a snapshot keeps chunks a newer one still uses
+  - gc waits for an in-progress snapshot instead of deleting its chunks
+  - Backup.create_backup / list_backups / delete_backup in incremental mode
+  - chats held dirty in memory are flushed before a backup
+
+Run with: pytest tests/test_backup_incremental.py -v
+"""
+import io
+import os
+import sqlite3
+import sys
+import tarfile
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core import backup_store
+from core.backup_store import ChunkStore, SnapshotStore
+
+
+@pytest.fixture
+def tree(tmp_path):
+    src = tmp_path / "user"
+    (src / "history").mkdir(parents=True)
+    (src / "history" / "a.json").write_text('{"a": 1}' * 100)
+    (src / "history" / "b.json").write_text('{"b": 2}' * 100)
+    (src / "gallery").mkdir()
+    (src / "gallery" / "img.png").write_bytes(os.urandom(5000))
+    return src
+
+
+@pytest.fixture
+def store(tree, tmp_path):
+    return SnapshotStore(tree, tmp_path / "backups" / "incremental")
+
+
+class TestChunkStore:
+    def test_dedup_and_roundtrip(self, tmp_path):
+        cs = ChunkStore(tmp_path / "chunks")
+        d1, w1 = cs.put(b"hello" * 1000)
+        d2, w2 = cs.put(b"hello" * 1000)
+        assert d1 == d2 and w1 > 0 and w2 == 0
+        assert cs.get(d1) == b"hello" * 1000
+        assert cs.path(d1).stat().st_size < 5000  # compressed
+
+    def test_incompressible_stored_raw(self, tmp_path):
+        cs = ChunkStore(tmp_path / "chunks")
+        data = os.urandom(4096)
+        digest, _ = cs.put(data)
+        assert cs.path(digest).read_bytes()[:1] == b"r"
+        assert cs.get(digest) == data
+
+    def test_zlib_fallback(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(backup_store, "zstd", None)
+        cs = ChunkStore(tmp_path / "chunks")
+        digest, _ = cs.put(b"abc" * 1000, level=9)
+        assert cs.path(digest).read_bytes()[:1] == b"d"
+        assert cs.get(digest) == b"abc" * 1000
+
+    def test_corrupt_chunk_detected(self, tmp_path):
+        cs = ChunkStore(tmp_path / "chunks")
+        digest, _ = cs.put(os.urandom(100))
+        cs.path(digest).write_bytes(b"r" + b"x" * 100)
+        with pytest.raises(ValueError):
+            cs.get(digest)
+
+
+class TestSnapshots:
+    def test_unchanged_files_skipped(self, store, tree):
+        first = store.create("sapphire_2026-01-01_030000_daily", "daily")
+        assert first["stats"]["files"] == 3 and first["stats"]["new_chunks"] == 3
+        second = store.create("sapphire_2026-01-02_030000_daily", "daily")
+        assert second["parent"] == first["name"]
+        assert second["stats"]["unchanged"] == 3
+        assert second["stats"]["new_chunks"] == 0
+
+        (tree / "history" / "a.json").write_text('{"a": 2}')
+        third = store.create("sapphire_2026-01-03_030000_daily", "daily")
+        assert third["stats"]["unchanged"] == 2 and third["stats"]["new_chunks"] == 1
+
+    def test_identical_content_stored_once(self, store, tree):
+        (tree / "copy.json").write_bytes((tree / "history" / "a.json").read_bytes())
+        m = store.create("sapphire_2026-01-01_030000_manual", "manual")
+        assert m["files"]["copy.json"]["chunks"] == m["files"]["history/a.json"]["chunks"]
+        assert m["stats"]["new_chunks"] == 3
+
+    def test_large_file_chunked(self, store, tree, monkeypatch):
+        monkeypatch.setattr(backup_store, "CHUNK_SIZE", 1024)
+        (tree / "big.bin").write_bytes(b"x" * 1024 * 3 + b"tail")
+        m = store.create("sapphire_2026-01-01_030000_manual", "manual")
+        assert len(m["files"]["big.bin"]["chunks"]) == 4
+        assert len(set(m["files"]["big.bin"]["chunks"])) == 2  # three identical x-chunks + tail
+
+    def test_excludes(self, tree, tmp_path):
+        (tree / "state.json.tmp").write_text("partial")
+        (tree / "plugin_mcp_key.json").write_text("secret")
+        from core.backup import _excluded
+        store = SnapshotStore(tree, tmp_path / "inc", exclude=_excluded)
+        files = store.create("sapphire_2026-01-01_030000_manual", "manual")["files"]
+        assert "state.json.tmp" not in files and "plugin_mcp_key.json" not in files
+
+
+class TestDatabases:
+    def _db(self, tree):
+        path = tree / "memory.db"
+        conn = sqlite3.connect(str(path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA wal_autocheckpoint=0")
+        conn.execute("CREATE TABLE m (v TEXT)")
+        conn.executemany("INSERT INTO m VALUES (?)", [(f"row{i}",) for i in range(200)])
+        conn.commit()
+        return path, conn
+
+    def test_online_backup_includes_wal(self, store, tree, tmp_path):
+        path, conn = self._db(tree)
+        try:
+            assert (tree / "memory.db-wal").exists()
+            m = store.create("sapphire_2026-01-01_030000_manual", "manual")
+            assert "memory.db" in m["files"]
+            assert "memory.db-wal" not in m["files"] and "memory.db-shm" not in m["files"]
+            assert m["stats"]["databases"] == 1
+
+            out = tmp_path / "restored"
+            store.restore(m["name"], out, only=["memory.db"])
+            r = sqlite3.connect(str(out / "memory.db"))
+            assert r.execute("SELECT COUNT(*) FROM m").fetchone()[0] == 200
+            assert r.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+            r.close()
+        finally:
+            conn.close()
+
+    def test_untouched_db_skipped(self, store, tree):
+        path, conn = self._db(tree)
+        try:
+            store.create("sapphire_2026-01-01_030000_manual", "manual")
+            second = store.create("sapphire_2026-01-02_030000_manual", "manual")
+            assert second["stats"]["unchanged"] == 4
+            conn.execute("INSERT INTO m VALUES ('new')")
+            conn.commit()
+            third = store.create("sapphire_2026-01-03_030000_manual", "manual")
+            assert third["stats"]["unchanged"] == 3
+        finally:
+            conn.close()
+
+
+class TestRestoreVerify:
+    def test_restore_roundtrip(self, store, tree, tmp_path):
+        m = store.create("sapphire_2026-01-01_030000_manual", "manual")
+        out = tmp_path / "restored"
+        assert store.restore(m["name"], out) == 3
+        for rel in ("history/a.json", "history/b.json", "gallery/img.png"):
+            assert (out / rel).read_bytes() == (tree / rel).read_bytes()
+            assert (out / rel).stat().st_mtime_ns == (tree / rel).stat().st_mtime_ns
+
+    def test_restore_from_later_snapshot_after_parent_deleted(self, store, tree, tmp_path):
+        first = store.create("sapphire_2026-01-01_030000_daily", "daily")
+        (tree / "history" / "b.json").write_text("changed")
+        second = store.create("sapphire_2026-01-02_030000_daily", "daily")
+        assert store.chain(second["name"]) == [second["name"], first["name"]]
+        store.delete(first["name"])
+        store.gc()
+        assert store.verify(second["name"])["ok"]
+        out = tmp_path / "restored"
+        store.restore(second["name"], out)
+        assert (out / "history" / "b.json").read_text() == "changed"
+        assert (out / "history" / "a.json").read_bytes() == (tree / "history" / "a.json").read_bytes()
+
+    def test_gc_drops_only_unreferenced(self, store, tree):
+        store.create("sapphire_2026-01-01_030000_daily", "daily")
+        (tree / "history" / "b.json").write_text("changed")
+        store.create("sapphire_2026-01-02_030000_daily", "daily")
+        store.delete("sapphire_2026-01-01_030000_daily")
+        assert store.gc()["removed"] == 1  # only the old b.json chunk
+
+    def test_gc_waits_for_create(self, store, tree):
+        # Pause create() after its first file's chunks are written, before
+        # the manifest exists, and run gc in between
+        written, resume = threading.Event(), threading.Event()
+        real = store._snapshot_file
+
+        def slow_snapshot_file(*args, **kwargs):
+            entry = real(*args, **kwargs)
+            written.set()
+            resume.wait(5)
+            return entry
+
+        with patch.object(store, "_snapshot_file", slow_snapshot_file):
+            creator = threading.Thread(
+                target=store.create, args=("sapphire_2026-01-01_030000_manual", "manual"))
+            creator.start()
+            assert written.wait(5)
+            result = {}
+            gc = threading.Thread(target=lambda: result.update(store.gc()))
+            gc.start()
+            gc.join(0.3)
+            assert gc.is_alive()  # blocked behind create()
+            resume.set()
+            creator.join(5)
+            gc.join(5)
+        assert result["removed"] == 0
+        assert store.verify("sapphire_2026-01-01_030000_manual")["ok"]
+
+    def test_verify_reports_damage(self, store):
+        m = store.create("sapphire_2026-01-01_030000_manual", "manual")
+        a_chunk = m["files"]["history/a.json"]["chunks"][0]
+        b_chunk = m["files"]["history/b.json"]["chunks"][0]
+        store.chunks.path(a_chunk).unlink()
+        store.chunks.path(b_chunk).write_bytes(b"rgarbage")
+        result = store.verify(m["name"])
+        assert not result["ok"]
+        assert result["missing"] == ["history/a.json"]
+        assert result["corrupt"] == ["history/b.json"]
+        assert store.verify(m["name"], deep=False)["corrupt"] == []
+
+    def test_export_tar(self, store, tree):
+        m = store.create("sapphire_2026-01-01_030000_manual", "manual")
+        buf = io.BytesIO()
+        store.export_tar(m["name"], buf)
+        buf.seek(0)
+        with tarfile.open(fileobj=buf, mode="r:gz") as tar:
+            assert sorted(tar.getnames()) == ["user/gallery/img.png", "user/history/a.json", "user/history/b.json"]
+            assert tar.extractfile("user/history/a.json").read() == (tree / "history" / "a.json").read_bytes()
+
+    def test_restore_refuses_escaping_paths(self, store, tmp_path):
+        m = store.create("sapphire_2026-01-01_030000_manual", "manual")
+        m["files"]["../evil"] = m["files"]["history/a.json"]
+        store._write_manifest(m)
+        out = tmp_path / "restored"
+        assert store.restore(m["name"], out) == 3
+        assert not (tmp_path / "evil").exists()
+
+
+@pytest.fixture
+def manager(tree, tmp_path):
+    from core.backup import Backup, _excluded
+    with patch.object(Backup, '__init__', lambda self: None):
+        b = Backup()
+    b.base_dir = tmp_path
+    b.user_dir = tree
+    b.backup_dir = tmp_path / "user_backups"
+    b.backup_dir.mkdir()
+    b._stop_event = None
+    b._snapshot_store = SnapshotStore(tree, b.backup_dir / "incremental", exclude=_excluded)
+    return b
+
+
+class TestBackupManager:
+    def test_incremental_mode(self, manager, monkeypatch):
+        import config
+        monkeypatch.setattr(config, "BACKUPS_MODE", "incremental", raising=False)
+        filename = manager.create_backup("manual")
+        assert filename.startswith("sapphire_") and filename.endswith("_manual.json")
+        listed = manager.list_backups()["manual"]
+        assert [b["filename"] for b in listed] == [filename]
+        assert listed[0]["incremental"] and listed[0]["logical_size"] > 0
+        assert manager.verify_backup(filename)["ok"]
+
+        export = manager.export_backup(filename)
+        try:
+            with tarfile.open(export, "r:gz") as tar:
+                assert "user/history/a.json" in tar.getnames()
+        finally:
+            export.unlink()
+
+        assert manager.delete_backup(filename) is True
+        assert manager.list_backups()["manual"] == []
+        assert list(manager._snapshot_store.chunks.digests()) == []
+
+    def test_manifest_name_guards(self, manager):
+        assert manager.verify_backup("../sapphire_x.json") is None
+        assert manager.verify_backup("sapphire_missing.json") is None
+        assert manager.delete_backup("sapphire_missing.json") is False
+
+    def test_full_mode_unchanged(self, manager, monkeypatch):
+        import config
+        monkeypatch.setattr(config, "BACKUPS_MODE", "full", raising=False)
+        filename = manager.create_backup("manual")
+        assert filename.endswith(".tar.gz")
+
+    def test_dirty_chats_flushed_before_backup(self, manager, monkeypatch):
+        import config
+        from unittest.mock import MagicMock
+        import core.api_fastapi as api
+        monkeypatch.setattr(config, "BACKUPS_MODE", "full", raising=False)
+        system = MagicMock()
+        monkeypatch.setattr(api, "_system", system)
+        assert manager.create_backup("manual")
+        system.llm_chat.session_manager.flush_sessions.assert_called_once()
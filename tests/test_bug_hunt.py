@@ -672,6 +672,11 @@ class TestRunForegroundNoUISwitch:
         with patch.object(ContinuityExecutor, '__init__', lambda self: None):
             executor = ContinuityExecutor()
             executor._voice_lock = threading.Lock()
+            executor._max_concurrent = 1
+            executor._slots = threading.BoundedSemaphore(1)
+            executor._slot_local = threading.local()
+            executor._chat_locks = {}
+            executor._chat_locks_guard = threading.Lock()
 
             mock_session = MagicMock()
             mock_session.list_chat_files.return_value = [{"name": "task_chat"}]
@@ -22,7 +22,8 @@ class TestTaskRunCount:
     """Test max_runs and delete_after_run features."""
 
     def _make_scheduler(self, tmp_path):
-        from core.continuity.scheduler import ContinuityScheduler
+        from core.continuity.event_router import EventRouter
+        from core.continuity.scheduler import ContinuityScheduler, _FireQueue
         base_dir = tmp_path / "user" / "continuity"
         base_dir.mkdir(parents=True)
 
@@ -40,11 +41,14 @@ class TestTaskRunCount:
         sched._activity_path = base_dir / "activity.json"
         sched._tasks = {}
         sched._activity = []
+        sched._run_log = None
         sched._task_running = {}
         sched._task_pending = {}
         sched._task_last_matched = {}
         sched._task_progress = {}
         sched._event_threads = []
+        sched._fire = _FireQueue()
+        sched._router = EventRouter(sched)
         return sched
 
     def test_create_task_has_run_count_fields(self, tmp_path):
@@ -0,0 +1,186 @@
+"""Content-addressed chat image store (core/chat/image_store.py + ChatSessionManager).
+
+Covers:
+  - attached images are stored once by hash; messages keep only a reference
+  - the same image in two chats shares one blob, freed when neither uses it
+  - removing the message (or clearing / deleting the chat) garbage-collects
+  - privacy mode keeps images inline and out of the database until it ends
+  - chats saved with inline base64 are migrated once, then never rescanned
+  - imports go through the store; raw exports inline the blobs again
+  - the history display gets a url instead of base64
+  - /api/chat-image serves with immutable caching and honours If-None-Match
+"""
+import asyncio
+import base64
+import json
+import sqlite3
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from core.chat import image_store
+from core.chat import history as history_mod
+from core.chat.history import ChatSessionManager
+
+PNG_A = b"\x89PNG\r\n\x1a\n" + b"a" * 5000
+PNG_B = b"\x89PNG\r\n\x1a\n" + b"b" * 5000
+
+
+def _content(*blobs, text="look"):
+    return [{"type": "text", "text": text}] + [
+        {"type": "image", "data": base64.b64encode(b).decode(), "media_type": "image/png"} for b in blobs
+    ]
+
+
+@pytest.fixture
+def sm(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_mod, "count_tokens", lambda text: len(text.split()))
+    mgr = ChatSessionManager(history_dir=str(tmp_path))
+    mgr.create_chat("other")
+    return mgr
+
+
+def _rows(sm, sql, *args):
+    with sqlite3.connect(sm._db_path) as conn:
+        return conn.execute(sql, args).fetchall()
+
+
+def _stored_messages(sm, name="default"):
+    return _rows(sm, "SELECT messages FROM chats WHERE name = ?", name)[0][0]
+
+
+class TestExternalize:
+    def test_bad_base64_left_inline(self):
+        block = {"type": "image", "data": "not base64!!", "media_type": "image/png"}
+        content, ids = image_store.externalize([block], lambda *a: None)
+        assert content == [block] and ids == []
+
+    def test_string_content_untouched(self):
+        assert image_store.externalize("hi", lambda *a: None) == ("hi", [])
+
+
+class TestSessionManager:
+    def test_message_keeps_reference(self, sm):
+        sm.add_user_message(_content(PNG_A, PNG_A))
+        raw = _stored_messages(sm)
+        assert "data" not in json.loads(raw)[0]["content"][1]
+        assert len(raw) < 1000
+        image_id = image_store.image_id_for(PNG_A)
+        assert json.loads(raw)[0]["content"][1]["image_id"] == image_id
+        assert _rows(sm, "SELECT COUNT(*) FROM chat_images") == [(1,)]
+        assert sm.get_chat_image(image_id) == (PNG_A, "image/png")
+
+    def test_shared_blob_freed_when_unreferenced(self, sm):
+        sm.add_user_message(_content(PNG_A))
+        sm.set_active_chat("other")
+        sm.add_user_message(_content(PNG_A, PNG_B))
+        assert _rows(sm, "SELECT COUNT(*) FROM chat_images") == [(2,)]
+
+        sm.remove_last_messages(1)
+        image_a = image_store.image_id_for(PNG_A)
+        assert [r[0] for r in _rows(sm, "SELECT id FROM chat_images")] == [image_a]
+
+        sm.set_active_chat("default")
+        sm.clear()
+        assert _rows(sm, "SELECT COUNT(*) FROM chat_images") == [(0,)]
+
+    def test_delete_chat_collects(self, sm):
+        sm.set_active_chat("other")
+        sm.add_user_message(_content(PNG_B))
+        sm.set_active_chat("default")
+        assert sm.delete_chat("other")
+        assert _rows(sm, "SELECT COUNT(*) FROM chat_images") == [(0,)]
+        assert _rows(sm, "SELECT COUNT(*) FROM chat_image_refs") == [(0,)]
+
+    def test_privacy_mode_stays_inline(self, sm):
+        with patch("core.privacy.is_privacy_mode", return_value=True):
+            sm.add_user_message(_content(PNG_A))
+        assert sm.current_chat.messages[-1]["content"][1]["data"]
+        assert _rows(sm, "SELECT COUNT(*) FROM chat_images") == [(0,)]
+
+    def test_llm_history_unaffected(self, sm):
+        sm.add_user_message(_content(PNG_A, text="what is this"))
+        [msg] = sm.get_messages_for_llm()
+        assert msg["content"] == "what is this"
+
+    def test_privacy_images_stored_when_saved_after(self, sm):
+        with patch("core.privacy.is_privacy_mode", return_value=True):
+            sm.add_user_message(_content(PNG_A))
+            sm.set_active_chat("other")
+            sm.set_active_chat("default")
+        assert "PNG" not in _stored_messages(sm)
+        assert _rows(sm, "SELECT COUNT(*) FROM chat_images") == [(0,)]
+        sm.add_user_message("done")
+        raw = _stored_messages(sm)
+        assert '"data"' not in raw and image_store.image_id_for(PNG_A) in raw
+
+    def test_inline_chats_migrated_once(self, tmp_path):
+        first = ChatSessionManager(history_dir=str(tmp_path))
+        with sqlite3.connect(first._db_path) as conn:
+            conn.execute("DELETE FROM chat_meta")
+            conn.execute("UPDATE chats SET messages = ? WHERE name = 'default'",
+                         (json.dumps([{"role": "user", "content": _content(PNG_A)}]),))
+        second = ChatSessionManager(history_dir=str(tmp_path))
+        block = second.current_chat.messages[0]["content"][1]
+        assert block["image_id"] == image_store.image_id_for(PNG_A) and "data" not in block
+        assert second.get_chat_image(block["image_id"])[0] == PNG_A
+
+        with patch.object(history_mod.logger, "info") as info:
+            ChatSessionManager(history_dir=str(tmp_path))
+        assert not any("inline image" in str(c) for c in info.call_args_list)
+        assert _rows(second, "SELECT key FROM chat_meta") == [("inline_images_migrated",)]
+
+    def test_import_externalizes_and_refs(self, sm):
+        sm.set_active_chat("other")
+        sm.add_user_message(_content(PNG_B))
+        stored_b = sm.current_chat.messages[-1]
+        sm.set_active_chat("default")
+        sm.add_user_message("old")
+        sm.import_messages([{"role": "user", "content": _content(PNG_A)}, stored_b])
+        assert len(sm.current_chat.messages) == 2, "import replaces, not appends"
+        raw = _stored_messages(sm)
+        assert '"data"' not in raw
+        refs = {r[0] for r in _rows(sm, "SELECT image_id FROM chat_image_refs WHERE chat_name = 'default'")}
+        assert refs == {image_store.image_id_for(PNG_A), image_store.image_id_for(PNG_B)}
+
+        # The source chat dropping it must not free a blob the import uses
+        sm.set_active_chat("other")
+        sm.clear()
+        assert sm.get_chat_image(image_store.image_id_for(PNG_B))[0] == PNG_B
+
+    def test_export_round_trip(self, sm, tmp_path):
+        sm.add_user_message(_content(PNG_A))
+        exported = sm.export_messages()
+        assert base64.b64decode(exported[0]["content"][1]["data"]) == PNG_A
+        assert "image_id" not in exported[0]["content"][1]
+        assert "data" not in sm.current_chat.messages[0]["content"][1]
+
+        fresh = ChatSessionManager(history_dir=str(tmp_path / "elsewhere"))
+        fresh.import_messages(json.loads(json.dumps(exported)))
+        block = fresh.current_chat.messages[0]["content"][1]
+        assert fresh.get_chat_image(block["image_id"])[0] == PNG_A
+
+
+class TestRoutes:
+    def test_display_uses_url(self, sm):
+        from core.api_fastapi import app  # noqa: F401  (resolves the routes' import cycle)
+        from core.routes.chat import format_messages_for_display
+        sm.add_user_message(_content(PNG_A))
+        [user] = format_messages_for_display(sm.get_messages_for_display())
+        assert user["images"] == [{"url": image_store.image_url(image_store.image_id_for(PNG_A)),
+                                   "media_type": "image/png"}]
+
+    def test_serve_cached(self, sm):
+        from core.api_fastapi import app  # noqa: F401
+        from core.routes import media
+        sm.add_user_message(_content(PNG_A))
+        image_id = image_store.image_id_for(PNG_A)
+        system = SimpleNamespace(llm_chat=SimpleNamespace(session_manager=sm))
+        with patch.object(media, "get_system", return_value=system):
+            resp = asyncio.run(media.serve_chat_image(image_id, SimpleNamespace(headers={})))
+            assert resp.body == PNG_A
+            assert "immutable" in resp.headers["cache-control"]
+            again = asyncio.run(media.serve_chat_image(
+                image_id, SimpleNamespace(headers={"if-none-match": resp.headers["etag"]})))
+            assert again.status_code == 304
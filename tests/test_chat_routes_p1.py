@@ -336,12 +336,12 @@ def test_delete_history_count_zero_returns_400(chat_client):
 def test_import_history_replaces_not_appends(chat_client):
     """[PROACTIVE] POST /api/history/import must ASSIGN the messages list,
     not extend the existing list. Otherwise importing into a non-empty chat
-    leaves old messages above the imported ones."""
+    leaves old messages above the imported ones. The route hands the list to
+    ChatSessionManager.import_messages, which replaces it (covered against a
+    real manager in test_chat_images)."""
     c, csrf, mock_system, fm, captured = chat_client
-    existing_chat = MagicMock()
-    existing_chat.messages = [{'role': 'user', 'content': 'old'}]
-    mock_system.llm_chat.session_manager.current_chat = existing_chat
-    mock_system.llm_chat.session_manager._save_current_chat = MagicMock()
+    sm = mock_system.llm_chat.session_manager
+    sm.import_messages = MagicMock()
 
     new_msgs = [
         {'role': 'user', 'content': 'new-1'},
@@ -353,9 +353,7 @@ def test_import_history_replaces_not_appends(chat_client):
         json={'messages': new_msgs},
     )
     assert r.status_code == 200
-    # messages was ASSIGNED (not extended) — identity is the new list
-    assert existing_chat.messages == new_msgs
-    assert mock_system.llm_chat.session_manager._save_current_chat.call_count == 1
+    sm.import_messages.assert_called_once_with(new_msgs)
 
 
 # ─── 2.29 Import non-list messages returns 400 ───────────────────────────────
@@ -0,0 +1,148 @@
+"""Per-chat session cache tests for ChatSessionManager.
+
+Covers:
+  - side-chat appends parse the chat once, then append in memory + persist
+  - a stream on one chat doesn't hold up appends to another
+  - a stream on the target chat still defers the append
+  - concurrent appends to different chats all land
+  - LRU eviction skips the active chat and writes back dirty sessions
+  - switching back to a cached chat doesn't re-read it; _load_chat does
+  - deleting a chat drops its session
+  - a failed write-back reports False, keeps the session dirty (and cached
+    on eviction), and flush_sessions() retries it
+"""
+import json
+import sqlite3
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from core.chat import history as history_mod
+from core.chat.history import ChatSessionManager
+
+
+@pytest.fixture
+def sm(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_mod, "count_tokens", lambda text: len(text.split()))
+    mgr = ChatSessionManager(history_dir=str(tmp_path))
+    for name in ("side_a", "side_b"):
+        mgr.create_chat(name)
+    return mgr
+
+
+def _stored(sm, name):
+    with sqlite3.connect(sm._db_path) as conn:
+        return json.loads(conn.execute("SELECT messages FROM chats WHERE name = ?", (name,)).fetchone()[0])
+
+
+def _msg(i):
+    return {"role": "user", "content": f"m{i}"}
+
+
+def test_side_chat_appends_parse_once(sm):
+    with patch.object(sm, "_read_session", wraps=sm._read_session) as reads:
+        for i in range(5):
+            sm.append_messages_to_chat("side_a", [_msg(i)])
+        history = sm.read_chat_messages("side_a")
+    assert reads.call_count == 1
+    assert [m["content"] for m in history] == [f"m{i}" for i in range(5)]
+    assert len(_stored(sm, "side_a")) == 5
+    assert not sm._sessions["side_a"].dirty
+    assert sm.active_chat_name == "default" and len(sm.current_chat.messages) == 0
+
+
+def test_stream_on_other_chat_does_not_block(sm):
+    sm.begin_streaming("default")
+    start = time.monotonic()
+    sm.append_messages_to_chat("side_a", [_msg(0)], max_wait_if_streaming=2)
+    assert time.monotonic() - start < 1
+    assert sm.is_chat_streaming("default") and not sm.is_chat_streaming("side_a")
+    sm.end_streaming("default")
+    assert not sm._is_streaming
+
+
+def test_stream_on_target_chat_defers_append(sm):
+    sm.begin_streaming("side_a")
+    threading.Timer(0.3, sm.end_streaming, args=("side_a",)).start()
+    start = time.monotonic()
+    sm.append_messages_to_chat("side_a", [_msg(0)], max_wait_if_streaming=5)
+    assert 0.25 < time.monotonic() - start < 3
+    assert len(_stored(sm, "side_a")) == 1
+
+
+def test_concurrent_appends_to_different_chats(sm):
+    def writer(name):
+        for i in range(20):
+            sm.append_messages_to_chat(name, [_msg(i)])
+    threads = [threading.Thread(target=writer, args=(n,)) for n in ("side_a", "side_b", "default")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    for name in ("side_a", "side_b"):
+        assert [m["content"] for m in _stored(sm, name)] == [f"m{i}" for i in range(20)]
+    assert len(sm.current_chat.messages) == 20
+
+
+def test_eviction_keeps_active_and_writes_back(sm, monkeypatch):
+    monkeypatch.setattr(history_mod, "SESSION_CACHE_SIZE", 2)
+    for name in ("c1", "c2", "c3"):
+        sm.create_chat(name)
+    sm.read_chat_messages("side_a")
+    sm._sessions["side_a"].history.messages.append(_msg("late"))
+    sm._sessions["side_a"].dirty = True
+    for name in ("c1", "c2", "c3"):
+        sm.read_chat_messages(name)
+    assert "default" in sm._sessions and len(sm._sessions) == 2
+    assert "side_a" not in sm._sessions
+    assert _stored(sm, "side_a") == [_msg("late")]
+
+
+def test_switch_back_uses_cache_and_load_chat_rereads(sm):
+    sm.set_active_chat("side_a")
+    sm.add_user_message("hello")
+    sm.set_active_chat("default")
+    with patch.object(sm, "_read_session", wraps=sm._read_session) as reads:
+        sm.set_active_chat("side_a")
+        assert reads.call_count == 0
+        assert sm.current_chat.messages[-1]["content"] == "hello"
+        with sqlite3.connect(sm._db_path) as conn:
+            conn.execute("UPDATE chats SET messages = '[]' WHERE name = 'side_a'")
+        sm._load_chat("side_a")
+        assert reads.call_count == 1
+    assert sm.current_chat.messages == []
+
+
+def test_delete_drops_session(sm):
+    sm.append_messages_to_chat("side_b", [_msg(0)])
+    assert "side_b" in sm._sessions
+    assert sm.delete_chat("side_b")
+    assert "side_b" not in sm._sessions
+    sm.append_messages_to_chat("side_b", [_msg(1)])
+    assert "side_b" not in sm._sessions
+
+
+def test_failed_write_back_stays_dirty_and_flush_retries(sm, monkeypatch):
+    sm.read_chat_messages("side_a")
+    session = sm._sessions["side_a"]
+    session.history.messages.append(_msg("pending"))
+    session.dirty = True
+    real = sm._get_connection
+
+    def broken():
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(sm, "_get_connection", broken)
+    assert sm._persist_session(session) is False
+    assert session.dirty
+    monkeypatch.setattr(history_mod, "SESSION_CACHE_SIZE", 1)
+    sm._evict_sessions()
+    assert sm._sessions.get("side_a") is session  # not dropped with its messages
+    assert sm.flush_sessions() is False
+
+    monkeypatch.setattr(sm, "_get_connection", real)
+    assert sm.flush_sessions() is True
+    assert not session.dirty
+    assert _stored(sm, "side_a") == [_msg("pending")]
@@ -0,0 +1,227 @@
+"""Concurrent continuity task execution tests.
+
+Covers:
+  - background tasks run their LLM work in parallel (no global voice lock)
+  - the shared TTS voice is never mutated; speak_sync gets the task's voice
+  - queued speech plays in FIFO order, one utterance at a time
+  - CONTINUITY_MAX_CONCURRENT_TASKS bounds running tasks; nested runs reuse the slot
+  - same-chat foreground tasks take turns, different chats don't
+  - a full speech queue drops rather than blocks
+"""
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import config
+
+
+def _system():
+    system = MagicMock()
+    sm = system.llm_chat.session_manager
+    sm.list_chat_files.return_value = [{"name": "alpha"}, {"name": "beta"}]
+    sm.read_chat_messages.return_value = []
+    system.tts = MagicMock()
+    return system
+
+
+@pytest.fixture
+def make_executor(monkeypatch):
+    def _make(limit=3):
+        from core.continuity.executor import ContinuityExecutor
+        monkeypatch.setattr(config, 'CONTINUITY_MAX_CONCURRENT_TASKS', limit, raising=False)
+        ex = ContinuityExecutor(_system())
+        ex._resolve_persona = lambda task: task
+        return ex
+    with patch('core.tts.utils.validate_voice', side_effect=lambda v: v):
+        yield _make
+
+
+class _GatedContext:
+    """ExecutionContext stand-in whose run() blocks until released, tracking
+    how many runs are in flight at once."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.started = threading.Semaphore(0)
+
+    def __call__(self, *args, **kwargs):
+        ctx = MagicMock()
+        ctx.new_messages = []
+
+        def run(msg, **kw):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            self.started.release()
+            try:
+                assert self.release.wait(5), "gate never opened"
+                return f"reply to {msg}"
+            finally:
+                with self.lock:
+                    self.active -= 1
+        ctx.run.side_effect = run
+        return ctx
+
+
+def _run_all(ex, tasks):
+    results = [None] * len(tasks)
+
+    def worker(i, task):
+        results[i] = ex.run(task)
+    threads = [threading.Thread(target=worker, args=(i, t), daemon=True) for i, t in enumerate(tasks)]
+    for t in threads:
+        t.start()
+    return threads, results
+
+
+def _task(name, **kw):
+    return dict({"name": name, "initial_message": name, "tts_enabled": False}, **kw)
+
+
+def test_background_tasks_run_concurrently(make_executor):
+    ex = make_executor(limit=3)
+    gate = _GatedContext()
+    with patch('core.continuity.execution_context.ExecutionContext', gate):
+        threads, results = _run_all(ex, [_task("a"), _task("b")])
+        assert gate.started.acquire(timeout=2) and gate.started.acquire(timeout=2), \
+            "second task never started while the first was still running"
+        gate.release.set()
+        for t in threads:
+            t.join(5)
+    assert gate.peak == 2
+    assert all(r["success"] for r in results)
+
+
+def test_concurrency_limit_bounds_running_tasks(make_executor):
+    ex = make_executor(limit=2)
+    gate = _GatedContext()
+    with patch('core.continuity.execution_context.ExecutionContext', gate):
+        threads, results = _run_all(ex, [_task(f"t{i}") for i in range(5)])
+        assert gate.started.acquire(timeout=2) and gate.started.acquire(timeout=2)
+        time.sleep(0.2)
+        assert gate.active == 2
+        gate.release.set()
+        for t in threads:
+            t.join(5)
+    assert gate.peak == 2
+    assert sum(1 for r in results if r["success"]) == 5
+
+
+def test_nested_run_reuses_slot(make_executor):
+    """A task whose tool triggers another continuity run on the same thread
+    must not deadlock waiting for its own slot."""
+    ex = make_executor(limit=1)
+    inner = {}
+
+    def factory(*args, **kwargs):
+        ctx = MagicMock()
+        ctx.new_messages = []
+
+        def run(msg, **kw):
+            if msg == "outer":
+                inner["result"] = ex.run(_task("inner"))
+            return msg
+        ctx.run.side_effect = run
+        return ctx
+
+    with patch('core.continuity.execution_context.ExecutionContext', side_effect=factory):
+        done = {}
+        t = threading.Thread(target=lambda: done.setdefault("r", ex.run(_task("outer"))), daemon=True)
+        t.start()
+        t.join(5)
+    assert not t.is_alive(), "nested run deadlocked on the task slot"
+    assert done["r"]["success"] and inner["result"]["success"]
+    assert ex._slots.acquire(blocking=False)
+
+
+def test_speech_uses_task_voice_without_touching_global(make_executor):
+    ex = make_executor()
+    tts = ex.system.tts
+    with patch('core.continuity.execution_context.ExecutionContext') as EC:
+        EC.return_value.run.return_value = "hello"
+        ex.run(_task("a", tts_enabled=True, voice="af_heart", speed=1.2, pitch=0.9))
+        ex.run(_task("b", tts_enabled=True, voice="am_adam"))
+    assert ex._speech.wait_idle(5)
+    tts.set_voice.assert_not_called()
+    tts.set_speed.assert_not_called()
+    tts.set_pitch.assert_not_called()
+    assert [c.kwargs for c in tts.speak_sync.call_args_list] == [
+        {"voice": "af_heart", "speed": 1.2, "pitch": 0.9},
+        {"voice": "am_adam", "speed": None, "pitch": None},
+    ]
+
+
+def test_browser_tts_publishes_instead_of_queueing(make_executor):
+    ex = make_executor()
+    with patch('core.continuity.execution_context.ExecutionContext') as EC, \
+            patch('core.continuity.executor.publish') as pub:
+        EC.return_value.run.return_value = "hi"
+        ex.run(_task("a", tts_enabled=True, browser_tts=True))
+    assert any(c.args[1] == {"text": "hi", "task": "a"} for c in pub.call_args_list)
+    assert ex._speech.pending() == 0
+    ex.system.tts.speak_sync.assert_not_called()
+
+
+def test_speech_queue_is_fifo_and_serialized():
+    from core.tts.speech_queue import SpeechQueue
+    spoken, active, peak = [], [0], [0]
+    lock = threading.Lock()
+
+    def speak(text, **kw):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        spoken.append(text)
+        with lock:
+            active[0] -= 1
+
+    tts = MagicMock()
+    tts.speak_sync.side_effect = speak
+    q = SpeechQueue(lambda: tts)
+    for i in range(6):
+        assert q.submit(f"line {i}")
+    assert q.wait_idle(5)
+    assert spoken == [f"line {i}" for i in range(6)]
+    assert peak[0] == 1
+
+
+def test_full_speech_queue_drops():
+    from core.tts.speech_queue import SpeechQueue
+    gate = threading.Event()
+    tts = MagicMock()
+    tts.speak_sync.side_effect = lambda text, **kw: gate.wait(5)
+    q = SpeechQueue(lambda: tts, max_pending=2)
+    assert q.submit("playing")
+    deadline = time.monotonic() + 2
+    while q.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert q.submit("one") and q.submit("two")
+    assert not q.submit("three")
+    gate.set()
+    assert q.wait_idle(5)
+    assert [c.args[0] for c in tts.speak_sync.call_args_list] == ["playing", "one", "two"]
+
+
+def test_same_chat_foreground_tasks_take_turns(make_executor):
+    ex = make_executor(limit=3)
+    gate = _GatedContext()
+    with patch('core.continuity.execution_context.ExecutionContext', gate):
+        threads, results = _run_all(ex, [
+            _task("a1", chat_target="alpha"),
+            _task("a2", chat_target="alpha"),
+            _task("b1", chat_target="beta"),
+        ])
+        assert gate.started.acquire(timeout=2) and gate.started.acquire(timeout=2)
+        time.sleep(0.2)
+        assert gate.active == 2, "same-chat tasks overlapped or different chats serialized"
+        gate.release.set()
+        for t in threads:
+            t.join(5)
+    assert gate.peak == 2
+    assert all(r["success"] for r in results)
@@ -0,0 +1,138 @@
+"""Embedding micro-batcher tests.
+
+Covers:
+  - concurrent submits coalesce into fewer inference runs
+  - each caller gets exactly its own rows back
+  - mixed prefixes never share a batch
+  - identical texts within a batch are embedded once
+  - None / exception / wrong-shape inference answers every caller with None
+  - LocalEmbedder.embed routes through the batcher
+"""
+import threading
+from unittest.mock import MagicMock
+
+import numpy as np
+
+
+def _fake_model(calls, dim=8, delay=None):
+    """Row i is a vector derived from the text, so slices are checkable."""
+    def _run(texts, prefix):
+        calls.append((list(texts), prefix))
+        if delay:
+            delay.wait(1.0)
+        return np.stack([_vec(t, prefix, dim) for t in texts])
+    return _run
+
+
+def _vec(text, prefix, dim=8):
+    seed = sum(map(ord, f"{prefix}:{text}"))
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+def _submit_all(batcher, jobs):
+    """Run submit() for each (texts, prefix) on its own thread; return results
+    in job order."""
+    results = [None] * len(jobs)
+    barrier = threading.Barrier(len(jobs))
+
+    def _go(i, texts, prefix):
+        barrier.wait()
+        results[i] = batcher.submit(texts, prefix)
+
+    threads = [threading.Thread(target=_go, args=(i, t, p)) for i, (t, p) in enumerate(jobs)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results
+
+
+def test_concurrent_submits_share_batches():
+    from core.embeddings.batcher import EmbeddingBatcher
+    calls = []
+    b = EmbeddingBatcher(_fake_model(calls), window_ms=50)
+    jobs = [([f"text {i}"], 'search_query') for i in range(12)]
+    results = _submit_all(b, jobs)
+    assert len(calls) < len(jobs)
+    for (texts, prefix), out in zip(jobs, results):
+        assert out.shape == (1, 8)
+        assert np.array_equal(out[0], _vec(texts[0], prefix))
+    stats = b.stats()
+    assert stats['requests'] == 12 and stats['batches'] == len(calls)
+    assert stats['avg_batch_rows'] > 1
+
+
+def test_multi_text_requests_get_their_own_slices():
+    from core.embeddings.batcher import EmbeddingBatcher
+    calls = []
+    b = EmbeddingBatcher(_fake_model(calls), window_ms=50)
+    jobs = [(['a', 'b', 'c'], 'search_document'), (['d'], 'search_document'), (['e', 'f'], 'search_document')]
+    results = _submit_all(b, jobs)
+    for (texts, prefix), out in zip(jobs, results):
+        assert out.shape == (len(texts), 8)
+        for row, t in zip(out, texts):
+            assert np.array_equal(row, _vec(t, prefix))
+
+
+def test_prefixes_never_mix_in_one_run():
+    from core.embeddings.batcher import EmbeddingBatcher
+    calls = []
+    b = EmbeddingBatcher(_fake_model(calls), window_ms=50)
+    jobs = [(['q1'], 'search_query'), (['d1'], 'search_document'),
+            (['q2'], 'search_query'), (['d2'], 'search_document')]
+    results = _submit_all(b, jobs)
+    for texts, prefix in calls:
+        expected = {'search_query': {'q1', 'q2'}, 'search_document': {'d1', 'd2'}}[prefix]
+        assert set(texts) <= expected
+    for (texts, prefix), out in zip(jobs, results):
+        assert np.array_equal(out[0], _vec(texts[0], prefix))
+
+
+def test_duplicate_texts_embedded_once():
+    from core.embeddings.batcher import EmbeddingBatcher
+    calls = []
+    b = EmbeddingBatcher(_fake_model(calls), window_ms=0)
+    out = b.submit(['same', 'other', 'same'], 'search_document')
+    assert calls == [(['same', 'other'], 'search_document')]
+    assert np.array_equal(out[0], out[2])
+    assert b.stats()['deduped'] == 1
+
+
+def test_failed_inference_returns_none_to_everyone():
+    from core.embeddings.batcher import EmbeddingBatcher
+    for bad in (lambda texts, prefix: None,
+                MagicMock(side_effect=RuntimeError('ort exploded')),
+                lambda texts, prefix: np.zeros((len(texts) + 1, 8), dtype=np.float32)):
+        b = EmbeddingBatcher(bad, window_ms=20)
+        results = _submit_all(b, [(['x'], 'search_query'), (['y'], 'search_query')])
+        assert results == [None, None]
+    # Worker survives a failure and keeps serving
+    calls = []
+    b = EmbeddingBatcher(MagicMock(side_effect=[RuntimeError('once'), np.ones((1, 8))]), window_ms=0)
+    assert b.submit(['x']) is None
+    assert b.submit(['x']).shape == (1, 8)
+
+
+def test_empty_submit_returns_none_without_worker():
+    from core.embeddings.batcher import EmbeddingBatcher
+    run = MagicMock()
+    b = EmbeddingBatcher(run)
+    assert b.submit([]) is None
+    run.assert_not_called()
+
+
+def test_local_embedder_routes_through_batcher():
+    """[REGRESSION_GUARD] embed() keeps its contract — loads the model, returns
+    None without a session — and otherwise goes through the shared batcher."""
+    from core.embeddings import LocalEmbedder
+    emb = LocalEmbedder()
+    emb._load = MagicMock()
+    assert emb.embed(['x']) is None
+
+    emb.session = object()
+    emb._embed_batch = MagicMock(return_value=np.ones((2, 4), dtype=np.float32))
+    emb._batcher._run_batch = emb._embed_batch
+    out = emb.embed(['a', 'b'], prefix='search_query')
+    assert out.shape == (2, 4)
+    emb._embed_batch.assert_called_once_with(['a', 'b'], 'search_query')
+    assert emb.batch_stats()['batches'] == 1
@@ -241,6 +241,189 @@ def test_reembed_publishes_progress_events(isolated_stores, monkeypatch, event_b
     assert len(events) >= 2, f"expected progress events, got {events}"
 
 
+# ─── Pipeline: bucketing, concurrency, checkpoint ─────────────────────────
+
+def test_bucket_batches_groups_by_length():
+    """Length bucketing: each batch holds similar-length texts, so padding to
+    the batch max wastes little. Every row still appears exactly once."""
+    from core.embeddings.reembed import _bucket_batches
+    items = [(i, 'x' * (i % 7 == 0 and 500 or 5)) for i in range(1, 41)]
+    batches = _bucket_batches(items, batch_size=8)
+    assert sorted(i for b in batches for i, _ in b) == list(range(1, 41))
+    long_ids = {i for i, t in items if len(t) == 500}
+    # All long rows share batches with each other, not sprinkled across all 5
+    mixed = [b for b in batches if {i for i, _ in b} & long_ids and
+             {i for i, _ in b} - long_ids]
+    assert len(mixed) <= 1
+
+
+def test_reembed_streams_in_pages(isolated_stores, monkeypatch):
+    """Rows are read in PAGE_SIZE pages by id cursor, not all at once."""
+    mt, _ = isolated_stores
+    _reset_state()
+    from core.embeddings import reembed
+    monkeypatch.setattr(reembed, 'PAGE_SIZE', 4)
+    monkeypatch.setattr(reembed, 'BATCH_SIZE', 2)
+    with mt._get_connection() as conn:
+        for i in range(10):
+            conn.execute("INSERT INTO memories (content) VALUES (?)", (f'row {i}' * (i + 1),))
+        conn.commit()
+
+    emb_obj = _embedder(dim=64, pid='test:PAGED')
+    import core.embeddings as emb
+    monkeypatch.setattr(emb, '_embedder', emb_obj)
+    monkeypatch.setattr(emb, 'get_embedder', lambda: emb_obj)
+
+    ok, _ = reembed.start_reembed()
+    assert ok
+    assert _wait_for_done()
+    status = reembed.get_status()
+    assert status['done'] == 10
+    assert status['rows_per_sec'] > 0
+    assert all(len(c.args[0]) <= 2 for c in emb_obj.embed.call_args_list)
+    # Clean finish leaves no checkpoint behind
+    assert not reembed._checkpoint_path().exists()
+
+
+def test_reembed_remote_providers_run_concurrently(isolated_stores, monkeypatch):
+    """Providers declaring MAX_CONCURRENT_REQUESTS get overlapping embed calls."""
+    import threading
+    mt, _ = isolated_stores
+    _reset_state()
+    from core.embeddings import reembed
+    monkeypatch.setattr(reembed, 'BATCH_SIZE', 1)
+    with mt._get_connection() as conn:
+        for i in range(8):
+            conn.execute("INSERT INTO memories (content) VALUES (?)", (f'row {i}',))
+        conn.commit()
+
+    lock = threading.Lock()
+    active = {'now': 0, 'peak': 0}
+
+    class _Remote:
+        MAX_CONCURRENT_REQUESTS = 4
+        available = True
+        provider_id = 'test:REMOTE'
+        dimension = 64
+
+        def embed(self, texts, prefix='search_document'):
+            with lock:
+                active['now'] += 1
+                active['peak'] = max(active['peak'], active['now'])
+            time.sleep(0.05)
+            with lock:
+                active['now'] -= 1
+            return np.stack([np.eye(64, dtype=np.float32)[0] for _ in texts])
+
+    remote = _Remote()
+    import core.embeddings as emb
+    monkeypatch.setattr(emb, '_embedder', remote)
+    monkeypatch.setattr(emb, 'get_embedder', lambda: remote)
+
+    ok, _ = reembed.start_reembed()
+    assert ok
+    assert _wait_for_done()
+    assert reembed.get_status()['done'] == 8
+    assert active['peak'] > 1
+
+
+def test_reembed_resumes_from_checkpoint(isolated_stores, monkeypatch):
+    """A checkpoint for the active provider skips rows at/below its cursor;
+    one from another provider or storage dimension is discarded."""
+    mt, _ = isolated_stores
+    _reset_state()
+    from core.embeddings import reembed
+    with mt._get_connection() as conn:
+        for i in range(6):
+            conn.execute("INSERT INTO memories (content) VALUES (?)", (f'row {i}',))
+        conn.commit()
+
+    emb_obj = _embedder(dim=64, pid='test:RESUME')
+    import core.embeddings as emb
+    monkeypatch.setattr(emb, '_embedder', emb_obj)
+    monkeypatch.setattr(emb, 'get_embedder', lambda: emb_obj)
+
+    key = reembed._checkpoint_key(emb_obj)
+    assert key == ('test:RESUME', 64)
+    reembed._save_checkpoint(('test:OTHER', 64), {'memories': 6})
+    assert reembed._load_checkpoint(key) == {}
+    assert not reembed._checkpoint_path().exists()
+    reembed._save_checkpoint(('test:RESUME', 32), {'memories': 6})
+    assert reembed._load_checkpoint(key) == {}
+
+    reembed._save_checkpoint(key, {'memories': 4})
+    ok, _ = reembed.start_reembed()
+    assert ok
+    assert _wait_for_done()
+    status = reembed.get_status()
+    assert status['resumed'] is True
+    assert status['total'] == 2
+    with mt._get_connection() as conn:
+        stamped = [r[0] for r in conn.execute(
+            "SELECT id FROM memories WHERE embedding_provider = 'test:RESUME' ORDER BY id")]
+    assert stamped == [5, 6]
+    assert not reembed._checkpoint_path().exists()
+
+
+def test_provider_switch_clears_checkpoint(isolated_stores, monkeypatch):
+    """Switching away and back must not resume a stale cursor: rows below it
+    may have been re-stamped by the other provider in between."""
+    _reset_state()
+    from core.embeddings import reembed
+    import core.embeddings as emb
+    reembed._save_checkpoint(('test:A', 64), {'memories': 4})
+    monkeypatch.setattr(emb, '_embedder', None)
+    monkeypatch.setattr(emb.embedding_registry, 'create', lambda name: _embedder(pid=f'test:{name}'))
+    emb.switch_embedding_provider('B')
+    assert not reembed._checkpoint_path().exists()
+
+
+def test_reembed_cancel_leaves_checkpoint(isolated_stores, monkeypatch):
+    """[REGRESSION_GUARD] Cancel mid-run keeps the cursor so the next start
+    picks up where it stopped instead of redoing everything."""
+    import threading
+    mt, _ = isolated_stores
+    _reset_state()
+    from core.embeddings import reembed
+    monkeypatch.setattr(reembed, 'PAGE_SIZE', 2)
+    monkeypatch.setattr(reembed, 'BATCH_SIZE', 2)
+    with mt._get_connection() as conn:
+        for i in range(10):
+            conn.execute("INSERT INTO memories (content) VALUES (?)", (f'row {i}',))
+        conn.commit()
+
+    first_written = threading.Event()
+    emb_obj = _embedder(dim=64, pid='test:CANCEL')
+    base = emb_obj.embed.side_effect
+
+    def _embed(texts, prefix='search_document'):
+        if first_written.is_set():
+            time.sleep(0.05)
+        return base(texts, prefix)
+
+    emb_obj.embed.side_effect = _embed
+    import core.embeddings as emb
+    monkeypatch.setattr(emb, '_embedder', emb_obj)
+    monkeypatch.setattr(emb, 'get_embedder', lambda: emb_obj)
+
+    real_save = reembed._save_checkpoint
+
+    def _save_and_cancel(key, cursors):
+        real_save(key, cursors)
+        first_written.set()
+        reembed.cancel_reembed()
+
+    monkeypatch.setattr(reembed, '_save_checkpoint', _save_and_cancel)
+    ok, _ = reembed.start_reembed()
+    assert ok
+    assert _wait_for_done()
+    status = reembed.get_status()
+    assert status['current_table'] == 'cancelled'
+    assert 0 < status['done'] < 10
+    cursor = reembed._load_checkpoint(('test:CANCEL', 64)).get('memories')
+    assert cursor is not None and cursor >= 2
+
+
 def test_reembed_event_bus_constant_exists():
     from core.event_bus import Events
     assert Events.REEMBED_PROGRESS == 'reembed_progress'
@@ -0,0 +1,206 @@
+"""Matryoshka vector storage tests.
+
+Covers:
+  - raw float32 blobs round-trip byte-for-byte; malformed blobs decode to None
+  - stamp_embedding honors EMBEDDING_STORAGE_DIM, only for declaring providers
+  - embed() output is already truncated, so queries and rows share a length
+  - rows stay readable by the memory plugin's raw float32 vector search
+  - re-embed re-stamps full-length rows to the truncated length without the model
+"""
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+import config
+
+
+def _unit(rng, dim=64):
+    v = rng.standard_normal(dim).astype(np.float32)
+    return v / np.linalg.norm(v)
+
+
+@pytest.fixture
+def storage_cfg(monkeypatch):
+    """Set the storage dimension on the config proxy for one test."""
+    def _set(dim=0):
+        monkeypatch.setattr(config, 'EMBEDDING_STORAGE_DIM', dim, raising=False)
+    _set()
+    return _set
+
+
+# ─── Encoding ─────────────────────────────────────────────────────────────
+
+def test_float32_blob_round_trip():
+    """[REGRESSION_GUARD] Rows are raw float32 blobs with no header, exactly
+    what the memory plugin decodes itself."""
+    from core.embeddings.storage import encode_vector, decode_vector, blob_nbytes
+    v = _unit(np.random.default_rng(1), 768)
+    blob = encode_vector(v)
+    assert blob == v.tobytes() and len(blob) == blob_nbytes(768)
+    assert np.array_equal(decode_vector(blob), v)
+
+
+def test_malformed_blob_decodes_to_none():
+    from core.embeddings.storage import decode_vector
+    assert decode_vector(b'') is None
+    assert decode_vector(b'abc') is None
+
+
+# ─── stamp_embedding ──────────────────────────────────────────────────────
+
+def test_stamp_default_is_raw_float32(storage_cfg):
+    from core.embeddings import stamp_embedding
+    v = _unit(np.random.default_rng(2))
+    emb = MagicMock(provider_id='test:p')
+    blob, pid, dim = stamp_embedding(v, emb)
+    assert blob == v.tobytes() and pid == 'test:p' and dim == 64
+
+
+def test_matryoshka_truncation_only_for_declaring_providers(storage_cfg):
+    from core.embeddings import stamp_embedding, LocalEmbedder, current_provenance
+    storage_cfg(dim=256)
+    v = _unit(np.random.default_rng(4), 768)
+
+    local = LocalEmbedder()
+    _, _, dim = stamp_embedding(v, local)
+    assert dim == 256
+
+    plugin = MagicMock(provider_id='plugin:x', dimension=768)
+    _, _, dim = stamp_embedding(v, plugin)
+    assert dim == 768, "providers without MATRYOSHKA_DIMS must not be truncated"
+
+    with patch('core.embeddings.get_embedder', return_value=local):
+        assert current_provenance() == (LocalEmbedder.PROVIDER_ID, 256)
+
+
+def test_matryoshka_query_and_docs_share_space(storage_cfg):
+    """embed() returns truncated vectors for docs and queries alike, so a
+    reader comparing raw float32 lengths (the memory plugin) finds the doc
+    closest to its own (slightly perturbed) query."""
+    from core.embeddings import stamp_embedding, LocalEmbedder
+    storage_cfg(dim=128)
+    rng = np.random.default_rng(5)
+    docs = np.stack([_unit(rng, 768) for _ in range(20)])
+    local = LocalEmbedder()
+    local.session = object()
+    with patch.object(local, '_load'), patch.object(local, '_batcher') as batcher:
+        batcher.submit.return_value = docs
+        blobs = [stamp_embedding(v, local)[0] for v in local.embed(['doc'] * 20)]
+        batcher.submit.return_value = (docs[7] + 0.01 * rng.standard_normal(768).astype(np.float32))[None]
+        [query] = local.embed(['query'], prefix='search_query')
+    assert query.shape == (128,)
+    assert abs(np.linalg.norm(query) - 1.0) < 1e-4
+    rows = [np.frombuffer(b, dtype=np.float32) for b in blobs]
+    assert all(r.shape == query.shape for r in rows)
+    assert int(np.argmax([float(np.dot(query, r)) for r in rows])) == 7
+
+
+# ─── Integration ──────────────────────────────────────────────────────────
+
+@pytest.fixture
+def isolated_memory(tmp_path, monkeypatch):
+    from plugins.memory.tools import memory_tools
+    monkeypatch.setattr(memory_tools, '_db_path', tmp_path / 'mem.db')
+    monkeypatch.setattr(memory_tools, '_db_initialized', False)
+    monkeypatch.setattr(memory_tools, '_backfill_done', True)
+    memory_tools._ensure_db()
+    return memory_tools
+
+
+def _keyed_embedder(pid='test:store', dim=64):
+    """Deterministic embedder: each distinct text gets its own unit vector."""
+    cache = {}
+    rng = np.random.default_rng(9)
+
+    def _embed(texts, prefix='search_document'):
+        out = []
+        for t in texts:
+            key = t.split(': ', 1)[-1] if ': ' in t else t
+            if key not in cache:
+                cache[key] = _unit(rng, dim)
+            out.append(cache[key])
+        return np.stack(out)
+
+    e = MagicMock()
+    e.available = True
+    e.provider_id = pid
+    e.dimension = dim
+    e.embed = MagicMock(side_effect=_embed)
+    return e
+
+
+def _matryoshka_embedder(pid='test:matryoshka', dim=768):
+    """_keyed_embedder behind a provider that declares MATRYOSHKA_DIMS and,
+    like the real embedders, truncates what embed() returns."""
+    from core.embeddings import LocalEmbedder
+    from core.embeddings.storage import prepare_batch
+    keyed = _keyed_embedder(pid=pid, dim=dim)
+
+    class KeyedMatryoshka:
+        MATRYOSHKA_DIMS = LocalEmbedder.MATRYOSHKA_DIMS
+        available = True
+        provider_id = pid
+        dimension = dim
+
+        def __init__(self):
+            self.embed = MagicMock(side_effect=lambda texts, prefix='search_document':
+                                   prepare_batch(keyed.embed(texts, prefix), self))
+
+    return KeyedMatryoshka()
+
+
+def test_truncated_rows_found_by_memory_plugin(isolated_memory, storage_cfg):
+    """The signed memory plugin reads raw float32 and compares query and row
+    lengths: truncated rows and truncated queries still match up."""
+    mt = isolated_memory
+    storage_cfg(dim=128)
+    emb = _matryoshka_embedder()
+    with patch.object(mt, '_get_embedder', return_value=emb):
+        for text in ('alpha', 'bravo', 'charlie'):
+            mt._save_memory(text, scope='default')
+        with mt._get_connection() as conn:
+            rows = conn.execute('SELECT embedding, embedding_dim FROM memories').fetchall()
+        assert all(len(b) == 4 * 128 and d == 128 for b, d in rows)
+        hits = mt._vector_search('bravo', 'default', [], 3)
+    assert hits and hits[0][1] == 'bravo'
+
+
+def _wait_for_reembed(timeout=5.0):
+    from core.embeddings import reembed
+    start = time.time()
+    while time.time() - start < timeout:
+        if not reembed._state.running:
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_reembed_restamps_to_truncated_length_without_model(isolated_memory, storage_cfg, monkeypatch):
+    """Turning on Matryoshka storage makes current-provider rows pending; the
+    re-embed pipeline truncates them from the stored vector, no embed() call."""
+    mt = isolated_memory
+    emb = _matryoshka_embedder(pid='test:restamp')
+    with patch.object(mt, '_get_embedder', return_value=emb):
+        for text in ('one', 'two', 'three'):
+            mt._save_memory(text, scope='default')
+
+    storage_cfg(dim=256)
+    import core.embeddings as ce
+    monkeypatch.setattr(ce, '_embedder', emb)
+    monkeypatch.setattr(ce, 'get_embedder', lambda: emb)
+    emb.embed.reset_mock()
+
+    from core.embeddings import reembed
+    reembed._state.running = False
+    ok, msg = reembed.start_reembed()
+    assert ok, msg
+    assert _wait_for_reembed()
+    status = reembed.get_status()
+    assert status['done'] == 3 and status['restamped'] == 3
+    assert emb.embed.call_count == 0
+
+    with mt._get_connection() as conn:
+        rows = conn.execute('SELECT embedding, embedding_dim FROM memories').fetchall()
+    assert all(len(b) == 4 * 256 and d == 256 for b, d in rows)
@@ -0,0 +1,203 @@
+"""Daemon event router (core/continuity/event_router.py).
+
+Covers:
+  - compiled filters keep fire_event_task's semantics (eq / _not / _contains,
+    account mismatch, non-JSON payload with a filter)
+  - routes are indexed by source + account, rebuilt only after task changes
+  - the payload is parsed once per event, not once per task
+  - a burst of chat messages on one channel becomes one task run with the
+    texts merged; other channels and non-chat events aren't held
+  - a steady stream is still flushed by the max hold
+  - trigger_config.debounce = 0 opts a task out
+"""
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.continuity import event_router as er
+from core.continuity.event_router import CompiledFilter, parse_event
+
+
+@pytest.fixture
+def sched(tmp_path, monkeypatch):
+    from core.continuity.event_router import EventRouter
+    from core.continuity.scheduler import ContinuityScheduler, _FireQueue
+    import config
+    monkeypatch.setattr(config, "DAEMON_EVENT_DEBOUNCE", 0.15, raising=False)
+    base_dir = tmp_path / "user" / "continuity"
+    base_dir.mkdir(parents=True)
+    s = ContinuityScheduler.__new__(ContinuityScheduler)
+    s.system = MagicMock()
+    s.executor = MagicMock()
+    s.executor.run.return_value = {"success": True, "responses": [], "errors": []}
+    s._running = False
+    s._thread = None
+    s._lock = threading.Lock()
+    s._base_dir = base_dir
+    s._tasks_path = base_dir / "tasks.json"
+    s._activity_path = base_dir / "activity.json"
+    s._tasks = {}
+    s._activity = []
+    s._run_log = None
+    s._task_running = {}
+    s._task_pending = {}
+    s._task_last_matched = {}
+    s._task_progress = {}
+    s._event_threads = []
+    s._fire = _FireQueue()
+    s._router = EventRouter(s)
+    yield s
+    s._router.cancel_pending()
+
+
+def _daemon(sched, name, **trigger):
+    trigger.setdefault("source", "discord_message")
+    return sched.create_task({"name": name, "type": "daemon", "schedule": "0 0 31 2 *",
+                              "trigger_config": trigger})
+
+
+def _msg(text, channel="c1", sender="ann", **extra):
+    return json.dumps({"text": text, "channel_id": channel, "display_name": sender, **extra})
+
+
+def _wait_runs(sched, n, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if sched.executor.run.call_count >= n:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _event_of(call):
+    return json.loads(call.kwargs["event_data"])
+
+
+class TestCompiledFilter:
+    def test_eq_not_contains(self):
+        f = CompiledFilter({"filter": {"channel": "General", "user_not": "bot", "text_contains": "HEY"}})
+        assert f.reject_reason({"channel": "general", "user": "ann", "text": "oh hey"}) is None
+        assert f.reject_reason({"channel": "random", "user": "ann", "text": "hey"}) == "Event filtered out"
+        assert f.reject_reason({"channel": "general", "user": "BOT", "text": "hey"}) == "Event filtered out"
+        assert f.reject_reason({"channel": "general", "user": "ann", "text": "hi"}) == "Event filtered out"
+
+    def test_account_and_unparseable(self):
+        f = CompiledFilter({"account": "main", "filter": {"x": 1}})
+        assert f.reject_reason({"account": "alt", "x": 1}) == "Account mismatch"
+        assert f.reject_reason({"x": 1}) is None  # event without account passes
+        assert "JSON" in f.reject_reason(parse_event("not json"))
+        assert CompiledFilter({"account": "main"}).reject_reason(parse_event("not json")) is None
+
+
+class TestIndex:
+    def test_source_and_account_index(self, sched):
+        a = _daemon(sched, "main bot", account="main", debounce=0)
+        b = _daemon(sched, "any bot", debounce=0)
+        _daemon(sched, "mail", source="email_message", debounce=0)
+        router = sched._router
+        assert {r.task_id for r in router.routes_for("discord_message", "main")} == {a["id"], b["id"]}
+        assert {r.task_id for r in router.routes_for("discord_message", "alt")} == {b["id"]}
+        assert len(router.routes_for("discord_message")) == 2
+        assert router.routes_for("nope") == []
+
+    def test_rebuilt_after_task_change(self, sched):
+        t = _daemon(sched, "bot", debounce=0)
+        router = sched._router
+        assert len(router.routes_for("discord_message")) == 1
+        with patch.object(router, "_build", wraps=router._build) as build:
+            router.routes_for("discord_message")
+            assert build.call_count == 0
+            sched.update_task(t["id"], {"enabled": False})
+            assert router.routes_for("discord_message") == []
+            assert build.call_count == 1
+
+    def test_payload_parsed_once(self, sched):
+        for i in range(4):
+            _daemon(sched, f"bot{i}", filter={"text_contains": "x"}, debounce=0)
+        with patch.object(er, "parse_event", wraps=er.parse_event) as parse:
+            assert sched.route_event("discord_message", json.dumps({"text": "x"})) is True
+        assert parse.call_count == 1
+
+    def test_filtered_event_not_accepted(self, sched):
+        _daemon(sched, "bot", filter={"channel": "general"}, debounce=0)
+        assert sched.route_event("discord_message", json.dumps({"channel": "random"})) is False
+        assert sched.executor.run.call_count == 0
+
+    def test_unparseable_payload_counts_as_accepted(self, sched):
+        # As before the router: a filter that can't run rejects the event for
+        # the task, but only filter/account mismatches mean "not for us"
+        _daemon(sched, "bot", filter={"channel": "general"}, debounce=0)
+        assert sched.route_event("discord_message", "not json") is True
+        assert sched.executor.run.call_count == 0
+        assert sched._router.stats()["filtered"] == 1
+
+
+class TestCoalescing:
+    def test_burst_becomes_one_run(self, sched):
+        _daemon(sched, "bot")
+        for line in ("so", "about that", "thing yesterday"):
+            assert sched.route_event("discord_message", _msg(line, message_id=line)) is True
+        assert _wait_runs(sched, 1)
+        time.sleep(0.3)
+        assert sched.executor.run.call_count == 1
+        event = _event_of(sched.executor.run.call_args)
+        assert event["text"] == "so\nabout that\nthing yesterday"
+        assert event["coalesced"] == 3
+        assert event["message_id"] == "thing yesterday"  # reply goes to the latest message
+        stats = sched.get_status()["events"]
+        assert stats["coalesced"] == 2 and stats["holding"] == 0
+
+    def test_mixed_senders_are_labelled(self, sched):
+        _daemon(sched, "bot")
+        sched.route_event("discord_message", _msg("hi", sender="ann"))
+        sched.route_event("discord_message", _msg("hello", sender="bob"))
+        assert _wait_runs(sched, 1)
+        assert _event_of(sched.executor.run.call_args)["text"] == "ann: hi\nbob: hello"
+
+    def test_channels_are_separate(self, sched):
+        _daemon(sched, "bot")
+        sched.route_event("discord_message", _msg("one", channel="c1"))
+        sched.route_event("discord_message", _msg("two", channel="c2"))
+        assert _wait_runs(sched, 2)
+        texts = sorted(_event_of(c)["text"] for c in sched.executor.run.call_args_list)
+        assert texts == ["one", "two"]
+
+    def test_single_message_passes_payload_through(self, sched):
+        _daemon(sched, "bot")
+        raw = _msg("solo")
+        sched.route_event("discord_message", raw)
+        assert _wait_runs(sched, 1)
+        assert sched.executor.run.call_args.kwargs["event_data"] == raw
+
+    def test_non_chat_events_not_held(self, sched):
+        _daemon(sched, "mail", source="email_message")
+        start = time.monotonic()
+        sched.route_event("email_message", json.dumps({"subject": "s", "snippet": "b"}))
+        assert _wait_runs(sched, 1)
+        assert time.monotonic() - start < 0.15
+
+    def test_debounce_zero_opts_out(self, sched):
+        _daemon(sched, "bot", debounce=0)
+        sched.route_event("discord_message", _msg("a"))
+        sched.route_event("discord_message", _msg("b"))
+        assert _wait_runs(sched, 2)
+
+    def test_steady_stream_flushed_by_max_hold(self, sched):
+        _daemon(sched, "bot", debounce=0.1)
+        start = time.monotonic()
+        while time.monotonic() - start < 0.7:
+            sched.route_event("discord_message", _msg("tick"))
+            time.sleep(0.03)
+        assert sched.executor.run.call_count >= 1  # flushed at ~4 x 0.1s while still chatting
+        sched._router.flush_all()
+
+    def test_cancel_pending_on_stop(self, sched):
+        _daemon(sched, "bot", debounce=5)
+        sched.route_event("discord_message", _msg("later"))
+        sched.stop()
+        time.sleep(0.05)
+        assert sched.executor.run.call_count == 0
+        assert sched._router.stats()["holding"] == 0
@@ -0,0 +1,193 @@
+"""Shared file watch service (core/file_watch.py).
+
+Covers, on both the inotify and polling backends:
+  - an external edit fires the callback with the changed path
+  - a burst of writes is coalesced into one callback
+  - our own writes (note_write) are suppressed by content hash
+  - rewriting identical content doesn't count as a change
+  - atomic tmp+rename saves are seen; the tmp file isn't
+  - recursive dir watches honour suffixes and pick up new subdirectories
+  - unwatch stops callbacks; stats report reloads / suppressed / latency
+"""
+import sys
+import threading
+import time
+
+import pytest
+
+from core.file_watch import FileWatchService
+
+BACKENDS = ["poll"]
+if sys.platform.startswith("linux"):
+    BACKENDS.insert(0, "inotify")
+
+
+@pytest.fixture(params=BACKENDS)
+def service(request):
+    svc = FileWatchService(use_inotify=request.param == "inotify", poll_interval=0.05)
+    yield svc
+    svc.stop()
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+        self.event = threading.Event()
+
+    def __call__(self, changed):
+        self.calls.append([p.name for p in changed])
+        self.event.set()
+
+    def wait(self, n=1, timeout=3.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if len(self.calls) >= n:
+                return True
+            time.sleep(0.01)
+        return False
+
+
+def _settle(svc, seconds=0.4):
+    """Long enough for any pending event to have fired (or been suppressed)."""
+    time.sleep(seconds)
+
+
+def _write(path, text):
+    """Write the way the managers do: tmp file + atomic rename."""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(text)
+    tmp.replace(path)
+
+
+def test_external_edit_fires(service, tmp_path):
+    target = tmp_path / "settings.json"
+    target.write_text("{}")
+    rec = Recorder()
+    service.watch([target], rec, name="settings", debounce=0.05)
+    time.sleep(0.06)  # distinct mtime for the poller
+    target.write_text('{"a": 1}')
+    assert rec.wait()
+    assert rec.calls == [["settings.json"]]
+
+
+def test_burst_is_coalesced(service, tmp_path):
+    target = tmp_path / "a.json"
+    target.write_text("0")
+    rec = Recorder()
+    service.watch([target], rec, debounce=0.3)
+    time.sleep(0.06)
+    for i in range(5):
+        target.write_text(str(i + 1))
+        time.sleep(0.03)
+    assert rec.wait()
+    _settle(service)
+    assert len(rec.calls) == 1
+
+
+def test_own_write_suppressed_by_hash(service, tmp_path):
+    target = tmp_path / "toolsets.json"
+    target.write_text("{}")
+    rec = Recorder()
+    wid = service.watch([target], rec, name="toolsets", debounce=0.1)
+    time.sleep(0.06)
+    _write(target, '{"mine": true}')
+    service.note_write(target)
+    _settle(service)
+    assert rec.calls == []
+    stats = {w["name"]: w for w in service.stats()["watches"]}
+    assert stats["toolsets"]["suppressed"] >= 1
+    # A later external edit still gets through
+    _write(target, '{"theirs": true}')
+    assert rec.wait()
+    assert service.stats()["watches"][0]["reloads"] == 1
+    service.unwatch(wid)
+
+
+def test_same_content_is_not_a_change(service, tmp_path):
+    target = tmp_path / "a.json"
+    target.write_text("same")
+    rec = Recorder()
+    service.watch([target], rec, debounce=0.05)
+    time.sleep(0.06)
+    target.write_text("same")
+    _settle(service)
+    assert rec.calls == []
+
+
+def test_missing_file_created_later(service, tmp_path):
+    target = tmp_path / "spice_sets.json"
+    rec = Recorder()
+    service.watch([target], rec, debounce=0.05)
+    _write(target, "{}")
+    assert rec.wait()
+    assert rec.calls == [["spice_sets.json"]]
+
+
+def test_tree_watch_suffixes_and_new_dirs(service, tmp_path):
+    root = tmp_path / "plugins"
+    (root / "alpha").mkdir(parents=True)
+    (root / "alpha" / "plugin.py").write_text("x = 1")
+    rec = Recorder()
+    service.watch([root], rec, recursive=True, suffixes=(".py", ".json"), debounce=0.05)
+    time.sleep(0.06)
+
+    (root / "alpha" / "notes.txt").write_text("ignored")
+    _settle(service)
+    assert rec.calls == []
+
+    (root / "alpha" / "plugin.py").write_text("x = 2")
+    assert rec.wait(1)
+    assert rec.calls[-1] == ["plugin.py"]
+
+    (root / "beta" / "tools").mkdir(parents=True)
+    _settle(service, 0.1)
+    (root / "beta" / "tools" / "t.py").write_text("y = 1")
+    assert rec.wait(2)
+    assert "t.py" in rec.calls[-1]
+
+
+def test_unwatch_stops_callbacks(service, tmp_path):
+    target = tmp_path / "a.json"
+    target.write_text("0")
+    rec = Recorder()
+    wid = service.watch([target], rec, debounce=0.05)
+    service.unwatch(wid)
+    time.sleep(0.06)
+    target.write_text("1")
+    _settle(service)
+    assert rec.calls == []
+    assert service.stats()["watches"] == []
+
+
+def test_callback_error_is_counted(service, tmp_path):
+    target = tmp_path / "a.json"
+    target.write_text("0")
+
+    def boom(changed):
+        raise RuntimeError("nope")
+    service.watch([target], boom, name="boom", debounce=0.05)
+    time.sleep(0.06)
+    target.write_text("1")
+    deadline = time.time() + 3
+    while time.time() < deadline and not service.stats()["watches"][0]["errors"]:
+        time.sleep(0.02)
+    assert service.stats()["watches"][0]["errors"] == 1
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_inotify_reports_latency_quickly(tmp_path):
+    svc = FileWatchService(use_inotify=True, poll_interval=60)
+    try:
+        target = tmp_path / "a.json"
+        target.write_text("0")
+        rec = Recorder()
+        svc.watch([target], rec, name="fast", debounce=0.02)
+        assert svc.backend == "inotify"
+        start = time.monotonic()
+        target.write_text("1")
+        assert rec.wait(timeout=2)
+        assert time.monotonic() - start < 1.0  # not waiting on the 60 s poll
+        w = svc.stats()["watches"][0]
+        assert w["mode"] == "inotify" and w["reloads"] == 1 and w["last_ms"] > 0
+    finally:
+        svc.stop()
@@ -0,0 +1,176 @@
+"""Gallery caches (core/gallery_cache.py).
+
+Covers:
+  - thumbnails are generated once and reused; editing the file regenerates it
+  - JPEG originals are decoded in draft (downscaled) mode
+  - grid pages are cached, invalidated when a file on the page changes, and
+    not kept when a tile failed
+  - folder counts come from counts.json and only re-list folders that changed
+  - a read-only gallery root works uncached
+"""
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+pytest.importorskip("PIL")
+from PIL import Image  # noqa: E402
+
+from core import gallery_cache as gc  # noqa: E402
+
+
+def _img(path, color="red", size=(400, 300), fmt=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, color).save(path, format=fmt)
+    return path
+
+
+def _touch_later(path):
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+
+
+@pytest.fixture
+def gallery(tmp_path):
+    root = tmp_path / "Pictures"
+    _img(root / "trip" / "a.jpg")
+    _img(root / "trip" / "b.png", "blue")
+    _img(root / "trip" / "day2" / "c.jpg", "green")
+    _img(root / "pets" / "d.webp", "white")
+    (root / "empty").mkdir()
+    return root
+
+
+def _trip(root):
+    return sorted(p for p in (root / "trip").iterdir() if p.suffix in gc.IMAGE_EXTS)
+
+
+class TestThumbnails:
+    def test_generated_once(self, gallery, monkeypatch):
+        monkeypatch.setattr(gc, "THUMB_WORKERS", 4)
+        cache = gc.GalleryCache(gallery)
+        with patch.object(gc, "make_thumbnail", wraps=gc.make_thumbnail) as make:
+            first = cache.thumbnails(_trip(gallery), 100)
+            second = cache.thumbnails(_trip(gallery), 100)
+        assert make.call_count == 2
+        assert [t.size for t in first] == [t.size for t in second] == [(100, 100)] * 2
+        assert len(list((cache.dir / "thumbs").iterdir())) == 2
+
+    def test_edit_invalidates(self, gallery):
+        cache = gc.GalleryCache(gallery)
+        path = gallery / "trip" / "a.jpg"
+        cache.thumbnails([path], 100)
+        _img(path, "yellow", size=(500, 300))
+        _touch_later(path)
+        with patch.object(gc, "make_thumbnail", wraps=gc.make_thumbnail) as make:
+            [thumb] = cache.thumbnails([path], 100)
+        assert make.call_count == 1
+        r, g, b = thumb.getpixel((50, 50))
+        assert r > 200 and g > 200 and b < 60
+
+    def test_jpeg_draft_mode(self, tmp_path):
+        path = _img(tmp_path / "big.jpg", size=(2400, 1600))
+        seen = {}
+        real_open = Image.open
+
+        def spy(*a, **kw):
+            img = real_open(*a, **kw)
+            real_draft = img.draft
+
+            def draft(mode, size):
+                res = real_draft(mode, size)
+                seen["size"] = img.size
+                return res
+            img.draft = draft
+            return img
+
+        with patch.object(Image, "open", spy):
+            thumb = gc.make_thumbnail(path, 200)
+        assert seen["size"][0] <= 400  # decoded at 1/8 (or so), not 2400 wide
+        assert thumb.size == (200, 200)
+
+    def test_broken_image_is_none(self, gallery):
+        bad = gallery / "trip" / "broken.jpg"
+        bad.write_bytes(b"not an image")
+        thumbs = gc.GalleryCache(gallery).thumbnails([bad, gallery / "trip" / "a.jpg"], 64)
+        assert thumbs[0] is None and thumbs[1] is not None
+
+
+class TestGridPages:
+    def test_page_cached_and_invalidated(self, gallery):
+        cache = gc.GalleryCache(gallery)
+        build = MagicMock(return_value=(b"page", True))
+        assert cache.grid_page(_trip(gallery), "3x2@200", build) == b"page"
+        assert cache.grid_page(_trip(gallery), "3x2@200", build) == b"page"
+        assert build.call_count == 1
+
+        cache.grid_page(_trip(gallery), "2x2@200", build)
+        assert build.call_count == 2, "layout is part of the key"
+
+        path = gallery / "trip" / "b.png"
+        _img(path, "black")
+        _touch_later(path)
+        cache.grid_page(_trip(gallery), "3x2@200", build)
+        assert build.call_count == 3
+
+    def test_incomplete_page_not_cached(self, gallery):
+        cache = gc.GalleryCache(gallery)
+        build = MagicMock(return_value=(b"partial", False))
+        cache.grid_page(_trip(gallery), "3x2@200", build)
+        cache.grid_page(_trip(gallery), "3x2@200", build)
+        assert build.call_count == 2
+        assert list((cache.dir / "grids").iterdir()) == []
+
+    def test_read_only_root_uncached(self, gallery):
+        with patch.object(gc.GalleryCache, "_open_dir", return_value=None):
+            cache = gc.GalleryCache(gallery)
+            build = MagicMock(return_value=(b"page", True))
+            cache.grid_page(_trip(gallery), "3x2@200", build)
+            cache.grid_page(_trip(gallery), "3x2@200", build)
+            thumbs = cache.thumbnails(_trip(gallery), 64)
+            counts = cache.folder_counts([gallery / "trip"])
+        assert build.call_count == 2
+        assert all(t is not None for t in thumbs)
+        assert counts[gallery / "trip"] == 3
+        assert not (gallery / gc.CACHE_DIR_NAME).exists()
+
+
+class TestFolderCounts:
+    def test_counts(self, gallery):
+        cache = gc.get_cache(gallery)
+        folders = [gallery / "trip", gallery / "pets", gallery / "empty"]
+        assert cache.folder_counts(folders) == dict(zip(folders, [3, 1, 0]))
+        assert gc.get_cache(gallery) is cache
+
+    def test_only_changed_folders_relisted(self, gallery):
+        cache = gc.GalleryCache(gallery)
+        cache.folder_counts([gallery / "trip"])
+        real_scandir = os.scandir
+        listed = []
+
+        def spy(path):
+            listed.append(os.path.basename(str(path)))
+            return real_scandir(path)
+
+        fresh = gc.GalleryCache(gallery)  # reads counts.json from disk
+        with patch.object(gc.os, "scandir", spy):
+            assert fresh.folder_counts([gallery / "trip"])[gallery / "trip"] == 3
+        assert listed == []
+
+        _img(gallery / "trip" / "day2" / "e.jpg")
+        with patch.object(gc.os, "scandir", spy):
+            assert fresh.folder_counts([gallery / "trip"])[gallery / "trip"] == 4
+        assert listed == ["day2"]
+
+    def test_removed_subfolder(self, gallery):
+        cache = gc.GalleryCache(gallery)
+        cache.folder_counts([gallery / "trip"])
+        for f in (gallery / "trip" / "day2").iterdir():
+            f.unlink()
+        (gallery / "trip" / "day2").rmdir()
+        assert cache.folder_counts([gallery / "trip"])[gallery / "trip"] == 2
+
+    def test_cache_folder_not_counted(self, gallery):
+        cache = gc.GalleryCache(gallery)
+        cache.thumbnails(_trip(gallery), 64)
+        assert cache.folder_counts([gallery])[gallery] == 4
@@ -0,0 +1,152 @@
+"""Pure-ASGI HTTP middleware tests (logging, CSRF, security headers, latency).
+
+Covers:
+  - security headers on every response; no-store only when unset and not /static
+  - CSRF: logged-in session without/with wrong token → 403 (with headers),
+    correct token / API key / exempt path / safe method pass
+  - 4xx responses logged as warnings
+  - streamed bodies pass through chunk by chunk (first chunk before the last is produced)
+  - latency counters keyed by route template, not raw path
+"""
+import asyncio
+import logging
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from core.http_middleware import RouteLatency, SapphireHTTPMiddleware
+
+TOKEN = "tok-123"
+
+
+async def login(request):
+    request.session["logged_in"] = True
+    request.session["csrf_token"] = TOKEN
+    return JSONResponse({"ok": True})
+
+
+async def item(request):
+    return JSONResponse({"id": request.path_params["id"]})
+
+
+async def cached(request):
+    return PlainTextResponse("x", headers={"Cache-Control": "max-age=60"})
+
+
+async def missing(request):
+    return JSONResponse({"detail": "nope"}, status_code=404)
+
+
+def _app(latency, stream_gate=None):
+    async def stream(request):
+        async def gen():
+            yield b"data: one\n\n"
+            if stream_gate is not None:
+                await stream_gate.wait()
+            yield b"data: two\n\n"
+        return StreamingResponse(gen(), media_type="text/event-stream")
+
+    return Starlette(
+        routes=[
+            Route("/login", login, methods=["POST"]),
+            Route("/api/items/{id}", item, methods=["GET", "POST"]),
+            Route("/api/cached", cached),
+            Route("/api/missing", missing),
+            Route("/api/stream", stream),
+        ],
+        middleware=[
+            Middleware(SessionMiddleware, secret_key="test"),
+            Middleware(SapphireHTTPMiddleware, latency=latency),
+        ],
+    )
+
+
+def _logged_in_client(latency=None):
+    client = TestClient(_app(latency or RouteLatency()))
+    assert client.post("/login").status_code == 200
+    return client
+
+
+def test_security_headers():
+    client = TestClient(_app(RouteLatency()))
+    resp = client.get("/api/items/1")
+    assert resp.headers["x-content-type-options"] == "nosniff"
+    assert resp.headers["x-frame-options"] == "DENY"
+    assert resp.headers["x-xss-protection"] == "1; mode=block"
+    assert resp.headers["cache-control"] == "no-store"
+    assert client.get("/api/cached").headers["cache-control"] == "max-age=60"
+
+
+def test_csrf_rejects_missing_or_wrong_token():
+    client = _logged_in_client()
+    resp = client.post("/api/items/1")
+    assert resp.status_code == 403 and resp.json() == {"detail": "CSRF validation failed"}
+    assert resp.headers["x-frame-options"] == "DENY"
+    assert client.post("/api/items/1", headers={"X-CSRF-Token": "wrong"}).status_code == 403
+
+
+def test_csrf_allows_valid_token_api_key_and_exempt():
+    client = _logged_in_client()
+    assert client.post("/api/items/1", headers={"X-CSRF-Token": TOKEN}).status_code == 200
+    assert client.post("/api/items/1", headers={"X-API-Key": "k"}).status_code == 200
+    assert client.post("/login").status_code == 200
+    assert client.get("/api/items/1").status_code == 200
+    # Not logged in → no CSRF check (auth dependencies handle it)
+    assert TestClient(_app(RouteLatency())).post("/api/items/1").status_code == 200
+
+
+def test_error_responses_logged(caplog):
+    client = TestClient(_app(RouteLatency()))
+    with caplog.at_level(logging.INFO, logger="core.api_fastapi"):
+        client.get("/api/missing")
+    assert "REQ: GET /api/missing" in caplog.text
+    assert "RSP: 404 GET /api/missing" in caplog.text
+
+
+def test_streaming_not_buffered():
+    """Middleware must forward the first SSE frame before the generator finishes."""
+    async def run():
+        gate = asyncio.Event()
+        app = _app(RouteLatency(), stream_gate=gate)
+        sent = []
+        first_chunk = asyncio.Event()
+
+        async def receive():
+            await asyncio.sleep(10)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if message["type"] == "http.response.body" and message.get("body"):
+                first_chunk.set()
+
+        scope = {"type": "http", "method": "GET", "path": "/api/stream", "raw_path": b"/api/stream",
+                 "query_string": b"", "headers": [], "scheme": "http", "server": ("test", 80),
+                 "root_path": "", "http_version": "1.1", "app": app}
+        task = asyncio.create_task(app(scope, receive, send))
+        await asyncio.wait_for(first_chunk.wait(), 2)
+        bodies = [m["body"] for m in sent if m["type"] == "http.response.body" and m.get("body")]
+        assert bodies == [b"data: one\n\n"]
+        gate.set()
+        await asyncio.wait_for(task, 2)
+        start = next(m for m in sent if m["type"] == "http.response.start")
+        assert (b"x-content-type-options", b"nosniff") in start["headers"]
+
+    asyncio.run(run())
+
+
+def test_latency_keyed_by_route_template():
+    latency = RouteLatency()
+    client = TestClient(_app(latency))
+    for i in range(3):
+        client.get(f"/api/items/{i}")
+    client.get("/api/does-not-exist")
+    stats = {r["route"]: r for r in latency.snapshot()}
+    assert stats["GET /api/items/{id}"]["count"] == 3
+    assert stats["GET /api/items/{id}"]["max_ms"] >= stats["GET /api/items/{id}"]["avg_ms"] >= 0
+    assert stats["GET <unmatched>"]["count"] == 1
+    assert not any("/api/items/0" in k for k in stats)
@@ -0,0 +1,142 @@
+"""Cache-stable system prompt layout tests.
+
+Covers:
+  - static system prompt is byte-identical across turns with datetime,
+    spice and prompt_inject all active; volatile parts land in the dynamic block
+  - dynamic block sits after history, right before the new user turn
+  - custom_context stays in the static prefix
+  - OpenAI-compat sends the dynamic block as a user-role message
+  - Claude caches the static block and leaves the dynamic block uncached
+  - prefix report: hash + cached/prompt tokens (OpenAI and Anthropic usage shapes)
+  - llama.cpp timings.cache_n is read as cached prompt tokens
+  - continuity ExecutionContext keeps datetime out of the system prompt
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.chat import prompt_layout
+
+
+@pytest.fixture
+def chat():
+    from core.chat.chat import LLMChat
+    with patch.object(LLMChat, '__init__', lambda self: None):
+        c = LLMChat()
+    sm = MagicMock()
+    sm.get_chat_settings.return_value = {"inject_datetime": True, "custom_context": "Likes tea.",
+                                         "rag_context": "off"}
+    sm.get_messages_for_llm.return_value = [
+        {"role": "user", "content": "earlier"},
+        {"role": "assistant", "content": "reply"},
+    ]
+    c.session_manager = sm
+    c.current_system_prompt = "You are {ai_name}. Talk to {user_name}."
+    with patch('core.chat.chat.count_tokens', side_effect=lambda t: len(str(t)) // 4):
+        yield c
+
+
+def _inject(event):
+    import time
+    event.context_parts.append(f"tick {time.monotonic_ns()}")
+
+
+def test_static_prefix_stable_across_turns(chat):
+    from core.hooks import hook_runner
+    with patch.object(hook_runner, 'has_handlers', return_value=True), \
+            patch.object(hook_runner, 'fire', side_effect=lambda name, ev: _inject(ev)):
+        first = chat._build_base_messages("hi")
+        second = chat._build_base_messages("again")
+    assert first[0]["content"] == second[0]["content"]
+    assert first[0][prompt_layout.PREFIX_HASH_KEY] == second[0][prompt_layout.PREFIX_HASH_KEY]
+    assert "Likes tea." in first[0]["content"]
+    assert "Current date/time" not in first[0]["content"]
+    assert first[-2]["_dynamic"] and "tick" in first[-2]["content"]
+    assert first[-2]["content"] != second[-2]["content"]
+
+
+def test_dynamic_block_after_history(chat):
+    msgs = chat._build_base_messages("hi")
+    assert [m["role"] for m in msgs] == ["system", "user", "assistant", "system", "user"]
+    assert msgs[-2].get("_dynamic") and msgs[-2]["content"].startswith("Current date/time:")
+    assert msgs[-1] == {"role": "user", "content": "hi"}
+
+
+def test_no_dynamic_block_when_nothing_volatile(chat):
+    chat.session_manager.get_chat_settings.return_value = {"rag_context": "off"}
+    with patch('core.prompts.split_spice', side_effect=lambda c: (c, "")):
+        msgs = chat._build_base_messages("hi")
+    assert not any(m.get("_dynamic") for m in msgs)
+
+
+def test_spice_moves_to_dynamic_block(chat):
+    chat.session_manager.get_chat_settings.return_value = {"rag_context": "off"}
+    chat.current_system_prompt = "Base persona.\nURGENT ALERT: be sassy"
+    with patch('core.prompts.split_spice',
+               side_effect=lambda c: (c.rsplit("\n", 1)[0], "URGENT ALERT: be sassy")):
+        msgs = chat._build_base_messages("hi")
+    assert msgs[0]["content"] == "Base persona."
+    assert msgs[-2]["content"] == "URGENT ALERT: be sassy"
+
+
+def test_split_spice_matches_assembled_output():
+    from core import prompt_state
+    with patch.dict(prompt_state._assembled_state, {"spice": "speak in rhyme"}), \
+            patch.object(prompt_state.prompt_manager, '_replace_templates', side_effect=lambda t: t):
+        base, spice = prompt_state.split_spice("Persona line\nURGENT ALERT: speak in rhyme")
+        assert (base, spice) == ("Persona line", "URGENT ALERT: speak in rhyme")
+        assert prompt_state.split_spice("A monolith prompt") == ("A monolith prompt", "")
+
+
+def test_openai_compat_sends_dynamic_as_user():
+    from core.chat.llm_providers.openai_compat import OpenAICompatProvider
+    provider = OpenAICompatProvider.__new__(OpenAICompatProvider)
+    static, dynamic = prompt_layout.system_messages("sys", "now")
+    clean = provider._sanitize_messages([static, {"role": "user", "content": "a"},
+                                         {"role": "assistant", "content": "b"},
+                                         dynamic, {"role": "user", "content": "c"}])
+    assert clean[0] == {"role": "system", "content": "sys"}
+    assert clean[3] == {"role": "user", "content": "now"}
+
+
+def test_claude_caches_static_block_only():
+    from core.chat.llm_providers.claude import ClaudeProvider
+    provider = ClaudeProvider.__new__(ClaudeProvider)
+    static, dynamic = prompt_layout.system_messages("sys", "now")
+    system, _, _, dyn = provider._convert_messages([static, {"role": "user", "content": "a"}, dynamic,
+                                                    {"role": "user", "content": "b"}])
+    blocks = provider._build_system_blocks(system, dyn, True, True, '5m')
+    assert blocks[0] == {"type": "text", "text": "sys", "cache_control": {"type": "ephemeral"}}
+    assert blocks[1] == {"type": "text", "text": "now"}
+
+
+def test_prefix_report_usage_shapes():
+    msgs = [prompt_layout.system_messages("sys")[0]]
+    h = prompt_layout.prefix_hash("sys")
+    assert prompt_layout.prefix_report(msgs, {"prompt_tokens": 1000, "cache_read_tokens": 900}) == \
+        {"hash": h, "prompt": 1000, "cached": 900}
+    # Anthropic: input_tokens excludes cache reads/writes
+    assert prompt_layout.prefix_report(msgs, {"prompt_tokens": 50, "cache_read_tokens": 900,
+                                              "cache_write_tokens": 0}) == \
+        {"hash": h, "prompt": 950, "cached": 900}
+    assert prompt_layout.prefix_report([{"role": "user", "content": "x"}], {}) is None
+
+
+def test_llama_cpp_cache_n_read():
+    from core.chat.llm_providers.openai_compat import _cached_prompt_tokens
+    chunk = MagicMock(spec=['usage', 'timings'])
+    chunk.usage = MagicMock(prompt_tokens_details=None)
+    chunk.timings = {"cache_n": 812, "prompt_n": 14}
+    assert _cached_prompt_tokens(chunk) == 812
+    chunk.usage = MagicMock(prompt_tokens_details=MagicMock(cached_tokens=64))
+    assert _cached_prompt_tokens(chunk) == 64
+
+
+def test_execution_context_datetime_is_dynamic():
+    from core.continuity.execution_context import ExecutionContext
+    ctx = ExecutionContext.__new__(ExecutionContext)
+    ctx.task_settings = {"inject_datetime": True, "prompt": "p"}
+    ctx.system_prompt = "static"
+    assert ctx._dynamic_context().startswith("Current date/time:")
+    ctx.task_settings = {"prompt": "p"}
+    assert ctx._dynamic_context() is None
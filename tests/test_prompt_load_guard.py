@@ -50,9 +50,7 @@ def isolated_pm(tmp_path, monkeypatch):
     mgr._spices = {}
     mgr._spice_meta = {}
     mgr._disabled_categories = set()
-    mgr._watcher_thread = None
-    mgr._watcher_running = False
-    mgr._last_mtimes = {}
+    mgr._watch_id = None
     mgr._active_preset_name = 'unknown'
     mgr._load_failed = {'pieces': False, 'monoliths': False, 'spices': False}
 
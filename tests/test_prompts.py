@@ -413,44 +413,38 @@ class TestPromptManagerEncoding:
 
 
 class TestPromptManagerFileWatcher:
-    """Test file watcher functionality."""
+    """Test file watcher registration with the shared watch service."""
     
     def test_start_file_watcher(self):
-        """start_file_watcher should start background thread."""
+        """start_file_watcher should register the user prompt files."""
         from core.prompt_manager import PromptManager
         
-        with patch.object(PromptManager, '__init__', lambda self: None):
+        with patch.object(PromptManager, '__init__', lambda self: None), \
+             patch('core.prompt_manager.file_watcher') as fw:
             mgr = PromptManager()
-            mgr._watcher_thread = None
-            mgr._watcher_running = False
+            mgr._watch_id = None
             mgr.USER_DIR = Path("/tmp")
-            mgr._last_mtimes = {}
-            
-            def mock_loop():
-                pass
-            mgr._file_watcher_loop = mock_loop
+            fw.watch.return_value = 3
             
             mgr.start_file_watcher()
             
-            assert mgr._watcher_running is True
-            assert mgr._watcher_thread is not None
-            
-            mgr._watcher_running = False
+            assert mgr._watch_id == 3
+            names = [p.name for p in fw.watch.call_args[0][0]]
+            assert names == ["prompt_pieces.json", "prompt_monoliths.json", "prompt_spices.json"]
     
     def test_stop_file_watcher(self):
-        """stop_file_watcher should stop background thread."""
+        """stop_file_watcher should unregister from the service."""
         from core.prompt_manager import PromptManager
         
-        with patch.object(PromptManager, '__init__', lambda self: None):
+        with patch.object(PromptManager, '__init__', lambda self: None), \
+             patch('core.prompt_manager.file_watcher') as fw:
             mgr = PromptManager()
-            mgr._watcher_running = True
-            mgr._watcher_thread = MagicMock()
-            mgr._watcher_thread.is_alive.return_value = True
+            mgr._watch_id = 3
             
             mgr.stop_file_watcher()
             
-            assert mgr._watcher_running is False
-            mgr._watcher_thread.join.assert_called_once()
+            assert mgr._watch_id is None
+            fw.unwatch.assert_called_once_with(3)
     
     def test_reload(self):
         """reload() should reload all data."""
@@ -0,0 +1,247 @@
+"""Continuity run log (core/continuity/run_log.py).
+
+Covers:
+  - a run is one row with start/end, trigger, outcome and timings
+  - activity() still yields the old started/outcome entry shape
+  - writes are buffered and land in one transaction; reads flush first
+  - retention by age and by row count
+  - runs left 'running' by a crashed process are closed as 'aborted'
+  - scheduler wiring: manual + cron runs record timings and queue wait,
+    the merged timeline reads from the log, legacy activity.json is imported
+  - executor.run reports slot wait
+  - the runs/run-stats routes reject a bad `hours` with 400
+"""
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.continuity.run_log import RunLog
+
+
+@pytest.fixture
+def log(tmp_path):
+    rl = RunLog(tmp_path / "runs.db")
+    yield rl
+    rl.close()
+
+
+def _raw_count(path):
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class TestRunLog:
+    def test_run_roundtrip(self, log):
+        start = _now()
+        run_id = log.start("t1", "Morning", "manual", start, queue_wait=1.25)
+        log.finish(run_id, "complete", start + timedelta(seconds=4),
+                   timings={"slot_wait_s": 0.5, "llm_s": 2.5, "llm_calls": 2, "tools_s": 1.0, "tool_calls": 3},
+                   responses=1, details={"manual": True, "responses": 1})
+        [row] = log.runs()
+        assert row["task_id"] == "t1" and row["trigger"] == "manual" and row["status"] == "complete"
+        assert row["duration"] == pytest.approx(4.0)
+        assert row["queue_wait"] == 1.25 and row["slot_wait"] == 0.5
+        assert (row["llm_seconds"], row["llm_calls"], row["tool_seconds"], row["tool_calls"]) == (2.5, 2, 1.0, 3)
+        assert row["details"] == {"manual": True, "responses": 1}
+
+    def test_activity_shape(self, log):
+        t = _now()
+        run_id = log.start("t1", "Task", "daemon", t)
+        log.note("t1", "Task", "queued", t + timedelta(seconds=1), {"pending": 1})
+        log.finish(run_id, "error", t + timedelta(seconds=2), error="boom", details={"exception": "boom"})
+        open_id = log.start("t2", "Other", "cron", t + timedelta(seconds=3))
+        entries = log.activity()
+        assert [(e["task_id"], e["status"]) for e in entries] == [
+            ("t1", "started"), ("t1", "queued"), ("t1", "error"), ("t2", "started")]
+        assert entries[0]["details"] == {"trigger": "daemon"}
+        assert entries[2]["details"] == {"exception": "boom"}
+        assert open_id
+        assert log.activity(limit=2)[-1]["task_id"] == "t2"
+
+    def test_writes_are_batched(self, log, tmp_path):
+        t = _now()
+        for i in range(20):
+            log.note("t", "T", "skipped", t + timedelta(seconds=i))
+        assert _raw_count(tmp_path / "runs.db") == 0  # still buffered
+        assert len(log.activity(limit=100)) == 20     # reads flush
+        assert _raw_count(tmp_path / "runs.db") == 20
+
+    def test_writer_flushes_in_background(self, log, tmp_path):
+        log.note("t", "T", "skipped", _now())
+        deadline = time.time() + 3
+        while time.time() < deadline and _raw_count(tmp_path / "runs.db") == 0:
+            time.sleep(0.05)
+        assert _raw_count(tmp_path / "runs.db") == 1
+
+    def test_close_flushes(self, tmp_path):
+        rl = RunLog(tmp_path / "runs.db")
+        rl.note("t", "T", "skipped", _now())
+        rl.close()
+        assert _raw_count(tmp_path / "runs.db") == 1
+
+    def test_prune_by_age_and_rows(self, tmp_path):
+        rl = RunLog(tmp_path / "runs.db", retention_days=7, max_rows=3)
+        try:
+            old = _now() - timedelta(days=30)
+            rl.note("t", "T", "skipped", old)
+            for i in range(5):
+                rl.note("t", "T", "skipped", _now() + timedelta(seconds=i))
+            rl.flush()
+            assert rl.prune() == 3  # 1 too old + 2 over the cap
+            entries = rl.activity(limit=10)
+            assert len(entries) == 3
+            assert all(datetime.fromisoformat(e["timestamp"]) > old for e in entries)
+        finally:
+            rl.close()
+
+    def test_orphaned_runs_aborted_on_open(self, tmp_path):
+        rl = RunLog(tmp_path / "runs.db")
+        done = rl.start("t", "T", "cron", _now())
+        rl.finish(done, "complete", _now())
+        rl.start("t", "T", "cron", _now())
+        rl.close()  # process dies before finish()
+
+        rl = RunLog(tmp_path / "runs.db")
+        try:
+            statuses = sorted(r["status"] for r in rl.runs())
+            assert statuses == ["aborted", "complete"]
+            [aborted] = [r for r in rl.runs() if r["status"] == "aborted"]
+            assert aborted["ended"] == aborted["started"] and aborted["duration"] is None
+            assert aborted["error"]
+            assert rl.task_stats(0)[0]["running"] == 0
+        finally:
+            rl.close()
+
+    def test_task_stats(self, log):
+        t = _now()
+        for i, status in enumerate(["complete", "complete", "error"]):
+            rid = log.start("t1", "T", "cron", t + timedelta(minutes=i), queue_wait=i)
+            log.finish(rid, status, t + timedelta(minutes=i, seconds=2), timings={"llm_s": 1.0, "llm_calls": 1})
+        [stats] = log.task_stats(t.timestamp() - 1)
+        assert stats["runs"] == 3 and stats["errors"] == 1
+        assert stats["avg_duration"] == pytest.approx(2.0)
+        assert stats["max_wait"] == pytest.approx(2.0)
+        assert stats["llm_calls"] == 3
+
+
+@pytest.fixture
+def sched(tmp_path):
+    from core.continuity.event_router import EventRouter
+    from core.continuity.scheduler import ContinuityScheduler, _FireQueue
+    base_dir = tmp_path / "user" / "continuity"
+    base_dir.mkdir(parents=True)
+    s = ContinuityScheduler.__new__(ContinuityScheduler)
+    s.system = MagicMock()
+    s.executor = MagicMock()
+    s.executor.run.return_value = {
+        "success": True, "responses": [{"output": "hi"}], "errors": [],
+        "timings": {"slot_wait_s": 0.2, "llm_s": 1.5, "llm_calls": 1, "tools_s": 0.0, "tool_calls": 0},
+    }
+    s._running = False
+    s._thread = None
+    s._lock = threading.Lock()
+    s._base_dir = base_dir
+    s._tasks_path = base_dir / "tasks.json"
+    s._activity_path = base_dir / "activity.json"
+    s._tasks = {}
+    s._activity = []
+    s._task_running = {}
+    s._task_pending = {}
+    s._task_last_matched = {}
+    s._task_progress = {}
+    s._event_threads = []
+    s._fire = _FireQueue()
+    s._router = EventRouter(s)
+    s._run_log = RunLog(base_dir / "runs.db")
+    yield s
+    s._run_log.close()
+
+
+class TestSchedulerWiring:
+    def test_manual_run_recorded_with_timings(self, sched):
+        task = sched.create_task({"name": "Ping", "schedule": "0 9 * * *"})
+        sched.run_task_now(task["id"])
+        [run] = sched.get_runs()
+        assert run["trigger"] == "manual" and run["status"] == "complete"
+        assert run["llm_seconds"] == 1.5 and run["slot_wait"] == 0.2
+        assert run["responses"] == 1
+        statuses = [e["status"] for e in sched.get_activity()]
+        assert statuses == ["started", "complete"]
+        assert not sched._activity_path.exists()
+
+    def test_error_run_keeps_message(self, sched):
+        sched.executor.run.return_value = {"success": False, "responses": [], "errors": ["LLM down"]}
+        task = sched.create_task({"name": "Ping", "schedule": "0 9 * * *"})
+        sched.run_task_now(task["id"])
+        [run] = sched.get_runs()
+        assert run["status"] == "error" and run["error"] == "LLM down"
+
+    def test_cron_queue_wait(self, sched):
+        task = sched.create_task({"name": "Tick", "schedule": "* * * * *"})
+        sched._task_running[task["id"]] = True
+        sched._task_pending[task["id"]] = [(None, None, time.monotonic() - 5)]
+        sched._execute_task(task)
+        runs = sched.get_runs()
+        assert len(runs) == 2
+        assert max(r["queue_wait"] for r in runs) >= 5
+        assert sched._task_running[task["id"]] is False
+
+    def test_merged_timeline_reads_run_log(self, sched):
+        task = sched.create_task({"name": "Ping", "schedule": "0 9 * * *"})
+        sched.run_task_now(task["id"])
+        sched._activity = []  # the in-memory ring isn't the source
+        past = sched.get_merged_timeline(hours_back=1)["past"]
+        assert [p["status"] for p in past] == ["complete", "started"]
+        assert past[0]["duration"] is not None
+
+    def test_legacy_activity_imported(self, sched):
+        ts = _now().isoformat()
+        sched._activity_path.write_text(json.dumps({"activity": [
+            {"timestamp": ts, "task_id": "old", "task_name": "Old", "status": "complete", "details": {}},
+        ]}))
+        sched._load_activity()
+        assert not sched._activity_path.exists()
+        assert sched._activity_path.with_suffix(".json.imported").exists()
+        assert [e["task_id"] for e in sched.get_activity()] == ["old"]
+
+
+class TestExecutorSlotWait:
+    def test_slot_wait_reported(self):
+        from core.continuity.executor import ContinuityExecutor
+        ex = ContinuityExecutor(MagicMock())
+        ex._run = MagicMock(return_value={"success": True, "responses": [], "errors": []})
+        result = ex.run({"name": "T"})
+        assert "slot_wait_s" in result["timings"]
+
+
+def _hours_param():
+    import core.api_fastapi  # noqa: F401 — routes import their app module first
+    from core.routes.system import _hours_param
+    return _hours_param
+
+
+class TestHoursParam:
+    @pytest.mark.parametrize("raw", ["abc", "0", "-3", "nan", "inf"])
+    def test_bad_hours_is_400(self, raw):
+        from fastapi import HTTPException
+        with pytest.raises(HTTPException) as exc:
+            _hours_param()(raw)
+        assert exc.value.status_code == 400
+
+    def test_default_and_valid(self):
+        parse = _hours_param()
+        assert parse(None) is None
+        assert parse("", 24) == 24
+        assert parse("1.5") == 1.5
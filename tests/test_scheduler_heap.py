@@ -0,0 +1,188 @@
+"""Next-fire heap scheduler tests.
+
+Covers:
+  - next fire computed on create/update/delete, no croniter on status reads
+  - _check_and_run fires exactly when due, once, then advances
+  - misfires past the grace window are skipped, not fired late
+  - timezone change recomputes every task
+  - timeline projection cached until a task changes
+  - loop sleeps until the deadline and wakes promptly on edits/stop
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+import pytest
+
+
+class _Clock:
+    def __init__(self, start):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **kw):
+        self.now = self.now + timedelta(**kw)
+
+
+@pytest.fixture
+def clock():
+    c = _Clock(datetime(2026, 3, 10, 8, 59, 30, tzinfo=ZoneInfo('UTC')))
+    with patch('core.continuity.scheduler._user_now', c):
+        yield c
+
+
+@pytest.fixture
+def sched(tmp_path, clock):
+    from core.continuity.event_router import EventRouter
+    from core.continuity.scheduler import ContinuityScheduler, _FireQueue
+    base_dir = tmp_path / "user" / "continuity"
+    base_dir.mkdir(parents=True)
+    s = ContinuityScheduler.__new__(ContinuityScheduler)
+    s.system = MagicMock()
+    s.executor = MagicMock()
+    s.executor.run.return_value = {"success": True, "responses": [], "errors": []}
+    s._running = False
+    s._thread = None
+    s._lock = threading.Lock()
+    s._base_dir = base_dir
+    s._tasks_path = base_dir / "tasks.json"
+    s._activity_path = base_dir / "activity.json"
+    s._tasks = {}
+    s._activity = []
+    s._run_log = None
+    s._task_running = {}
+    s._task_pending = {}
+    s._task_last_matched = {}
+    s._task_progress = {}
+    s._event_threads = []
+    s._fire = _FireQueue()
+    s._router = EventRouter(s)
+    return s
+
+
+def _fired(s):
+    """Task names the scheduler spawned a worker for."""
+    return [c.args[0]["name"] for c in s._spawn.call_args_list]
+
+
+@pytest.fixture
+def spawn(sched):
+    """Capture task launches instead of starting worker threads."""
+    sched._spawn = MagicMock()
+
+    class _FakeThread:
+        def __init__(self, target, args, **kw):
+            self.args = args
+
+        def start(self):
+            sched._spawn(*self.args)
+
+    with patch('core.continuity.scheduler.threading.Thread', _FakeThread):
+        yield sched
+
+
+def test_next_fire_computed_on_create(sched, clock):
+    sched.create_task({"name": "Nine", "schedule": "0 9 * * *"})
+    sched.create_task({"name": "Daemon", "type": "daemon", "schedule": "* * * * *",
+                       "trigger_config": {"source": "x"}})
+    nxt = sched._get_next_scheduled()
+    assert nxt["name"] == "Nine"
+    assert nxt["scheduled_for"] == "2026-03-10T09:00:00+00:00"
+    assert len(sched._fire.next_fire) == 1
+
+
+def test_status_reads_do_not_rebuild_croniters(sched, clock):
+    for i in range(20):
+        sched.create_task({"name": f"T{i}", "schedule": f"{i} * * * *"})
+    sched._get_next_scheduled()  # initial build
+    with patch('core.continuity.scheduler._get_croniter') as cron:
+        sched._get_next_scheduled()
+        sched.get_status()
+        cron.assert_not_called()
+
+
+def test_fires_when_due_once_then_advances(spawn, clock):
+    s = spawn
+    s.create_task({"name": "Nine", "schedule": "0 9 * * *"})
+    s._check_and_run()
+    assert _fired(s) == []
+
+    clock.advance(seconds=30)  # 09:00:00
+    s._check_and_run()
+    s._check_and_run()
+    assert _fired(s) == ["Nine"]
+    assert s._get_next_scheduled()["scheduled_for"] == "2026-03-11T09:00:00+00:00"
+
+
+def test_edit_reschedules_and_wakes(sched, clock):
+    task = sched.create_task({"name": "T", "schedule": "0 9 * * *"})
+    sched._get_next_scheduled()
+    wake = sched._fire.wake
+    wake.clear()
+    sched.update_task(task["id"], {"schedule": "30 9 * * *"})
+    assert wake.is_set()
+    assert sched._get_next_scheduled()["scheduled_for"] == "2026-03-10T09:30:00+00:00"
+
+    sched.update_task(task["id"], {"enabled": False})
+    assert sched._get_next_scheduled() is None
+    sched.update_task(task["id"], {"enabled": True})
+    assert sched._get_next_scheduled() is not None
+    sched.delete_task(task["id"])
+    assert sched._get_next_scheduled() is None
+
+
+def test_misfire_past_grace_is_skipped(spawn, clock):
+    s = spawn
+    s.create_task({"name": "Nine", "schedule": "0 9 * * *"})
+    s._check_and_run()
+    clock.advance(minutes=10)  # slept through 09:00
+    s._check_and_run()
+    assert _fired(s) == []
+    assert s._get_next_scheduled()["scheduled_for"] == "2026-03-11T09:00:00+00:00"
+
+
+def test_timezone_change_recomputes(sched, clock):
+    sched.create_task({"name": "Nine", "schedule": "0 9 * * *"})
+    assert sched._get_next_scheduled()["scheduled_for"] == "2026-03-10T09:00:00+00:00"
+    clock.now = clock.now.astimezone(ZoneInfo('Asia/Tokyo'))  # 17:59 local
+    assert sched._get_next_scheduled()["scheduled_for"] == "2026-03-11T09:00:00+09:00"
+
+
+def test_timeline_cached_until_task_changes(sched, clock):
+    task = sched.create_task({"name": "Hourly", "schedule": "0 * * * *"})
+    first = sched.get_timeline(hours=5)
+    assert len(first) == 5
+    with patch('core.continuity.scheduler._get_croniter') as cron:
+        assert sched.get_timeline(hours=5) == first
+        cron.assert_not_called()
+    sched.update_task(task["id"], {"schedule": "0 */2 * * *"})
+    assert len(sched.get_timeline(hours=5)) == 2  # 10:00, 12:00
+
+
+def test_timeline_cache_expires_when_first_entry_passes(sched, clock):
+    sched.create_task({"name": "Hourly", "schedule": "0 * * * *"})
+    sched._check_and_run()
+    before = sched.get_timeline(hours=2)
+    clock.advance(minutes=1)  # 09:00:30 — first entry is now past
+    sched._check_and_run()
+    after = sched.get_timeline(hours=2)
+    assert before[0]["scheduled_for"] == "2026-03-10T09:00:00+00:00"
+    assert after[0]["scheduled_for"] == "2026-03-10T10:00:00+00:00"
+
+
+def test_loop_sleeps_until_deadline_and_stops_promptly(sched):
+    """Real clock: the loop computes a sleep bounded by MAX_SLEEP and stop()
+    interrupts it instead of waiting out the interval."""
+    from core.continuity.scheduler import _user_now
+    with patch('core.continuity.scheduler._user_now', lambda: datetime.now(ZoneInfo('UTC'))):
+        sched.create_task({"name": "Yearly", "schedule": "0 0 1 1 *"})
+        assert sched._seconds_until_next(_user_now()) == sched.MAX_SLEEP
+        sched.start()
+        time.sleep(0.1)
+        started = time.monotonic()
+        sched.stop()
+        assert time.monotonic() - started < 2
@@ -10,9 +10,11 @@ class TestMergedTimelineTimezones:
     """get_merged_timeline must handle both naive and aware timestamps."""
 
     def _make_scheduler(self, activity, tasks=None):
-        from core.continuity.scheduler import ContinuityScheduler
+        from core.continuity.scheduler import ContinuityScheduler, _FireQueue
         with patch.object(ContinuityScheduler, '__init__', lambda self: None):
             sched = ContinuityScheduler()
+            sched._fire = _FireQueue()
+            sched._run_log = None
             sched._activity = activity
             sched._tasks = {}
             sched._lock = threading.Lock()
@@ -355,13 +355,11 @@ class TestReload:
             mgr._lock = threading.Lock()
             mgr._load_user_settings = MagicMock()
             mgr._merge_settings = MagicMock()
-            mgr._update_mtime = MagicMock()
             
             mgr.reload()
             
             mgr._load_user_settings.assert_called_once()
             mgr._merge_settings.assert_called_once()
-            mgr._update_mtime.assert_called_once()
     
     def test_reset_to_defaults(self):
         """reset_to_defaults() should clear user overrides."""
@@ -576,72 +574,81 @@ class TestFileOperationsEncoding:
 
 
 class TestFileWatcher:
-    """Test file watcher functionality."""
+    """Test file watcher registration with the shared watch service."""
     
     def test_start_file_watcher(self):
-        """start_file_watcher should start background thread."""
+        """start_file_watcher should register settings.json with the service."""
         from core.settings_manager import SettingsManager
         
-        with patch.object(SettingsManager, '__init__', lambda self: None):
+        with patch.object(SettingsManager, '__init__', lambda self: None), \
+             patch('core.settings_manager.file_watcher') as fw:
             mgr = SettingsManager()
-            mgr._watcher_thread = None
-            mgr._watcher_running = False
+            mgr._watch_id = None
             mgr.BASE_DIR = Path("/tmp")
-            
-            # Mock the loop to exit immediately
-            def mock_loop():
-                pass
-            mgr._file_watcher_loop = mock_loop
+            fw.watch.return_value = 7
             
             mgr.start_file_watcher()
             
-            assert mgr._watcher_running is True
-            assert mgr._watcher_thread is not None
-            
-            # Cleanup
-            mgr._watcher_running = False
-            time.sleep(0.1)
+            assert mgr._watch_id == 7
+            paths = fw.watch.call_args[0][0]
+            assert paths == [Path("/tmp") / 'user' / 'settings.json']
     
     def test_stop_file_watcher(self):
-        """stop_file_watcher should stop background thread."""
+        """stop_file_watcher should unregister from the service."""
         from core.settings_manager import SettingsManager
         
-        with patch.object(SettingsManager, '__init__', lambda self: None):
+        with patch.object(SettingsManager, '__init__', lambda self: None), \
+             patch('core.settings_manager.file_watcher') as fw:
             mgr = SettingsManager()
-            mgr._watcher_running = True
-            mgr._watcher_thread = MagicMock()
-            mgr._watcher_thread.is_alive.return_value = True
+            mgr._watch_id = 7
             
             mgr.stop_file_watcher()
             
-            assert mgr._watcher_running is False
-            mgr._watcher_thread.join.assert_called_once()
+            assert mgr._watch_id is None
+            fw.unwatch.assert_called_once_with(7)
     
-    def test_stop_file_watcher_no_thread(self):
-        """stop_file_watcher should handle None thread."""
+    def test_stop_file_watcher_not_started(self):
+        """stop_file_watcher should handle never having started."""
         from core.settings_manager import SettingsManager
         
-        with patch.object(SettingsManager, '__init__', lambda self: None):
+        with patch.object(SettingsManager, '__init__', lambda self: None), \
+             patch('core.settings_manager.file_watcher') as fw:
             mgr = SettingsManager()
-            mgr._watcher_thread = None
+            mgr._watch_id = None
             
             mgr.stop_file_watcher()  # Should not raise
+            fw.unwatch.assert_not_called()
     
     def test_double_start_prevented(self):
         """Starting watcher twice should be prevented."""
         from core.settings_manager import SettingsManager
         
-        with patch.object(SettingsManager, '__init__', lambda self: None):
+        with patch.object(SettingsManager, '__init__', lambda self: None), \
+             patch('core.settings_manager.file_watcher') as fw:
             mgr = SettingsManager()
-            mgr._watcher_thread = MagicMock()
-            mgr._watcher_thread.is_alive.return_value = True
-            mgr._watcher_running = True
+            mgr._watch_id = 7
             
-            # Should return early without starting another thread
             mgr.start_file_watcher()
             
-            # Thread should not have changed
-            assert mgr._watcher_thread.is_alive.called
+            fw.watch.assert_not_called()
+            assert mgr._watch_id == 7
+
+    def test_change_reloads_and_fires_callbacks(self):
+        """A change reported by the service reloads and runs reload callbacks."""
+        from core.settings_manager import SettingsManager
+        
+        with patch.object(SettingsManager, '__init__', lambda self: None):
+            mgr = SettingsManager()
+            mgr._lock = threading.RLock()
+            mgr._config = {"MY_KEY": 5}
+            callback = MagicMock()
+            mgr._reload_callbacks = {"MY_KEY": callback}
+            mgr.reload = MagicMock()
+            
+            mgr._on_file_change([Path("/tmp/user/settings.json")])
+            
+            mgr.reload.assert_called_once()
+            callback.assert_called_once_with(5)
 
 
 class TestCallbackRegistration:
@@ -237,13 +237,15 @@ def test_resolve_persona_non_scope_field_still_treats_none_as_empty():
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# 3. _run_foreground must not self-deadlock on _voice_lock
+# 3. _run_foreground must not self-deadlock or leave its lock held
 #
 # The original bug: `acquire()` at method entry + `with self._voice_lock:`
 # in the finally block → non-reentrant re-acquire → task hangs forever.
+# The global voice lock is gone (voice is per-utterance now) but the same
+# acquire-at-entry / release-in-finally shape guards the per-chat lock.
 # Test drives _run_foreground with all dependencies mocked and asserts:
 #   (a) the call returns within a generous timeout, and
-#   (b) _voice_lock is released afterwards (not stuck held).
+#   (b) the chat lock is released afterwards (not stuck held).
 # Deadlock would pin the thread past the timeout and leave the lock held.
 # ─────────────────────────────────────────────────────────────────────────────
 
@@ -283,15 +285,15 @@ def _run_with_timeout(fn, timeout_s=5.0):
     if not holder["done"]:
         pytest.fail(
             f"_run_foreground did not return within {timeout_s}s — "
-            "this is exactly the voice_lock deadlock signature."
+            "this is exactly the lock deadlock signature."
         )
     if holder["error"]:
         raise holder["error"]
     return holder["result"]
 
 
-def test_run_foreground_releases_voice_lock_on_success():
-    """After a normal _run_foreground call, _voice_lock must be released —
+def test_run_foreground_releases_chat_lock_on_success():
+    """After a normal _run_foreground call, the chat lock must be released —
     not pinned by a finally block that tries to re-acquire it."""
     from core.continuity.executor import ContinuityExecutor
     system = _build_mocked_system()
@@ -321,16 +323,16 @@ def test_run_foreground_releases_voice_lock_on_success():
         )
 
     # The real proof: acquire non-blocking — if the lock is held, this fails.
-    acquired = ex._voice_lock.acquire(blocking=False)
+    acquired = ex._chat_lock("lookout").acquire(blocking=False)
     assert acquired, (
-        "_voice_lock was NOT released after _run_foreground returned. "
+        "chat lock was NOT released after _run_foreground returned. "
         "This is the exact signature of the re-entrant double-acquire "
         "deadlock we just fixed."
     )
-    ex._voice_lock.release()
+    ex._chat_lock("lookout").release()
 
 
-def test_run_foreground_releases_voice_lock_on_inner_exception():
+def test_run_foreground_releases_chat_lock_on_inner_exception():
     """An exception inside the LLM run path still releases the lock on the
     way out — otherwise one failed task starves every subsequent task."""
     from core.continuity.executor import ContinuityExecutor
@@ -356,12 +358,12 @@ def test_run_foreground_releases_voice_lock_on_inner_exception():
             timeout_s=5.0,
         )
 
-    acquired = ex._voice_lock.acquire(blocking=False)
+    acquired = ex._chat_lock("lookout").acquire(blocking=False)
     assert acquired, (
-        "_voice_lock held after an error path through _run_foreground — "
+        "chat lock held after an error path through _run_foreground — "
         "inner exception doesn't release the lock. Future tasks starve."
     )
-    ex._voice_lock.release()
+    ex._chat_lock("lookout").release()
 
 
 def test_run_foreground_back_to_back_does_not_deadlock():
@@ -393,9 +395,9 @@ def test_run_foreground_back_to_back_does_not_deadlock():
                 timeout_s=5.0,
             )
 
-    acquired = ex._voice_lock.acquire(blocking=False)
-    assert acquired, "_voice_lock still held after two serial _run_foreground calls"
-    ex._voice_lock.release()
+    acquired = ex._chat_lock("lookout").acquire(blocking=False)
+    assert acquired, "chat lock still held after two serial _run_foreground calls"
+    ex._chat_lock("lookout").release()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,132 @@
+"""Content-hashed static asset tests.
+
+Covers:
+  - import map points every JS file at its content-hash URL
+  - hashed URL → immutable; bare or stale URL → no-cache + ETag
+  - If-None-Match → 304
+  - gzip variant served when accepted, identity otherwise, Vary set
+  - small files aren't compressed
+  - editing a file changes its hash and URL
+  - variants are reused from the disk cache and pruned when stale
+  - path traversal still refused
+  - nothing is written until the manifest is first used
+"""
+import gzip
+import json
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from core.static_assets import AssetManifest, AssetStaticFiles, IMMUTABLE
+
+BIG_JS = "export const x = 1;\n" + "// padding padding padding padding\n" * 200
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "static"
+    (root / "core").mkdir(parents=True)
+    (root / "main.js").write_text(BIG_JS)
+    (root / "core" / "state.js").write_text("export let s = 0;\n")
+    (root / "style.css").write_text("body { color: red; }\n" * 100)
+    (root / "logo.png").write_bytes(b"\x89PNG" + b"\x00" * 4000)
+    return root, tmp_path / "cache"
+
+
+def _client(manifest):
+    app = Starlette(routes=[Mount("/static", AssetStaticFiles(directory=str(manifest.root), manifest=manifest))])
+    return TestClient(app)
+
+
+def test_import_map_uses_content_hashes(tree):
+    root, cache = tree
+    m = AssetManifest(root, cache).build()
+    imports = json.loads(m.import_map())["imports"]
+    assert set(imports) == {"/static/main.js", "/static/core/state.js"}
+    assert imports["/static/main.js"] == f"/static/main.js?h={m.get('main.js').hash}"
+
+
+def test_hashed_url_is_immutable_and_bare_url_revalidates(tree):
+    m = AssetManifest(*tree).build()
+    client = _client(m)
+    hashed = client.get(m.url("main.js"), headers={"Accept-Encoding": "identity"})
+    assert hashed.status_code == 200 and hashed.headers["cache-control"] == IMMUTABLE
+    bare = client.get("/static/main.js", headers={"Accept-Encoding": "identity"})
+    assert bare.headers["cache-control"] == "no-cache"
+    stale = client.get("/static/main.js?h=deadbeef", headers={"Accept-Encoding": "identity"})
+    assert stale.headers["cache-control"] == "no-cache"
+    assert bare.headers["etag"] == f'"{m.get("main.js").hash}"'
+
+
+def test_etag_304(tree):
+    m = AssetManifest(*tree).build()
+    client = _client(m)
+    first = client.get("/static/main.js", headers={"Accept-Encoding": "gzip"})
+    again = client.get("/static/main.js", headers={"Accept-Encoding": "gzip",
+                                                  "If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304 and again.content == b""
+
+
+def test_gzip_variant_negotiation(tree):
+    m = AssetManifest(*tree).build()
+    client = _client(m)
+    raw = client.get("/static/main.js", headers={"Accept-Encoding": "gzip"})
+    # TestClient decodes transparently; check the wire headers + size instead
+    assert raw.headers["content-encoding"] == "gzip"
+    assert raw.headers["vary"] == "Accept-Encoding"
+    assert int(raw.headers["content-length"]) < len(BIG_JS) / 2
+    assert raw.text == BIG_JS
+    assert raw.headers["content-type"].startswith("text/javascript")
+    plain = client.get("/static/main.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.text == BIG_JS
+    refused = client.get("/static/main.js", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in refused.headers
+    assert plain.headers["etag"] != raw.headers["etag"]
+
+
+def test_small_and_binary_files_not_compressed(tree):
+    m = AssetManifest(*tree).build()
+    assert m.get("core/state.js").variants == {}
+    assert m.get("logo.png").variants == {}
+    assert "gzip" in m.get("style.css").variants
+
+
+def test_edit_changes_hash(tree):
+    root, cache = tree
+    m = AssetManifest(root, cache).build()
+    old = m.url("main.js")
+    (root / "main.js").write_text(BIG_JS + "export const y = 2;\n")
+    new = m.url("main.js")
+    assert new != old
+    resp = _client(m).get("/static/main.js", headers={"Accept-Encoding": "gzip"})
+    assert "export const y" in resp.text
+
+
+def test_variants_cached_on_disk_and_pruned(tree):
+    root, cache = tree
+    m = AssetManifest(root, cache).build()
+    variant = m.get("main.js").variants["gzip"]
+    assert gzip.decompress(variant.read_bytes()).decode() == BIG_JS
+    mtime = variant.stat().st_mtime_ns
+    AssetManifest(root, cache).build()
+    assert variant.stat().st_mtime_ns == mtime  # reused, not rebuilt
+    (root / "main.js").write_text("changed\n" * 500)
+    AssetManifest(root, cache).build()
+    assert not variant.exists()
+
+
+def test_manifest_builds_lazily(tree):
+    root, cache = tree
+    m = AssetManifest(root, cache)
+    assert not cache.exists()
+    assert "/static/main.js" in json.loads(m.import_map())["imports"]
+    assert m.get("main.js").variants["gzip"].parent == cache
+
+
+def test_traversal_refused(tree):
+    m = AssetManifest(*tree).build()
+    (tree[0].parent / "secret.txt").write_text("nope")
+    resp = _client(m).get("/static/../secret.txt")
+    assert resp.status_code == 404
@@ -0,0 +1,174 @@
+"""SSE frame coalescing for /api/chat/stream (core/chat/stream_coalescer.py).
+
+Covers:
+  - a burst of deltas becomes a few frames with the text intact and in order
+  - a delta after a pause goes out immediately (no added latency)
+  - held text is flushed on time while the model is stalled
+  - tool/status events flush held text first and pass through unchanged
+  - max_chars forces an early flush; window 0 passes everything through
+  - errors from the stream surface after held text; close() stops the stream
+  - close() cancels a still-running stream and waits for it; a finished one
+    isn't cancelled; the hand-off queue is bounded
+"""
+import threading
+import time
+
+import pytest
+
+from core.chat.stream_coalescer import StreamCoalescer
+
+
+def _text(events):
+    return "".join(e["text"] if isinstance(e, dict) else e for e in events
+                   if not isinstance(e, dict) or e.get("type") == "content")
+
+
+def _burst(n, delay=0.0):
+    for i in range(n):
+        if delay:
+            time.sleep(delay)
+        yield {"type": "content", "text": f"t{i} "}
+
+
+class TestCoalescing:
+    def test_burst_merged(self):
+        c = StreamCoalescer(_burst(500), window_ms=30)
+        out = list(c)
+        assert _text(out) == "".join(f"t{i} " for i in range(500))
+        assert c.deltas == 500
+        assert c.content_frames < 50
+        assert c.frames_per_delta < 0.1
+
+    def test_first_delta_not_delayed(self):
+        def slow():
+            yield {"type": "content", "text": "first"}
+            time.sleep(0.3)
+            yield {"type": "content", "text": "second"}
+
+        c = StreamCoalescer(slow(), window_ms=50)
+        it = iter(c)
+        start = time.monotonic()
+        assert next(it) == {"type": "content", "text": "first"}
+        assert time.monotonic() - start < 0.05
+        assert next(it)["text"] == "second"  # after a pause: sent on arrival, alone
+
+    def test_held_text_flushed_during_stall(self):
+        release = threading.Event()
+
+        def stalls():
+            yield {"type": "content", "text": "a"}
+            yield {"type": "content", "text": "b"}
+            release.wait(2)
+            yield {"type": "content", "text": "c"}
+
+        c = StreamCoalescer(stalls(), window_ms=20)
+        it = iter(c)
+        assert next(it)["text"] == "a"
+        start = time.monotonic()
+        assert next(it)["text"] == "b"
+        assert time.monotonic() - start < 0.5  # didn't wait for "c"
+        release.set()
+        assert _text(list(it)) == "c"
+
+    def test_tool_events_flush_and_pass_through(self):
+        tool = {"type": "tool_start", "id": "1", "name": "x", "args": {}}
+        events = [{"type": "stream_started"}] + [{"type": "content", "text": ch} for ch in "abc"] + [tool, "de", "f"]
+        out = list(StreamCoalescer(iter(events), window_ms=1000))
+        assert out[0] == {"type": "stream_started"}
+        i = out.index(tool)
+        assert _text(out[:i]) == "abc" and _text(out[i + 1:]) == "def"
+
+    def test_reload_marker_not_merged(self):
+        out = list(StreamCoalescer(iter(["x", "<<RELOAD_PAGE>>", "y"]), window_ms=1000))
+        assert "<<RELOAD_PAGE>>" in out
+
+    def test_max_chars_flushes_early(self):
+        c = StreamCoalescer(iter([{"type": "content", "text": "x" * 10}] * 20), window_ms=10_000, max_chars=50)
+        out = list(c)
+        assert _text(out) == "x" * 200
+        assert all(len(e["text"]) <= 50 for e in out)
+        assert c.content_frames >= 4
+
+    def test_window_zero_passthrough(self):
+        events = [{"type": "content", "text": str(i)} for i in range(10)]
+        c = StreamCoalescer(iter(events), window_ms=0)
+        assert list(c) == events
+        assert c._thread is None and c.frames_per_delta == 1.0
+
+
+class TestLifecycle:
+    def test_error_after_held_text(self):
+        def boom():
+            yield {"type": "content", "text": "a"}
+            yield {"type": "content", "text": "b"}
+            raise ConnectionError("provider down")
+
+        out = []
+        with pytest.raises(ConnectionError, match="provider down"):
+            for e in StreamCoalescer(boom(), window_ms=1000):
+                out.append(e)
+        assert _text(out) == "ab"
+
+    def test_close_stops_and_closes_stream(self):
+        closed = threading.Event()
+
+        def endless():
+            try:
+                while True:
+                    time.sleep(0.005)
+                    yield {"type": "content", "text": "."}
+            finally:
+                closed.set()
+
+        c = StreamCoalescer(endless(), window_ms=10)
+        it = iter(c)
+        next(it)
+        c.close()
+        assert closed.wait(1)
+        assert not c._thread.is_alive()
+
+    def test_close_cancels_running_stream_and_waits(self):
+        cancel = threading.Event()
+        cleaned = threading.Event()
+
+        def busy():
+            try:
+                yield {"type": "content", "text": "a"}
+                # Stands in for an LLM/tool call that only checks cancel_flag
+                while not cancel.is_set():
+                    time.sleep(0.01)
+                time.sleep(0.05)
+            finally:
+                cleaned.set()
+
+        c = StreamCoalescer(busy(), window_ms=10, on_cancel=cancel.set)
+        it = iter(c)
+        next(it)
+        c.close()
+        assert cancel.is_set()
+        assert cleaned.is_set()  # joined: cleanup ran before close() returned
+        assert not c._thread.is_alive()
+
+    def test_finished_stream_not_cancelled(self):
+        cancelled = []
+        c = StreamCoalescer(_burst(3), window_ms=10, on_cancel=lambda: cancelled.append(1))
+        list(c)
+        c.close()
+        assert cancelled == []
+
+    def test_queue_bounded_for_slow_consumer(self):
+        from core.chat import stream_coalescer
+        produced = []
+
+        def fast():
+            for i in range(stream_coalescer.QUEUE_SIZE * 4):
+                produced.append(i)
+                yield {"type": "tool_start", "id": i}
+
+        c = StreamCoalescer(fast(), window_ms=10)
+        it = iter(c)
+        next(it)
+        time.sleep(0.2)
+        assert len(produced) <= stream_coalescer.QUEUE_SIZE + 2
+        c.close()
+        assert not c._thread.is_alive()
@@ -24,6 +24,7 @@ def sm():
     inst = ChatSessionManager.__new__(ChatSessionManager)
     inst._lock = threading.RLock()
     inst._streaming_count = 0
+    inst._streaming_chats = {}
     return inst
 
 
@@ -0,0 +1,307 @@
+"""Warm transcription service (core/stt/service.py) and its callers.
+
+Covers:
+  - live mic jobs are served before queued uploads
+  - the upload queue is bounded; live jobs always get in
+  - workers run clips concurrently on one shared model
+  - idle unload drops the model and the next job reloads it
+  - a job that times out while queued is cancelled, never run
+  - stats report queue wait and real-time factor
+  - shared services are reused per key and retired on key change
+  - stt.utils.transcribe passes priority/timeout only to queued providers
+  - the faster-whisper provider keeps one warm model across re-creates and
+    batches only long uploads
+
+Fake load/run callables and a fake faster_whisper module — no Whisper
+model needed. sounddevice is mocked for the provider tests when PortAudio
+is missing, as in test_audio_fallbacks.py, because core.audio imports it.
+"""
+import sys
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+
+def sounddevice_available():
+    try:
+        import sounddevice  # noqa: F401
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+from core.stt import service as svc
+from core.stt.service import (
+    PRIORITY_LIVE, PRIORITY_UPLOAD, TranscriptionQueueFull, TranscriptionService,
+)
+
+
+class Model:
+    def __init__(self):
+        self.calls = []
+
+
+def _service(run=None, **kwargs):
+    loads = []
+
+    def load():
+        loads.append(Model())
+        return loads[-1]
+
+    def default_run(model, job):
+        model.calls.append(job.audio)
+        return f"text:{job.audio}"
+
+    s = TranscriptionService(load, run or default_run, **kwargs)
+    s.loads = loads
+    return s
+
+
+def _gated(gate, started=None):
+    """run() that blocks on `gate`, recording the order clips start in."""
+    order = []
+
+    def run(model, job):
+        order.append(job.audio)
+        if started is not None:
+            started.set()
+        gate.wait(5)
+        return job.audio
+    return run, order
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    yield
+    for service, _ in list(svc._services.values()):
+        service.shutdown()
+    svc._services.clear()
+
+
+class TestQueue:
+    def test_warm_loads_once(self):
+        s = _service()
+        s.warm()
+        assert s.transcribe("a", 1.0, timeout=5) == "text:a"
+        assert s.transcribe("b", 1.0, timeout=5) == "text:b"
+        assert len(s.loads) == 1 and s.loads[0].calls == ["a", "b"]
+        s.shutdown()
+
+    def test_live_served_first(self):
+        gate, started = threading.Event(), threading.Event()
+        run, order = _gated(gate, started)
+        s = _service(run)
+        first = s.submit("busy", 1.0)
+        started.wait(5)
+        uploads = [s.submit(f"up{i}", 1.0) for i in range(3)]
+        live = s.submit("mic", 1.0, priority=PRIORITY_LIVE)
+        gate.set()
+        for f in [first, live, *uploads]:
+            f.result(5)
+        assert order == ["busy", "mic", "up0", "up1", "up2"]
+        s.shutdown()
+
+    def test_upload_queue_bounded(self):
+        gate, started = threading.Event(), threading.Event()
+        run, _ = _gated(gate, started)
+        s = _service(run, max_queue=2)
+        running = s.submit("busy", 1.0)
+        started.wait(5)
+        queued = [s.submit("q1", 1.0), s.submit("q2", 1.0)]
+        with pytest.raises(TranscriptionQueueFull):
+            s.submit("q3", 1.0)
+        live = s.submit("mic", 1.0, priority=PRIORITY_LIVE)  # never turned away
+        gate.set()
+        for f in [running, live, *queued]:
+            f.result(5)
+        assert s.stats()["rejected"] == 1 and s.stats()["queued"] == 0
+        s.shutdown()
+
+    def test_workers_share_model_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def run(model, job):
+            barrier.wait()  # breaks unless both clips run at once
+            return id(model)
+
+        s = _service(run, workers=2)
+        futures = [s.submit("a", 1.0), s.submit("b", 1.0)]
+        ids = {f.result(5) for f in futures}
+        assert len(ids) == 1 and len(s.loads) == 1
+        s.shutdown()
+
+    def test_timeout_cancels_queued_job(self):
+        gate, started = threading.Event(), threading.Event()
+        run, order = _gated(gate, started)
+        s = _service(run)
+        running = s.submit("busy", 1.0)
+        started.wait(5)
+        with pytest.raises(TimeoutError):
+            s.transcribe("late", 1.0, timeout=0.05)
+        gate.set()
+        running.result(5)
+        assert s.transcribe("next", 1.0, timeout=5) == "next"
+        assert "late" not in order
+        assert s.stats()["cancelled"] == 1
+        s.shutdown()
+
+    def test_run_error_reaches_caller(self):
+        def run(model, job):
+            raise ValueError("decode failed")
+        s = _service(run)
+        with pytest.raises(ValueError):
+            s.transcribe("a", 1.0, timeout=5)
+        assert s.stats()["failed"] == 1
+        s.shutdown()
+
+    def test_shutdown_drains_then_unloads(self):
+        s = _service()
+        s.warm()
+        futures = [s.submit(str(i), 1.0) for i in range(3)]
+        s.shutdown()
+        assert [f.result(5) for f in futures] == ["text:0", "text:1", "text:2"]
+        deadline = time.monotonic() + 5
+        while s.model is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert s.model is None
+        with pytest.raises(RuntimeError):
+            s.submit("x", 1.0)
+
+
+class TestResidency:
+    def test_idle_unload_and_reload(self):
+        s = _service(idle_unload=0.1)
+        s.warm()
+        deadline = time.monotonic() + 5
+        while s.model is not None and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert s.model is None and s.stats()["unloads"] == 1
+        assert s.transcribe("a", 1.0, timeout=5) == "text:a"
+        assert len(s.loads) == 2
+        s.shutdown()
+
+    def test_load_failure_propagates_from_warm(self):
+        def load():
+            raise RuntimeError("no model")
+        s = TranscriptionService(load, lambda m, j: "")
+        with pytest.raises(RuntimeError):
+            s.warm()
+
+    def test_stats(self):
+        def run(model, job):
+            time.sleep(0.02)
+            return ""
+        s = _service(run)
+        s.transcribe("a", 0.1, timeout=5)
+        stats = s.stats()
+        assert stats["completed"] == 1 and stats["loaded"]
+        assert stats["real_time_factor"]["avg"] >= 0.1   # ~0.02s work / 0.1s audio
+        assert stats["queue_wait_ms"]["max"] >= 0
+        s.shutdown()
+
+
+class TestRegistry:
+    def test_reused_per_key_and_retired_on_change(self):
+        a = svc.acquire_service("small", _service)
+        assert svc.acquire_service("small", _service) is a
+        svc.release_service("small", a)
+        assert not a.closed                       # still one holder
+        b = svc.acquire_service("large", _service)
+        assert a.closed and b is not a
+        svc.release_service("large", b)
+        assert b.closed
+
+
+class TestHelper:
+    def test_queued_provider_gets_priority(self):
+        from core.stt.utils import transcribe
+        client = MagicMock(queued=True)
+        transcribe(client, "clip.wav", live=True, timeout=3)
+        client.transcribe_file.assert_called_once_with("clip.wav", priority=PRIORITY_LIVE, timeout=3)
+        client.reset_mock()
+        transcribe(client, "clip.wav")
+        client.transcribe_file.assert_called_once_with("clip.wav", priority=PRIORITY_UPLOAD, timeout=None)
+
+    def test_plain_provider_called_as_before(self):
+        from core.stt.utils import transcribe
+        client = MagicMock(spec=["transcribe_file"])
+        transcribe(client, "clip.wav", live=True, timeout=3)
+        client.transcribe_file.assert_called_once_with("clip.wav")
+
+
+class TestFasterWhisperProvider:
+    @pytest.fixture
+    def whisper(self, monkeypatch):
+        segment = MagicMock(text="hello there", no_speech_prob=0.1)
+        models, pipelines = [], []
+
+        def make_model(*args, **kwargs):
+            model = MagicMock(spec=["transcribe"])
+            model.transcribe.return_value = ([segment], None)
+            model.kwargs = kwargs
+            models.append(model)
+            return model
+
+        def make_pipeline(model):
+            pipeline = MagicMock()
+            pipeline.transcribe.return_value = ([segment], None)
+            pipelines.append(pipeline)
+            return pipeline
+
+        fw = MagicMock(WhisperModel=MagicMock(side_effect=make_model),
+                       BatchedInferencePipeline=MagicMock(side_effect=make_pipeline))
+        torch = MagicMock()
+        torch.cuda.is_available.return_value = False
+        if not sounddevice_available():
+            mock_sd = MagicMock()
+            mock_sd.query_devices.return_value = []
+            mock_sd.default.device = (0, 0)
+            monkeypatch.setitem(sys.modules, "sounddevice", mock_sd)
+        monkeypatch.setitem(sys.modules, "faster_whisper", fw)
+        monkeypatch.setitem(sys.modules, "torch", torch)
+        from core.stt.providers import faster_whisper
+        return faster_whisper, models, pipelines
+
+    def _wav(self, tmp_path, seconds, rate=48000):
+        path = tmp_path / f"clip{seconds}.wav"
+        t = np.arange(int(rate * seconds)) / rate
+        sf.write(path, (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32), rate)
+        return str(path)
+
+    def test_recreate_keeps_model_warm(self, whisper, tmp_path):
+        fw, models, _ = whisper
+        first = fw.FasterWhisperProvider()
+        second = fw.FasterWhisperProvider()
+        first.close()
+        assert len(models) == 1 and second.is_available() and second.model is models[0]
+        assert models[0].kwargs["num_workers"] >= 1
+        assert second.transcribe_file(self._wav(tmp_path, 1), priority=PRIORITY_LIVE) == "hello there"
+        audio = models[0].transcribe.call_args[0][0]
+        assert audio.dtype == np.float32 and len(audio) == 16000
+        assert second.stats()["completed"] == 1
+        second.close()
+        assert not second.is_available() and second.transcribe_file("x.wav") is None
+
+    def test_long_uploads_batched(self, whisper, tmp_path):
+        fw, models, pipelines = whisper
+        provider = fw.FasterWhisperProvider()
+        with patch("config.FASTER_WHISPER_BATCH_SIZE", 8, create=True):
+            provider.transcribe_file(self._wav(tmp_path, 40, rate=16000))
+            provider.transcribe_file(self._wav(tmp_path, 40, rate=16000), priority=PRIORITY_LIVE)
+            provider.transcribe_file(self._wav(tmp_path, 2, rate=16000))
+        assert len(pipelines) == 1 and pipelines[0].transcribe.call_count == 1
+        assert pipelines[0].transcribe.call_args.kwargs["batch_size"] == 8
+        assert models[0].transcribe.call_count == 2
+        provider.close()
+
+    def test_queue_full_surfaces(self, whisper, tmp_path):
+        fw, _, _ = whisper
+        provider = fw.FasterWhisperProvider()
+        with patch.object(provider._service, "transcribe", side_effect=TranscriptionQueueFull("busy")):
+            with pytest.raises(TranscriptionQueueFull):
+                provider.transcribe_file(self._wav(tmp_path, 1))
+        provider.close()
@@ -19,7 +19,8 @@ class TestSchedulerTypeField:
 
     def _make_scheduler(self, tmp_path, tasks=None):
         """Create a ContinuityScheduler with mocked system/executor and optional seed tasks."""
-        from core.continuity.scheduler import ContinuityScheduler
+        from core.continuity.event_router import EventRouter
+        from core.continuity.scheduler import ContinuityScheduler, _FireQueue
 
         base_dir = tmp_path / "user" / "continuity"
         base_dir.mkdir(parents=True)
@@ -43,11 +44,14 @@ class TestSchedulerTypeField:
         sched._activity_path = base_dir / "activity.json"
         sched._tasks = {}
         sched._activity = []
+        sched._run_log = None
         sched._task_running = {}
         sched._task_pending = {}
         sched._task_last_matched = {}
         sched._task_progress = {}
         sched._event_threads = []
+        sched._fire = _FireQueue()
+        sched._router = EventRouter(sched)
         sched._load_tasks()
         sched._load_activity()
 
@@ -146,7 +150,8 @@ class TestSchedulerEventFinders:
     """Test the event/webhook lookup methods."""
 
     def _make_scheduler(self, tmp_path):
-        from core.continuity.scheduler import ContinuityScheduler
+        from core.continuity.event_router import EventRouter
+        from core.continuity.scheduler import ContinuityScheduler, _FireQueue
         base_dir = tmp_path / "user" / "continuity"
         base_dir.mkdir(parents=True)
 
@@ -161,11 +166,14 @@ class TestSchedulerEventFinders:
         sched._activity_path = base_dir / "activity.json"
         sched._tasks = {}
         sched._activity = []
+        sched._run_log = None
         sched._task_running = {}
         sched._task_pending = {}
         sched._task_last_matched = {}
         sched._task_progress = {}
         sched._event_threads = []
+        sched._fire = _FireQueue()
+        sched._router = EventRouter(sched)
         return sched
 
     def test_find_tasks_by_event(self, tmp_path):
@@ -236,7 +244,8 @@ class TestFireEventTask:
     """Test fire_event_task including filter logic."""
 
     def _make_scheduler(self, tmp_path):
-        from core.continuity.scheduler import ContinuityScheduler
+        from core.continuity.event_router import EventRouter
+        from core.continuity.scheduler import ContinuityScheduler, _FireQueue
         base_dir = tmp_path / "user" / "continuity"
         base_dir.mkdir(parents=True)
 
@@ -254,11 +263,14 @@ class TestFireEventTask:
         sched._activity_path = base_dir / "activity.json"
         sched._tasks = {}
         sched._activity = []
+        sched._run_log = None
         sched._task_running = {}
         sched._task_pending = {}
         sched._task_last_matched = {}
         sched._task_progress = {}
         sched._event_threads = []
+        sched._fire = _FireQueue()
+        sched._router = EventRouter(sched)
         return sched
 
     def test_fire_event_task_success(self, tmp_path):
@@ -404,7 +416,8 @@ class TestCronSkipsEventTasks:
     """Verify _check_and_run skips daemon/webhook types."""
 
     def test_check_and_run_skips_daemons(self, tmp_path):
-        from core.continuity.scheduler import ContinuityScheduler
+        from core.continuity.event_router import EventRouter
+        from core.continuity.scheduler import ContinuityScheduler, _FireQueue
         base_dir = tmp_path / "user" / "continuity"
         base_dir.mkdir(parents=True)
 
@@ -419,11 +432,14 @@ class TestCronSkipsEventTasks:
         sched._activity_path = base_dir / "activity.json"
         sched._tasks = {}
         sched._activity = []
+        sched._run_log = None
         sched._task_running = {}
         sched._task_pending = {}
         sched._task_last_matched = {}
         sched._task_progress = {}
         sched._event_threads = []
+        sched._fire = _FireQueue()
+        sched._router = EventRouter(sched)
 
         # Create a daemon with a schedule that would match every minute
         sched.create_task({
@@ -587,18 +603,13 @@ class TestPluginDaemonCapability:
         loader = PluginLoader()
 
         mock_scheduler = MagicMock()
-        mock_scheduler.find_tasks_by_event.return_value = [
-            {"id": "task-1", "name": "Handler 1"},
-            {"id": "task-2", "name": "Handler 2"},
-        ]
-        mock_scheduler.fire_event_task.return_value = {"success": True}
+        mock_scheduler.route_event.return_value = True
         loader._scheduler = mock_scheduler
 
-        loader.emit_daemon_event("discord_message", '{"text": "hello"}')
+        accepted = loader.emit_daemon_event("discord_message", '{"text": "hello"}')
 
-        assert mock_scheduler.fire_event_task.call_count == 2
-        mock_scheduler.fire_event_task.assert_any_call("task-1", '{"text": "hello"}', reply_callback=None)
-        mock_scheduler.fire_event_task.assert_any_call("task-2", '{"text": "hello"}', reply_callback=None)
+        assert accepted is True
+        mock_scheduler.route_event.assert_called_once_with("discord_message", '{"text": "hello"}', reply_callback=None)
 
     def test_emit_daemon_event_no_scheduler(self):
         """Emit with no scheduler should not crash."""
@@ -613,9 +624,9 @@ class TestPluginDaemonCapability:
         from core.plugin_loader import PluginLoader
         loader = PluginLoader()
         mock_scheduler = MagicMock()
-        mock_scheduler.find_tasks_by_event.return_value = []
+        mock_scheduler.route_event.return_value = False
         loader._scheduler = mock_scheduler
-        loader.emit_daemon_event("nonexistent_source", "data")
+        assert not loader.emit_daemon_event("nonexistent_source", "data")
         mock_scheduler.fire_event_task.assert_not_called()
 
 
@@ -627,7 +638,8 @@ class TestDaemonIntegration:
     """Integration test: plugin emits event -> scheduler finds task -> executor runs."""
 
     def test_full_daemon_flow(self, tmp_path):
-        from core.continuity.scheduler import ContinuityScheduler
+        from core.continuity.event_router import EventRouter
+        from core.continuity.scheduler import ContinuityScheduler, _FireQueue
         from core.plugin_loader import PluginLoader
 
         base_dir = tmp_path / "user" / "continuity"
@@ -647,11 +659,14 @@ class TestDaemonIntegration:
         sched._activity_path = base_dir / "activity.json"
         sched._tasks = {}
         sched._activity = []
+        sched._run_log = None
         sched._task_running = {}
         sched._task_pending = {}
         sched._task_last_matched = {}
         sched._task_progress = {}
         sched._event_threads = []
+        sched._fire = _FireQueue()
+        sched._router = EventRouter(sched)
 
         # Create a daemon task
         task = sched.create_task({
@@ -719,15 +734,15 @@ class TestReplyHandler:
         loader.register_reply_handler("telegram", handler)
 
         mock_scheduler = MagicMock()
-        mock_scheduler.find_tasks_by_event.return_value = [{"id": "t1", "name": "Test"}]
         loader._scheduler = mock_scheduler
 
         loader.emit_daemon_event("telegram_message", '{"text": "hi"}')
-        mock_scheduler.fire_event_task.assert_called_once_with("t1", '{"text": "hi"}', reply_callback=handler)
+        mock_scheduler.route_event.assert_called_once_with("telegram_message", '{"text": "hi"}', reply_callback=handler)
 
     def test_reply_callback_called_on_response(self, tmp_path):
         """Reply callback fires when executor produces a response."""
-        from core.continuity.scheduler import ContinuityScheduler
+        from core.continuity.event_router import EventRouter
+        from core.continuity.scheduler import ContinuityScheduler, _FireQueue
 
         base_dir = tmp_path / "user" / "continuity"
         base_dir.mkdir(parents=True)
@@ -756,11 +771,14 @@ class TestReplyHandler:
         sched._activity_path = base_dir / "activity.json"
         sched._tasks = {}
         sched._activity = []
+        sched._run_log = None
         sched._task_running = {}
         sched._task_pending = {}
         sched._task_last_matched = {}
         sched._task_progress = {}
         sched._event_threads = []
+        sched._fire = _FireQueue()
+        sched._router = EventRouter(sched)
 
         task = sched.create_task({
             "name": "Telegram Reply Test",
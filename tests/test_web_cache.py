@@ -0,0 +1,218 @@
+"""Web tool HTTP cache + parse-once page tests, against a local HTTP server.
+
+Covers:
+  - Cache-Control max-age responses are served from disk without a request
+  - ETag / Last-Modified revalidation: 304 replays the stored body
+  - no-store and non-HTML-without-headers responses are not reused
+  - HTML without cache headers gets the WEB_CACHE_TTL fallback
+  - WEB_CACHE_ENABLED=false bypasses the cache
+  - Vary: a request with different values for the varied headers is a miss
+  - get_session() (IP checks, SOCKS test) is never cached
+  - DDG results cached per query; empty results are not
+  - get_site_links then get_images on one URL: one fetch, one parse
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+import config
+
+
+PAGE = b"""<html><body><nav><a href="/nav">Nav</a></nav>
+<main><p>Hello cached world</p><a href="/about">About</a>
+<img src="/pics/photo.jpg" alt="photo" width="300" height="200"></main></body></html>"""
+
+# path -> (status, headers, body). Handler records every request it sees.
+ROUTES = {
+    '/max-age': (200, {'Content-Type': 'text/html', 'Cache-Control': 'max-age=300'}, PAGE),
+    '/etag': (200, {'Content-Type': 'text/html', 'Cache-Control': 'no-cache', 'ETag': '"v1"'}, PAGE),
+    '/modified': (200, {'Content-Type': 'text/html', 'Cache-Control': 'max-age=0',
+                        'Last-Modified': 'Wed, 01 Jan 2025 00:00:00 GMT'}, PAGE),
+    '/no-store': (200, {'Content-Type': 'text/html', 'Cache-Control': 'no-store'}, PAGE),
+    '/plain': (200, {'Content-Type': 'text/plain'}, b'203.0.113.9'),
+    '/bare-html': (200, {'Content-Type': 'text/html'}, PAGE),
+    '/vary': (200, {'Content-Type': 'text/html', 'Cache-Control': 'max-age=300',
+                    'Vary': 'Accept-Language'}, PAGE),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.seen.append((self.path, dict(self.headers)))
+        status, headers, body = ROUTES.get(self.path, (404, {'Content-Type': 'text/plain'}, b'nope'))
+        etag = headers.get('ETag')
+        modified = headers.get('Last-Modified')
+        if (etag and self.headers.get('If-None-Match') == etag) or \
+                (modified and self.headers.get('If-Modified-Since') == modified):
+            self.send_response(304)
+            if etag:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    srv.seen = []
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    srv.base = f"http://127.0.0.1:{srv.server_address[1]}"
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    """Fresh caching session backed by a temp cache directory."""
+    from core import http_cache, socks_proxy
+    monkeypatch.setattr(http_cache, '_cache', http_cache.HTTPCache(tmp_path / 'http'))
+    monkeypatch.setattr(config, 'SOCKS_ENABLED', False, raising=False)
+    monkeypatch.setattr(config, 'WEB_CACHE_ENABLED', True, raising=False)
+    monkeypatch.setattr(config, 'WEB_CACHE_TTL', 600, raising=False)
+    socks_proxy.clear_session_cache()
+    yield socks_proxy.get_caching_session()
+    socks_proxy.clear_session_cache()
+
+
+def _hits(server, path):
+    return sum(1 for p, _ in server.seen if p == path)
+
+
+# ─── HTTP cache ───────────────────────────────────────────────────────────
+
+def test_max_age_served_from_disk(server, session):
+    first = session.get(server.base + '/max-age')
+    second = session.get(server.base + '/max-age')
+    assert first.text == second.text and b'Hello cached world' in second.content
+    assert getattr(second, 'from_cache', False)
+    assert _hits(server, '/max-age') == 1
+
+
+def test_etag_revalidation_replays_body(server, session):
+    session.get(server.base + '/etag')
+    resp = session.get(server.base + '/etag')
+    assert resp.status_code == 200 and resp.content == PAGE
+    assert _hits(server, '/etag') == 2
+    assert server.seen[-1][1].get('If-None-Match') == '"v1"'
+    from core import http_cache
+    assert http_cache.get_cache().stats()['revalidated'] == 1
+
+
+def test_last_modified_revalidation(server, session):
+    session.get(server.base + '/modified')
+    resp = session.get(server.base + '/modified')
+    assert resp.content == PAGE
+    assert server.seen[-1][1].get('If-Modified-Since') == ROUTES['/modified'][1]['Last-Modified']
+
+
+def test_no_store_and_headerless_non_html_not_reused(server, session):
+    for path in ('/no-store', '/plain'):
+        session.get(server.base + path)
+        resp = session.get(server.base + path)
+        assert not getattr(resp, 'from_cache', False)
+        assert _hits(server, path) == 2
+
+
+def test_headerless_html_uses_ttl_fallback(server, session):
+    session.get(server.base + '/bare-html')
+    assert getattr(session.get(server.base + '/bare-html'), 'from_cache', False)
+    assert _hits(server, '/bare-html') == 1
+
+
+def test_disabled_cache_always_fetches(server, session, monkeypatch):
+    monkeypatch.setattr(config, 'WEB_CACHE_ENABLED', False, raising=False)
+    session.get(server.base + '/max-age')
+    session.get(server.base + '/max-age')
+    assert _hits(server, '/max-age') == 2
+
+
+def test_errors_not_cached(server, session):
+    assert session.get(server.base + '/missing').status_code == 404
+    assert session.get(server.base + '/missing').status_code == 404
+    assert _hits(server, '/missing') == 2
+
+
+def test_vary_keys_on_request_headers(server, session):
+    url = server.base + '/vary'
+    session.get(url, headers={'Accept-Language': 'en'})
+    assert getattr(session.get(url, headers={'Accept-Language': 'en'}), 'from_cache', False)
+    resp = session.get(url, headers={'Accept-Language': 'de'})
+    assert not getattr(resp, 'from_cache', False)
+    assert _hits(server, '/vary') == 2
+
+
+def test_plain_session_not_cached(server, session):
+    from core import socks_proxy
+    plain = socks_proxy.get_session()
+    assert plain is not session
+    plain.get(server.base + '/max-age')
+    plain.get(server.base + '/max-age')
+    assert _hits(server, '/max-age') == 2
+
+
+def test_prune_respects_size_cap(tmp_path):
+    from core.http_cache import HTTPCache
+    cache = HTTPCache(tmp_path)
+    for i in range(5):
+        cache.store(f"k{i}", {'headers': {}, 'fresh_until': 0}, b'x' * 1000)
+    assert cache.prune(max_bytes=2500) == 3
+    assert len(list(tmp_path.glob('*.body'))) == 2
+
+
+# ─── Web tools ────────────────────────────────────────────────────────────
+
+def test_ddg_results_cached_per_query(monkeypatch):
+    from functions import web
+    monkeypatch.setattr(web, '_search_cache', type(web._search_cache)())
+    monkeypatch.setattr(config, 'WEB_CACHE_ENABLED', True, raising=False)
+    monkeypatch.setattr(config, 'WEB_SEARCH_CACHE_TTL', 900, raising=False)
+    results = [{'title': 'T', 'href': 'https://example.com', 'body': ''}]
+    with patch.object(web, '_search_ddg_uncached', return_value=results) as fetch:
+        assert web.search_ddg_html('Python  ', 8) == results
+        assert web.search_ddg_html('python', 8) == results
+        assert fetch.call_count == 1
+        web.search_ddg_html('python', 15)
+        assert fetch.call_count == 2
+    with patch.object(web, '_search_ddg_uncached', return_value=[]) as fetch:
+        web.search_ddg_html('nothing', 8)
+        web.search_ddg_html('nothing', 8)
+        assert fetch.call_count == 2, "empty results must not be cached"
+
+
+def test_links_then_images_fetch_and_parse_once(server, session, monkeypatch):
+    from functions import web
+    monkeypatch.setattr(web, '_page_cache', type(web._page_cache)())
+    url = server.base + '/max-age'
+    with patch.object(web, 'WebPage', wraps=web.WebPage) as parse:
+        out, ok = web.execute('get_site_links', {'url': url}, config)
+        assert ok and '/about' in out and '/nav' not in out
+        out, ok = web.execute('get_images', {'url': url}, config)
+        assert ok and 'photo.jpg' in out
+        out, ok = web.execute('get_website', {'url': url}, config)
+        assert ok and 'Hello cached world' in out
+        assert parse.call_count == 1
+    assert _hits(server, '/max-age') == 1
+
+
+def test_extractors_share_one_tree_without_interference():
+    """[REGRESSION_GUARD] Content extraction strips nav/forms; links on the
+    same parsed page must still see nav when strip_nav=False."""
+    from functions.web import WebPage
+    page = WebPage(PAGE.decode(), 'http://127.0.0.1/')
+    assert 'Nav' not in page.content()
+    assert [l['text'] for l in page.links(strip_nav=False)] == ['Nav', 'About']
+    assert [l['text'] for l in page.links()] == ['About']
+    assert page.images()[0]['name'] == 'photo'
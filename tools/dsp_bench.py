@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: polyphase resampling (core/audio/dsp.py) vs np.interp.
+
+Times the rate conversions TTS playback, wake word and STT actually do,
+excluding the one-time filter design.
+
+Usage:
+    python tools/dsp_bench.py [--repeat N]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from core.audio.dsp import filter_bank, rate_ratio, resample  # noqa: E402
+
+CASES = {
+    'tts 24k->48k, 5s': (24000, 48000, 5.0),
+    'tts 22.05k->48k, 5s': (22050, 48000, 5.0),
+    'tts 24k->44.1k, 5s': (24000, 44100, 5.0),
+    'wakeword 48k->16k, 80ms chunk': (48000, 16000, 0.08),
+    'stt 44.1k->16k, 10s': (44100, 16000, 10.0),
+}
+
+
+def interp(audio, from_rate, to_rate):
+    n = int(len(audio) * to_rate / from_rate)
+    return np.interp(np.linspace(0, len(audio) - 1, n), np.arange(len(audio)), audio.astype(np.float64))
+
+
+def benchmark(repeat=5):
+    """Returns {case: (polyphase_ms, interp_ms)}."""
+    rng = np.random.default_rng(0)
+    results = {}
+    for name, (src, dst, seconds) in CASES.items():
+        audio = (rng.standard_normal(int(src * seconds)) * 0.1).astype(np.float32)
+        filter_bank(*rate_ratio(src, dst))  # exclude one-time design
+        timings = []
+        for fn in (resample, interp):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn(audio, src, dst)
+            timings.append((time.perf_counter() - start) * 1000 / repeat)
+        results[name] = tuple(timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    for case, (poly_ms, interp_ms) in benchmark(args.repeat).items():
+        print(f"{case:32s} polyphase {poly_ms:8.2f} ms   interp {interp_ms:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()